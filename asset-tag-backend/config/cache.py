@@ -4,11 +4,13 @@ Redis cache configuration and client management
 
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 import redis.asyncio as redis
 
-from config.cache_strategies import (CacheInvalidation, cache_key_manager,
+from config.cache_strategies import (ENTITY_VERSIONS_KEY, SEARCH_GENERATION_KEY,
+                                     CacheInvalidation, cache_key_manager,
                                      cache_metrics)
 from config.settings import settings
 
@@ -18,6 +20,25 @@ logger = logging.getLogger(__name__)
 redis_pool = None
 redis_client = None
 
+# Sets each key whose stored JSON still has the expected "version" (0 when the
+# key is missing) and returns the 1-based positions of the keys that did not
+COMPARE_AND_SET_SCRIPT = """
+local conflicts = {}
+for i, key in ipairs(KEYS) do
+    local current = redis.call('GET', key)
+    local version = 0
+    if current then
+        version = tonumber(cjson.decode(current)['version']) or 0
+    end
+    if version == tonumber(ARGV[2 * i]) then
+        redis.call('SET', key, ARGV[2 * i + 1], 'EX', ARGV[1])
+    else
+        table.insert(conflicts, i)
+    end
+end
+return conflicts
+"""
+
 if hasattr(settings, 'use_redis') and settings.use_redis:
     redis_pool = redis.ConnectionPool.from_url(
         settings.redis_url, encoding="utf-8", decode_responses=True, max_connections=20
@@ -89,6 +110,8 @@ class CacheManager:
 
     async def get_many(self, keys: list[str]) -> dict[str, Any]:
         """Get multiple values from cache"""
+        if not self.enabled or not keys:
+            return {}
         try:
             values = await self.client.mget(keys)
             result = {}
@@ -104,6 +127,10 @@ class CacheManager:
         self, mapping: dict[str, Any], ttl: Optional[int] = None
     ) -> bool:
         """Set multiple values in cache"""
+        if not self.enabled:
+            return False
+        if not mapping:
+            return True
         try:
             serialized = {
                 key: json.dumps(value, default=str) for key, value in mapping.items()
@@ -149,6 +176,57 @@ class CacheManager:
         ttl = self.key_manager.get_ttl(strategy_name)
         return await self.set(key, value, ttl)
 
+    async def get_many_with_strategy(
+        self, strategy_name: str, ids: List[str], field: str = "asset_id"
+    ) -> Dict[str, Any]:
+        """Get values for many ids of one strategy with a single MGET"""
+        keys = {
+            self.key_manager.get_key(strategy_name, **{field: id_}): id_ for id_ in ids
+        }
+        found = await self.get_many(list(keys))
+        return {keys[key]: value for key, value in found.items()}
+
+    async def set_many_with_strategy(
+        self, strategy_name: str, values: Dict[str, Any], field: str = "asset_id"
+    ) -> bool:
+        """Set values for many ids of one strategy in one pipeline"""
+        mapping = {
+            self.key_manager.get_key(strategy_name, **{field: id_}): value
+            for id_, value in values.items()
+        }
+        return await self.set_many(mapping, self.key_manager.get_ttl(strategy_name))
+
+    async def compare_and_set_many_with_strategy(
+        self,
+        strategy_name: str,
+        values: Dict[str, Tuple[int, Dict[str, Any]]],
+        field: str = "asset_id",
+    ) -> Optional[Set[str]]:
+        """Write values whose stored version is unchanged, in one script call
+
+        ``values`` maps ids to (expected version, new value). Returns the ids
+        another writer got to first, or None if the write failed.
+        """
+        if not self.enabled:
+            return None
+        if not values:
+            return set()
+        ids = list(values)
+        keys = [self.key_manager.get_key(strategy_name, **{field: id_}) for id_ in ids]
+        args: List[Any] = [self.key_manager.get_ttl(strategy_name)]
+        for id_ in ids:
+            version, value = values[id_]
+            args.extend([version, json.dumps(value, default=str)])
+        try:
+            conflicts = await self.client.eval(
+                COMPARE_AND_SET_SCRIPT, len(keys), *keys, *args
+            )
+        except Exception as e:
+            logger.error(f"Cache compare-and-set error for {strategy_name}: {e}")
+            self.metrics.record_error()
+            return None
+        return {ids[int(position) - 1] for position in conflicts}
+
     async def delete_with_strategy(self, strategy_name: str, **kwargs) -> bool:
         """Delete value using cache strategy"""
         key = self.key_manager.get_key(strategy_name, **kwargs)
@@ -168,6 +246,63 @@ class CacheManager:
             self.client, organization_id
         )
 
+    async def invalidate_search_cache(self) -> None:
+        """Invalidate cached search results after an index write"""
+        if not self.enabled:
+            return
+        try:
+            await CacheInvalidation.invalidate_search_cache(self.client)
+        except Exception as e:
+            logger.error(f"Error invalidating search cache: {e}")
+            self.metrics.record_error()
+
+    async def get_search_generation(self) -> int:
+        """Current search cache generation (0 if unset or Redis is disabled)"""
+        if not self.enabled:
+            return 0
+        try:
+            value = await self.client.get(SEARCH_GENERATION_KEY)
+            return int(value) if value else 0
+        except Exception as e:
+            logger.error(f"Error reading search cache generation: {e}")
+            self.metrics.record_error()
+            return 0
+
+    async def bump_entity_versions(self, tables: List[str]) -> bool:
+        """Bump the write counters (and last write time) of tables"""
+        if not self.enabled:
+            return False
+        try:
+            now = time.time()
+            pipe = self.client.pipeline(transaction=False)
+            for table in tables:
+                pipe.hincrby(ENTITY_VERSIONS_KEY, table, 1)
+                pipe.hset(ENTITY_VERSIONS_KEY, f"{table}:at", now)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error bumping entity versions for {tables}: {e}")
+            self.metrics.record_error()
+            return False
+
+    async def get_entity_versions(
+        self, tables: List[str]
+    ) -> Optional[Dict[str, Tuple[int, float]]]:
+        """Write counter and last write time per table (None if unavailable)"""
+        if not self.enabled:
+            return None
+        try:
+            fields = [field for table in tables for field in (table, f"{table}:at")]
+            values = await self.client.hmget(ENTITY_VERSIONS_KEY, fields)
+        except Exception as e:
+            logger.error(f"Error reading entity versions: {e}")
+            self.metrics.record_error()
+            return None
+        return {
+            table: (int(values[2 * i] or 0), float(values[2 * i + 1] or 0))
+            for i, table in enumerate(tables)
+        }
+
     async def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics"""
         return self.metrics.get_stats()
@@ -53,12 +53,18 @@ class CacheStrategy:
     # ML model predictions (TTL: 60s)
     ML_PREDICTIONS = ("ml:predictions:{asset_id}", 60)
 
+    # Online feature aggregates checkpoint (TTL: 30 days)
+    ASSET_ONLINE_STATE = ("ml:online:{asset_id}", 2592000)
+
     # Rate limiting (TTL: 60s)
     RATE_LIMIT = ("rate:limit:{identifier}", 60)
 
     # WebSocket connections (TTL: 300s)
     WEBSOCKET_CONNECTION = ("ws:connection:{connection_id}", 300)
 
+    # Background export job status (TTL: 7 days)
+    EXPORT_JOB = ("export:job:{export_id}", 604800)
+
 
 @dataclass
 class CacheKey:
@@ -168,6 +174,12 @@ class CacheKeyManager:
                 description="ML model predictions",
                 category=CacheCategory.ML,
             ),
+            "asset_online_state": CacheKey(
+                pattern="ml:online:{asset_id}",
+                ttl=2592000,
+                description="Online feature/baseline aggregates checkpoint",
+                category=CacheCategory.ML,
+            ),
             "rate_limit": CacheKey(
                 pattern="rate:limit:{identifier}",
                 ttl=60,
@@ -180,6 +192,12 @@ class CacheKeyManager:
                 description="WebSocket connection state",
                 category=CacheCategory.SYSTEM,
             ),
+            "export_job": CacheKey(
+                pattern="export:job:{export_id}",
+                ttl=604800,
+                description="Status of exports uploaded to storage",
+                category=CacheCategory.SYSTEM,
+            ),
         }
 
     def get_key(self, strategy_name: str, **kwargs) -> str:
@@ -280,6 +298,10 @@ def generate_geofence_boundary_key(geofence_id: str) -> str:
     return cache_key_manager.get_key("geofence_boundary", geofence_id=geofence_id)
 
 
+# Counter included in search result keys; bumped whenever an index changes
+SEARCH_GENERATION_KEY = "search:generation"
+
+
 def generate_search_results_key(query: str, filters: Dict[str, Any]) -> str:
     """Generate cache key for search results"""
     import hashlib
@@ -298,6 +320,15 @@ def generate_dashboard_metrics_key(organization_id: str) -> str:
     )
 
 
+# Hash of per-table write counters that cached HTTP responses are versioned by
+ENTITY_VERSIONS_KEY = "http:versions"
+
+
+def generate_http_response_key(etag: str) -> str:
+    """Generate cache key for a rendered response (stored with the dashboard TTL)"""
+    return f"http:response:{etag}"
+
+
 def generate_ml_predictions_key(asset_id: str) -> str:
     """Generate cache key for ML predictions"""
     return cache_key_manager.get_key("ml_predictions", asset_id=asset_id)
@@ -348,8 +379,11 @@ class CacheInvalidation:
 
     @staticmethod
     async def invalidate_search_cache(redis_client) -> None:
-        """Invalidate all search result caches"""
-        keys = await redis_client.keys("search:results:*")
-        if keys:
-            await redis_client.delete(*keys)
-            logger.debug(f"Invalidated {len(keys)} search cache keys")
+        """Invalidate all search result caches
+
+        Search result keys include the current search generation, so bumping
+        it orphans every cached result (they expire with their TTL) without
+        scanning the keyspace.
+        """
+        generation = await redis_client.incr(SEARCH_GENERATION_KEY)
+        logger.debug(f"Search cache generation bumped to {generation}")
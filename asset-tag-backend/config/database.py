@@ -1,13 +1,23 @@
 """
 Database configuration and connection management
+
+Three engine roles are configured so heavy queries cannot starve the OLTP path:
+
+- primary: writes and read-your-writes traffic (``get_db``)
+- read: read-only API endpoints, served by a replica when one is configured
+  (``get_read_db``)
+- analytics: analytics, reports and ML feature SQL with its own pool size and
+  statement timeout (``get_analytics_db`` / ``analytics_session``)
 """
 
 import logging
 import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Dict, Optional
 
 from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
-                                    create_async_engine)
+from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
+                                    async_sessionmaker, create_async_engine)
 from sqlalchemy.orm import declarative_base
 
 from config.settings import settings
@@ -20,12 +30,53 @@ logger = logging.getLogger(__name__)
 # Base class for all models
 Base = declarative_base()
 
-# Async engine for FastAPI
-async_engine = create_async_engine(
-    settings.database_url,
-    echo=settings.environment == "local",
-    pool_pre_ping=True,
-    pool_recycle=300,
+
+def _create_role_engine(
+    url: str,
+    pool_size: int,
+    max_overflow: int,
+    statement_timeout_ms: Optional[int] = None,
+) -> AsyncEngine:
+    """Create an async engine with its own connection pool"""
+    connect_args: Dict[str, Any] = {}
+    if statement_timeout_ms and url.startswith("postgresql+asyncpg"):
+        connect_args["server_settings"] = {
+            "statement_timeout": str(statement_timeout_ms)
+        }
+
+    return create_async_engine(
+        url,
+        echo=settings.environment == "local",
+        pool_pre_ping=True,
+        pool_recycle=300,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        connect_args=connect_args,
+    )
+
+
+# Async engine for FastAPI (primary, read-write)
+async_engine = _create_role_engine(
+    settings.database_url, settings.db_pool_size, settings.db_max_overflow
+)
+
+# Read-only engine: a replica when configured, otherwise the primary pool
+if settings.read_replica_url:
+    read_engine = _create_role_engine(
+        settings.read_database_url,
+        settings.read_pool_size,
+        settings.read_max_overflow,
+    )
+else:
+    read_engine = async_engine
+
+# Analytics engine: always a separate pool so reports cannot exhaust ingest
+analytics_engine = _create_role_engine(
+    settings.analytics_db_url,
+    settings.analytics_pool_size,
+    settings.analytics_max_overflow,
+    statement_timeout_ms=settings.analytics_statement_timeout_ms,
 )
 
 # Sync engine for Alembic migrations
@@ -36,22 +87,29 @@ sync_engine = create_engine(
     pool_recycle=300,
 )
 
-# Session factory
+# Session factories
 AsyncSessionLocal = async_sessionmaker(
     async_engine, class_=AsyncSession, expire_on_commit=False
 )
+ReadSessionLocal = async_sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
+AnalyticsSessionLocal = async_sessionmaker(
+    analytics_engine, class_=AsyncSession, expire_on_commit=False
+)
 
 
-async def get_db() -> AsyncSession:
-    """Dependency to get database session"""
-    # Use test session if in test environment
+async def _session_scope(
+    session_factory: async_sessionmaker,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Yield a session from the given factory, or the test session in tests"""
     if IS_TEST_ENV:
         from config.test_database import get_test_db
 
         async for session in get_test_db():
             yield session
     else:
-        async with AsyncSessionLocal() as session:
+        async with session_factory() as session:
             try:
                 yield session
             except Exception as e:
@@ -62,6 +120,59 @@ async def get_db() -> AsyncSession:
                 await session.close()
 
 
+async def get_db() -> AsyncSession:
+    """Dependency to get database session"""
+    async for session in _session_scope(AsyncSessionLocal):
+        yield session
+
+
+async def get_read_db() -> AsyncSession:
+    """Dependency to get a read-only database session (replica if configured)"""
+    async for session in _session_scope(ReadSessionLocal):
+        yield session
+
+
+async def get_analytics_db() -> AsyncSession:
+    """Dependency to get a database session from the analytics pool"""
+    async for session in _session_scope(AnalyticsSessionLocal):
+        yield session
+
+
+@asynccontextmanager
+async def analytics_session() -> AsyncGenerator[AsyncSession, None]:
+    """Context manager for analytics sessions outside of request scope"""
+    async for session in _session_scope(AnalyticsSessionLocal):
+        yield session
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Get connection pool utilization for every engine role"""
+    engines = {
+        "primary": async_engine,
+        "read": read_engine,
+        "analytics": analytics_engine,
+    }
+
+    stats = {}
+    for role, engine in engines.items():
+        pool = engine.pool
+        try:
+            size = pool.size()
+            checked_out = pool.checkedout()
+            stats[role] = {
+                "shared_with_primary": role != "primary" and engine is async_engine,
+                "pool_size": size,
+                "checked_in": pool.checkedin(),
+                "checked_out": checked_out,
+                "overflow": pool.overflow(),
+                "utilization": checked_out / size if size else 0.0,
+            }
+        except AttributeError:
+            # NullPool/StaticPool do not expose queue counters
+            stats[role] = {"pool_class": type(pool).__name__}
+    return stats
+
+
 async def init_db() -> None:
     """Initialize database tables"""
     # Use test engine if in test environment
@@ -87,4 +198,7 @@ async def close_db() -> None:
         await close_test_db()
     else:
         await async_engine.dispose()
+        if read_engine is not async_engine:
+            await read_engine.dispose()
+        await analytics_engine.dispose()
     logger.info("Database connections closed")
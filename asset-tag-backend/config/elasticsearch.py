@@ -1,19 +1,37 @@
 """
 Elasticsearch configuration and client management
+
+The ``elasticsearch`` package is imported when the first client is created,
+so importing this module (and the search routers) stays cheap.
 """
 
 import json
 import logging
-from typing import Any, Dict, List, Optional
-
-from elasticsearch import AsyncElasticsearch
-from elasticsearch.exceptions import ConnectionError, NotFoundError
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from config.settings import settings
 
+if TYPE_CHECKING:
+    from elasticsearch import AsyncElasticsearch
+
 logger = logging.getLogger(__name__)
 
 
+def _not_found_error() -> type:
+    from elasticsearch.exceptions import NotFoundError
+
+    return NotFoundError
+
+
+def _already_exists(error: Exception) -> bool:
+    """Whether index creation failed because the index (or an alias) exists"""
+    message = str(error)
+    return (
+        "resource_already_exists_exception" in message
+        or "already exists as alias" in message
+    )
+
+
 class ElasticsearchManager:
     """Elasticsearch client manager"""
 
@@ -27,9 +45,11 @@ class ElasticsearchManager:
             "audit_logs": "audit_logs_index",
         }
 
-    async def _get_client(self) -> AsyncElasticsearch:
+    async def _get_client(self) -> "AsyncElasticsearch":
         """Get Elasticsearch client"""
         if not self.client:
+            from elasticsearch import AsyncElasticsearch
+
             self.client = AsyncElasticsearch(
                 hosts=[settings.elasticsearch_url],
                 timeout=30,
@@ -65,9 +85,11 @@ class ElasticsearchManager:
             logger.error(f"Error creating Elasticsearch indices: {e}")
             return False
 
-    async def _create_assets_index(self, client: AsyncElasticsearch) -> None:
+    async def _create_assets_index(
+        self, client: "AsyncElasticsearch", index_name: Optional[str] = None
+    ) -> None:
         """Create assets index with mapping"""
-        index_name = self.indices["assets"]
+        index_name = index_name or self.indices["assets"]
 
         mapping = {
             "mappings": {
@@ -123,12 +145,14 @@ class ElasticsearchManager:
             await client.indices.create(index=index_name, body=mapping)
             logger.info(f"Created assets index: {index_name}")
         except Exception as e:
-            if "resource_already_exists_exception" not in str(e):
+            if not _already_exists(e):
                 logger.error(f"Error creating assets index: {e}")
 
-    async def _create_sites_index(self, client: AsyncElasticsearch) -> None:
+    async def _create_sites_index(
+        self, client: "AsyncElasticsearch", index_name: Optional[str] = None
+    ) -> None:
         """Create sites index with mapping"""
-        index_name = self.indices["sites"]
+        index_name = index_name or self.indices["sites"]
 
         mapping = {
             "mappings": {
@@ -165,12 +189,14 @@ class ElasticsearchManager:
             await client.indices.create(index=index_name, body=mapping)
             logger.info(f"Created sites index: {index_name}")
         except Exception as e:
-            if "resource_already_exists_exception" not in str(e):
+            if not _already_exists(e):
                 logger.error(f"Error creating sites index: {e}")
 
-    async def _create_gateways_index(self, client: AsyncElasticsearch) -> None:
+    async def _create_gateways_index(
+        self, client: "AsyncElasticsearch", index_name: Optional[str] = None
+    ) -> None:
         """Create gateways index with mapping"""
-        index_name = self.indices["gateways"]
+        index_name = index_name or self.indices["gateways"]
 
         mapping = {
             "mappings": {
@@ -206,12 +232,14 @@ class ElasticsearchManager:
             await client.indices.create(index=index_name, body=mapping)
             logger.info(f"Created gateways index: {index_name}")
         except Exception as e:
-            if "resource_already_exists_exception" not in str(e):
+            if not _already_exists(e):
                 logger.error(f"Error creating gateways index: {e}")
 
-    async def _create_alerts_index(self, client: AsyncElasticsearch) -> None:
+    async def _create_alerts_index(
+        self, client: "AsyncElasticsearch", index_name: Optional[str] = None
+    ) -> None:
         """Create alerts index with mapping"""
-        index_name = self.indices["alerts"]
+        index_name = index_name or self.indices["alerts"]
 
         mapping = {
             "mappings": {
@@ -249,12 +277,14 @@ class ElasticsearchManager:
             await client.indices.create(index=index_name, body=mapping)
             logger.info(f"Created alerts index: {index_name}")
         except Exception as e:
-            if "resource_already_exists_exception" not in str(e):
+            if not _already_exists(e):
                 logger.error(f"Error creating alerts index: {e}")
 
-    async def _create_audit_logs_index(self, client: AsyncElasticsearch) -> None:
+    async def _create_audit_logs_index(
+        self, client: "AsyncElasticsearch", index_name: Optional[str] = None
+    ) -> None:
         """Create audit logs index with mapping"""
-        index_name = self.indices["audit_logs"]
+        index_name = index_name or self.indices["audit_logs"]
 
         mapping = {
             "mappings": {
@@ -277,9 +307,68 @@ class ElasticsearchManager:
             await client.indices.create(index=index_name, body=mapping)
             logger.info(f"Created audit logs index: {index_name}")
         except Exception as e:
-            if "resource_already_exists_exception" not in str(e):
+            if not _already_exists(e):
                 logger.error(f"Error creating audit logs index: {e}")
 
+    async def create_index(self, index_type: str, index_name: str) -> bool:
+        """Create a physical index with the mapping of an index type
+
+        The creators log errors instead of raising, so this returns whether
+        the index exists afterwards.
+        """
+        creators = {
+            "assets": self._create_assets_index,
+            "sites": self._create_sites_index,
+            "gateways": self._create_gateways_index,
+            "alerts": self._create_alerts_index,
+            "audit_logs": self._create_audit_logs_index,
+        }
+        if index_type not in creators:
+            raise ValueError(f"Unknown index type: {index_type}")
+        client = await self._get_client()
+        await creators[index_type](client, index_name)
+        return bool(await client.indices.exists(index=index_name))
+
+    async def swap_alias(self, index_type: str, index_name: str) -> List[str]:
+        """Point an index type's name at ``index_name`` in one atomic update
+
+        The name may still be a concrete index created before aliases were
+        used; it is removed in the same update. Returns the indices the alias
+        pointed at before, which the caller can delete.
+        """
+        client = await self._get_client()
+        alias = self.indices[index_type]
+
+        previous: List[str] = []
+        actions: List[Dict[str, Any]] = []
+        try:
+            previous = list((await client.indices.get_alias(name=alias)).keys())
+            actions.extend(
+                {"remove": {"index": index, "alias": alias}} for index in previous
+            )
+        except _not_found_error():
+            if await client.indices.exists(index=alias):
+                actions.append({"remove_index": {"index": alias}})
+        actions.append({"add": {"index": index_name, "alias": alias}})
+
+        await client.indices.update_aliases(actions=actions)
+        logger.info(f"Alias {alias} now points at {index_name}")
+        return [index for index in previous if index != index_name]
+
+    async def delete_index(self, index_name: str) -> None:
+        client = await self._get_client()
+        await client.indices.delete(index=index_name, ignore_unavailable=True)
+
+    async def bulk(self, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Send action/source lines to the ``_bulk`` API
+
+        Unlike the single-document helpers, errors are raised so the caller
+        can retry the batch.
+        """
+        client = await self._get_client()
+        response = await client.bulk(operations=operations)
+        return response.body if hasattr(response, "body") else response
+
     async def index_document(
         self, index_type: str, document_id: str, document: Dict[str, Any]
     ) -> bool:
@@ -293,6 +382,7 @@ class ElasticsearchManager:
                 return False
 
             await client.index(index=index_name, id=document_id, body=document)
+            await self._invalidate_search_cache()
 
             logger.debug(f"Indexed document {document_id} in {index_name}")
             return True
@@ -322,6 +412,48 @@ class ElasticsearchManager:
             logger.error(f"Error searching {index_type}: {e}")
             return {"hits": {"total": {"value": 0}, "hits": []}}
 
+    async def multi_search(
+        self, searches: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Run several searches in one ``_msearch`` round trip
+
+        ``searches`` pairs an index type with a query body (including its
+        ``size``). Responses come back in the same order; a search that fails
+        gets an empty result carrying an ``error`` key so the others are kept.
+        """
+        empty = {"hits": {"total": {"value": 0}, "hits": []}}
+        if not searches:
+            return []
+        try:
+            client = await self._get_client()
+            lines: List[Dict[str, Any]] = []
+            for index_type, query in searches:
+                index_name = self.indices.get(index_type)
+                if not index_name:
+                    raise ValueError(f"Unknown index type: {index_type}")
+                lines.append({"index": index_name})
+                lines.append(query)
+
+            response = await client.msearch(searches=lines)
+
+            results = []
+            for (index_type, _), item in zip(searches, response["responses"]):
+                if "error" in item:
+                    logger.error(f"Error searching {index_type}: {item['error']}")
+                    results.append({**empty, "error": item["error"]})
+                else:
+                    results.append(item)
+            return results
+
+        except Exception as e:
+            logger.error(f"Error in multi-search: {e}")
+            return [{**empty, "error": str(e)} for _ in searches]
+
+    async def _invalidate_search_cache(self) -> None:
+        from config.cache import cache
+
+        await cache.invalidate_search_cache()
+
     async def delete_document(self, index_type: str, document_id: str) -> bool:
         """Delete a document"""
         try:
@@ -333,10 +465,11 @@ class ElasticsearchManager:
                 return False
 
             await client.delete(index=index_name, id=document_id)
+            await self._invalidate_search_cache()
             logger.debug(f"Deleted document {document_id} from {index_name}")
             return True
 
-        except NotFoundError:
+        except _not_found_error():
             logger.debug(f"Document {document_id} not found in {index_name}")
             return True
         except Exception as e:
@@ -356,6 +489,7 @@ class ElasticsearchManager:
                 return False
 
             await client.index(index=index_name, id=document_id, body=document)
+            await self._invalidate_search_cache()
 
             logger.debug(f"Updated document {document_id} in {index_name}")
             return True
@@ -381,7 +515,7 @@ class ElasticsearchManager:
                             "size_in_bytes"
                         ],
                     }
-                except NotFoundError:
+                except _not_found_error():
                     stats[index_type] = {"doc_count": 0, "size": 0}
 
             return stats
@@ -29,9 +29,70 @@ class Settings(BaseSettings):
     postgres_password: str = "dev_pass"
     database_url_override: Optional[str] = None
 
+    # Connection pools (primary / read replica / analytics)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: int = 30
+    read_replica_url: Optional[str] = None  # Falls back to the primary
+    read_pool_size: int = 10
+    read_max_overflow: int = 20
+    analytics_database_url: Optional[str] = None  # Falls back to the replica
+    analytics_pool_size: int = 5
+    analytics_max_overflow: int = 5
+    analytics_statement_timeout_ms: int = 120000
+
+    # TimescaleDB lifecycle (hypertables, compression, retention)
+    timescale_manage_lifecycle: bool = True
+    timescale_target_chunk_size_mb: int = 512
+    observations_chunk_interval: str = "1 hour"
+    observations_compress_after: str = "1 day"
+    observations_retention: str = "7 days"
+    estimated_locations_chunk_interval: str = "1 hour"
+    estimated_locations_compress_after: str = "1 day"
+    estimated_locations_retention: str = "90 days"
+    alerts_chunk_interval: str = "1 day"
+    alerts_retention: str = "180 days"
+    audit_logs_chunk_interval: str = "1 day"
+    audit_logs_retention: str = "365 days"
+
+    # Audit logging (batched background writer)
+    audit_queue_max_size: int = 10000
+    audit_batch_size: int = 500
+    audit_flush_interval_seconds: float = 1.0
+    audit_spill_dir: str = "/tmp/asset-tag-audit-spill"
+    audit_max_body_bytes: int = 65536
+
+    # Cold archive (Parquet in object storage)
+    archive_enabled: bool = False
+    archive_lag_days: int = 1  # Archive complete days older than this
+    archive_batch_size: int = 10000
+    archive_row_group_size: int = 50000
+    archive_cron: str = "30 2 * * *"  # Daily archival run (UTC)
+
+    # Streaming exports (CSV/NDJSON/Parquet)
+    export_batch_size: int = 5000  # Rows fetched per server-side cursor batch
+    export_upload_part_size_mb: int = 8  # Multipart part size for storage uploads
+    export_url_expiry_seconds: int = 3600
+
+    # Report workers (durable job table, rendering in a process pool)
+    report_worker_enabled: bool = True  # Run a worker inside the API process
+    report_worker_processes: int = 2
+    report_poll_interval_seconds: float = 2.0
+    report_job_timeout_seconds: int = 900  # Reclaim jobs without a heartbeat
+    report_max_attempts: int = 3
+    report_cache_ttl_seconds: int = 3600  # Reuse identical finished reports
+    report_render_chunk_rows: int = 5000
+    report_spool_dir: str = "/tmp/asset-tag-reports"
+
+    # Periodic job scheduler (exclusive jobs run once per cluster via Redis)
+    scheduler_enabled: bool = True
+    scheduler_key_prefix: str = "scheduler"
+    scheduled_reports_poll_seconds: int = 60
+
     # Redis Cache
     redis_url: str = "redis://localhost:6379"
     use_redis: bool = False  # Disable Redis for now
+    alert_stats_reconcile_interval_seconds: int = 300
 
     # Streaming (Kinesis/Redpanda)
     kinesis_stream_name: str = "bluetooth-observations"
@@ -55,19 +116,76 @@ class Settings(BaseSettings):
     # API Configuration
     api_v1_prefix: str = "/api/v1"
     cors_origins: list = ["http://localhost:5173", "http://localhost:3000"]
+    # Validate fast-path list responses against their schema (slower)
+    validate_fast_responses: bool = False
+    # ETag/304 and shared response cache for dashboard GET routes
+    http_cache_enabled: bool = True
+    http_cache_max_body_bytes: int = 1048576
+    # Per-connection WebSocket outbound queue; slow readers drop oldest messages
+    websocket_send_queue_size: int = 256
+    websocket_send_timeout_seconds: float = 10.0
+    # Highest location update rate a client may negotiate via ``subscribe``
+    websocket_location_max_rate_hz: float = 10.0
+    # Forward WebSocket broadcasts between workers over Redis pub/sub
+    websocket_cluster_enabled: bool = True
+    websocket_cluster_shards: int = 8
+    websocket_cluster_batch_ms: float = 5.0
+    websocket_cluster_batch_size: int = 100
+    # Viewport subscriptions: grid cell size (degrees) and cells per viewport
+    # before it is checked directly; below the zoom level, clients receive
+    # clustered positions at the given rate
+    websocket_viewport_cell_degrees: float = 0.5
+    websocket_viewport_max_cells: int = 4096
+    websocket_viewport_cluster_below_zoom: int = 12
+    websocket_viewport_cluster_rate_hz: float = 1.0
+    # Dashboard deltas kept per organization to replay on a client's resync
+    websocket_dashboard_history: int = 64
 
     # Monitoring
     prometheus_port: int = 9090
     grafana_port: int = 3001
     use_local_monitoring: bool = True  # Use local Prometheus/Grafana
 
+    # On-demand sampling profiler (admin endpoints / signed X-Profile-Token);
+    # off unless enabled per deployment
+    profiling_enabled: bool = False
+    profiling_sample_interval_ms: float = 5.0
+    profiling_max_seconds: float = 60.0
+    profiling_max_profiles: int = 20
+
     # ML
     mlflow_tracking_uri: str = "http://localhost:5000"
     use_local_mlflow: bool = False  # Use local MLFlow
+    ml_enabled: bool = True  # ML routers and model refresh (mlflow loads lazily)
+    ml_preload_models: bool = True  # Warm common models after startup
+    ml_anomaly_batch_size: int = 5000  # Assets per bulk fetch/predict_proba call
+    ml_feature_bulk_chunk_size: int = 1000  # Assets per bulk feature query
+    # Features/baselines maintained from the observation stream
+    ml_online_features_enabled: bool = True
+    ml_online_half_life_seconds: float = 300.0  # Decay of real-time aggregates
+    ml_online_baseline_half_life_days: float = 7.0  # Decay of baseline aggregates
+    ml_online_checkpoint_seconds: float = 10.0  # Redis checkpoint interval
+    ml_online_max_assets: int = 100000  # States kept in memory per worker
+    # Versioned model artifacts on local disk, shared by the workers of a host
+    ml_model_cache_dir: str = "/tmp/asset-tag-models"
+    ml_model_mmap_mode: str = "r"  # joblib mmap_mode for model arrays; "" loads them
+    ml_model_cache_keep_versions: int = 3  # Versions kept per model
 
     # Elasticsearch
     elasticsearch_url: str = "http://localhost:9200"
     use_local_elasticsearch: bool = False  # Use local Elasticsearch
+    search_indexing_enabled: bool = True  # Sync entity changes to the indices
+    search_index_coalesce_seconds: float = 1.0  # Window for merging doc updates
+    search_bulk_max_actions: int = 500
+    search_bulk_max_bytes: int = 5 * 1024 * 1024
+    search_bulk_max_retries: int = 5
+    search_reindex_batch_size: int = 1000  # Rows per cursor batch / bulk request
+    search_reindex_parallelism: int = 4  # Concurrent bulk requests per reindex
+
+    # In-process autocomplete for /search/suggestions
+    search_suggestions_enabled: bool = True
+    search_suggestions_memory_mb: int = 64  # Word-prefix entries stop past this
+    search_suggestions_rebuild_seconds: int = 3600  # Full rebuild from Postgres
 
     # Logging
     log_level: str = "INFO"
@@ -118,6 +236,16 @@ class Settings(BaseSettings):
             
         return f"postgresql://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{db_name}"
 
+    @property
+    def read_database_url(self) -> str:
+        """Get database URL for read-only queries (replica or primary)"""
+        return self.read_replica_url or self.database_url
+
+    @property
+    def analytics_db_url(self) -> str:
+        """Get database URL for heavy analytics, report and feature queries"""
+        return self.analytics_database_url or self.read_database_url
+
     @property
     def storage_endpoint(self) -> Optional[str]:
         """Get storage endpoint (MinIO or S3)"""
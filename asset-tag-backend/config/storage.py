@@ -2,9 +2,11 @@
 Storage configuration for S3/MinIO
 """
 
+import asyncio
 import io
 import logging
-from typing import BinaryIO, Optional
+from typing import Any, AsyncIterator, BinaryIO, Optional
+from urllib.parse import urlparse
 
 import boto3
 from botocore.config import Config
@@ -64,6 +66,21 @@ class StorageManager:
             except Exception as e:
                 logger.error(f"Error creating bucket {self.bucket}: {e}")
 
+    def get_arrow_filesystem(self) -> Any:
+        """Get a pyarrow filesystem for columnar reads (MinIO or AWS S3)"""
+        from pyarrow import fs
+
+        if settings.use_local_storage:
+            endpoint = urlparse(settings.storage_endpoint)
+            return fs.S3FileSystem(
+                access_key=settings.s3_access_key,
+                secret_key=settings.s3_secret_key,
+                endpoint_override=endpoint.netloc,
+                scheme=endpoint.scheme or "http",
+                region=settings.aws_region,
+            )
+        return fs.S3FileSystem(region=settings.aws_region)
+
     async def upload_file(
         self, file_obj: BinaryIO, key: str, content_type: Optional[str] = None
     ) -> bool:
@@ -80,6 +97,41 @@ class StorageManager:
             logger.error(f"File upload error for {key}: {e}")
             return False
 
+    async def upload_local_file(
+        self, path: str, key: str, content_type: Optional[str] = None
+    ) -> bool:
+        """Upload a local file (multipart for large files) without blocking"""
+        try:
+            extra_args = {}
+            if content_type:
+                extra_args["ContentType"] = content_type
+
+            await asyncio.to_thread(
+                self.client.upload_file, path, self.bucket, key, ExtraArgs=extra_args
+            )
+            logger.info(f"File uploaded successfully: {key}")
+            return True
+        except Exception as e:
+            logger.error(f"File upload error for {key}: {e}")
+            return False
+
+    async def iter_file(
+        self, key: str, chunk_size: int = 1024 * 1024
+    ) -> AsyncIterator[bytes]:
+        """Stream a file from storage in chunks"""
+        response = await asyncio.to_thread(
+            self.client.get_object, Bucket=self.bucket, Key=key
+        )
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
     async def download_file(self, key: str) -> Optional[bytes]:
         """Download file from storage"""
         try:
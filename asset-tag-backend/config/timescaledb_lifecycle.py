@@ -0,0 +1,509 @@
+"""
+TimescaleDB lifecycle management
+
+Idempotently converts the time-series tables into hypertables and keeps their
+chunk interval, compression and retention policies in line with settings.
+On plain PostgreSQL (no timescaledb extension) or SQLite every operation is a
+no-op that reports ``timescaledb_available: False``.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.database import get_db
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HypertablePolicy:
+    """Desired TimescaleDB layout for one time-series table"""
+
+    table: str
+    time_column: str
+    chunk_interval: str
+    retention: Optional[str] = None
+    compress_after: Optional[str] = None
+    compress_segmentby: Optional[str] = None
+
+    @property
+    def compress_orderby(self) -> str:
+        return f"{self.time_column} DESC"
+
+
+def get_hypertable_policies() -> Dict[str, HypertablePolicy]:
+    """Build hypertable policies from settings"""
+    policies = [
+        HypertablePolicy(
+            table="observations",
+            time_column="observed_at",
+            chunk_interval=settings.observations_chunk_interval,
+            retention=settings.observations_retention,
+            compress_after=settings.observations_compress_after,
+            compress_segmentby="asset_id, gateway_id",
+        ),
+        HypertablePolicy(
+            table="estimated_locations",
+            time_column="estimated_at",
+            chunk_interval=settings.estimated_locations_chunk_interval,
+            retention=settings.estimated_locations_retention,
+            compress_after=settings.estimated_locations_compress_after,
+            compress_segmentby="asset_id",
+        ),
+        HypertablePolicy(
+            table="alerts",
+            time_column="triggered_at",
+            chunk_interval=settings.alerts_chunk_interval,
+            retention=settings.alerts_retention,
+        ),
+        HypertablePolicy(
+            table="audit_logs",
+            time_column="created_at",
+            chunk_interval=settings.audit_logs_chunk_interval,
+            retention=settings.audit_logs_retention,
+        ),
+    ]
+    return {policy.table: policy for policy in policies}
+
+
+class TimescaleLifecycleManager:
+    """Applies hypertable, compression and retention policies"""
+
+    def __init__(self, policies: Optional[Dict[str, HypertablePolicy]] = None) -> None:
+        self.policies = policies or get_hypertable_policies()
+
+    async def is_available(self, db: AsyncSession) -> bool:
+        """Check whether the connected database has the timescaledb extension"""
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        try:
+            result = await db.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'")
+            )
+            return result.scalar() is not None
+        except Exception as e:
+            logger.warning(f"Could not detect timescaledb extension: {e}")
+            return False
+
+    async def apply(self) -> Dict[str, Any]:
+        """Apply all policies; safe to run on every startup"""
+        report: Dict[str, Any] = {"timescaledb_available": False, "tables": {}}
+
+        async for db in get_db():
+            if not await self.is_available(db):
+                logger.info("TimescaleDB not available, skipping lifecycle setup")
+                return report
+
+            report["timescaledb_available"] = True
+            for table, policy in self.policies.items():
+                report["tables"][table] = await self._apply_policy(db, policy)
+            break
+
+        return report
+
+    async def _apply_policy(
+        self, db: AsyncSession, policy: HypertablePolicy
+    ) -> Dict[str, Any]:
+        """Apply the policy for a single table, committing each step"""
+        status: Dict[str, Any] = {"hypertable": False, "actions": []}
+        try:
+            if not await self._table_exists(db, policy.table):
+                status["skipped"] = "table does not exist"
+                return status
+
+            if not await self._is_hypertable(db, policy.table):
+                blocker = await self._conversion_blocker(db, policy)
+                if blocker:
+                    status["skipped"] = blocker
+                    logger.warning(f"Cannot convert {policy.table}: {blocker}")
+                    return status
+                await self._create_hypertable(db, policy)
+                status["actions"].append("created_hypertable")
+            elif await self._sync_chunk_interval(db, policy):
+                status["actions"].append("updated_chunk_interval")
+            status["hypertable"] = True
+
+            if policy.compress_after:
+                status["actions"].extend(await self._ensure_compression(db, policy))
+
+            if policy.retention and await self._ensure_job(
+                db,
+                policy.table,
+                "policy_retention",
+                "drop_after",
+                policy.retention,
+                "add_retention_policy",
+                "remove_retention_policy",
+            ):
+                status["actions"].append("set_retention_policy")
+
+        except Exception as e:
+            await db.rollback()
+            status["error"] = str(e)
+            logger.error(f"Error applying TimescaleDB policy for {policy.table}: {e}")
+
+        return status
+
+    async def _table_exists(self, db: AsyncSession, table: str) -> bool:
+        result = await db.execute(
+            text("SELECT to_regclass(:table) IS NOT NULL"), {"table": table}
+        )
+        return bool(result.scalar())
+
+    async def _is_hypertable(self, db: AsyncSession, table: str) -> bool:
+        result = await db.execute(
+            text(
+                """
+                SELECT 1 FROM timescaledb_information.hypertables
+                WHERE hypertable_name = :table
+            """
+            ),
+            {"table": table},
+        )
+        return result.scalar() is not None
+
+    async def _conversion_blocker(
+        self, db: AsyncSession, policy: HypertablePolicy
+    ) -> Optional[str]:
+        """Return a reason the table cannot become a hypertable, if any"""
+        # Hypertables cannot be the target of foreign keys
+        result = await db.execute(
+            text(
+                """
+                SELECT conname FROM pg_constraint
+                WHERE contype = 'f' AND confrelid = to_regclass(:table)
+            """
+            ),
+            {"table": policy.table},
+        )
+        referencing = [row[0] for row in result.fetchall()]
+        if referencing:
+            return f"referenced by foreign keys: {', '.join(referencing)}"
+        return None
+
+    async def _create_hypertable(
+        self, db: AsyncSession, policy: HypertablePolicy
+    ) -> None:
+        """Widen the primary key to include the time column and convert"""
+        result = await db.execute(
+            text(
+                """
+                SELECT c.conname, array_agg(a.attname::text)
+                FROM pg_constraint c
+                JOIN pg_attribute a
+                  ON a.attrelid = c.conrelid AND a.attnum = ANY(c.conkey)
+                WHERE c.contype = 'p' AND c.conrelid = to_regclass(:table)
+                GROUP BY c.conname
+            """
+            ),
+            {"table": policy.table},
+        )
+        pk = result.fetchone()
+        if pk and policy.time_column not in pk[1]:
+            columns = ", ".join(list(pk[1]) + [policy.time_column])
+            await db.execute(
+                text(
+                    f"ALTER TABLE {policy.table} DROP CONSTRAINT {pk[0]}, "
+                    f"ADD PRIMARY KEY ({columns})"
+                )
+            )
+
+        await db.execute(
+            text(
+                """
+                SELECT create_hypertable(
+                    CAST(:table AS regclass), :time_column,
+                    chunk_time_interval => CAST(:interval AS INTERVAL),
+                    if_not_exists => TRUE,
+                    migrate_data => TRUE
+                )
+            """
+            ),
+            {
+                "table": policy.table,
+                "time_column": policy.time_column,
+                "interval": policy.chunk_interval,
+            },
+        )
+        await db.commit()
+        logger.info(f"Converted {policy.table} to a hypertable")
+
+    async def _sync_chunk_interval(
+        self, db: AsyncSession, policy: HypertablePolicy
+    ) -> bool:
+        """Update the chunk interval for new chunks if it drifted from settings"""
+        result = await db.execute(
+            text(
+                """
+                SELECT time_interval <> CAST(:interval AS INTERVAL)
+                FROM timescaledb_information.dimensions
+                WHERE hypertable_name = :table AND column_name = :time_column
+            """
+            ),
+            {
+                "table": policy.table,
+                "time_column": policy.time_column,
+                "interval": policy.chunk_interval,
+            },
+        )
+        if not result.scalar():
+            return False
+        await self.set_chunk_interval(db, policy.table, policy.chunk_interval)
+        return True
+
+    async def set_chunk_interval(
+        self, db: AsyncSession, table: str, interval: str
+    ) -> None:
+        """Set the chunk interval used for chunks created from now on"""
+        await db.execute(
+            text(
+                "SELECT set_chunk_time_interval("
+                "CAST(:table AS regclass), CAST(:interval AS INTERVAL))"
+            ),
+            {"table": table, "interval": interval},
+        )
+        await db.commit()
+        logger.info(f"Set chunk interval of {table} to {interval}")
+
+    async def _ensure_compression(
+        self, db: AsyncSession, policy: HypertablePolicy
+    ) -> List[str]:
+        """Enable native compression and the compression policy"""
+        actions = []
+        result = await db.execute(
+            text(
+                """
+                SELECT compression_enabled FROM timescaledb_information.hypertables
+                WHERE hypertable_name = :table
+            """
+            ),
+            {"table": policy.table},
+        )
+        if not result.scalar():
+            await db.execute(
+                text(
+                    f"""
+                    ALTER TABLE {policy.table} SET (
+                        timescaledb.compress,
+                        timescaledb.compress_segmentby = '{policy.compress_segmentby}',
+                        timescaledb.compress_orderby = '{policy.compress_orderby}'
+                    )
+                """
+                )
+            )
+            await db.commit()
+            actions.append("enabled_compression")
+
+        if await self._ensure_job(
+            db,
+            policy.table,
+            "policy_compression",
+            "compress_after",
+            policy.compress_after,
+            "add_compression_policy",
+            "remove_compression_policy",
+        ):
+            actions.append("set_compression_policy")
+        return actions
+
+    async def _ensure_job(
+        self,
+        db: AsyncSession,
+        table: str,
+        proc_name: str,
+        config_key: str,
+        interval: str,
+        add_function: str,
+        remove_function: str,
+    ) -> bool:
+        """Create or replace a policy job whose interval differs from settings"""
+        result = await db.execute(
+            text(
+                """
+                SELECT (config->>:config_key)::interval = CAST(:interval AS INTERVAL)
+                FROM timescaledb_information.jobs
+                WHERE proc_name = :proc_name AND hypertable_name = :table
+            """
+            ),
+            {
+                "config_key": config_key,
+                "interval": interval,
+                "proc_name": proc_name,
+                "table": table,
+            },
+        )
+        row = result.fetchone()
+        if row and row[0]:
+            return False
+
+        if row:
+            await db.execute(
+                text(
+                    f"SELECT {remove_function}("
+                    "CAST(:table AS regclass), if_exists => TRUE)"
+                ),
+                {"table": table},
+            )
+        await db.execute(
+            text(
+                f"SELECT {add_function}("
+                "CAST(:table AS regclass), CAST(:interval AS INTERVAL), "
+                "if_not_exists => TRUE)"
+            ),
+            {"table": table, "interval": interval},
+        )
+        await db.commit()
+        logger.info(f"Set {proc_name} on {table} to {interval}")
+        return True
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Describe current hypertables, chunk intervals and policy jobs"""
+        status: Dict[str, Any] = {
+            "timescaledb_available": False,
+            "configured": {
+                table: {
+                    "time_column": policy.time_column,
+                    "chunk_interval": policy.chunk_interval,
+                    "compress_after": policy.compress_after,
+                    "retention": policy.retention,
+                }
+                for table, policy in self.policies.items()
+            },
+        }
+
+        async for db in get_db():
+            if not await self.is_available(db):
+                return status
+
+            status["timescaledb_available"] = True
+            result = await db.execute(
+                text(
+                    """
+                    SELECT h.hypertable_name, h.num_chunks, h.compression_enabled,
+                           d.column_name, d.time_interval::text AS chunk_interval
+                    FROM timescaledb_information.hypertables h
+                    JOIN timescaledb_information.dimensions d
+                      ON d.hypertable_name = h.hypertable_name
+                    ORDER BY h.hypertable_name
+                """
+                )
+            )
+            status["hypertables"] = [dict(row._mapping) for row in result.fetchall()]
+
+            result = await db.execute(
+                text(
+                    """
+                    SELECT job_id, proc_name, hypertable_name, schedule_interval::text,
+                           config
+                    FROM timescaledb_information.jobs
+                    WHERE proc_name IN ('policy_retention', 'policy_compression')
+                    ORDER BY hypertable_name, proc_name
+                """
+                )
+            )
+            status["jobs"] = [dict(row._mapping) for row in result.fetchall()]
+            break
+
+        return status
+
+    async def get_chunk_sizing(self, table: str) -> Dict[str, Any]:
+        """Inspect chunk sizes and recommend a chunk interval for a hypertable"""
+        if table not in self.policies:
+            raise ValueError(f"Unknown hypertable: {table}")
+
+        sizing: Dict[str, Any] = {"table": table, "timescaledb_available": False}
+
+        async for db in get_db():
+            if not await self.is_available(db):
+                return sizing
+
+            sizing["timescaledb_available"] = True
+            result = await db.execute(
+                text(
+                    """
+                    SELECT c.chunk_name, c.range_start, c.range_end, c.is_compressed,
+                           s.total_bytes
+                    FROM timescaledb_information.chunks c
+                    JOIN chunks_detailed_size(CAST(:table AS regclass)) s
+                      ON s.chunk_name = c.chunk_name
+                    WHERE c.hypertable_name = :table
+                    ORDER BY c.range_start DESC
+                    LIMIT 50
+                """
+                ),
+                {"table": table},
+            )
+            chunks = [dict(row._mapping) for row in result.fetchall()]
+
+            result = await db.execute(
+                text(
+                    """
+                    SELECT EXTRACT(EPOCH FROM time_interval)
+                    FROM timescaledb_information.dimensions
+                    WHERE hypertable_name = :table
+                """
+                ),
+                {"table": table},
+            )
+            interval_seconds = float(result.scalar() or 0)
+            break
+
+        # Compressed chunks are not representative of raw ingest volume
+        raw_sizes = [c["total_bytes"] for c in chunks if not c["is_compressed"]]
+        sizing["chunks"] = chunks
+        sizing["current_interval_seconds"] = interval_seconds
+        sizing["recommended_interval"] = recommend_chunk_interval(
+            raw_sizes, interval_seconds, settings.timescale_target_chunk_size_mb
+        )
+        return sizing
+
+    async def update_chunk_interval(self, table: str, interval: str) -> None:
+        """Change the chunk interval of a hypertable at runtime"""
+        if table not in self.policies:
+            raise ValueError(f"Unknown hypertable: {table}")
+
+        async for db in get_db():
+            if not await self.is_available(db):
+                raise RuntimeError("TimescaleDB is not available")
+            await self.set_chunk_interval(db, table, interval)
+            break
+
+        self.policies[table].chunk_interval = interval
+
+
+def recommend_chunk_interval(
+    chunk_sizes: List[int], interval_seconds: float, target_size_mb: int
+) -> Optional[str]:
+    """Scale the current interval so an average chunk approaches the target size"""
+    if not chunk_sizes or interval_seconds <= 0:
+        return None
+
+    avg_bytes = sum(chunk_sizes) / len(chunk_sizes)
+    if avg_bytes <= 0:
+        return None
+
+    target_bytes = target_size_mb * 1024 * 1024
+    seconds = interval_seconds * target_bytes / avg_bytes
+    # Keep recommendations within sane bounds (5 minutes to 7 days)
+    seconds = max(300.0, min(seconds, 7 * 86400.0))
+    recommended = timedelta(seconds=int(seconds))
+
+    if recommended.days:
+        return f"{recommended.days} days {recommended.seconds // 3600} hours"
+    hours, remainder = divmod(recommended.seconds, 3600)
+    return f"{hours} hours {remainder // 60} minutes"
+
+
+# Global lifecycle manager instance
+timescale_lifecycle = TimescaleLifecycleManager()
+
+
+async def get_timescale_lifecycle() -> TimescaleLifecycleManager:
+    """Dependency to get the TimescaleDB lifecycle manager"""
+    return timescale_lifecycle
@@ -2,7 +2,9 @@
 Asset Tag Backend - FastAPI Application
 """
 
+import asyncio
 import logging
+import sys
 import time
 from contextlib import asynccontextmanager
 
@@ -12,15 +14,13 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 
 from config.cache import close_cache
-from config.database import close_db, init_db
-from config.elasticsearch import close_elasticsearch
+from config.database import close_db, get_pool_stats, init_db
 from config.settings import settings
-from config.streaming import start_streaming, stop_streaming
-from ml.serving.model_loader import (preload_common_models,
-                                     start_model_refresh_scheduler,
-                                     stop_model_refresh_scheduler)
-from streaming.stream_processor_coordinator import (
-    start_all_stream_processors, stop_all_stream_processors)
+from modules.audit.audit_middleware import AuditMiddleware
+from modules.audit.writer import audit_writer
+
+# Optional subsystems (streaming clients, stream processors, MLflow) are
+# imported inside lifespan only when enabled; see scripts/import_profile.py
 
 # Configure logging
 logging.basicConfig(
@@ -40,6 +40,17 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("Database initialized")
 
+    # Background writer for audit records queued by AuditMiddleware
+    if settings.environment.value != "test":
+        await audit_writer.start()
+
+    # Hypertables, compression and retention (no-op without TimescaleDB)
+    if settings.timescale_manage_lifecycle and settings.environment.value != "test":
+        from config.timescaledb_lifecycle import timescale_lifecycle
+
+        report = await timescale_lifecycle.apply()
+        logger.info(f"TimescaleDB lifecycle applied: {report}")
+
     # Initialize services based on environment configuration
     from config.settings import settings, Environment
     
@@ -57,8 +68,26 @@ async def lifespan(app: FastAPI):
                 # Don't fail startup if seeding fails
 
     if settings.environment.value != "test":
+        # Periodic jobs; services below register theirs as they start
+        if settings.scheduler_enabled:
+            from modules.scheduler.jobs import register_default_jobs
+            from modules.scheduler.scheduler import scheduler
+
+            register_default_jobs(scheduler)
+            await scheduler.start()
+        else:
+            logger.warning(
+                "Scheduler disabled: periodic jobs (scheduled reports, archiving, "
+                "statistics, model refresh, processor maintenance) will not run "
+                "in this process"
+            )
+
         # Start streaming services if enabled
         if getattr(settings, 'enable_streaming', False):
+            from config.streaming import start_streaming
+            from streaming.stream_processor_coordinator import \
+                start_all_stream_processors
+
             await start_streaming()
             logger.info("Streaming services started")
 
@@ -75,9 +104,39 @@ async def lifespan(app: FastAPI):
             es_manager = await get_elasticsearch_manager()
             await es_manager.create_indices()
             logger.info("Elasticsearch indices initialized")
+
+            # Keep indices in sync with committed entity changes
+            if settings.search_indexing_enabled:
+                from modules.search.indexer import search_indexer
+
+                await search_indexer.start()
         else:
             logger.info("Elasticsearch disabled, skipping index initialization")
 
+        # Keep alert statistics counters reconciled with the database
+        if settings.use_redis:
+            from modules.alerts.statistics import alert_statistics
+
+            await alert_statistics.start()
+
+        # Serve autocomplete from memory, following committed entity changes
+        if settings.search_suggestions_enabled:
+            from modules.search.suggestions import suggestion_service
+
+            await suggestion_service.start()
+
+        # Execute queued reports (dedicated workers can run alongside)
+        if settings.report_worker_enabled:
+            from modules.reports.worker import report_worker
+
+            await report_worker.start()
+
+        # Reach WebSocket clients connected to other workers
+        if settings.use_redis and settings.websocket_cluster_enabled:
+            from modules.websocket.cluster import start_cluster_broadcasts
+
+            await start_cluster_broadcasts()
+
         # Initialize storage (MinIO/S3) if enabled
         if getattr(settings, 'use_local_storage', False):
             from config.storage import storage
@@ -86,28 +145,76 @@ async def lifespan(app: FastAPI):
             logger.info("Storage disabled, skipping initialization")
 
     # Skip ML services in test environment
-    if settings.environment.value != "test":
+    preload_task = None
+    if settings.environment.value != "test" and settings.ml_enabled:
+        from ml.serving.model_loader import (preload_common_models,
+                                             start_model_refresh_scheduler)
+
         # Start ML model refresh scheduler
         await start_model_refresh_scheduler()
         logger.info("ML model refresh scheduler started")
 
-        # Preload common ML models
-        await preload_common_models()
-        logger.info("Common ML models preloaded")
+        # Warm common models without holding up startup; loads on first use
+        # until then
+        if settings.ml_preload_models:
+            preload_task = asyncio.create_task(preload_common_models())
 
     yield
 
     # Shutdown
     logger.info("Shutting down Asset Tag Backend...")
 
+    if settings.environment.value != "test" and settings.scheduler_enabled:
+        from modules.scheduler.scheduler import scheduler
+
+        await scheduler.stop()
+
+    if preload_task is not None and not preload_task.done():
+        preload_task.cancel()
+
     # Skip ML services in test environment
     if settings.environment.value != "test":
-        # Stop ML model refresh scheduler
-        await stop_model_refresh_scheduler()
-        logger.info("ML model refresh scheduler stopped")
+        if settings.ml_enabled:
+            from ml.serving.model_loader import stop_model_refresh_scheduler
+
+            # Stop ML model refresh scheduler
+            await stop_model_refresh_scheduler()
+            logger.info("ML model refresh scheduler stopped")
+
+        if settings.use_redis:
+            from modules.alerts.statistics import alert_statistics
+
+            await alert_statistics.stop()
+
+        if settings.search_suggestions_enabled:
+            from modules.search.suggestions import suggestion_service
+
+            await suggestion_service.stop()
+
+        if settings.report_worker_enabled:
+            from modules.reports.worker import report_worker
+
+            await report_worker.stop()
+
+        if settings.use_redis and settings.websocket_cluster_enabled:
+            from modules.websocket.cluster import stop_cluster_broadcasts
+
+            await stop_cluster_broadcasts()
+
+        if (
+            getattr(settings, 'use_local_elasticsearch', False)
+            and settings.search_indexing_enabled
+        ):
+            from modules.search.indexer import search_indexer
+
+            await search_indexer.stop()
 
         # Stop enhanced stream processors only if streaming was enabled
         if getattr(settings, 'enable_streaming', False):
+            from config.streaming import stop_streaming
+            from streaming.stream_processor_coordinator import \
+                stop_all_stream_processors
+
             await stop_all_stream_processors()
             logger.info("Enhanced stream processors stopped")
 
@@ -115,6 +222,10 @@ async def lifespan(app: FastAPI):
             await stop_streaming()
             logger.info("Streaming services stopped")
 
+    # Flush queued audit records before the pools close
+    if settings.environment.value != "test":
+        await audit_writer.stop()
+
     # Close database connections
     await close_db()
     logger.info("Database connections closed")
@@ -123,9 +234,12 @@ async def lifespan(app: FastAPI):
     await close_cache()
     logger.info("Cache connections closed")
 
-    # Close Elasticsearch connections
-    await close_elasticsearch()
-    logger.info("Elasticsearch connections closed")
+    # Close Elasticsearch connections (only if a search module loaded it)
+    if "config.elasticsearch" in sys.modules:
+        from config.elasticsearch import close_elasticsearch
+
+        await close_elasticsearch()
+        logger.info("Elasticsearch connections closed")
 
 
 # Create FastAPI application
@@ -138,6 +252,23 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Sampling profiles of selected requests; added first so it is the innermost
+# middleware and runs in the endpoint's task
+if settings.profiling_enabled:
+    from modules.profiling.middleware import ProfilingMiddleware
+
+    app.add_middleware(ProfilingMiddleware)
+
+# Conditional GET (ETag/304) and shared response cache for dashboard routes;
+# ORM commits bump the table versions the ETags are derived from. Added before
+# CORS and audit so the 304s and hits it answers itself pass through both
+if settings.http_cache_enabled:
+    from modules.shared.http_cache import (HTTPCacheMiddleware,
+                                           register_version_tracking)
+
+    register_version_tracking()
+    app.add_middleware(HTTPCacheMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -147,6 +278,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Audit write requests; records are written in batches by the audit writer
+app.add_middleware(AuditMiddleware)
+
 # Add trusted host middleware for production
 if settings.environment == "production":
     app.add_middleware(
@@ -194,8 +328,13 @@ async def health_check() -> None:
     }
 
 
-from ml.features.api import router as features_router
-from ml.serving.api import router as ml_serving_router
+@app.get("/health/db-pools")
+async def database_pool_health() -> None:
+    """Connection pool utilization per engine role (primary/read/analytics)"""
+    return {"pools": get_pool_stats(), "timestamp": time.time()}
+
+
+from modules.admin.api import router as admin_router
 from modules.alerts.api import router as alerts_router
 from modules.analytics.api import router as analytics_router
 # API v1 routes
@@ -203,6 +342,7 @@ from modules.assets.api import router as assets_router
 from modules.audit.api import router as audit_router
 from modules.checkin_checkout.api import router as checkin_checkout_router
 from modules.compliance.api import router as compliance_router
+from modules.exports.api import router as exports_router
 from modules.gateways.api import router as gateways_router
 from modules.geofences.api import router as geofences_router
 from modules.issues.api import router as issues_router
@@ -246,10 +386,19 @@ app.include_router(reports_router, prefix=settings.api_v1_prefix, tags=["reports
 
 # Include new routers
 app.include_router(search_router, prefix=settings.api_v1_prefix, tags=["search"])
-app.include_router(features_router, prefix=settings.api_v1_prefix, tags=["features"])
-app.include_router(ml_serving_router, prefix=settings.api_v1_prefix, tags=["ml"])
 app.include_router(audit_router, prefix=settings.api_v1_prefix, tags=["audit"])
+app.include_router(exports_router, prefix=settings.api_v1_prefix, tags=["exports"])
 app.include_router(streaming_router, prefix=settings.api_v1_prefix, tags=["streaming"])
+app.include_router(admin_router, prefix=settings.api_v1_prefix, tags=["admin"])
+
+if settings.ml_enabled:
+    from ml.features.api import router as features_router
+    from ml.serving.api import router as ml_serving_router
+
+    app.include_router(
+        features_router, prefix=settings.api_v1_prefix, tags=["features"]
+    )
+    app.include_router(ml_serving_router, prefix=settings.api_v1_prefix, tags=["ml"])
 
 
 # Root endpoint
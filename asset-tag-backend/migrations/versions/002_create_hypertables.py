@@ -20,7 +20,9 @@ def upgrade() -> None:
     """Convert time-series tables to hypertables (skipped for local development)"""
     
     # Skip TimescaleDB hypertables for local development
-    # All TimescaleDB-specific operations are commented out
+    # All TimescaleDB-specific operations are commented out here; hypertables,
+    # compression and retention are applied idempotently at startup by
+    # config/timescaledb_lifecycle.py using the intervals from settings.
     pass
     
     # # Convert observations table to hypertable
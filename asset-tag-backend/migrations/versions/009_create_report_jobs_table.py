@@ -0,0 +1,65 @@
+"""Create report jobs table
+
+Revision ID: 009_create_report_jobs_table
+Revises: 008_create_vehicle_asset_pairings_table
+Create Date: 2024-02-01 09:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "009_create_report_jobs_table"
+down_revision = "008_create_vehicle_asset_pairings_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create report_jobs table"""
+
+    # Create report_jobs table
+    op.create_table(
+        "report_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("template_id", sa.String(length=100), nullable=False),
+        sa.Column("format", sa.String(length=20), nullable=False),
+        sa.Column("parameters", sa.JSON(), nullable=True),
+        sa.Column("params_hash", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("progress", sa.Integer(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("worker_id", sa.String(length=100), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("storage_key", sa.String(length=500), nullable=True),
+        sa.Column("filename", sa.String(length=255), nullable=True),
+        sa.Column("media_type", sa.String(length=100), nullable=True),
+        sa.Column("size_bytes", sa.Integer(), nullable=True),
+        sa.Column("row_count", sa.Integer(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("failed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    # Create indexes for report_jobs table
+    op.create_index("idx_report_job_status", "report_jobs", ["status", "created_at"])
+    op.create_index(
+        "idx_report_job_params", "report_jobs", ["params_hash", "status"]
+    )
+
+
+def downgrade() -> None:
+    """Drop report_jobs table"""
+
+    # Drop indexes
+    op.drop_index("idx_report_job_params", table_name="report_jobs")
+    op.drop_index("idx_report_job_status", table_name="report_jobs")
+
+    # Drop table
+    op.drop_table("report_jobs")
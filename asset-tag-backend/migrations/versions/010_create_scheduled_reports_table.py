@@ -0,0 +1,55 @@
+"""Create scheduled reports table
+
+Revision ID: 010_create_scheduled_reports_table
+Revises: 009_create_report_jobs_table
+Create Date: 2024-02-05 09:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "010_create_scheduled_reports_table"
+down_revision = "009_create_report_jobs_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create scheduled_reports table"""
+
+    # Create scheduled_reports table
+    op.create_table(
+        "scheduled_reports",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("template_id", sa.String(length=100), nullable=False),
+        sa.Column("schedule", sa.String(length=20), nullable=False),
+        sa.Column("cron", sa.String(length=100), nullable=False),
+        sa.Column("parameters", sa.JSON(), nullable=True),
+        sa.Column("format", sa.String(length=20), nullable=False),
+        sa.Column("recipients", sa.JSON(), nullable=True),
+        sa.Column("enabled", sa.Boolean(), nullable=False),
+        sa.Column("next_run", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_run", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_report_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    # Create indexes for scheduled_reports table
+    op.create_index(
+        "idx_scheduled_report_due", "scheduled_reports", ["enabled", "next_run"]
+    )
+
+
+def downgrade() -> None:
+    """Drop scheduled_reports table"""
+
+    # Drop indexes
+    op.drop_index("idx_scheduled_report_due", table_name="scheduled_reports")
+
+    # Drop table
+    op.drop_table("scheduled_reports")
@@ -2,6 +2,7 @@
 Feature store API endpoints
 """
 
+import uuid
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
@@ -13,6 +14,69 @@ from ml.features.feature_store import (AssetBaseline, FeatureStore,
 router = APIRouter()
 
 
+@router.get("/features/batch")
+async def get_batch_features(
+    asset_ids: str = Query(..., description="Comma-separated list of asset IDs"),
+    as_of: Optional[datetime] = Query(
+        None, description="Compute features as of this time instead of now"
+    ),
+    feature_store: FeatureStore = Depends(get_feature_store),
+):
+    """Get features for multiple assets"""
+    try:
+        asset_id_list = [aid.strip() for aid in asset_ids.split(",")]
+
+        if len(asset_id_list) > 100:
+            raise HTTPException(
+                status_code=400, detail="Maximum 100 assets per batch request"
+            )
+
+        # The bulk queries cast the whole list to uuid[], so one bad id would
+        # fail every asset in its chunk
+        invalid = []
+        for index, asset_id in enumerate(asset_id_list):
+            try:
+                asset_id_list[index] = str(uuid.UUID(asset_id))
+            except ValueError:
+                invalid.append(asset_id)
+        if invalid:
+            raise HTTPException(
+                status_code=400, detail=f"Invalid asset IDs: {', '.join(invalid)}"
+            )
+
+        if as_of is None:
+            features_by_asset = await feature_store.get_features_bulk(asset_id_list)
+        else:
+            matrix = await feature_store.compute_features_bulk(asset_id_list, as_of)
+            features_by_asset = matrix.vectors()
+
+        results = []
+        for asset_id in asset_id_list:
+            features = features_by_asset.get(asset_id)
+            if features:
+                results.append(
+                    {
+                        "asset_id": asset_id,
+                        "features": features.features,
+                        "timestamp": features.timestamp.isoformat(),
+                        "metadata": features.metadata,
+                    }
+                )
+
+        return {
+            "requested_count": len(asset_id_list),
+            "returned_count": len(results),
+            "features": results,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error getting batch features: {str(e)}"
+        )
+
+
 @router.get("/features/{asset_id}")
 async def get_features(
     asset_id: str, feature_store: FeatureStore = Depends(get_feature_store)
@@ -134,47 +198,6 @@ async def get_anomaly_score(
         )
 
 
-@router.get("/features/batch")
-async def get_batch_features(
-    asset_ids: str = Query(..., description="Comma-separated list of asset IDs"),
-    feature_store: FeatureStore = Depends(get_feature_store),
-):
-    """Get features for multiple assets"""
-    try:
-        asset_id_list = [aid.strip() for aid in asset_ids.split(",")]
-
-        if len(asset_id_list) > 100:
-            raise HTTPException(
-                status_code=400, detail="Maximum 100 assets per batch request"
-            )
-
-        results = []
-        for asset_id in asset_id_list:
-            features = await feature_store.get_features(asset_id)
-            if features:
-                results.append(
-                    {
-                        "asset_id": asset_id,
-                        "features": features.features,
-                        "timestamp": features.timestamp.isoformat(),
-                        "metadata": features.metadata,
-                    }
-                )
-
-        return {
-            "requested_count": len(asset_id_list),
-            "returned_count": len(results),
-            "features": results,
-        }
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error getting batch features: {str(e)}"
-        )
-
-
 async def _calculate_anomaly_score(
     features: FeatureVector, baseline: AssetBaseline
 ) -> float:
@@ -5,16 +5,127 @@ Feature store for ML model serving
 import json
 import logging
 from dataclasses import asdict, dataclass
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 from sqlalchemy import text
 
 from config.cache import get_cache
-from config.database import get_db
+from config.database import analytics_session
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Column order of FeatureMatrix.values
+FEATURE_COLUMNS: Tuple[str, ...] = (
+    "avg_rssi",
+    "min_rssi",
+    "max_rssi",
+    "rssi_std",
+    "avg_battery",
+    "battery_trend",
+    "avg_temperature",
+    "gateway_count",
+    "current_confidence",
+    "current_speed",
+    "current_bearing",
+    "hour_of_day",
+    "day_of_week",
+    "is_weekend",
+    "observation_rate",
+)
+
+# Last 100 observations per asset from the 10 minutes before :as_of
+REAL_TIME_OBSERVATIONS_QUERY = """
+    WITH recent AS (
+        SELECT
+            asset_id,
+            gateway_id,
+            rssi,
+            battery_level,
+            temperature,
+            observed_at,
+            ROW_NUMBER() OVER (
+                PARTITION BY asset_id ORDER BY observed_at DESC
+            ) AS position
+        FROM observations
+        WHERE asset_id = ANY(CAST(:asset_ids AS uuid[]))
+            AND observed_at > CAST(:as_of AS timestamptz) - INTERVAL '10 minutes'
+            AND observed_at <= :as_of
+    ),
+    latest AS (
+        SELECT
+            *,
+            ROW_NUMBER() OVER (
+                PARTITION BY asset_id, battery_level IS NULL
+                ORDER BY observed_at DESC
+            ) - 1 AS battery_position
+        FROM recent
+        WHERE position <= 100
+    )
+    SELECT
+        asset_id,
+        COUNT(*) AS observation_count,
+        AVG(rssi) AS avg_rssi,
+        MIN(rssi) AS min_rssi,
+        MAX(rssi) AS max_rssi,
+        STDDEV_SAMP(rssi) AS rssi_std,
+        AVG(battery_level) AS avg_battery,
+        REGR_SLOPE(battery_level, battery_position) AS battery_trend,
+        AVG(temperature) AS avg_temperature,
+        ARRAY_AGG(DISTINCT gateway_id) AS gateway_ids,
+        EXTRACT(EPOCH FROM MAX(observed_at) - MIN(observed_at)) AS time_span
+    FROM latest
+    GROUP BY asset_id
+"""
+
+# Latest location estimate per asset at :as_of
+CURRENT_LOCATIONS_QUERY = """
+    SELECT ids.asset_id, latest.confidence, latest.speed, latest.bearing
+    FROM unnest(CAST(:asset_ids AS uuid[])) AS ids(asset_id)
+    CROSS JOIN LATERAL (
+        SELECT confidence, speed, bearing
+        FROM estimated_locations
+        WHERE estimated_locations.asset_id = ids.asset_id
+            AND estimated_at <= :as_of
+        ORDER BY estimated_at DESC
+        LIMIT 1
+    ) AS latest
+"""
+
+# Per-gateway averages over the 30 days before :as_of
+BASELINE_GATEWAYS_QUERY = """
+    SELECT
+        asset_id,
+        gateway_id,
+        AVG(rssi) AS avg_rssi,
+        AVG(battery_level) AS avg_battery,
+        AVG(temperature) AS avg_temperature
+    FROM observations
+    WHERE asset_id = ANY(CAST(:asset_ids AS uuid[]))
+        AND observed_at > CAST(:as_of AS timestamptz) - INTERVAL '30 days'
+        AND observed_at <= :as_of
+    GROUP BY asset_id, gateway_id
+"""
+
+# Location confidence and movement over the 30 days before :as_of
+BASELINE_LOCATIONS_QUERY = """
+    SELECT
+        asset_id,
+        AVG(confidence) AS avg_confidence,
+        AVG(distance_from_previous) AS avg_distance,
+        AVG(speed) FILTER (
+            WHERE distance_from_previous IS NOT NULL
+        ) AS avg_speed,
+        COUNT(distance_from_previous) AS location_count
+    FROM estimated_locations
+    WHERE asset_id = ANY(CAST(:asset_ids AS uuid[]))
+        AND estimated_at > CAST(:as_of AS timestamptz) - INTERVAL '30 days'
+        AND estimated_at <= :as_of
+    GROUP BY asset_id
+"""
+
 
 @dataclass
 class FeatureVector:
@@ -83,12 +194,87 @@ class AssetBaseline:
         )
 
 
+@dataclass
+class FeatureMatrix:
+    """Features of many assets, one row per asset
+
+    ``values`` has one column per name in ``columns`` (``FEATURE_COLUMNS``);
+    features an asset does not have are NaN.
+    """
+
+    asset_ids: List[str]
+    columns: Tuple[str, ...]
+    values: np.ndarray
+    timestamp: datetime
+    metadata: List[Dict[str, Any]]
+
+    @classmethod
+    def from_vectors(
+        cls, vectors: List[FeatureVector], timestamp: Optional[datetime] = None
+    ) -> "FeatureMatrix":
+        values = np.full((len(vectors), len(FEATURE_COLUMNS)), np.nan)
+        for row, vector in enumerate(vectors):
+            for column, name in enumerate(FEATURE_COLUMNS):
+                if name in vector.features:
+                    values[row, column] = vector.features[name]
+        return cls(
+            asset_ids=[vector.asset_id for vector in vectors],
+            columns=FEATURE_COLUMNS,
+            values=values,
+            timestamp=timestamp or datetime.now(),
+            metadata=[vector.metadata or {} for vector in vectors],
+        )
+
+    def __len__(self) -> int:
+        return len(self.asset_ids)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:, self.columns.index(name)]
+
+    def to_frame(self) -> Any:
+        """``pandas.DataFrame`` indexed by asset id"""
+        import pandas as pd
+
+        return pd.DataFrame(
+            self.values,
+            index=pd.Index(self.asset_ids, name="asset_id"),
+            columns=list(self.columns),
+        )
+
+    def vectors(self) -> Dict[str, FeatureVector]:
+        """Per-asset feature vectors, without the NaN entries"""
+        return {
+            asset_id: FeatureVector(
+                asset_id=asset_id,
+                timestamp=self.timestamp,
+                features={
+                    name: float(value)
+                    for name, value in zip(self.columns, row)
+                    if not np.isnan(value)
+                },
+                metadata=metadata,
+            )
+            for asset_id, row, metadata in zip(
+                self.asset_ids, self.values, self.metadata
+            )
+        }
+
+
 class FeatureStore:
     """Feature store for ML model serving"""
 
     def __init__(self) -> None:
         self.cache = None
-        self.db = None
+        self._online = None
+
+    @property
+    def online(self) -> Any:
+        """Online aggregates of the assets whose observations this worker ingests"""
+        if self._online is None:
+            from ml.features.online import OnlineFeatureTracker
+
+            self._online = OnlineFeatureTracker(self._compute_baselines)
+        return self._online
 
     async def _get_cache(self) -> None:
         """Get cache manager"""
@@ -96,15 +282,12 @@ class FeatureStore:
             self.cache = await get_cache()
         return self.cache
 
-    async def _get_db(self) -> None:
-        """Get database session"""
-        if not self.db:
-            self.db = await get_db()
-        return self.db
-
     async def get_features(self, asset_id: str) -> Optional[FeatureVector]:
         """Get real-time features for an asset"""
         try:
+            if self._online_has(asset_id):
+                return self.online.features(asset_id)
+
             cache = await self._get_cache()
 
             # Try cache first (hot cache)
@@ -131,6 +314,11 @@ class FeatureStore:
     async def get_baseline(self, asset_id: str) -> Optional[AssetBaseline]:
         """Get asset baseline features"""
         try:
+            if self._online_has(asset_id):
+                baseline = self.online.baseline(asset_id)
+                if baseline is not None:
+                    return baseline
+
             cache = await self._get_cache()
 
             # Try cache first (24 hour TTL)
@@ -154,279 +342,333 @@ class FeatureStore:
             logger.error(f"Error getting baseline for asset {asset_id}: {e}")
             return None
 
-    async def _compute_real_time_features(
-        self, asset_id: str
-    ) -> Optional[FeatureVector]:
-        """Compute real-time features from database"""
-        try:
-            db = await self._get_db()
-
-            # Get recent observations (last 10 minutes)
-            recent_obs_query = text(
-                """
-                SELECT 
-                    gateway_id,
-                    rssi,
-                    battery_level,
-                    temperature,
-                    observed_at
-                FROM observations
-                WHERE asset_id = :asset_id
-                    AND observed_at > NOW() - INTERVAL '10 minutes'
-                ORDER BY observed_at DESC
-                LIMIT 100;
-            """
-            )
+    async def get_features_bulk(self, asset_ids: List[str]) -> Dict[str, FeatureVector]:
+        """Real-time features for many assets
 
-            obs_result = await db.execute(recent_obs_query, {"asset_id": asset_id})
-            observations = obs_result.fetchall()
-
-            if not observations:
-                return None
-
-            # Get current location
-            location_query = text(
-                """
-                SELECT 
-                    latitude,
-                    longitude,
-                    confidence,
-                    speed,
-                    bearing,
-                    estimated_at
-                FROM estimated_locations
-                WHERE asset_id = :asset_id
-                ORDER BY estimated_at DESC
-                LIMIT 1;
-            """
+        Features of assets tracked online are current; of the others, cached
+        features come from one MGET and the rest are computed and written back
+        in one pipeline. Assets without features are left out.
+        """
+        try:
+            features: Dict[str, FeatureVector] = {}
+            remaining = []
+            for asset_id in asset_ids:
+                if self._online_has(asset_id):
+                    vector = self.online.features(asset_id)
+                    if vector is not None:
+                        features[asset_id] = vector
+                else:
+                    remaining.append(asset_id)
+            cache = await self._get_cache()
+            cached = await cache.get_many_with_strategy("asset_features", remaining)
+            features.update(
+                (asset_id, FeatureVector.from_dict(data))
+                for asset_id, data in cached.items()
             )
-
-            loc_result = await db.execute(location_query, {"asset_id": asset_id})
-            location = loc_result.fetchone()
-
-            # Compute features
-            features = {}
-
-            # RSSI features
-            rssi_values = [obs.rssi for obs in observations]
-            features["avg_rssi"] = sum(rssi_values) / len(rssi_values)
-            features["min_rssi"] = min(rssi_values)
-            features["max_rssi"] = max(rssi_values)
-            features["rssi_std"] = self._calculate_std(rssi_values)
-
-            # Battery features
-            battery_values = [
-                obs.battery_level
-                for obs in observations
-                if obs.battery_level is not None
-            ]
-            if battery_values:
-                features["avg_battery"] = sum(battery_values) / len(battery_values)
-                features["battery_trend"] = self._calculate_trend(
-                    [
-                        obs.battery_level
-                        for obs in observations
-                        if obs.battery_level is not None
-                    ]
-                )
-
-            # Temperature features
-            temp_values = [
-                obs.temperature for obs in observations if obs.temperature is not None
-            ]
-            if temp_values:
-                features["avg_temperature"] = sum(temp_values) / len(temp_values)
-
-            # Gateway diversity
-            unique_gateways = set(obs.gateway_id for obs in observations)
-            features["gateway_count"] = len(unique_gateways)
-
-            # Location features
-            if location:
-                features["current_confidence"] = float(location.confidence)
-                features["current_speed"] = (
-                    float(location.speed) if location.speed else 0.0
-                )
-                features["current_bearing"] = (
-                    float(location.bearing) if location.bearing else 0.0
+            missing = [asset_id for asset_id in remaining if asset_id not in features]
+            computed = await self._compute_feature_vectors(missing)
+            if computed:
+                await cache.set_many_with_strategy(
+                    "asset_features",
+                    {asset_id: fv.to_dict() for asset_id, fv in computed.items()},
                 )
-
-            # Temporal features
-            now = datetime.now()
-            features["hour_of_day"] = now.hour
-            features["day_of_week"] = now.weekday()
-            features["is_weekend"] = 1.0 if now.weekday() >= 5 else 0.0
-
-            # Movement features
-            if len(observations) > 1:
-                time_span = (
-                    observations[0].observed_at - observations[-1].observed_at
-                ).total_seconds()
-                features["observation_rate"] = len(observations) / max(
-                    time_span / 60, 1
-                )  # per minute
-
-            return FeatureVector(
-                asset_id=asset_id,
-                timestamp=datetime.now(),
-                features=features,
-                metadata={
-                    "observation_count": len(observations),
-                    "has_location": location is not None,
-                    "gateway_ids": list(unique_gateways),
-                },
-            )
+            features.update(computed)
+            return features
 
         except Exception as e:
-            logger.error(f"Error computing real-time features for {asset_id}: {e}")
-            return None
+            logger.error(f"Error getting features for {len(asset_ids)} assets: {e}")
+            return {}
 
-    async def _compute_baseline_features(
-        self, asset_id: str
-    ) -> Optional[AssetBaseline]:
-        """Compute baseline features from historical data"""
+    async def get_baselines_bulk(
+        self, asset_ids: List[str]
+    ) -> Dict[str, AssetBaseline]:
+        """Baselines for many assets, fetched like ``get_features_bulk``"""
         try:
-            db = await self._get_db()
-
-            # Get historical observations (last 30 days)
-            baseline_query = text(
-                """
-                SELECT 
-                    gateway_id,
-                    AVG(rssi) as avg_rssi,
-                    AVG(battery_level) as avg_battery,
-                    AVG(temperature) as avg_temperature
-                FROM observations
-                WHERE asset_id = :asset_id
-                    AND observed_at > NOW() - INTERVAL '30 days'
-                GROUP BY gateway_id;
-            """
+            baselines: Dict[str, AssetBaseline] = {}
+            if settings.ml_online_features_enabled:
+                for asset_id in asset_ids:
+                    baseline = self.online.baseline(asset_id)
+                    if baseline is not None:
+                        baselines[asset_id] = baseline
+            cache = await self._get_cache()
+            remaining = [
+                asset_id for asset_id in asset_ids if asset_id not in baselines
+            ]
+            cached = await cache.get_many_with_strategy("asset_baseline", remaining)
+            baselines.update(
+                (asset_id, AssetBaseline.from_dict(data))
+                for asset_id, data in cached.items()
             )
+            missing = [asset_id for asset_id in remaining if asset_id not in baselines]
+            computed = await self._compute_baselines(missing)
+            if computed:
+                await cache.set_many_with_strategy(
+                    "asset_baseline",
+                    {asset_id: bl.to_dict() for asset_id, bl in computed.items()},
+                )
+            baselines.update(computed)
+            return baselines
 
-            baseline_result = await db.execute(baseline_query, {"asset_id": asset_id})
-            gateway_stats = baseline_result.fetchall()
+        except Exception as e:
+            logger.error(f"Error getting baselines for {len(asset_ids)} assets: {e}")
+            return {}
 
-            if not gateway_stats:
-                return None
+    def _online_has(self, asset_id: str) -> bool:
+        return settings.ml_online_features_enabled and self.online.has(asset_id)
 
-            # Get location confidence baseline
-            confidence_query = text(
-                """
-                SELECT AVG(confidence) as avg_confidence
-                FROM estimated_locations
-                WHERE asset_id = :asset_id
-                    AND estimated_at > NOW() - INTERVAL '30 days';
-            """
-            )
+    async def observe(self, asset_id: str, observation: Dict[str, Any]) -> None:
+        """Fold an ingested observation into the asset's online aggregates"""
+        if not settings.ml_online_features_enabled:
+            return
+        try:
+            await self.online.observe(asset_id, observation)
+        except Exception as e:
+            logger.error(f"Error updating online features for {asset_id}: {e}")
 
-            conf_result = await db.execute(confidence_query, {"asset_id": asset_id})
-            avg_confidence = conf_result.fetchone()
-
-            # Get movement pattern
-            movement_query = text(
-                """
-                SELECT 
-                    AVG(distance_from_previous) as avg_distance,
-                    AVG(speed) as avg_speed,
-                    COUNT(*) as location_count
-                FROM estimated_locations
-                WHERE asset_id = :asset_id
-                    AND estimated_at > NOW() - INTERVAL '30 days'
-                    AND distance_from_previous IS NOT NULL;
-            """
+    async def observe_location(self, asset_id: str, location: Any) -> None:
+        """Fold an estimated location into the asset's online aggregates"""
+        if not settings.ml_online_features_enabled:
+            return
+        try:
+            await self.online.observe_location(asset_id, location)
+        except Exception as e:
+            logger.error(f"Error updating online location for {asset_id}: {e}")
+
+    async def start_online_updates(self) -> None:
+        if settings.ml_online_features_enabled:
+            self.online.start()
+
+    async def stop_online_updates(self) -> None:
+        await self.online.stop()
+
+    async def compute_features_bulk(
+        self, asset_ids: List[str], as_of: Optional[datetime] = None
+    ) -> FeatureMatrix:
+        """Compute real-time features for many assets with grouped queries
+
+        Computes the same features as ``get_features`` as of ``as_of``
+        (default: now), ``ml_feature_bulk_chunk_size`` assets per query.
+        Assets without recent observations are left out. Current features
+        are written back to the ``asset_features`` cache in one pipeline.
+        """
+        vectors = await self._compute_feature_vectors(asset_ids, as_of)
+        if as_of is None and vectors:
+            cache = await self._get_cache()
+            await cache.set_many_with_strategy(
+                "asset_features",
+                {asset_id: fv.to_dict() for asset_id, fv in vectors.items()},
             )
+        ordered = [vectors[asset_id] for asset_id in asset_ids if asset_id in vectors]
+        timestamp = ordered[0].timestamp if ordered else None
+        return FeatureMatrix.from_vectors(ordered, timestamp)
 
-            move_result = await db.execute(movement_query, {"asset_id": asset_id})
-            movement_stats = move_result.fetchone()
-
-            # Build baseline
-            avg_rssi_per_gateway = {
-                str(stat.gateway_id): float(stat.avg_rssi) for stat in gateway_stats
-            }
-
-            typical_movement_pattern = {
-                "avg_distance": (
-                    float(movement_stats.avg_distance)
-                    if movement_stats.avg_distance
-                    else 0.0
-                ),
-                "avg_speed": (
-                    float(movement_stats.avg_speed) if movement_stats.avg_speed else 0.0
-                ),
-                "location_count": (
-                    int(movement_stats.location_count)
-                    if movement_stats.location_count
-                    else 0
-                ),
-            }
-
-            # Calculate battery drain rate (simplified)
-            battery_values = [
-                stat.avg_battery
-                for stat in gateway_stats
-                if stat.avg_battery is not None
-            ]
-            normal_battery_drain_rate = 0.1  # Default 10% per day
+    async def _compute_real_time_features(
+        self, asset_id: str
+    ) -> Optional[FeatureVector]:
+        """Compute real-time features from database"""
+        vectors = await self._compute_feature_vectors([asset_id])
+        return vectors.get(asset_id)
 
-            avg_temperature = (
-                sum(
-                    stat.avg_temperature
-                    for stat in gateway_stats
-                    if stat.avg_temperature is not None
+    async def _compute_baseline_features(
+        self, asset_id: str
+    ) -> Optional[AssetBaseline]:
+        """Compute baseline features from historical data"""
+        baselines = await self._compute_baselines([asset_id])
+        return baselines.get(asset_id)
+
+    @staticmethod
+    def _as_of(as_of: Optional[datetime]) -> datetime:
+        """Timezone-aware ``as_of``; naive times are taken as local time"""
+        if as_of is None:
+            return datetime.now(timezone.utc)
+        return as_of if as_of.tzinfo else as_of.astimezone()
+
+    @staticmethod
+    def _chunks(asset_ids: List[str]) -> List[List[str]]:
+        size = settings.ml_feature_bulk_chunk_size
+        return [
+            asset_ids[start : start + size] for start in range(0, len(asset_ids), size)
+        ]
+
+    async def _compute_feature_vectors(
+        self, asset_ids: List[str], as_of: Optional[datetime] = None
+    ) -> Dict[str, FeatureVector]:
+        """Real-time feature vectors by asset, two queries per chunk"""
+        as_of = self._as_of(as_of)
+        local_time = as_of.astimezone()
+        vectors: Dict[str, FeatureVector] = {}
+        for chunk in self._chunks(asset_ids):
+            try:
+                params = {"asset_ids": chunk, "as_of": as_of}
+                async with analytics_session() as db:
+                    obs_result = await db.execute(
+                        text(REAL_TIME_OBSERVATIONS_QUERY), params
+                    )
+                    observations = obs_result.fetchall()
+                    if not observations:
+                        continue
+                    loc_result = await db.execute(text(CURRENT_LOCATIONS_QUERY), params)
+                    locations = {
+                        str(row.asset_id): row for row in loc_result.fetchall()
+                    }
+
+                for row in observations:
+                    asset_id = str(row.asset_id)
+                    location = locations.get(asset_id)
+                    gateway_ids = [str(gateway_id) for gateway_id in row.gateway_ids]
+                    vectors[asset_id] = FeatureVector(
+                        asset_id=asset_id,
+                        timestamp=local_time.replace(tzinfo=None),
+                        features=self._real_time_features(row, location, local_time),
+                        metadata={
+                            "observation_count": row.observation_count,
+                            "has_location": location is not None,
+                            "gateway_ids": gateway_ids,
+                        },
+                    )
+
+            except Exception as e:
+                logger.error(
+                    f"Error computing real-time features for {len(chunk)} assets: {e}"
                 )
-                / len(gateway_stats)
-                if gateway_stats
-                else 20.0
+        return vectors
+
+    @staticmethod
+    def _real_time_features(
+        row: Any, location: Optional[Any], local_time: datetime
+    ) -> Dict[str, float]:
+        """Feature dict from one aggregated observation row"""
+        features = {}
+
+        # RSSI features
+        features["avg_rssi"] = float(row.avg_rssi)
+        features["min_rssi"] = float(row.min_rssi)
+        features["max_rssi"] = float(row.max_rssi)
+        features["rssi_std"] = float(row.rssi_std or 0.0)
+
+        # Battery features
+        if row.avg_battery is not None:
+            features["avg_battery"] = float(row.avg_battery)
+            features["battery_trend"] = float(row.battery_trend or 0.0)
+
+        # Temperature features
+        if row.avg_temperature is not None:
+            features["avg_temperature"] = float(row.avg_temperature)
+
+        # Gateway diversity
+        features["gateway_count"] = len(row.gateway_ids)
+
+        # Location features
+        if location:
+            features["current_confidence"] = float(location.confidence)
+            features["current_speed"] = (
+                float(location.speed) if location.speed else 0.0
             )
-
-            return AssetBaseline(
-                asset_id=asset_id,
-                avg_rssi_per_gateway=avg_rssi_per_gateway,
-                typical_movement_pattern=typical_movement_pattern,
-                normal_battery_drain_rate=normal_battery_drain_rate,
-                avg_temperature=avg_temperature,
-                typical_confidence=(
-                    float(avg_confidence.avg_confidence)
-                    if avg_confidence and avg_confidence.avg_confidence
-                    else 0.8
-                ),
-                last_updated=datetime.now(),
+            features["current_bearing"] = (
+                float(location.bearing) if location.bearing else 0.0
             )
 
-        except Exception as e:
-            logger.error(f"Error computing baseline for {asset_id}: {e}")
-            return None
-
-    def _calculate_std(self, values: List[float]) -> float:
-        """Calculate standard deviation"""
-        if len(values) < 2:
-            return 0.0
-
-        mean = sum(values) / len(values)
-        variance = sum((x - mean) ** 2 for x in values) / (len(values) - 1)
-        return variance**0.5
-
-    def _calculate_trend(self, values: List[float]) -> float:
-        """Calculate trend (slope) of values"""
-        if len(values) < 2:
-            return 0.0
-
-        # Simple linear regression slope
-        n = len(values)
-        x = list(range(n))
-        x_mean = sum(x) / n
-        y_mean = sum(values) / n
+        # Temporal features
+        features["hour_of_day"] = local_time.hour
+        features["day_of_week"] = local_time.weekday()
+        features["is_weekend"] = 1.0 if local_time.weekday() >= 5 else 0.0
+
+        # Movement features
+        if row.observation_count > 1:
+            features["observation_rate"] = row.observation_count / max(
+                float(row.time_span) / 60, 1
+            )  # per minute
+
+        return features
+
+    async def _compute_baselines(
+        self, asset_ids: List[str], as_of: Optional[datetime] = None
+    ) -> Dict[str, AssetBaseline]:
+        """Baselines by asset, two grouped queries per chunk"""
+        as_of = self._as_of(as_of)
+        baselines: Dict[str, AssetBaseline] = {}
+        for chunk in self._chunks(asset_ids):
+            try:
+                params = {"asset_ids": chunk, "as_of": as_of}
+                async with analytics_session() as db:
+                    gateway_result = await db.execute(
+                        text(BASELINE_GATEWAYS_QUERY), params
+                    )
+                    gateway_rows = gateway_result.fetchall()
+                    if not gateway_rows:
+                        continue
+                    location_result = await db.execute(
+                        text(BASELINE_LOCATIONS_QUERY), params
+                    )
+                    locations = {
+                        str(row.asset_id): row for row in location_result.fetchall()
+                    }
+
+                gateway_stats: Dict[str, List[Any]] = {}
+                for row in gateway_rows:
+                    gateway_stats.setdefault(str(row.asset_id), []).append(row)
+                for asset_id, stats in gateway_stats.items():
+                    baselines[asset_id] = self._baseline(
+                        asset_id, stats, locations.get(asset_id)
+                    )
+
+            except Exception as e:
+                logger.error(f"Error computing baselines for {len(chunk)} assets: {e}")
+        return baselines
+
+    @staticmethod
+    def _baseline(
+        asset_id: str, gateway_stats: List[Any], location_stats: Optional[Any]
+    ) -> AssetBaseline:
+        """Baseline from an asset's per-gateway and location aggregates"""
+        avg_rssi_per_gateway = {
+            str(stat.gateway_id): float(stat.avg_rssi) for stat in gateway_stats
+        }
 
-        numerator = sum((x[i] - x_mean) * (values[i] - y_mean) for i in range(n))
-        denominator = sum((x[i] - x_mean) ** 2 for i in range(n))
+        typical_movement_pattern = {
+            "avg_distance": (
+                float(location_stats.avg_distance)
+                if location_stats and location_stats.avg_distance
+                else 0.0
+            ),
+            "avg_speed": (
+                float(location_stats.avg_speed)
+                if location_stats and location_stats.avg_speed
+                else 0.0
+            ),
+            "location_count": (
+                int(location_stats.location_count)
+                if location_stats and location_stats.location_count
+                else 0
+            ),
+        }
 
-        return numerator / denominator if denominator != 0 else 0.0
+        # Calculate battery drain rate (simplified)
+        normal_battery_drain_rate = 0.1  # Default 10% per day
+
+        avg_temperature = sum(
+            float(stat.avg_temperature)
+            for stat in gateway_stats
+            if stat.avg_temperature is not None
+        ) / len(gateway_stats)
+
+        return AssetBaseline(
+            asset_id=asset_id,
+            avg_rssi_per_gateway=avg_rssi_per_gateway,
+            typical_movement_pattern=typical_movement_pattern,
+            normal_battery_drain_rate=normal_battery_drain_rate,
+            avg_temperature=avg_temperature,
+            typical_confidence=(
+                float(location_stats.avg_confidence)
+                if location_stats and location_stats.avg_confidence
+                else 0.8
+            ),
+            last_updated=datetime.now(),
+        )
 
     async def store_features(self, feature_vector: FeatureVector) -> bool:
         """Store feature vector in database"""
         try:
-            db = await self._get_db()
-
             # Store in feature_history table (if it exists)
             # For now, we'll just cache it
             cache = await self._get_cache()
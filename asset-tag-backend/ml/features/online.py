@@ -0,0 +1,935 @@
+"""
+Online feature and baseline aggregates
+
+Real-time features and baselines are maintained from the observation and
+location stream instead of being recomputed from SQL:
+
+- means and variances are exponentially decayed Welford accumulators, with a
+  short half-life for real-time features and a long one for baselines;
+- the observation rate is an exponentially decayed counter;
+- min/max RSSI over the real-time window come from monotonic deques;
+- each gateway keeps a small RSSI sketch (last seen, decayed mean/variance)
+  for the per-gateway baseline.
+
+All of these merge, so an asset observed by several workers keeps one
+checkpoint: each worker folds only its changes since its previous checkpoint
+into the stored state, with a compare-and-set on the state's version, and
+retries when another worker wrote in between.
+
+Each asset's state is a few hundred bytes of JSON. Changed states are
+checkpointed to Redis every ``ml_online_checkpoint_seconds`` together with the
+derived ``asset_features`` and ``asset_baseline`` cache entries, so other
+workers read fresh values from the cache. A state is restored from its
+checkpoint the first time an asset is seen, and only assets with neither are
+seeded from the database, in bulk.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import (Any, Awaitable, Callable, Deque, Dict, List, Optional,
+                    Set, Tuple)
+
+from config.cache import get_cache
+from config.settings import settings
+from ml.features.feature_store import AssetBaseline, FeatureVector
+
+logger = logging.getLogger(__name__)
+
+# Real-time features cover the observations of the last 10 minutes
+WINDOW_SECONDS = 600.0
+# Readings kept for the windowed min/max
+WINDOW_MAX_READINGS = 100
+# Gateways not seen for this long drop out of the baseline
+GATEWAY_RETENTION_SECONDS = 30 * 86400.0
+# Weight given to a database baseline when seeding, in observations
+SEED_WEIGHT = 10.0
+# Battery readings closer together than this do not update the drain rate
+MIN_DRAIN_INTERVAL_SECONDS = 60.0
+DEFAULT_DRAIN_RATE = 0.1  # 10% per day
+DEFAULT_TEMPERATURE = 20.0
+DEFAULT_CONFIDENCE = 0.8
+# Merge attempts per checkpoint before a contended state waits for the next one
+CHECKPOINT_ATTEMPTS = 3
+
+SeedBaselines = Callable[[List[str]], Awaitable[Dict[str, AssetBaseline]]]
+
+
+def _timestamp(value: Any) -> float:
+    """Epoch seconds of a datetime, ISO string or number; now when missing"""
+    if value is None:
+        return time.time()
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value.timestamp()
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _decay_factor(half_life: Optional[float], since: float, at: float) -> float:
+    """Weight left at ``at`` of a contribution made at ``since``"""
+    if half_life and at > since:
+        return 0.5 ** ((at - since) / half_life)
+    return 1.0
+
+
+class DecayedMoments:
+    """Weighted Welford mean/variance whose weights halve every ``half_life``
+
+    Without a half-life this is the plain Welford algorithm.
+    """
+
+    __slots__ = ("half_life", "weight", "mean", "m2", "updated_at")
+
+    def __init__(self, half_life: Optional[float] = None) -> None:
+        self.half_life = half_life
+        self.weight = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updated_at = 0.0
+
+    def _decay(self, at: float) -> None:
+        if self.weight:
+            factor = _decay_factor(self.half_life, self.updated_at, at)
+            self.weight *= factor
+            self.m2 *= factor
+        self.updated_at = max(self.updated_at, at)
+
+    def update(self, value: float, at: float, weight: float = 1.0) -> None:
+        self._decay(at)
+        self.weight += weight
+        delta = value - self.mean
+        self.mean += delta * weight / self.weight
+        self.m2 += weight * delta * (value - self.mean)
+
+    def merge(self, mean: float, weight: float, m2: float = 0.0) -> None:
+        """Fold in a mean computed elsewhere, worth ``weight`` observations"""
+        total = self.weight + weight
+        if total <= 0:
+            return
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.weight * weight / total
+        self.mean += delta * weight / total
+        self.weight = total
+
+    def combine(self, other: "DecayedMoments") -> None:
+        """Fold in another accumulator of the same values (parallel Welford)"""
+        if not other.weight:
+            return
+        at = max(self.updated_at, other.updated_at)
+        self._decay(at)
+        factor = _decay_factor(other.half_life, other.updated_at, at)
+        self.merge(other.mean, other.weight * factor, other.m2 * factor)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.weight - 1) if self.weight > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.variance, 0.0))
+
+    def to_list(self) -> List[float]:
+        return [self.weight, self.mean, self.m2, self.updated_at]
+
+    @classmethod
+    def from_list(
+        cls, values: Optional[List[float]], half_life: Optional[float]
+    ) -> "DecayedMoments":
+        moments = cls(half_life)
+        if values:
+            moments.weight, moments.mean, moments.m2, moments.updated_at = values
+        return moments
+
+
+class DecayedTrend:
+    """Decayed least-squares slope of ``y`` against ``x`` (co-moment form)"""
+
+    __slots__ = (
+        "half_life",
+        "weight",
+        "mean_x",
+        "mean_y",
+        "cxx",
+        "cxy",
+        "updated_at",
+    )
+
+    def __init__(self, half_life: Optional[float] = None) -> None:
+        self.half_life = half_life
+        self.weight = 0.0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.cxx = 0.0
+        self.cxy = 0.0
+        self.updated_at = 0.0
+
+    def _decay(self, at: float) -> None:
+        if self.weight:
+            factor = _decay_factor(self.half_life, self.updated_at, at)
+            self.weight *= factor
+            self.cxx *= factor
+            self.cxy *= factor
+        self.updated_at = max(self.updated_at, at)
+
+    def update(self, x: float, y: float, at: float) -> None:
+        self._decay(at)
+        self.weight += 1.0
+        dx = x - self.mean_x
+        self.mean_x += dx / self.weight
+        self.mean_y += (y - self.mean_y) / self.weight
+        self.cxx += dx * (x - self.mean_x)
+        self.cxy += dx * (y - self.mean_y)
+
+    def combine(self, other: "DecayedTrend", x_offset: float = 0.0) -> None:
+        """Fold in a trend fitted elsewhere, its ``x`` shifted by ``x_offset``"""
+        if not other.weight:
+            return
+        at = max(self.updated_at, other.updated_at)
+        self._decay(at)
+        factor = _decay_factor(other.half_life, other.updated_at, at)
+        weight = other.weight * factor
+        total = self.weight + weight
+        dx = other.mean_x + x_offset - self.mean_x
+        dy = other.mean_y - self.mean_y
+        share = self.weight * weight / total
+        self.cxx += other.cxx * factor + dx * dx * share
+        self.cxy += other.cxy * factor + dx * dy * share
+        self.mean_x += dx * weight / total
+        self.mean_y += dy * weight / total
+        self.weight = total
+
+    @property
+    def slope(self) -> float:
+        return self.cxy / self.cxx if self.cxx > 1e-12 else 0.0
+
+    def to_list(self) -> List[float]:
+        return [
+            self.weight,
+            self.mean_x,
+            self.mean_y,
+            self.cxx,
+            self.cxy,
+            self.updated_at,
+        ]
+
+    @classmethod
+    def from_list(
+        cls, values: Optional[List[float]], half_life: Optional[float]
+    ) -> "DecayedTrend":
+        trend = cls(half_life)
+        if values:
+            (
+                trend.weight,
+                trend.mean_x,
+                trend.mean_y,
+                trend.cxx,
+                trend.cxy,
+                trend.updated_at,
+            ) = values
+        return trend
+
+
+class DecayedCounter:
+    """Event count whose contributions halve every ``half_life`` seconds"""
+
+    __slots__ = ("half_life", "value", "updated_at")
+
+    def __init__(self, half_life: float) -> None:
+        self.half_life = half_life
+        self.value = 0.0
+        self.updated_at = 0.0
+
+    def value_at(self, at: float) -> float:
+        if at <= self.updated_at:
+            return self.value
+        return self.value * 0.5 ** ((at - self.updated_at) / self.half_life)
+
+    def add(self, at: float, amount: float = 1.0) -> None:
+        self.value = self.value_at(at) + amount
+        self.updated_at = max(self.updated_at, at)
+
+    def combine(self, other: "DecayedCounter") -> None:
+        at = max(self.updated_at, other.updated_at)
+        self.value = self.value_at(at) + other.value_at(at)
+        self.updated_at = at
+
+    def rate_per_minute(self, at: float) -> float:
+        """Event rate; a steady rate r keeps the count at r * half_life / ln 2"""
+        return self.value_at(at) * math.log(2) / self.half_life * 60.0
+
+    def to_list(self) -> List[float]:
+        return [self.value, self.updated_at]
+
+    @classmethod
+    def from_list(
+        cls, values: Optional[List[float]], half_life: float
+    ) -> "DecayedCounter":
+        counter = cls(half_life)
+        if values:
+            counter.value, counter.updated_at = values
+        return counter
+
+
+class WindowExtremes:
+    """Min and max over a sliding time window (monotonic deques)"""
+
+    __slots__ = ("window", "minima", "maxima")
+
+    def __init__(self, window: float = WINDOW_SECONDS) -> None:
+        self.window = window
+        self.minima: Deque[Tuple[float, float]] = deque(maxlen=WINDOW_MAX_READINGS)
+        self.maxima: Deque[Tuple[float, float]] = deque(maxlen=WINDOW_MAX_READINGS)
+
+    def _expire(self, now: float) -> None:
+        for readings in (self.minima, self.maxima):
+            while readings and readings[0][0] <= now - self.window:
+                readings.popleft()
+
+    def add(self, value: float, at: float) -> None:
+        while self.minima and self.minima[-1][1] >= value:
+            self.minima.pop()
+        self.minima.append((at, value))
+        while self.maxima and self.maxima[-1][1] <= value:
+            self.maxima.pop()
+        self.maxima.append((at, value))
+        self._expire(at)
+
+    def extremes(self, now: float) -> Optional[Tuple[float, float]]:
+        self._expire(now)
+        if not self.minima:
+            return None
+        return self.minima[0][1], self.maxima[0][1]
+
+    def combine(self, other: "WindowExtremes") -> None:
+        """Merge another window; candidates dropped by either stay dominated"""
+        readings = sorted({*self.minima, *self.maxima, *other.minima, *other.maxima})
+        self.minima.clear()
+        self.maxima.clear()
+        for at, value in readings:
+            self.add(value, at)
+
+    def to_list(self) -> List[List[List[float]]]:
+        return [
+            [list(entry) for entry in self.minima],
+            [list(entry) for entry in self.maxima],
+        ]
+
+    @classmethod
+    def from_list(cls, values: Optional[List[Any]]) -> "WindowExtremes":
+        extremes = cls()
+        if values:
+            extremes.minima.extend(tuple(entry) for entry in values[0])
+            extremes.maxima.extend(tuple(entry) for entry in values[1])
+        return extremes
+
+
+class AssetFeatureState:
+    """Online aggregates for one asset"""
+
+    def __init__(self, asset_id: str) -> None:
+        recent = settings.ml_online_half_life_seconds
+        long_term = settings.ml_online_baseline_half_life_days * 86400.0
+        self.asset_id = asset_id
+        self.last_observed_at = 0.0
+        self.seeded = False
+
+        # Real-time
+        self.rssi = DecayedMoments(recent)
+        self.rssi_extremes = WindowExtremes()
+        self.battery = DecayedMoments(recent)
+        self.battery_trend = DecayedTrend(recent)
+        self.battery_readings = 0
+        self.temperature = DecayedMoments(recent)
+        self.observations = DecayedCounter(recent)
+        # Gateway -> [last seen, decayed RSSI moments]
+        self.gateways: Dict[str, List[Any]] = {}
+        # (confidence, speed, bearing, estimated at) of the latest location
+        self.location: Optional[List[float]] = None
+
+        # Baseline
+        self.long_term = long_term
+        self.baseline_temperature = DecayedMoments(long_term)
+        self.confidence = DecayedMoments(long_term)
+        self.distance = DecayedMoments(long_term)
+        self.speed = DecayedMoments(long_term)
+        self.drain_rate = DecayedMoments(long_term)
+        # (battery level, read at) the drain rate is measured from
+        self.last_battery: Optional[List[float]] = None
+
+    def observe(
+        self,
+        gateway_id: str,
+        rssi: float,
+        at: float,
+        battery_level: Optional[float] = None,
+        temperature: Optional[float] = None,
+    ) -> None:
+        self.last_observed_at = max(self.last_observed_at, at)
+        self.rssi.update(rssi, at)
+        self.rssi_extremes.add(rssi, at)
+        self.observations.add(at)
+
+        sketch = self.gateways.get(gateway_id)
+        if sketch is None:
+            sketch = self.gateways[gateway_id] = [at, DecayedMoments(self.long_term)]
+        sketch[0] = max(sketch[0], at)
+        sketch[1].update(rssi, at)
+
+        if battery_level is not None:
+            self.battery.update(battery_level, at)
+            self.battery_readings += 1
+            self.battery_trend.update(self.battery_readings, battery_level, at)
+            self._update_drain_rate(float(battery_level), at)
+
+        if temperature is not None:
+            self.temperature.update(temperature, at)
+            self.baseline_temperature.update(temperature, at)
+
+    def _update_drain_rate(self, level: float, at: float) -> None:
+        if self.last_battery is None or level > self.last_battery[0]:
+            # First reading, or the battery was charged
+            self.last_battery = [level, at]
+            return
+        elapsed = at - self.last_battery[1]
+        if elapsed < MIN_DRAIN_INTERVAL_SECONDS:
+            return
+        drop = (self.last_battery[0] - level) / 100.0
+        self.drain_rate.update(drop / (elapsed / 86400.0), at)
+        self.last_battery = [level, at]
+
+    def observe_location(
+        self,
+        confidence: float,
+        at: float,
+        speed: Optional[float] = None,
+        bearing: Optional[float] = None,
+        distance_from_previous: Optional[float] = None,
+    ) -> None:
+        if self.location is None or at >= self.location[3]:
+            self.location = [confidence, speed or 0.0, bearing or 0.0, at]
+        self.confidence.update(confidence, at)
+        if distance_from_previous is not None:
+            self.distance.update(distance_from_previous, at)
+            self.speed.update(speed or 0.0, at)
+
+    def seed(self, baseline: AssetBaseline) -> None:
+        """Fold a database baseline into the long-term aggregates"""
+        self.seeded = True
+        for gateway_id, mean in baseline.avg_rssi_per_gateway.items():
+            sketch = self.gateways.get(gateway_id)
+            if sketch is None:
+                sketch = self.gateways[gateway_id] = [
+                    baseline.last_updated.timestamp(),
+                    DecayedMoments(self.long_term),
+                ]
+            sketch[1].merge(mean, SEED_WEIGHT)
+        self.baseline_temperature.merge(baseline.avg_temperature, SEED_WEIGHT)
+        self.confidence.merge(baseline.typical_confidence, SEED_WEIGHT)
+        self.drain_rate.merge(baseline.normal_battery_drain_rate, SEED_WEIGHT)
+        movement = baseline.typical_movement_pattern or {}
+        if movement.get("location_count"):
+            weight = min(float(movement["location_count"]), SEED_WEIGHT)
+            self.distance.merge(movement.get("avg_distance", 0.0), weight)
+            self.speed.merge(movement.get("avg_speed", 0.0), weight)
+
+    def merge(self, other: "AssetFeatureState") -> None:
+        """Fold in aggregates of the same asset accumulated elsewhere
+
+        Battery readings of ``other`` are placed after this state's in the
+        trend; the latest location and battery reading win.
+        """
+        self.last_observed_at = max(self.last_observed_at, other.last_observed_at)
+        self.seeded = self.seeded or other.seeded
+        self.rssi.combine(other.rssi)
+        self.rssi_extremes.combine(other.rssi_extremes)
+        self.battery.combine(other.battery)
+        self.battery_trend.combine(other.battery_trend, self.battery_readings)
+        self.battery_readings += other.battery_readings
+        self.temperature.combine(other.temperature)
+        self.observations.combine(other.observations)
+        for gateway_id, (last_seen, moments) in other.gateways.items():
+            sketch = self.gateways.get(gateway_id)
+            if sketch is None:
+                sketch = self.gateways[gateway_id] = [
+                    last_seen,
+                    DecayedMoments(self.long_term),
+                ]
+            sketch[0] = max(sketch[0], last_seen)
+            sketch[1].combine(moments)
+        if other.location is not None and (
+            self.location is None or other.location[3] >= self.location[3]
+        ):
+            self.location = list(other.location)
+        for name in ("baseline_temperature", "confidence", "distance", "speed"):
+            getattr(self, name).combine(getattr(other, name))
+        self.drain_rate.combine(other.drain_rate)
+        if other.last_battery is not None and (
+            self.last_battery is None or other.last_battery[1] >= self.last_battery[1]
+        ):
+            self.last_battery = list(other.last_battery)
+
+    def prune(self, now: float) -> None:
+        for gateway_id, sketch in list(self.gateways.items()):
+            if sketch[0] < now - GATEWAY_RETENTION_SECONDS:
+                del self.gateways[gateway_id]
+
+    def features(self, now: Optional[float] = None) -> Optional[FeatureVector]:
+        """Real-time features; None without observations in the window"""
+        now = now or time.time()
+        if now - self.last_observed_at > WINDOW_SECONDS:
+            return None
+        features: Dict[str, float] = {}
+
+        # RSSI features
+        features["avg_rssi"] = self.rssi.mean
+        extremes = self.rssi_extremes.extremes(now)
+        if extremes is not None:
+            features["min_rssi"], features["max_rssi"] = extremes
+        features["rssi_std"] = self.rssi.std
+
+        # Battery features
+        if self.battery.weight:
+            features["avg_battery"] = self.battery.mean
+            # Readings are ordered newest first in the batch computation
+            features["battery_trend"] = -self.battery_trend.slope
+
+        # Temperature features
+        if self.temperature.weight:
+            features["avg_temperature"] = self.temperature.mean
+
+        # Gateway diversity
+        recent_gateways = [
+            gateway_id
+            for gateway_id, sketch in self.gateways.items()
+            if now - sketch[0] <= WINDOW_SECONDS
+        ]
+        features["gateway_count"] = len(recent_gateways)
+
+        # Location features
+        if self.location is not None:
+            confidence, speed, bearing, _ = self.location
+            features["current_confidence"] = confidence
+            features["current_speed"] = speed
+            features["current_bearing"] = bearing
+
+        # Temporal features
+        local_time = datetime.fromtimestamp(now)
+        features["hour_of_day"] = local_time.hour
+        features["day_of_week"] = local_time.weekday()
+        features["is_weekend"] = 1.0 if local_time.weekday() >= 5 else 0.0
+
+        # Movement features
+        features["observation_rate"] = self.observations.rate_per_minute(now)
+
+        return FeatureVector(
+            asset_id=self.asset_id,
+            timestamp=local_time,
+            features=features,
+            metadata={
+                "observation_count": round(self.observations.value_at(now)),
+                "has_location": self.location is not None,
+                "gateway_ids": recent_gateways,
+                "source": "online",
+            },
+        )
+
+    def baseline(self) -> Optional[AssetBaseline]:
+        if not self.gateways:
+            return None
+        return AssetBaseline(
+            asset_id=self.asset_id,
+            avg_rssi_per_gateway={
+                gateway_id: sketch[1].mean
+                for gateway_id, sketch in self.gateways.items()
+            },
+            typical_movement_pattern={
+                "avg_distance": self.distance.mean,
+                "avg_speed": self.speed.mean,
+                "location_count": round(self.distance.weight),
+            },
+            normal_battery_drain_rate=(
+                self.drain_rate.mean if self.drain_rate.weight else DEFAULT_DRAIN_RATE
+            ),
+            avg_temperature=(
+                self.baseline_temperature.mean
+                if self.baseline_temperature.weight
+                else DEFAULT_TEMPERATURE
+            ),
+            typical_confidence=(
+                self.confidence.mean if self.confidence.weight else DEFAULT_CONFIDENCE
+            ),
+            last_updated=datetime.fromtimestamp(
+                self.last_observed_at or time.time()
+            ),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "asset_id": self.asset_id,
+            "last_observed_at": self.last_observed_at,
+            "seeded": self.seeded,
+            "rssi": self.rssi.to_list(),
+            "rssi_extremes": self.rssi_extremes.to_list(),
+            "battery": self.battery.to_list(),
+            "battery_trend": self.battery_trend.to_list(),
+            "battery_readings": self.battery_readings,
+            "temperature": self.temperature.to_list(),
+            "observations": self.observations.to_list(),
+            "gateways": {
+                gateway_id: [sketch[0], sketch[1].to_list()]
+                for gateway_id, sketch in self.gateways.items()
+            },
+            "location": self.location,
+            "baseline_temperature": self.baseline_temperature.to_list(),
+            "confidence": self.confidence.to_list(),
+            "distance": self.distance.to_list(),
+            "speed": self.speed.to_list(),
+            "drain_rate": self.drain_rate.to_list(),
+            "last_battery": self.last_battery,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AssetFeatureState":
+        state = cls(data["asset_id"])
+        recent = state.rssi.half_life
+        long_term = state.long_term
+        state.last_observed_at = data.get("last_observed_at", 0.0)
+        state.seeded = data.get("seeded", False)
+        state.rssi = DecayedMoments.from_list(data.get("rssi"), recent)
+        state.rssi_extremes = WindowExtremes.from_list(data.get("rssi_extremes"))
+        state.battery = DecayedMoments.from_list(data.get("battery"), recent)
+        state.battery_trend = DecayedTrend.from_list(data.get("battery_trend"), recent)
+        state.battery_readings = data.get("battery_readings", 0)
+        state.temperature = DecayedMoments.from_list(data.get("temperature"), recent)
+        state.observations = DecayedCounter.from_list(data.get("observations"), recent)
+        state.gateways = {
+            gateway_id: [last_seen, DecayedMoments.from_list(moments, long_term)]
+            for gateway_id, (last_seen, moments) in data.get("gateways", {}).items()
+        }
+        state.location = data.get("location")
+        for name in ("baseline_temperature", "confidence", "distance", "speed"):
+            setattr(state, name, DecayedMoments.from_list(data.get(name), long_term))
+        state.drain_rate = DecayedMoments.from_list(data.get("drain_rate"), long_term)
+        state.last_battery = data.get("last_battery")
+        return state
+
+
+class OnlineFeatureTracker:
+    """Per-asset online aggregates for this worker, checkpointed to Redis
+
+    ``states`` is this worker's view of each asset: the stored state as of
+    the last checkpoint plus everything observed here since. The part
+    observed here is also kept in ``deltas``, which is what a checkpoint
+    merges into the stored state.
+    """
+
+    def __init__(self, seed_baselines: SeedBaselines) -> None:
+        self.seed_baselines = seed_baselines
+        # Least recently observed first
+        self.states: "OrderedDict[str, AssetFeatureState]" = OrderedDict()
+        self.deltas: Dict[str, AssetFeatureState] = {}
+        # Database baselines not checkpointed yet (None: nothing in the database)
+        self.seeds: Dict[str, Optional[AssetBaseline]] = {}
+        self.dirty: Set[str] = set()
+        self.unseeded: Set[str] = set()
+        self.checkpoint_task: Optional[asyncio.Task] = None
+        self.stats = {
+            "observations": 0,
+            "locations": 0,
+            "restored": 0,
+            "cold_starts": 0,
+            "seeded": 0,
+            "checkpoints": 0,
+            "checkpointed_states": 0,
+            "checkpoint_conflicts": 0,
+            "evicted": 0,
+        }
+
+    def has(self, asset_id: str) -> bool:
+        return asset_id in self.states
+
+    async def _state(self, asset_id: str) -> AssetFeatureState:
+        """The asset's state, restored from its checkpoint on first use"""
+        state = self.states.get(asset_id)
+        if state is not None:
+            self.states.move_to_end(asset_id)
+            return state
+        # Registered before the checkpoint is read, so concurrent first
+        # observations share it; dirty keeps it from being evicted meanwhile
+        state = self.states[asset_id] = AssetFeatureState(asset_id)
+        self.dirty.add(asset_id)
+        cache = await get_cache()
+        checkpoint = await cache.get_with_strategy(
+            "asset_online_state", asset_id=asset_id
+        )
+        if self.states.get(asset_id) is not state:
+            # A checkpoint merged it with the stored state in the meantime
+            return self.states.get(asset_id, state)
+        if checkpoint:
+            restored = AssetFeatureState.from_dict(checkpoint)
+            restored.merge(state)
+            state = self.states[asset_id] = restored
+            self.stats["restored"] += 1
+        else:
+            self.stats["cold_starts"] += 1
+        if not state.seeded:
+            self.unseeded.add(asset_id)
+        return state
+
+    def _delta(self, asset_id: str, state: AssetFeatureState) -> AssetFeatureState:
+        """This worker's changes to an asset since its last checkpoint"""
+        delta = self.deltas.get(asset_id)
+        if delta is None:
+            delta = self.deltas[asset_id] = AssetFeatureState(asset_id)
+            # The drain rate continues from the last known reading
+            delta.last_battery = state.last_battery
+        return delta
+
+    async def observe(self, asset_id: str, observation: Dict[str, Any]) -> None:
+        """Update an asset's aggregates with one gateway observation"""
+        state = await self._state(asset_id)
+        battery_level = observation.get("battery_level")
+        temperature = observation.get("temperature")
+        gateway_id = str(observation["gateway_id"])
+        rssi = float(observation["rssi"])
+        at = _timestamp(observation.get("timestamp"))
+        for aggregates in (state, self._delta(asset_id, state)):
+            aggregates.observe(
+                gateway_id,
+                rssi,
+                at,
+                battery_level=None if battery_level is None else float(battery_level),
+                temperature=None if temperature is None else float(temperature),
+            )
+        self.dirty.add(asset_id)
+        self.stats["observations"] += 1
+
+    async def observe_location(self, asset_id: str, location: Any) -> None:
+        """Update an asset's aggregates with one estimated location"""
+        state = await self._state(asset_id)
+        at = _timestamp(location.timestamp)
+        for aggregates in (state, self._delta(asset_id, state)):
+            aggregates.observe_location(
+                float(location.confidence),
+                at,
+                speed=_optional_float(location.speed),
+                bearing=_optional_float(location.bearing),
+                distance_from_previous=_optional_float(location.distance_from_previous),
+            )
+        self.dirty.add(asset_id)
+        self.stats["locations"] += 1
+
+    def features(self, asset_id: str) -> Optional[FeatureVector]:
+        state = self.states.get(asset_id)
+        return state.features() if state else None
+
+    def baseline(self, asset_id: str) -> Optional[AssetBaseline]:
+        state = self.states.get(asset_id)
+        return state.baseline() if state else None
+
+    async def seed(self) -> None:
+        """Fold database baselines into newly created states, in bulk"""
+        asset_ids = [asset_id for asset_id in self.unseeded if asset_id in self.states]
+        self.unseeded.clear()
+        if not asset_ids:
+            return
+        baselines = await self.seed_baselines(asset_ids)
+        for asset_id in asset_ids:
+            state = self.states.get(asset_id)
+            if state is None:
+                continue
+            baseline = baselines.get(asset_id)
+            if baseline is not None:
+                state.seed(baseline)
+                self.stats["seeded"] += 1
+            else:
+                # Nothing in the database yet; the stream is the baseline
+                state.seeded = True
+            self.seeds[asset_id] = baseline
+            self.dirty.add(asset_id)
+
+    async def checkpoint(self) -> None:
+        """Merge changed states into their checkpoints, then write features"""
+        await self.seed()
+        dirty, self.dirty = self.dirty, set()
+        asset_ids = [asset_id for asset_id in dirty if self.has(asset_id)]
+        if asset_ids:
+            # Taken before any await; later observations start new deltas
+            deltas = {
+                asset_id: self.deltas.pop(asset_id, None) for asset_id in asset_ids
+            }
+            seeds = {
+                asset_id: self.seeds.pop(asset_id)
+                for asset_id in asset_ids
+                if asset_id in self.seeds
+            }
+            views = {
+                asset_id: self.states[asset_id].to_dict() for asset_id in asset_ids
+            }
+            try:
+                cache = await get_cache()
+                if cache.enabled:
+                    merged, pending = await self._merge_checkpoints(
+                        cache, deltas, seeds, views
+                    )
+                else:
+                    # Nothing shared to merge with; the views are the state
+                    merged, pending = {}, []
+            except BaseException:
+                self._requeue(asset_ids, deltas, seeds)
+                raise
+            if pending:
+                logger.warning(
+                    f"{len(pending)} online feature states still contended, "
+                    "retrying at the next checkpoint"
+                )
+                self._requeue(pending, deltas, seeds)
+
+            features = {}
+            baselines = {}
+            now = time.time()
+            for asset_id, state in merged.items():
+                # Observations that arrived while merging stay on top
+                delta = self.deltas.get(asset_id)
+                if delta is not None:
+                    state.merge(delta)
+                if asset_id in self.states:
+                    self.states[asset_id] = state
+                vector = state.features(now)
+                if vector is not None:
+                    features[asset_id] = vector.to_dict()
+                baseline = state.baseline()
+                if baseline is not None:
+                    baselines[asset_id] = baseline.to_dict()
+            await cache.set_many_with_strategy("asset_features", features)
+            await cache.set_many_with_strategy("asset_baseline", baselines)
+            self.stats["checkpoints"] += 1
+            self.stats["checkpointed_states"] += len(merged)
+        self._evict()
+
+    async def _merge_checkpoints(
+        self,
+        cache: Any,
+        deltas: Dict[str, Optional[AssetFeatureState]],
+        seeds: Dict[str, Optional[AssetBaseline]],
+        views: Dict[str, Dict[str, Any]],
+    ) -> Tuple[Dict[str, AssetFeatureState], List[str]]:
+        """Merge deltas into the stored states with compare-and-set
+
+        Returns the states written and the assets still contended. An asset
+        without a stored state is written as this worker's view of it.
+        """
+        merged: Dict[str, AssetFeatureState] = {}
+        pending = list(deltas)
+        for _ in range(CHECKPOINT_ATTEMPTS):
+            now = time.time()
+            stored = await cache.get_many_with_strategy("asset_online_state", pending)
+            candidates: Dict[str, Tuple[int, AssetFeatureState]] = {}
+            for asset_id in pending:
+                data = stored.get(asset_id)
+                if data is None:
+                    candidates[asset_id] = (
+                        0,
+                        AssetFeatureState.from_dict(views[asset_id]),
+                    )
+                    continue
+                state = AssetFeatureState.from_dict(data)
+                if asset_id in seeds and not state.seeded:
+                    baseline = seeds[asset_id]
+                    if baseline is not None:
+                        state.seed(baseline)
+                    state.seeded = True
+                delta = deltas[asset_id]
+                if delta is not None:
+                    state.merge(delta)
+                candidates[asset_id] = (data.get("version", 0), state)
+
+            for _, state in candidates.values():
+                state.prune(now)
+            conflicts = await cache.compare_and_set_many_with_strategy(
+                "asset_online_state",
+                {
+                    asset_id: (version, {**state.to_dict(), "version": version + 1})
+                    for asset_id, (version, state) in candidates.items()
+                },
+            )
+            if conflicts is None:
+                break
+            for asset_id, (_, state) in candidates.items():
+                if asset_id not in conflicts:
+                    merged[asset_id] = state
+            self.stats["checkpoint_conflicts"] += len(conflicts)
+            pending = [asset_id for asset_id in pending if asset_id in conflicts]
+            if not pending:
+                break
+        return merged, pending
+
+    def _requeue(
+        self,
+        asset_ids: List[str],
+        deltas: Dict[str, Optional[AssetFeatureState]],
+        seeds: Dict[str, Optional[AssetBaseline]],
+    ) -> None:
+        """Put back changes a checkpoint could not write"""
+        for asset_id in asset_ids:
+            delta = deltas.get(asset_id)
+            if delta is not None:
+                newer = self.deltas.get(asset_id)
+                if newer is not None:
+                    delta.merge(newer)
+                self.deltas[asset_id] = delta
+            if asset_id in seeds:
+                self.seeds.setdefault(asset_id, seeds[asset_id])
+            self.dirty.add(asset_id)
+
+    def _evict(self) -> None:
+        """Drop the least recently observed clean states over the limit"""
+        excess = len(self.states) - settings.ml_online_max_assets
+        for asset_id in list(self.states)[: max(excess, 0)]:
+            if asset_id not in self.dirty:
+                del self.states[asset_id]
+                self.unseeded.discard(asset_id)
+                self.stats["evicted"] += 1
+
+    async def _checkpoint_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ml_online_checkpoint_seconds)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                logger.error(f"Error checkpointing online features: {e}")
+
+    def start(self) -> None:
+        if self.checkpoint_task is None or self.checkpoint_task.done():
+            self.checkpoint_task = asyncio.create_task(self._checkpoint_loop())
+            logger.info("Online feature checkpoints started")
+
+    async def stop(self) -> None:
+        task, self.checkpoint_task = self.checkpoint_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        try:
+            await self.checkpoint()
+        except Exception as e:
+            logger.error(f"Error writing final online feature checkpoint: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "assets": len(self.states),
+            "dirty": len(self.dirty),
+            "unseeded": len(self.unseeded),
+            "checkpointing": self.checkpoint_task is not None,
+        }
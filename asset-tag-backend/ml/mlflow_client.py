@@ -259,12 +259,16 @@ class MLflowClient:
             return None
 
 
-# Global MLflow client instance
-mlflow_client = MLflowClient()
+# Global MLflow client instance, created on first use: constructing it
+# contacts the tracking server
+mlflow_client: Optional[MLflowClient] = None
 
 
 def get_mlflow_client() -> MLflowClient:
     """Get MLflow client instance"""
+    global mlflow_client
+    if mlflow_client is None:
+        mlflow_client = MLflowClient()
     return mlflow_client
 
 
@@ -278,7 +282,7 @@ class MLflowRun:
         self.run = None
 
     def __enter__(self) -> None:
-        self.run = mlflow_client.start_run(self.experiment_name, self.run_name)
+        self.run = get_mlflow_client().start_run(self.experiment_name, self.run_name)
         return self.run
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
@@ -292,9 +296,9 @@ def log_anomaly_detection_model(
 ):
     """Log anomaly detection model to MLflow"""
     with MLflowRun("anomaly_detection") as run:
-        mlflow_client.log_params(params)
-        mlflow_client.log_metrics(metrics)
-        mlflow_client.log_model(model, "anomaly_detector", "sklearn")
+        get_mlflow_client().log_params(params)
+        get_mlflow_client().log_metrics(metrics)
+        get_mlflow_client().log_model(model, "anomaly_detector", "sklearn")
         return run.info.run_id
 
 
@@ -303,15 +307,16 @@ def log_location_prediction_model(
 ):
     """Log location prediction model to MLflow"""
     with MLflowRun("location_prediction") as run:
-        mlflow_client.log_params(params)
-        mlflow_client.log_metrics(metrics)
-        mlflow_client.log_model(model, "location_predictor", "sklearn")
+        get_mlflow_client().log_params(params)
+        get_mlflow_client().log_metrics(metrics)
+        get_mlflow_client().log_model(model, "location_predictor", "sklearn")
         return run.info.run_id
 
 
 def load_production_model(model_name: str, model_type: str = "sklearn") -> None:
     """Load production model from MLflow"""
-    model_uri = mlflow_client.get_latest_model("anomaly_detection", model_name)
+    client = get_mlflow_client()
+    model_uri = client.get_latest_model("anomaly_detection", model_name)
     if model_uri:
-        return mlflow_client.load_model(model_uri, model_type)
+        return client.load_model(model_uri, model_type)
     return None
@@ -153,6 +153,7 @@ async def get_model_status(model_loader: ModelLoader = Depends(get_model_loader)
             "loaded_models": loaded_models,
             "model_count": len(loaded_models),
             "model_info": model_info,
+            "loader_stats": model_loader.get_stats(),
             "timestamp": datetime.now().isoformat(),
         }
 
@@ -0,0 +1,157 @@
+"""
+Versioned on-disk cache of model artifacts shared by worker processes
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FILE = "model.joblib"
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+
+def model_version(model_uri: str) -> str:
+    """Version key for a model URI (the run id for ``runs:/`` URIs)"""
+    if model_uri.startswith("runs:/"):
+        return model_uri[len("runs:/") :].split("/", 1)[0]
+    return hashlib.sha256(model_uri.encode()).hexdigest()[:16]
+
+
+class ModelArtifactCache:
+    """Model artifacts on local disk, one directory per model version
+
+    Layout is ``{root}/{model_name}/{version}/model.joblib`` plus ``meta.json``.
+    Both are written to a temporary name and renamed into place, and the
+    metadata goes last, so a version only counts as present once it is
+    complete. A per-model file lock lets one process on the host download a
+    version while the others wait and then read it from disk; readers hold
+    it shared while loading, so a concurrent prune cannot remove the files
+    under them.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        mmap_mode: Optional[str] = None,
+        keep_versions: Optional[int] = None,
+    ) -> None:
+        self.root = Path(root or settings.ml_model_cache_dir)
+        # An empty mode loads arrays into memory instead of mapping them
+        self.mmap_mode = (
+            mmap_mode if mmap_mode is not None else settings.ml_model_mmap_mode
+        ) or None
+        self.keep_versions = max(
+            1, keep_versions or settings.ml_model_cache_keep_versions
+        )
+
+    def _model_dir(self, model_name: str) -> Path:
+        return self.root / model_name
+
+    def _version_dir(self, model_name: str, version: str) -> Path:
+        return self._model_dir(model_name) / version
+
+    def has(self, model_name: str, version: str) -> bool:
+        """Whether a complete artifact for this version is on disk"""
+        return (self._version_dir(model_name, version) / META_FILE).exists()
+
+    def versions(self, model_name: str) -> List[str]:
+        """Stored versions of a model, newest first"""
+        model_dir = self._model_dir(model_name)
+        if not model_dir.exists():
+            return []
+        stored = []
+        for meta_path in model_dir.glob(f"*/{META_FILE}"):
+            try:
+                stored.append((meta_path.stat().st_mtime, meta_path.parent.name))
+            except FileNotFoundError:
+                # Pruned by another process while we were scanning
+                continue
+        stored.sort(key=lambda entry: entry[0], reverse=True)
+        return [version for _, version in stored]
+
+    def latest(self, model_name: str) -> Optional[str]:
+        """Most recently stored version of a model, if any"""
+        versions = self.versions(model_name)
+        return versions[0] if versions else None
+
+    @contextmanager
+    def lock(self, model_name: str, shared: bool = False) -> Iterator[None]:
+        """Hold the per-model file lock (blocking; call from a worker thread)
+
+        Shared holders only read; store and prune need it exclusively.
+        """
+        model_dir = self._model_dir(model_name)
+        model_dir.mkdir(parents=True, exist_ok=True)
+        with open(model_dir / LOCK_FILE, "a+") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def store(
+        self,
+        model_name: str,
+        version: str,
+        model: Any,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Write a model version to disk and drop versions beyond the limit"""
+        import joblib
+
+        version_dir = self._version_dir(model_name, version)
+        version_dir.mkdir(parents=True, exist_ok=True)
+        suffix = f".{os.getpid()}.tmp"
+
+        # Uncompressed, so large numpy arrays can be memory-mapped on load
+        artifact = version_dir / ARTIFACT_FILE
+        tmp_artifact = artifact.with_name(ARTIFACT_FILE + suffix)
+        joblib.dump(model, tmp_artifact)
+        os.replace(tmp_artifact, artifact)
+
+        meta = {
+            **(metadata or {}),
+            "version": version,
+            "size_bytes": artifact.stat().st_size,
+            "stored_at": time.time(),
+        }
+        meta_path = version_dir / META_FILE
+        tmp_meta = meta_path.with_name(META_FILE + suffix)
+        tmp_meta.write_text(json.dumps(meta, default=str), encoding="utf-8")
+        os.replace(tmp_meta, meta_path)
+
+        self.prune(model_name)
+        return meta
+
+    def load(self, model_name: str, version: str) -> Tuple[Any, Dict[str, Any]]:
+        """Load a stored version, memory-mapping its arrays"""
+        import joblib
+
+        version_dir = self._version_dir(model_name, version)
+        meta = json.loads((version_dir / META_FILE).read_text(encoding="utf-8"))
+        model = joblib.load(version_dir / ARTIFACT_FILE, mmap_mode=self.mmap_mode)
+        return model, meta
+
+    def prune(self, model_name: str) -> List[str]:
+        """Remove all but the newest versions of a model
+
+        Processes that still map a removed file keep their view of it until
+        they swap to a newer version.
+        """
+        removed = self.versions(model_name)[self.keep_versions :]
+        for version in removed:
+            shutil.rmtree(self._version_dir(model_name, version), ignore_errors=True)
+            logger.info(f"Pruned cached model {model_name} version {version}")
+        return removed
@@ -4,86 +4,192 @@ Model loader for ML model serving
 
 import asyncio
 import logging
-import threading
 import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from config.cache import get_cache
-from ml.mlflow_client import MLflowClient, get_mlflow_client
+import numpy as np
+
+from ml.serving.model_cache import ModelArtifactCache, model_version
 
 logger = logging.getLogger(__name__)
 
 
-class ModelLoader:
-    """Loads and manages ML models for serving"""
+def validate_model(model: Any) -> None:
+    """Reject artifacts that cannot serve predictions
+
+    Models that know their input width are probed with one all-zero row.
+    """
+    predict = getattr(model, "predict_proba", None) or getattr(model, "predict", None)
+    if not callable(predict):
+        raise ValueError(f"{type(model).__name__} has no predict method")
 
-    def __init__(self) -> None:
-        self.mlflow_client = get_mlflow_client()
-        self.cache = None
+    n_features = getattr(model, "n_features_in_", None)
+    if n_features:
+        output = np.asarray(predict(np.zeros((1, int(n_features)))), dtype=float)
+        if output.size == 0 or not np.all(np.isfinite(output)):
+            raise ValueError(f"{type(model).__name__} returned an invalid prediction")
+
+
+class ModelLoader:
+    """Loads and manages ML models for serving
+
+    Artifacts come from the on-disk cache, which is filled from MLflow once
+    per version and host. Predictions read ``self.models`` without locking;
+    a new version is downloaded, validated and loaded off the event loop and
+    then swapped in with a single assignment, so in-flight predictions finish
+    on the model object they already hold.
+    """
+
+    def __init__(self, artifacts: Optional[ModelArtifactCache] = None) -> None:
+        self._mlflow_client = None
+        self.artifacts = artifacts or ModelArtifactCache()
         self.models = {}
         self.model_metadata = {}
-        self.load_lock = asyncio.Lock()
         self.last_refresh = {}
         self.refresh_interval = timedelta(hours=1)  # Refresh models every hour
-
-    async def _get_cache(self) -> None:
-        """Get cache manager"""
-        if not self.cache:
-            self.cache = await get_cache()
-        return self.cache
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.stats = {
+            "loads": 0,
+            "downloads": 0,
+            "disk_hits": 0,
+            "swaps": 0,
+            "unchanged": 0,
+            "failures": 0,
+        }
+
+    @property
+    def mlflow_client(self) -> Any:
+        """MLflow client, imported on first use (mlflow is slow to import)"""
+        if self._mlflow_client is None:
+            from ml.mlflow_client import get_mlflow_client
+
+            self._mlflow_client = get_mlflow_client()
+        return self._mlflow_client
+
+    def _lock(self, model_name: str) -> asyncio.Lock:
+        """Per-model lock, so a slow download does not hold up other models"""
+        return self._locks.setdefault(model_name, asyncio.Lock())
 
     async def load_model(
         self, model_name: str, model_type: str = "sklearn"
     ) -> Optional[Any]:
-        """Load model from MLflow or cache"""
+        """Load the latest model version, keeping the current one on failure"""
         try:
-            async with self.load_lock:
-                # Check if model is already loaded and fresh
-                if self._is_model_fresh(model_name):
-                    logger.debug(f"Using cached model: {model_name}")
-                    return self.models.get(model_name)
-
-                # Try to load from cache first
-                cache = await self._get_cache()
-                cached_model = await cache.get_with_strategy(
-                    "ml_predictions", asset_id=model_name
-                )
-
-                if cached_model and self._is_model_fresh(model_name):
-                    self.models[model_name] = cached_model
-                    return cached_model
-
-                # Load from MLflow
-                model_uri = self.mlflow_client.get_latest_model(
-                    "anomaly_detection", model_name
-                )
-                if not model_uri:
-                    logger.warning(f"No model found for {model_name}")
-                    return None
-
-                model = self.mlflow_client.load_model(model_uri, model_type)
-
-                # Store in memory and cache
-                self.models[model_name] = model
-                self.model_metadata[model_name] = {
-                    "loaded_at": datetime.now(),
-                    "model_uri": model_uri,
-                    "model_type": model_type,
-                }
-                self.last_refresh[model_name] = datetime.now()
-
-                # Cache the model (with longer TTL for models)
-                await cache.set_with_strategy(
-                    "ml_predictions", model, asset_id=model_name
-                )
+            async with self._lock(model_name):
+                # Another caller may have loaded it while we waited
+                if model_name in self.models and self._is_model_fresh(model_name):
+                    return self.models[model_name]
 
-                logger.info(f"Loaded model: {model_name} from {model_uri}")
-                return model
+                return await self._load_latest(model_name, model_type)
 
         except Exception as e:
+            self.stats["failures"] += 1
             logger.error(f"Error loading model {model_name}: {e}")
-            return None
+            return self.models.get(model_name)
+
+    async def _load_latest(self, model_name: str, model_type: str) -> Optional[Any]:
+        """Resolve the latest version and install it if it is new
+
+        The caller holds the model's lock.
+        """
+        model_uri = await asyncio.to_thread(self._resolve_latest, model_name)
+        if model_uri:
+            version = model_version(model_uri)
+        else:
+            # MLflow unreachable or empty: serve the newest version on disk
+            version = await asyncio.to_thread(self.artifacts.latest, model_name)
+            if version is None:
+                logger.warning(f"No model found for {model_name}")
+                return None
+            logger.warning(f"Using cached {model_name} version {version}")
+
+        current = self.model_metadata.get(model_name)
+        if current and current.get("version") == version:
+            self.stats["unchanged"] += 1
+            self.last_refresh[model_name] = datetime.now()
+            return self.models[model_name]
+
+        model, metadata = await asyncio.to_thread(
+            self._fetch, model_name, model_type, model_uri, version
+        )
+        self.stats["downloads" if metadata["source"] == "mlflow" else "disk_hits"] += 1
+        self._install(model_name, model, metadata)
+        return model
+
+    def _resolve_latest(self, model_name: str) -> Optional[str]:
+        return self.mlflow_client.get_latest_model("anomaly_detection", model_name)
+
+    def _fetch(
+        self,
+        model_name: str,
+        model_type: str,
+        model_uri: Optional[str],
+        version: str,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """Load a version from disk, downloading it first if no worker has
+
+        The artifact is loaded while the lock is held, so another process
+        storing a newer version cannot prune it mid-load. Blocking; runs in
+        a worker thread.
+        """
+        started = time.perf_counter()
+        source = "disk"
+        loaded = None
+        with self.artifacts.lock(model_name, shared=True):
+            if self.artifacts.has(model_name, version):
+                loaded = self.artifacts.load(model_name, version)
+
+        if loaded is None:
+            with self.artifacts.lock(model_name):
+                # Another process may have stored it while we waited
+                if not self.artifacts.has(model_name, version):
+                    downloaded = self.mlflow_client.load_model(model_uri, model_type)
+                    validate_model(downloaded)
+                    self.artifacts.store(
+                        model_name,
+                        version,
+                        downloaded,
+                        {
+                            "model_uri": model_uri,
+                            "model_type": model_type,
+                            "download_seconds": time.perf_counter() - started,
+                        },
+                    )
+                    source = "mlflow"
+                loaded = self.artifacts.load(model_name, version)
+
+        model, metadata = loaded
+        validate_model(model)
+        metadata.update(
+            {
+                "source": source,
+                "load_seconds": time.perf_counter() - started,
+                "loaded_at": datetime.now(),
+            }
+        )
+        return model, metadata
+
+    def _install(self, model_name: str, model: Any, metadata: Dict[str, Any]) -> None:
+        """Swap in a loaded model; holders of the previous object keep it"""
+        previous = self.model_metadata.get(model_name)
+        self.models[model_name] = model
+        self.model_metadata[model_name] = metadata
+        self.last_refresh[model_name] = datetime.now()
+        self.stats["loads"] += 1
+
+        if previous:
+            self.stats["swaps"] += 1
+            logger.info(
+                f"Swapped model {model_name}: {previous.get('version')} -> "
+                f"{metadata['version']}"
+            )
+        logger.info(
+            f"Loaded model {model_name} version {metadata['version']} from "
+            f"{metadata['source']} in {metadata['load_seconds']:.2f}s "
+            f"({metadata['size_bytes']} bytes)"
+        )
 
     def _is_model_fresh(self, model_name: str) -> bool:
         """Check if model is fresh (loaded recently)"""
@@ -95,29 +201,42 @@ class ModelLoader:
     async def get_model(
         self, model_name: str, model_type: str = "sklearn"
     ) -> Optional[Any]:
-        """Get model, loading if necessary"""
-        if model_name in self.models and self._is_model_fresh(model_name):
-            return self.models[model_name]
-
-        return await self.load_model(model_name, model_type)
+        """Get model, loading if necessary
+
+        A stale model is still returned while a newer one loads in the
+        background.
+        """
+        model = self.models.get(model_name)
+        if model is None:
+            return await self.load_model(model_name, model_type)
+
+        if not self._is_model_fresh(model_name):
+            self._refresh_in_background(model_name, model_type)
+        return model
+
+    def _refresh_in_background(self, model_name: str, model_type: str) -> None:
+        task = self._refreshing.get(model_name)
+        if task and not task.done():
+            return
 
-    async def refresh_model(self, model_name: str) -> bool:
-        """Force refresh a model"""
+        task = asyncio.create_task(self.refresh_model(model_name, model_type))
+        self._refreshing[model_name] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(model_name, None))
+
+    async def refresh_model(
+        self, model_name: str, model_type: Optional[str] = None
+    ) -> bool:
+        """Check for a newer version and swap it in"""
+        model_type = model_type or self.model_metadata.get(model_name, {}).get(
+            "model_type", "sklearn"
+        )
         try:
-            async with self.load_lock:
-                # Remove from cache
-                if model_name in self.models:
-                    del self.models[model_name]
-                if model_name in self.model_metadata:
-                    del self.model_metadata[model_name]
-                if model_name in self.last_refresh:
-                    del self.last_refresh[model_name]
-
-                # Load fresh model
-                model = await self.load_model(model_name)
+            async with self._lock(model_name):
+                model = await self._load_latest(model_name, model_type)
                 return model is not None
 
         except Exception as e:
+            self.stats["failures"] += 1
             logger.error(f"Error refreshing model {model_name}: {e}")
             return False
 
@@ -141,16 +260,30 @@ class ModelLoader:
         metadata["is_fresh"] = self._is_model_fresh(model_name)
         return metadata
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Load counters plus version, size and load time per model"""
+        return {
+            **self.stats,
+            "cache_dir": str(self.artifacts.root),
+            "mmap_mode": self.artifacts.mmap_mode,
+            "models": {
+                model_name: {
+                    "version": metadata.get("version"),
+                    "source": metadata.get("source"),
+                    "size_bytes": metadata.get("size_bytes"),
+                    "load_seconds": metadata.get("load_seconds"),
+                }
+                for model_name, metadata in self.model_metadata.items()
+            },
+        }
+
     async def unload_model(self, model_name: str) -> bool:
         """Unload a model from memory"""
         try:
-            async with self.load_lock:
-                if model_name in self.models:
-                    del self.models[model_name]
-                if model_name in self.model_metadata:
-                    del self.model_metadata[model_name]
-                if model_name in self.last_refresh:
-                    del self.last_refresh[model_name]
+            async with self._lock(model_name):
+                self.models.pop(model_name, None)
+                self.model_metadata.pop(model_name, None)
+                self.last_refresh.pop(model_name, None)
 
                 logger.info(f"Unloaded model: {model_name}")
                 return True
@@ -169,54 +302,51 @@ class ModelLoader:
 
 
 class ModelRefreshScheduler:
-    """Background scheduler for model refresh"""
+    """Periodic model refresh, run by the shared scheduler in every process"""
 
     def __init__(self, model_loader: ModelLoader) -> None:
         self.model_loader = model_loader
         self.running = False
-        self.refresh_task = None
 
     async def start(self, refresh_interval: int = 3600) -> None:  # 1 hour default
         """Start the refresh scheduler"""
+        from modules.scheduler.cron import IntervalSchedule
+        from modules.scheduler.scheduler import ScheduledJob, scheduler
+
         if self.running:
             return
 
         self.running = True
-        self.refresh_task = asyncio.create_task(self._refresh_loop(refresh_interval))
+        # Loaded models live in each process, so this job is not exclusive;
+        # jitter keeps workers from hitting MLflow at the same moment
+        scheduler.add_job(
+            ScheduledJob(
+                name="model_refresh",
+                func=self._refresh,
+                schedule=IntervalSchedule(refresh_interval),
+                exclusive=False,
+                jitter_seconds=min(refresh_interval / 10, 300),
+                missed_run_policy="skip",
+            )
+        )
         logger.info("Model refresh scheduler started")
 
     async def stop(self) -> None:
         """Stop the refresh scheduler"""
+        from modules.scheduler.scheduler import scheduler
+
         self.running = False
-        if self.refresh_task:
-            self.refresh_task.cancel()
-            try:
-                await self.refresh_task
-            except asyncio.CancelledError:
-                pass
+        scheduler.remove_job("model_refresh")
         logger.info("Model refresh scheduler stopped")
 
-    async def _refresh_loop(self, refresh_interval: int) -> None:
-        """Background refresh loop"""
-        while self.running:
-            try:
-                await asyncio.sleep(refresh_interval)
-
-                if self.running:
-                    logger.info("Starting scheduled model refresh")
-                    results = await self.model_loader.refresh_all_models()
-
-                    refreshed = sum(1 for success in results.values() if success)
-                    total = len(results)
-                    logger.info(
-                        f"Model refresh completed: {refreshed}/{total} models refreshed"
-                    )
+    async def _refresh(self) -> None:
+        """Refresh all loaded models"""
+        logger.info("Starting scheduled model refresh")
+        results = await self.model_loader.refresh_all_models()
 
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in model refresh loop: {e}")
-                await asyncio.sleep(60)  # Wait 1 minute before retrying
+        refreshed = sum(1 for success in results.values() if success)
+        total = len(results)
+        logger.info(f"Model refresh completed: {refreshed}/{total} models refreshed")
 
 
 # Global model loader instance
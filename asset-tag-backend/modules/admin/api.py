@@ -0,0 +1,316 @@
+"""
+Admin API endpoints for database lifecycle management
+"""
+
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from config.settings import settings
+from config.timescaledb_lifecycle import (TimescaleLifecycleManager,
+                                          get_timescale_lifecycle)
+from modules.admin.schemas import ChunkIntervalUpdate
+from modules.archive.cold_store import ARCHIVE_TABLES, cold_archive
+from modules.audit.writer import AuditWriter, get_audit_writer
+from modules.profiling.profiler import (PROCESSOR_MODULES, ProfilingService,
+                                        get_profiling_service,
+                                        sign_profile_token)
+from modules.reports.worker import ReportWorker, get_report_worker
+from modules.scheduler.scheduler import Scheduler, get_scheduler
+from modules.search.indexer import (INDEXED_ENTITIES, SearchIndexer,
+                                    get_search_indexer)
+from modules.shared.http_cache import get_http_cache_stats
+from modules.users.api import require_admin
+
+router = APIRouter()
+
+
+@router.get("/admin/timescaledb/status")
+async def get_timescaledb_status(
+    lifecycle: TimescaleLifecycleManager = Depends(get_timescale_lifecycle),
+):
+    """Get hypertables, chunk intervals and compression/retention jobs"""
+    try:
+        status = await lifecycle.get_status()
+        status["timestamp"] = datetime.now().isoformat()
+        return status
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error getting TimescaleDB status: {str(e)}"
+        )
+
+
+@router.post("/admin/timescaledb/apply")
+async def apply_timescaledb_lifecycle(
+    lifecycle: TimescaleLifecycleManager = Depends(get_timescale_lifecycle),
+):
+    """Apply hypertable, compression and retention policies from settings"""
+    try:
+        return await lifecycle.apply()
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error applying TimescaleDB lifecycle: {str(e)}"
+        )
+
+
+@router.get("/admin/timescaledb/hypertables/{table}/chunks")
+async def get_chunk_sizing(
+    table: str,
+    lifecycle: TimescaleLifecycleManager = Depends(get_timescale_lifecycle),
+):
+    """Inspect chunk sizes and get a recommended chunk interval"""
+    try:
+        return await lifecycle.get_chunk_sizing(table)
+
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error getting chunk sizing: {str(e)}"
+        )
+
+
+@router.put("/admin/timescaledb/hypertables/{table}/chunk-interval")
+async def update_chunk_interval(
+    table: str,
+    request: ChunkIntervalUpdate,
+    lifecycle: TimescaleLifecycleManager = Depends(get_timescale_lifecycle),
+):
+    """Change the chunk interval used for new chunks of a hypertable"""
+    try:
+        await lifecycle.update_chunk_interval(table, request.chunk_interval)
+        return {
+            "table": table,
+            "chunk_interval": request.chunk_interval,
+            "message": "Chunk interval updated; applies to newly created chunks",
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error updating chunk interval: {str(e)}"
+        )
+
+
+@router.get("/admin/archive/status")
+async def get_archive_status():
+    """Get the cold archive configuration and per-table watermarks"""
+    try:
+        from modules.archive.archiver import parquet_archiver
+
+        available = cold_archive.is_available()
+        tables = {}
+        for table, spec in ARCHIVE_TABLES.items():
+            watermark = await parquet_archiver.get_watermark(table) if available else None
+            tables[table] = {
+                "hot_window": spec.retention,
+                "last_archived_date": watermark.isoformat() if watermark else None,
+            }
+
+        return {
+            "available": available,
+            "tables": tables,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error getting archive status: {str(e)}"
+        )
+
+
+@router.post("/admin/archive/run")
+async def run_archive(tables: Optional[List[str]] = Query(None)):
+    """Export pending days of time-series tables to the Parquet archive"""
+    try:
+        from modules.archive.archiver import parquet_archiver
+
+        unknown = [table for table in tables or [] if table not in ARCHIVE_TABLES]
+        if unknown:
+            raise HTTPException(
+                status_code=404, detail=f"Tables not archivable: {', '.join(unknown)}"
+            )
+
+        return await parquet_archiver.run(tables)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running archive: {str(e)}")
+
+
+@router.get("/admin/audit-writer/stats")
+async def get_audit_writer_stats(writer: AuditWriter = Depends(get_audit_writer)):
+    """Get audit writer queue depth, batch, spill and overflow counters"""
+    return {**writer.get_stats(), "timestamp": datetime.now().isoformat()}
+
+
+@router.get("/admin/report-worker/stats")
+async def get_report_worker_stats(worker: ReportWorker = Depends(get_report_worker)):
+    """Get report worker capacity and completed/failed job counters"""
+    return {**worker.get_stats(), "timestamp": datetime.now().isoformat()}
+
+
+@router.get("/admin/search-indexer/stats")
+async def get_search_indexer_stats(
+    indexer: SearchIndexer = Depends(get_search_indexer),
+):
+    """Get captured, coalesced and shipped search index changes"""
+    return {**indexer.get_stats(), "timestamp": datetime.now().isoformat()}
+
+
+@router.post("/admin/search-indexer/reindex")
+async def reindex_search(
+    background_tasks: BackgroundTasks,
+    index_types: Optional[str] = Query(
+        None, description="Comma-separated index types (default: all)"
+    ),
+    indexer: SearchIndexer = Depends(get_search_indexer),
+):
+    """Rebuild search indices from the database and swap their aliases"""
+    types = [t.strip() for t in index_types.split(",")] if index_types else None
+    unknown = set(types or []) - set(INDEXED_ENTITIES)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown index types: {', '.join(sorted(unknown))}",
+        )
+    background_tasks.add_task(indexer.reindex, types)
+    return {"status": "started", "index_types": types or list(INDEXED_ENTITIES)}
+
+
+@router.get("/admin/http-cache/stats")
+async def get_http_cache_stats_endpoint():
+    """Get 304, cache hit and stored response counts of the HTTP cache"""
+    return {**get_http_cache_stats(), "timestamp": datetime.now().isoformat()}
+
+
+@router.get("/admin/scheduler/jobs")
+async def get_scheduler_jobs(scheduler: Scheduler = Depends(get_scheduler)):
+    """Get scheduled jobs with their next run and execution metrics"""
+    return {**scheduler.get_stats(), "timestamp": datetime.now().isoformat()}
+
+
+@router.post("/admin/scheduler/jobs/{name}/run")
+async def run_scheduler_job(name: str, scheduler: Scheduler = Depends(get_scheduler)):
+    """Run a scheduled job now (exclusive jobs still run once per cluster)"""
+    if not await scheduler.run_now(name):
+        raise HTTPException(status_code=404, detail=f"Unknown scheduled job: {name}")
+    return {"job": name, "message": "Job triggered"}
+
+
+def _require_profiling() -> None:
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+
+# Profiles expose stacks and internals: the whole surface is admin-only
+profiling_router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@profiling_router.get("/admin/profiling/stats")
+async def get_profiling_stats(
+    service: ProfilingService = Depends(get_profiling_service),
+):
+    """Get sampler state, armed requests and stored profile count"""
+    return {**service.get_stats(), "timestamp": datetime.now().isoformat()}
+
+
+@profiling_router.post("/admin/profiling/requests")
+async def arm_request_profiling(
+    count: int = Query(1, ge=0, le=100, description="Requests to profile"),
+    path_prefix: str = Query("", description="Only profile matching paths"),
+    service: ProfilingService = Depends(get_profiling_service),
+):
+    """Profile the next requests (0 disarms); their IDs are in X-Profile-Id"""
+    _require_profiling()
+    service.arm_requests(count, path_prefix)
+    return {"armed_requests": count, "path_prefix": path_prefix}
+
+
+@profiling_router.post("/admin/profiling/token")
+async def create_profiling_token(
+    ttl_seconds: int = Query(300, ge=1, le=86400),
+):
+    """Signed X-Profile-Token header value that profiles any request sent with it"""
+    _require_profiling()
+    expires_at = int(time.time()) + ttl_seconds
+    return {
+        "header": "X-Profile-Token",
+        "token": sign_profile_token(expires_at),
+        "expires_at": datetime.fromtimestamp(expires_at).isoformat(),
+    }
+
+
+@profiling_router.post("/admin/profiling/processors/{name}")
+async def profile_processor(
+    name: str,
+    seconds: float = Query(10.0, gt=0),
+    service: ProfilingService = Depends(get_profiling_service),
+):
+    """Profile a stream processor for some seconds; poll the profile for results"""
+    _require_profiling()
+    if name not in PROCESSOR_MODULES:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown processor: {name} "
+            f"(expected one of {', '.join(PROCESSOR_MODULES)})",
+        )
+    if seconds > settings.profiling_max_seconds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"seconds must be at most {settings.profiling_max_seconds}",
+        )
+    try:
+        profile = service.start_processor_profile(name, seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return profile.summary()
+
+
+@profiling_router.get("/admin/profiling/profiles")
+async def list_profiles(service: ProfilingService = Depends(get_profiling_service)):
+    """List stored profiles, newest first"""
+    return {"profiles": service.list_profiles()}
+
+
+@profiling_router.get("/admin/profiling/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    limit: int = Query(20, ge=1, le=200),
+    service: ProfilingService = Depends(get_profiling_service),
+):
+    """Get a profile's summary and its hottest functions"""
+    profile = service.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile: {profile_id}")
+    return {**profile.summary(), "top_functions": profile.top_functions(limit)}
+
+
+@profiling_router.get("/admin/profiling/profiles/{profile_id}/collapsed")
+async def download_profile(
+    profile_id: str, service: ProfilingService = Depends(get_profiling_service)
+):
+    """Download collapsed stacks for flamegraph.pl or speedscope"""
+    profile = service.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile: {profile_id}")
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="profile-{profile.id}.collapsed.txt"'
+            )
+        },
+    )
+
+
+router.include_router(profiling_router)
@@ -0,0 +1,13 @@
+"""
+Admin schemas
+"""
+
+from pydantic import BaseModel, Field
+
+
+class ChunkIntervalUpdate(BaseModel):
+    """Request to change a hypertable chunk interval"""
+
+    chunk_interval: str = Field(
+        ..., description="PostgreSQL interval, e.g. '2 hours' or '1 day'"
+    )
@@ -12,9 +12,12 @@ from fastapi import (APIRouter, Depends, HTTPException, Query, WebSocket,
 from sqlalchemy import select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from modules.alerts.models import Alert
 from modules.alerts.schemas import AlertCreate, AlertResponse, AlertUpdate
+from modules.alerts.statistics import alert_statistics
+from modules.search.indexer import record_change
+from modules.shared.serialization import RowSerializer
 
 
 def alert_to_response(alert: Alert) -> AlertResponse:
@@ -102,6 +105,11 @@ def alert_to_response(alert: Alert) -> AlertResponse:
     )
 
 
+# Fast path for list endpoints: result rows map straight to response dicts
+alert_serializer = RowSerializer(
+    AlertResponse, columns={"metadata": "alert_metadata"}
+)
+
 router = APIRouter()
 
 
@@ -141,7 +149,7 @@ async def get_alerts(
     status: Optional[str] = None,
     asset_id: Optional[str] = None,
     geofence_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of alerts with optional filtering"""
     try:
@@ -190,97 +198,29 @@ async def get_alerts(
         result = await db.execute(text(raw_query), params)
         rows = result.fetchall()
 
-        # Convert rows to Alert objects manually
-        alerts = []
-        for row in rows:
-            alert = Alert()
-            alert.id = row[0]
-            alert.organization_id = row[1]
-            alert.alert_type = row[2]
-            alert.severity = row[3]
-            alert.status = row[4]
-            alert.asset_id = row[5]
-            alert.asset_name = row[6]
-            alert.message = row[7]
-            alert.description = row[8]
-            alert.reason = row[9]
-            alert.suggested_action = row[10]
-            alert.location_description = row[11]
-            alert.latitude = row[12]
-            alert.longitude = row[13]
-            alert.geofence_id = row[14]
-            alert.geofence_name = row[15]
-            alert.triggered_at = row[16]
-            alert.auto_resolvable = row[17]
-            alert.alert_metadata = row[18]
-            alert.acknowledged_at = row[19]
-            alert.resolved_at = row[20]
-            alert.resolution_notes = row[21]
-            alert.resolved_by_user_id = row[22]
-            alert.auto_resolved = row[23]
-            alert.workflow_actions = row[24]
-            alert.created_at = row[25]
-            alert.updated_at = row[26]
-            alerts.append(alert)
-
-        return [alert_to_response(alert) for alert in alerts]
+        return alert_serializer.response(rows)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching alerts: {str(e)}")
 
 
+async def _get_alert_status(db: AsyncSession, alert_id: str) -> Optional[str]:
+    """Current status of an alert, used to move statistics counters"""
+    result = await db.execute(
+        text(
+            "SELECT status FROM alerts "
+            "WHERE id = :alert_id OR REPLACE(id, '-', '') = REPLACE(:alert_id, '-', '')"
+        ),
+        {"alert_id": alert_id},
+    )
+    return result.scalar()
+
+
 @router.get("/alerts/statistics")
-async def get_alert_stats(db: AsyncSession = Depends(get_db)):
+async def get_alert_stats(db: AsyncSession = Depends(get_read_db)):
     """Get alert statistics summary"""
     try:
-        # Use raw SQL to avoid UUID serialization issues with SQLite
-        # Get counts by status
-        active_query = "SELECT COUNT(*) FROM alerts WHERE status = 'active'"
-        active_result = await db.execute(text(active_query))
-        active_count = active_result.scalar()
-
-        acknowledged_query = "SELECT COUNT(*) FROM alerts WHERE status = 'acknowledged'"
-        acknowledged_result = await db.execute(text(acknowledged_query))
-        acknowledged_count = acknowledged_result.scalar()
-
-        resolved_query = "SELECT COUNT(*) FROM alerts WHERE status = 'resolved'"
-        resolved_result = await db.execute(text(resolved_query))
-        resolved_count = resolved_result.scalar()
-
-        # Get counts by severity
-        critical_query = "SELECT COUNT(*) FROM alerts WHERE severity = 'critical'"
-        critical_result = await db.execute(text(critical_query))
-        critical_count = critical_result.scalar()
-
-        warning_query = "SELECT COUNT(*) FROM alerts WHERE severity = 'warning'"
-        warning_result = await db.execute(text(warning_query))
-        warning_count = warning_result.scalar()
-
-        # Get counts by alert type
-        battery_low_query = (
-            "SELECT COUNT(*) FROM alerts WHERE alert_type = 'battery_low'"
-        )
-        battery_low_result = await db.execute(text(battery_low_query))
-        battery_low_count = battery_low_result.scalar()
-
-        total_alerts = active_count + acknowledged_count + resolved_count
-
-        return {
-            "total_alerts": total_alerts,
-            "active_alerts": active_count,
-            "acknowledged_alerts": acknowledged_count,
-            "resolved_alerts": resolved_count,
-            "alerts_by_type": {
-                "battery_low": battery_low_count,
-                "geofence_breach": 0,
-                "maintenance_due": 0,
-            },
-            "alerts_by_severity": {
-                "critical": critical_count,
-                "warning": warning_count,
-                "info": 0,
-            },
-        }
+        return await alert_statistics.get_stats(db)
 
     except Exception as e:
         raise HTTPException(
@@ -289,7 +229,7 @@ async def get_alert_stats(db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/alerts/{alert_id}", response_model=AlertResponse)
-async def get_alert(alert_id: str, db: AsyncSession = Depends(get_db)):
+async def get_alert(alert_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get alert by ID"""
     try:
         # Use raw SQL to avoid UUID serialization issues with SQLite
@@ -392,6 +332,9 @@ async def create_alert(alert_data: AlertCreate, db: AsyncSession = Depends(get_d
         await db.commit()
         # Skip refresh for now due to SQLite UUID compatibility issues
         # await db.refresh(alert)
+        await alert_statistics.record_created(
+            alert.alert_type, alert.severity, alert.status
+        )
 
         # Create response using helper function
         alert_response = alert_to_response(alert)
@@ -415,6 +358,8 @@ async def create_alert(alert_data: AlertCreate, db: AsyncSession = Depends(get_d
 async def acknowledge_alert(alert_id: str, db: AsyncSession = Depends(get_db)):
     """Acknowledge an alert"""
     try:
+        previous_status = await _get_alert_status(db, alert_id)
+
         # Use raw SQL to update the alert
         update_query = """
         UPDATE alerts 
@@ -433,7 +378,9 @@ async def acknowledge_alert(alert_id: str, db: AsyncSession = Depends(get_db)):
         if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Alert not found")
 
+        record_change(db, "alerts", str(uuid.UUID(alert_id)))
         await db.commit()
+        await alert_statistics.record_transition(previous_status, "acknowledged")
 
         # Fetch the updated alert using raw SQL
         fetch_query = """
@@ -508,6 +455,8 @@ async def resolve_alert(
 ):
     """Resolve an alert"""
     try:
+        previous_status = await _get_alert_status(db, alert_id)
+
         # Use raw SQL to update the alert
         update_query = """
         UPDATE alerts 
@@ -532,7 +481,9 @@ async def resolve_alert(
         if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Alert not found")
 
+        record_change(db, "alerts", str(uuid.UUID(alert_id)))
         await db.commit()
+        await alert_statistics.record_transition(previous_status, "resolved")
 
         # Fetch the updated alert using raw SQL
         fetch_query = """
@@ -0,0 +1,219 @@
+"""
+Alert statistics service
+
+Breakdowns by status, severity and alert type are computed in a single grouped
+query and mirrored into a Redis hash. Alert creation and status transitions
+adjust the hash with HINCRBY so dashboard reads are O(1); a scheduled job
+periodically overwrites the hash from the database to correct any drift.
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = "alert:stats"
+
+# Categories always present in responses, even when their count is zero
+DEFAULT_STATUSES = ("active", "acknowledged", "resolved")
+DEFAULT_SEVERITIES = ("critical", "warning", "info")
+DEFAULT_TYPES = ("battery_low", "geofence_breach", "maintenance_due")
+
+GROUPING_SETS_QUERY = """
+SELECT
+    GROUPING(status) AS g_status,
+    GROUPING(severity) AS g_severity,
+    status, severity, alert_type, COUNT(*) AS count
+FROM alerts
+GROUP BY GROUPING SETS ((status), (severity), (alert_type))
+"""
+
+# Databases without GROUPING SETS (SQLite in tests) fold one grouped scan
+GROUPED_QUERY = """
+SELECT status, severity, alert_type, COUNT(*) AS count
+FROM alerts
+GROUP BY status, severity, alert_type
+"""
+
+
+def build_stats_response(counts: Dict[str, int]) -> Dict[str, Any]:
+    """Shape flat ``dimension:value`` counters into the statistics response"""
+
+    def breakdown(prefix: str, defaults: tuple) -> Dict[str, int]:
+        result = {name: 0 for name in defaults}
+        for field, value in counts.items():
+            if field.startswith(f"{prefix}:"):
+                result[field.split(":", 1)[1]] = max(int(value), 0)
+        return result
+
+    by_status = breakdown("status", DEFAULT_STATUSES)
+    return {
+        "total_alerts": max(int(counts.get("total", 0)), 0),
+        "active_alerts": by_status["active"],
+        "acknowledged_alerts": by_status["acknowledged"],
+        "resolved_alerts": by_status["resolved"],
+        "alerts_by_status": by_status,
+        "alerts_by_type": breakdown("type", DEFAULT_TYPES),
+        "alerts_by_severity": breakdown("severity", DEFAULT_SEVERITIES),
+    }
+
+
+class AlertStatisticsService:
+    """Alert statistics backed by Redis counters with database reconciliation"""
+
+    def __init__(self) -> None:
+        self.running = False
+        self.last_reconciled_at: Optional[datetime] = None
+
+    @property
+    def client(self) -> Any:
+        from config.cache import cache
+
+        return cache.client if cache.enabled else None
+
+    async def compute_counts(self, db: AsyncSession) -> Counter:
+        """Compute all breakdowns from the database in one pass"""
+        counts: Counter = Counter()
+        if db.bind.dialect.name == "postgresql":
+            result = await db.execute(text(GROUPING_SETS_QUERY))
+            for row in result.fetchall():
+                if row.g_status == 0:
+                    counts[f"status:{row.status}"] += row.count
+                    counts["total"] += row.count
+                elif row.g_severity == 0:
+                    counts[f"severity:{row.severity}"] += row.count
+                else:
+                    counts[f"type:{row.alert_type}"] += row.count
+        else:
+            result = await db.execute(text(GROUPED_QUERY))
+            for row in result.fetchall():
+                counts[f"status:{row.status}"] += row.count
+                counts[f"severity:{row.severity}"] += row.count
+                counts[f"type:{row.alert_type}"] += row.count
+                counts["total"] += row.count
+        return counts
+
+    async def get_stats(self, db: AsyncSession) -> Dict[str, Any]:
+        """Read statistics from the counters, seeding them on a miss"""
+        client = self.client
+        if client is not None:
+            try:
+                counts = await client.hgetall(STATS_KEY)
+                if counts:
+                    return build_stats_response(counts)
+            except Exception as e:
+                logger.error(f"Error reading alert stats counters: {e}")
+
+        counts = await self.compute_counts(db)
+        await self._store(counts)
+        return build_stats_response(counts)
+
+    async def record_created(
+        self, alert_type: str, severity: str, status: str = "active"
+    ) -> None:
+        """Count a newly created alert"""
+        await self._increment(
+            {
+                "total": 1,
+                f"status:{status}": 1,
+                f"severity:{severity}": 1,
+                f"type:{alert_type}": 1,
+            }
+        )
+
+    async def record_transition(self, old_status: str, new_status: str) -> None:
+        """Move an alert between status counters"""
+        if old_status == new_status:
+            return
+        await self._increment({f"status:{old_status}": -1, f"status:{new_status}": 1})
+
+    async def reconcile(self, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
+        """Overwrite the counters with fresh database counts"""
+        if db is None:
+            from config.database import analytics_session
+
+            async with analytics_session() as session:
+                counts = await self.compute_counts(session)
+        else:
+            counts = await self.compute_counts(db)
+
+        await self._store(counts)
+        self.last_reconciled_at = datetime.now()
+        return build_stats_response(counts)
+
+    async def _increment(self, deltas: Dict[str, int]) -> None:
+        client = self.client
+        if client is None:
+            return
+        try:
+            # Only adjust counters that have been seeded; a missing hash is
+            # rebuilt from the database on the next read
+            if not await client.exists(STATS_KEY):
+                return
+            pipe = client.pipeline()
+            for field, delta in deltas.items():
+                pipe.hincrby(STATS_KEY, field, delta)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error updating alert stats counters: {e}")
+
+    async def _store(self, counts: Dict[str, int]) -> None:
+        client = self.client
+        if client is None:
+            return
+        try:
+            mapping = dict(counts) or {"total": 0}
+            pipe = client.pipeline(transaction=True)
+            pipe.delete(STATS_KEY)
+            pipe.hset(STATS_KEY, mapping=mapping)
+            # Expire stale counters if reconciliation stops running
+            pipe.expire(STATS_KEY, settings.alert_stats_reconcile_interval_seconds * 3)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error storing alert stats counters: {e}")
+
+    async def start(self) -> None:
+        """Schedule periodic reconciliation (once per cluster)"""
+        from modules.scheduler.cron import IntervalSchedule
+        from modules.scheduler.scheduler import ScheduledJob, scheduler
+
+        if self.running:
+            return
+
+        self.running = True
+        scheduler.add_job(
+            ScheduledJob(
+                name="alert_stats_reconcile",
+                func=self.reconcile,
+                schedule=IntervalSchedule(
+                    settings.alert_stats_reconcile_interval_seconds
+                ),
+                run_on_start=True,
+                missed_run_policy="skip",
+            )
+        )
+        logger.info("Alert statistics reconciliation scheduled")
+
+    async def stop(self) -> None:
+        """Stop periodic reconciliation"""
+        from modules.scheduler.scheduler import scheduler
+
+        self.running = False
+        scheduler.remove_job("alert_stats_reconcile")
+        logger.info("Alert statistics reconciliation stopped")
+
+
+# Global alert statistics service
+alert_statistics = AlertStatisticsService()
+
+
+async def get_alert_statistics() -> AlertStatisticsService:
+    """Dependency to get the alert statistics service"""
+    return alert_statistics
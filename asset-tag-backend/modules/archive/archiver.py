@@ -0,0 +1,209 @@
+"""
+Archival job exporting aged time-series rows to Parquet
+
+Each run exports every complete UTC day that is older than
+``archive_lag_days`` and newer than the table's watermark. Rows are streamed
+with a server-side cursor ordered by organization, asset and time, so only one
+organization's Parquet file is buffered at a time and files are sorted for
+efficient row-group pruning on ``asset_id``.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from config.database import analytics_session
+from config.settings import settings
+from modules.archive.cold_store import (ARCHIVE_PREFIX, ARCHIVE_TABLES,
+                                        ArchiveTable, arrow_schema,
+                                        cold_archive, partition_key)
+
+logger = logging.getLogger(__name__)
+
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+
+def _to_archive_value(value: Any) -> Any:
+    """Convert database values to types pyarrow can store"""
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+class ParquetArchiver:
+    """Exports aged chunks of time-series tables to the Parquet archive"""
+
+    def __init__(self) -> None:
+        self._storage = None
+
+    def _get_storage(self) -> Any:
+        if self._storage is None:
+            from config.storage import storage
+
+            self._storage = storage
+        return self._storage
+
+    def _watermark_key(self, table: str) -> str:
+        return f"{ARCHIVE_PREFIX}/{table}/_watermark.json"
+
+    async def get_watermark(self, table: str) -> Optional[date]:
+        """Last fully archived day for a table"""
+        content = await self._get_storage().download_file(self._watermark_key(table))
+        if not content:
+            return None
+        return date.fromisoformat(json.loads(content)["last_archived_date"])
+
+    async def _set_watermark(self, table: str, day: date) -> None:
+        payload = json.dumps(
+            {
+                "last_archived_date": day.isoformat(),
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+        ).encode()
+        await self._get_storage().upload_file(
+            io.BytesIO(payload), self._watermark_key(table), "application/json"
+        )
+
+    async def run(self, tables: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Archive all pending days for the given tables"""
+        if not cold_archive.is_available():
+            logger.info("Archive disabled or pyarrow not installed, skipping")
+            return {"archived": False}
+
+        summary: Dict[str, Any] = {"archived": True, "tables": {}}
+        last_day = datetime.now(timezone.utc).date() - timedelta(
+            days=settings.archive_lag_days
+        )
+
+        for table in tables or list(ARCHIVE_TABLES):
+            spec = ARCHIVE_TABLES[table]
+            watermark = await self.get_watermark(table)
+            first_day = (
+                watermark + timedelta(days=1)
+                if watermark
+                else await self._first_day(spec)
+            )
+
+            days = []
+            day = first_day
+            while day is not None and day <= last_day:
+                rows = await self.archive_day(spec, day)
+                await self._set_watermark(table, day)
+                days.append({"date": day.isoformat(), "rows": rows})
+                day += timedelta(days=1)
+
+            cold_archive.invalidate(table)
+            summary["tables"][table] = days
+            logger.info(f"Archived {len(days)} day(s) of {table}")
+
+        return summary
+
+    async def _first_day(self, spec: ArchiveTable) -> Optional[date]:
+        async with analytics_session() as db:
+            result = await db.execute(
+                text(f"SELECT MIN({spec.time_column}) FROM {spec.table}")
+            )
+            oldest = result.scalar()
+        return oldest.astimezone(timezone.utc).date() if oldest else None
+
+    async def archive_day(self, spec: ArchiveTable, day: date) -> int:
+        """Export one UTC day of a table, one Parquet file per organization"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = arrow_schema(spec)
+        start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+        end = start + timedelta(days=1)
+        # Deterministic file names make re-running a day overwrite, not duplicate
+        part = day.strftime("%Y%m%d")
+
+        query = text(
+            f"""
+            SELECT organization_id, {', '.join(spec.column_names)}
+            FROM {spec.table}
+            WHERE {spec.time_column} >= :start AND {spec.time_column} < :end
+            ORDER BY organization_id, asset_id, {spec.time_column}
+        """
+        )
+
+        total = 0
+        current_org = None
+        sink = None
+        writer = None
+
+        async with analytics_session() as db:
+            result = await db.stream(query, {"start": start, "end": end})
+            async for batch in result.partitions(settings.archive_batch_size):
+                rows_by_org: Dict[str, List[Dict[str, Any]]] = {}
+                for row in batch:
+                    mapping = row._mapping
+                    org = str(mapping["organization_id"])
+                    rows_by_org.setdefault(org, []).append(
+                        {
+                            name: _to_archive_value(mapping[name])
+                            for name in spec.column_names
+                        }
+                    )
+
+                for org, rows in rows_by_org.items():
+                    if org != current_org:
+                        if writer is not None:
+                            writer.close()
+                            await self._upload(spec, current_org, day, part, sink)
+                        current_org = org
+                        sink = pa.BufferOutputStream()
+                        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+                    writer.write_table(
+                        pa.Table.from_pylist(rows, schema=schema),
+                        row_group_size=settings.archive_row_group_size,
+                    )
+                    total += len(rows)
+
+        if writer is not None:
+            writer.close()
+            await self._upload(spec, current_org, day, part, sink)
+
+        return total
+
+    async def _upload(
+        self,
+        spec: ArchiveTable,
+        organization_id: str,
+        day: date,
+        part: str,
+        sink: Any,
+    ) -> None:
+        key = partition_key(spec.table, organization_id, day.isoformat(), part)
+        uploaded = await self._get_storage().upload_file(
+            io.BytesIO(sink.getvalue().to_pybytes()), key, PARQUET_CONTENT_TYPE
+        )
+        if not uploaded:
+            raise RuntimeError(f"Failed to upload archive partition {key}")
+
+
+# Global archiver instance
+parquet_archiver = ParquetArchiver()
+
+
+async def run_archive_job() -> Dict[str, Any]:
+    """Run the archival job once"""
+    return await parquet_archiver.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    print(json.dumps(asyncio.run(run_archive_job()), indent=2))
@@ -0,0 +1,332 @@
+"""
+Columnar cold archive for time-series tables
+
+Aged rows of ``observations`` and ``estimated_locations`` are stored as Parquet
+files under ``archive/<table>/organization_id=<org>/date=<YYYY-MM-DD>/`` in the
+object store. Reads go through a pyarrow dataset so partition pruning (date,
+organization) and row-group statistics (asset_id, time) keep scans small.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PREFIX = "archive"
+
+# Seconds a discovered dataset (file listing) is reused before re-listing
+DATASET_CACHE_TTL = 300
+
+
+@dataclass
+class ArchiveTable:
+    """Archive layout for one time-series table"""
+
+    table: str
+    time_column: str
+    retention: str
+    columns: List[Tuple[str, str]]
+
+    @property
+    def hot_window(self) -> timedelta:
+        """How long rows stay in the database before only the archive has them"""
+        return parse_interval(self.retention)
+
+    @property
+    def column_names(self) -> List[str]:
+        return [name for name, _ in self.columns]
+
+
+ARCHIVE_TABLES: Dict[str, ArchiveTable] = {
+    "observations": ArchiveTable(
+        table="observations",
+        time_column="observed_at",
+        retention=settings.observations_retention,
+        columns=[
+            ("id", "string"),
+            ("asset_id", "string"),
+            ("gateway_id", "string"),
+            ("rssi", "int32"),
+            ("battery_level", "int32"),
+            ("temperature", "float64"),
+            ("observed_at", "timestamp"),
+            ("received_at", "timestamp"),
+            ("signal_quality", "string"),
+            ("noise_level", "int32"),
+        ],
+    ),
+    "estimated_locations": ArchiveTable(
+        table="estimated_locations",
+        time_column="estimated_at",
+        retention=settings.estimated_locations_retention,
+        columns=[
+            ("id", "string"),
+            ("asset_id", "string"),
+            ("latitude", "float64"),
+            ("longitude", "float64"),
+            ("altitude", "float64"),
+            ("uncertainty_radius", "float64"),
+            ("confidence", "float64"),
+            ("algorithm", "string"),
+            ("estimated_at", "timestamp"),
+            ("gateway_count", "int32"),
+            ("gateway_ids", "string"),
+            ("speed", "float64"),
+            ("bearing", "float64"),
+            ("distance_from_previous", "float64"),
+            ("signal_quality_score", "float64"),
+            ("rssi_variance", "float64"),
+        ],
+    ),
+}
+
+
+def parse_interval(value: str) -> timedelta:
+    """Parse a simple PostgreSQL interval such as '7 days' or '1 hour'"""
+    match = re.fullmatch(r"\s*(\d+)\s*(minute|hour|day|week)s?\s*", value or "")
+    if not match:
+        raise ValueError(f"Unsupported interval: {value}")
+    amount, unit = int(match.group(1)), match.group(2)
+    return timedelta(**{f"{unit}s": amount})
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def arrow_schema(spec: ArchiveTable) -> Any:
+    """Build the pyarrow schema for an archived table"""
+    import pyarrow as pa
+
+    types = {
+        "string": pa.string(),
+        "int32": pa.int32(),
+        "float64": pa.float64(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in spec.columns])
+
+
+def partition_key(table: str, organization_id: str, day: str, part: str) -> str:
+    """Object key for one Parquet partition file"""
+    return (
+        f"{ARCHIVE_PREFIX}/{table}/organization_id={organization_id}/"
+        f"date={day}/part-{part}.parquet"
+    )
+
+
+class ColdArchive:
+    """Query layer over the Parquet archive"""
+
+    def __init__(self) -> None:
+        self._storage = None
+        self._filesystem = None
+        self._datasets: Dict[str, Tuple[float, Any]] = {}
+
+    @staticmethod
+    def is_available() -> bool:
+        """Whether the archive can be used (pyarrow installed, enabled)"""
+        if not settings.archive_enabled:
+            return False
+        try:
+            import pyarrow.dataset  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def cold_range(
+        self, table: str, start: Optional[datetime], end: Optional[datetime]
+    ) -> Optional[Tuple[datetime, datetime]]:
+        """Return the part of [start, end] older than the hot window, if any"""
+        if start is None or table not in ARCHIVE_TABLES or not self.is_available():
+            return None
+
+        boundary = datetime.now(timezone.utc) - ARCHIVE_TABLES[table].hot_window
+        start = as_utc(start)
+        cold_end = min(as_utc(end), boundary) if end else boundary
+        if start >= cold_end:
+            return None
+        return start, cold_end
+
+    async def query(
+        self,
+        table: str,
+        start: datetime,
+        end: datetime,
+        asset_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        descending: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Read archived rows for a time range, newest first by default"""
+        if not self.is_available():
+            return []
+        try:
+            return await asyncio.to_thread(
+                self._scan,
+                table,
+                as_utc(start),
+                as_utc(end),
+                asset_id,
+                organization_id,
+                limit,
+                columns,
+                descending,
+            )
+        except Exception as e:
+            logger.error(f"Error querying {table} archive: {e}")
+            return []
+
+    async def history_fallthrough(
+        self,
+        table: str,
+        asset_id: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        oldest_hot: Optional[datetime],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """Archived rows for the part of [start, end] the database no longer has
+
+        Callers pass the oldest timestamp the database returned (when it
+        returned fewer rows than the limit), so rows still awaiting retention
+        are not returned twice.
+        """
+        if limit <= 0:
+            return []
+        cold = self.cold_range(table, start, end)
+        if not cold:
+            return []
+        cold_start, cold_end = cold
+        if oldest_hot is not None:
+            cold_end = min(cold_end, as_utc(oldest_hot))
+        if cold_start >= cold_end:
+            return []
+        return await self.query(
+            table, cold_start, cold_end, asset_id=asset_id, limit=limit
+        )
+
+    def _scan(
+        self,
+        table: str,
+        start: datetime,
+        end: datetime,
+        asset_id: Optional[str],
+        organization_id: Optional[str],
+        limit: Optional[int],
+        columns: Optional[List[str]],
+        descending: bool,
+    ) -> List[Dict[str, Any]]:
+        asset_ids = [asset_id] if asset_id else None
+        result = self._scan_table(table, start, end, asset_ids, organization_id)
+        if result.num_rows == 0:
+            return []
+
+        time_column = ARCHIVE_TABLES[table].time_column
+        order = "descending" if descending else "ascending"
+        result = result.sort_by([(time_column, order)])
+        if limit is not None:
+            result = result.slice(0, limit)
+        if columns:
+            result = result.select(columns)
+        return result.to_pylist()
+
+    def _scan_table(
+        self,
+        table: str,
+        start: datetime,
+        end: datetime,
+        asset_ids: Optional[List[str]],
+        organization_id: Optional[str],
+    ) -> Any:
+        """Scan with partition pruning and predicate pushdown"""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        spec = ARCHIVE_TABLES[table]
+        dataset = self._get_dataset(table)
+        if dataset is None:
+            return arrow_schema(spec).empty_table()
+
+        timestamp = pa.timestamp("us", tz="UTC")
+        # Partition pruning on the hive "date" directory, then row-group
+        # statistics on the time column and asset_id
+        expression = (ds.field("date") >= start.date().isoformat()) & (
+            ds.field("date") <= end.date().isoformat()
+        )
+        expression &= ds.field(spec.time_column) >= pa.scalar(start, type=timestamp)
+        expression &= ds.field(spec.time_column) < pa.scalar(end, type=timestamp)
+        if asset_ids:
+            expression &= ds.field("asset_id").isin(asset_ids)
+        if organization_id:
+            expression &= ds.field("organization_id") == organization_id
+
+        return dataset.to_table(
+            columns=spec.column_names + ["organization_id"], filter=expression
+        )
+
+    def _get_dataset(self, table: str) -> Any:
+        """Discover (and briefly cache) the Parquet dataset for a table"""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        cached = self._datasets.get(table)
+        if cached and time.monotonic() - cached[0] < DATASET_CACHE_TTL:
+            return cached[1]
+
+        storage, filesystem = self._get_storage()
+        partitioning = ds.partitioning(
+            pa.schema([("organization_id", pa.string()), ("date", pa.string())]),
+            flavor="hive",
+        )
+        try:
+            dataset = ds.dataset(
+                f"{storage.bucket}/{ARCHIVE_PREFIX}/{table}",
+                schema=arrow_schema(ARCHIVE_TABLES[table]).append(
+                    pa.field("organization_id", pa.string())
+                ).append(pa.field("date", pa.string())),
+                filesystem=filesystem,
+                format="parquet",
+                partitioning=partitioning,
+                exclude_invalid_files=True,
+            )
+        except FileNotFoundError:
+            dataset = None
+
+        self._datasets[table] = (time.monotonic(), dataset)
+        return dataset
+
+    def _get_storage(self) -> Tuple[Any, Any]:
+        if self._storage is None:
+            from config.storage import storage
+
+            self._storage = storage
+            self._filesystem = storage.get_arrow_filesystem()
+        return self._storage, self._filesystem
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Forget cached dataset listings after new partitions are written"""
+        if table:
+            self._datasets.pop(table, None)
+        else:
+            self._datasets.clear()
+
+
+# Global cold archive instance
+cold_archive = ColdArchive()
+
+
+async def get_cold_archive() -> ColdArchive:
+    """Dependency to get the cold archive"""
+    return cold_archive
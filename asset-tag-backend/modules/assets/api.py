@@ -11,9 +11,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import delete, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from modules.assets.models import Asset
 from modules.assets.schemas import AssetCreate, AssetResponse, AssetUpdate
+from modules.search.indexer import record_change
+from modules.shared.serialization import RowSerializer
 
 
 def asset_to_response(asset: Asset) -> AssetResponse:
@@ -123,6 +125,9 @@ def asset_to_response(asset: Asset) -> AssetResponse:
     )
 
 
+# Fast path for list endpoints: result rows map straight to response dicts
+asset_serializer = RowSerializer(AssetResponse)
+
 router = APIRouter()
 
 
@@ -135,7 +140,7 @@ async def get_assets(
     asset_type: Optional[str] = None,
     status: Optional[str] = None,
     site_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of assets with optional filtering"""
     try:
@@ -185,40 +190,7 @@ async def get_assets(
         result = await db.execute(text(raw_query), params)
         rows = result.fetchall()
 
-        # Convert rows to Asset objects manually
-        assets = []
-        for row in rows:
-            asset = Asset()
-            asset.id = row[0]
-            asset.organization_id = row[1]
-            asset.name = row[2]
-            asset.serial_number = row[3]
-            asset.asset_type = row[4]
-            asset.status = row[5]
-            asset.current_site_id = row[6]
-            asset.location_description = row[7]
-            asset.last_seen = row[8]
-            asset.battery_level = row[9]
-            asset.temperature = row[10]
-            asset.movement_status = row[11]
-            asset.assigned_to_user_id = row[12]
-            asset.assigned_job_id = row[13]
-            asset.assignment_start_date = row[14]
-            asset.assignment_end_date = row[15]
-            asset.manufacturer = row[16]
-            asset.model = row[17]
-            asset.purchase_date = row[18]
-            asset.warranty_expiry = row[19]
-            asset.last_maintenance = row[20]
-            asset.next_maintenance = row[21]
-            asset.hourly_rate = row[22]
-            asset.availability = row[23]
-            asset.asset_metadata = row[24]
-            asset.created_at = row[25]
-            asset.updated_at = row[26]
-            assets.append(asset)
-
-        return [asset_to_response(asset) for asset in assets]
+        return asset_serializer.response(rows)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching assets: {str(e)}")
@@ -228,7 +200,7 @@ async def get_assets(
 async def search_assets(
     q: str = Query(..., min_length=1, description="Search query"),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Search assets by name or serial number"""
     try:
@@ -251,47 +223,14 @@ async def search_assets(
         )
         rows = result.fetchall()
 
-        # Convert rows to Asset objects manually
-        assets = []
-        for row in rows:
-            asset = Asset()
-            asset.id = row[0]
-            asset.organization_id = row[1]
-            asset.name = row[2]
-            asset.serial_number = row[3]
-            asset.asset_type = row[4]
-            asset.status = row[5]
-            asset.current_site_id = row[6]
-            asset.location_description = row[7]
-            asset.last_seen = row[8]
-            asset.battery_level = row[9]
-            asset.temperature = row[10]
-            asset.movement_status = row[11]
-            asset.assigned_to_user_id = row[12]
-            asset.assigned_job_id = row[13]
-            asset.assignment_start_date = row[14]
-            asset.assignment_end_date = row[15]
-            asset.manufacturer = row[16]
-            asset.model = row[17]
-            asset.purchase_date = row[18]
-            asset.warranty_expiry = row[19]
-            asset.last_maintenance = row[20]
-            asset.next_maintenance = row[21]
-            asset.hourly_rate = row[22]
-            asset.availability = row[23]
-            asset.asset_metadata = row[24]
-            asset.created_at = row[25]
-            asset.updated_at = row[26]
-            assets.append(asset)
-
-        return [asset_to_response(asset) for asset in assets]
+        return asset_serializer.response(rows)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching assets: {str(e)}")
 
 
 @router.get("/assets/{asset_id}", response_model=AssetResponse)
-async def get_asset(asset_id: str, db: AsyncSession = Depends(get_db)):
+async def get_asset(asset_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get asset by ID"""
     try:
         # Use raw SQL to avoid UUID serialization issues with SQLite
@@ -492,6 +431,7 @@ async def update_asset(
         if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Asset not found")
 
+        record_change(db, "assets", str(uuid.UUID(asset_id)))
         await db.commit()
 
         # Fetch the updated asset using raw SQL
@@ -571,6 +511,7 @@ async def delete_asset(asset_id: str, db: AsyncSession = Depends(get_db)):
         if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="Asset not found")
 
+        record_change(db, "assets", str(uuid.UUID(asset_id)), "delete")
         await db.commit()
 
         return {"message": "Asset deleted successfully"}
@@ -583,7 +524,7 @@ async def delete_asset(asset_id: str, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/assets/{asset_id}/current-location")
-async def get_asset_current_location(asset_id: str, db: AsyncSession = Depends(get_db)):
+async def get_asset_current_location(asset_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get current location of an asset"""
     try:
         from modules.locations.models import EstimatedLocation
@@ -629,23 +570,26 @@ async def get_asset_location_history(
     start_time: Optional[str] = None,
     end_time: Optional[str] = None,
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get location history for an asset"""
     try:
         from datetime import datetime
 
+        from modules.archive.cold_store import cold_archive
+        from modules.locations.api import (archived_location_entry,
+                                           location_history_entry)
         from modules.locations.models import EstimatedLocation
 
         query = select(EstimatedLocation).where(EstimatedLocation.asset_id == asset_id)
+        start_dt = datetime.fromisoformat(start_time) if start_time else None
+        end_dt = datetime.fromisoformat(end_time) if end_time else None
 
         # Apply time filters
-        if start_time:
-            start_dt = datetime.fromisoformat(start_time)
+        if start_dt:
             query = query.where(EstimatedLocation.estimated_at >= start_dt)
 
-        if end_time:
-            end_dt = datetime.fromisoformat(end_time)
+        if end_dt:
             query = query.where(EstimatedLocation.estimated_at <= end_dt)
 
         # Order by time and limit
@@ -654,25 +598,21 @@ async def get_asset_location_history(
         result = await db.execute(query)
         locations = result.scalars().all()
 
-        return [
-            {
-                "latitude": float(loc.latitude),
-                "longitude": float(loc.longitude),
-                "altitude": float(loc.altitude) if loc.altitude else None,
-                "uncertainty_radius": float(loc.uncertainty_radius),
-                "confidence": float(loc.confidence),
-                "algorithm": loc.algorithm,
-                "estimated_at": loc.estimated_at.isoformat(),
-                "speed": float(loc.speed) if loc.speed else None,
-                "bearing": float(loc.bearing) if loc.bearing else None,
-                "distance_from_previous": (
-                    float(loc.distance_from_previous)
-                    if loc.distance_from_previous
-                    else None
-                ),
-            }
-            for loc in locations
-        ]
+        history = [location_history_entry(loc) for loc in locations]
+
+        # Ranges older than the hot window fall through to the Parquet archive
+        if len(history) < limit:
+            archived = await cold_archive.history_fallthrough(
+                "estimated_locations",
+                asset_id,
+                start_dt,
+                end_dt,
+                locations[-1].estimated_at if locations else None,
+                limit - len(history),
+            )
+            history.extend(archived_location_entry(row) for row in archived)
+
+        return history
 
     except Exception as e:
         raise HTTPException(
@@ -684,7 +624,7 @@ async def get_asset_location_history(
 async def get_asset_battery_history(
     asset_id: str,
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get battery level history for an asset"""
     try:
@@ -5,16 +5,81 @@ Audit API endpoints
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy import and_, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_read_db
+from modules.exports.service import EXPORT_DESTINATIONS, deliver_export
+from modules.exports.streaming import get_export_format
 from modules.shared.database.models import AuditLog
 
 router = APIRouter()
 
 
+@router.get("/audit/export")
+async def export_audit_logs(
+    background_tasks: BackgroundTasks,
+    entity_type: Optional[str] = Query(None, description="Filter by entity type"),
+    start_date: Optional[str] = Query(None, description="Start date (ISO format)"),
+    end_date: Optional[str] = Query(None, description="End date (ISO format)"),
+    format: str = Query(
+        "json", description="Export format: csv, json (NDJSON) or parquet"
+    ),
+    compress: bool = Query(True, description="Gzip CSV/NDJSON output"),
+    destination: str = Query(
+        "download", description="download (stream) or storage (upload, then poll)"
+    ),
+):
+    """Export audit logs, streamed in batches from a server-side cursor"""
+    try:
+        try:
+            export_format = get_export_format(format)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if destination not in EXPORT_DESTINATIONS:
+            raise HTTPException(status_code=400, detail="Invalid destination")
+
+        query = select(
+            AuditLog.id,
+            AuditLog.entity_type,
+            AuditLog.entity_id,
+            AuditLog.action,
+            AuditLog.user_id,
+            AuditLog.organization_id,
+            AuditLog.changes,
+            AuditLog.model_metadata.label("metadata"),
+            AuditLog.created_at,
+        )
+
+        # Add filters
+        if entity_type:
+            query = query.where(AuditLog.entity_type == entity_type)
+
+        if start_date:
+            start_dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
+            query = query.where(AuditLog.created_at >= start_dt)
+
+        if end_date:
+            end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+            query = query.where(AuditLog.created_at <= end_dt)
+
+        # Order by creation time
+        query = query.order_by(AuditLog.created_at.desc())
+
+        prefix = f"audit_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        return await deliver_export(
+            background_tasks, query, export_format, prefix, compress, destination
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error exporting audit logs: {str(e)}"
+        )
+
+
 @router.get("/audit/{entity_type}")
 async def get_audit_trail(
     entity_type: str,
@@ -25,7 +90,7 @@ async def get_audit_trail(
     end_date: Optional[str] = Query(None, description="End date (ISO format)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Starting offset"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get audit trail for an entity type"""
     try:
@@ -102,7 +167,7 @@ async def get_entity_audit_trail(
     entity_id: str,
     limit: int = Query(50, ge=1, le=500, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Starting offset"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get audit trail for a specific entity"""
     try:
@@ -158,7 +223,7 @@ async def get_user_audit_trail(
     days: int = Query(30, ge=1, le=365, description="Number of days to look back"),
     limit: int = Query(100, ge=1, le=1000, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Starting offset"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get audit trail for a specific user"""
     try:
@@ -226,7 +291,7 @@ async def get_audit_summary(
     organization_id: Optional[str] = Query(
         None, description="Filter by organization ID"
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get audit statistics summary"""
     try:
@@ -344,77 +409,3 @@ async def get_audit_summary(
         raise HTTPException(
             status_code=500, detail=f"Error getting audit summary: {str(e)}"
         )
-
-
-@router.get("/audit/export")
-async def export_audit_logs(
-    entity_type: Optional[str] = Query(None, description="Filter by entity type"),
-    start_date: Optional[str] = Query(None, description="Start date (ISO format)"),
-    end_date: Optional[str] = Query(None, description="End date (ISO format)"),
-    format: str = Query("json", description="Export format: json or csv"),
-    db: AsyncSession = Depends(get_db),
-):
-    """Export audit logs"""
-    try:
-        # Build query
-        query = select(AuditLog)
-
-        # Add filters
-        if entity_type:
-            query = query.where(AuditLog.entity_type == entity_type)
-
-        if start_date:
-            start_dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
-            query = query.where(AuditLog.created_at >= start_dt)
-
-        if end_date:
-            end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-            query = query.where(AuditLog.created_at <= end_dt)
-
-        # Order by creation time
-        query = query.order_by(AuditLog.created_at.desc())
-
-        # Execute query
-        result = await db.execute(query)
-        audit_logs = result.scalars().all()
-
-        # Format results
-        export_data = []
-        for log in audit_logs:
-            export_data.append(
-                {
-                    "id": str(log.id),
-                    "entity_type": log.entity_type,
-                    "entity_id": log.entity_id,
-                    "action": log.action,
-                    "user_id": log.user_id,
-                    "organization_id": log.organization_id,
-                    "changes": log.changes,
-                    "metadata": log.metadata,
-                    "created_at": log.created_at.isoformat(),
-                }
-            )
-
-        if format.lower() == "csv":
-            # Convert to CSV format
-            import csv
-            import io
-
-            output = io.StringIO()
-            if export_data:
-                writer = csv.DictWriter(output, fieldnames=export_data[0].keys())
-                writer.writeheader()
-                writer.writerows(export_data)
-
-            return {
-                "format": "csv",
-                "data": output.getvalue(),
-                "count": len(export_data),
-            }
-        else:
-            return {"format": "json", "data": export_data, "count": len(export_data)}
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error exporting audit logs: {str(e)}"
-        )
@@ -1,28 +1,91 @@
 """
 Audit middleware for automatic change tracking
+
+Implemented as plain ASGI middleware: the request body is captured as the
+application reads it and the finished audit record is handed to the
+background ``AuditWriter``, so write requests never wait on an audit INSERT.
 """
 
 import json
 import logging
-from datetime import datetime
+import re
+import time
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl
 
-from fastapi import Request, Response
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from config.database import get_db
-from modules.shared.database.models import AuditLog
+from config.settings import settings
+from modules.audit.writer import AuditWriter, audit_writer, build_audit_record
 
 logger = logging.getLogger(__name__)
 
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+BODY_METHODS = {"POST", "PUT", "PATCH"}
+
+UUID_PATTERN = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE
+)
+NUMERIC_PATTERN = re.compile(r"^\d+$")
+
+# Request body fields that are never written to the audit log
+SENSITIVE_KEYS = {
+    "password",
+    "current_password",
+    "new_password",
+    "token",
+    "secret",
+    "api_key",
+}
+REDACTED = "[REDACTED]"
+
+
+def _redact(value: Any) -> Any:
+    """Replace sensitive fields anywhere in a decoded JSON body"""
+    if isinstance(value, dict):
+        return {
+            key: (
+                REDACTED
+                if isinstance(key, str) and key.lower() in SENSITIVE_KEYS
+                else _redact(item)
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+def redact_body(body: Optional[str]) -> Optional[str]:
+    """Return the request body with sensitive fields redacted
+
+    Bodies that cannot be decoded as JSON (truncated, form data) are dropped
+    entirely when they mention a sensitive field name.
+    """
+    if not body:
+        return body
+    try:
+        return json.dumps(_redact(json.loads(body)))
+    except ValueError:
+        lowered = body.lower()
+        if any(key in lowered for key in SENSITIVE_KEYS):
+            return REDACTED
+        return body
 
-class AuditMiddleware(BaseHTTPMiddleware):
+
+class AuditMiddleware:
     """Middleware for automatic audit logging"""
 
-    def __init__(self, app, exclude_paths: Optional[List[str]] = None) -> None:
-        super().__init__(app)
+    def __init__(
+        self,
+        app: ASGIApp,
+        exclude_paths: Optional[List[str]] = None,
+        writer: Optional[AuditWriter] = None,
+    ) -> None:
+        self.app = app
+        self.writer = writer or audit_writer
+        self.max_body_bytes = settings.audit_max_body_bytes
         self.exclude_paths = exclude_paths or [
             "/health",
             "/docs",
@@ -31,153 +94,134 @@ class AuditMiddleware(BaseHTTPMiddleware):
             "/metrics",
         ]
 
-    async def dispatch(self, request: Request, call_next) -> None:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request and log audit information"""
-        start_time = datetime.now()
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
 
+        path = scope["path"]
         # Skip audit for excluded paths
-        if any(request.url.path.startswith(path) for path in self.exclude_paths):
-            return await call_next(request)
-
-        # Get request information
-        request_info = await self._extract_request_info(request)
-
-        # Process request
-        response = await call_next(request)
-
-        # Log audit information
-        await self._log_audit(request_info, response, start_time)
-
-        return response
+        if any(path.startswith(excluded) for excluded in self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        entity_type, entity_id = self._extract_entity_info(path)
+        if not entity_type:
+            await self.app(scope, receive, send)
+            return
+
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        body = bytearray()
+        body_truncated = False
+        response_info: Dict[str, Any] = {"status_code": 500}
+
+        async def receive_wrapper() -> Message:
+            nonlocal body_truncated
+            message = await receive()
+            if message["type"] == "http.request" and scope["method"] in BODY_METHODS:
+                chunk = message.get("body", b"")
+                room = self.max_body_bytes - len(body)
+                if len(chunk) > room:
+                    body_truncated = True
+                body.extend(chunk[: max(room, 0)])
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_info["status_code"] = message["status"]
+                response_info["headers"] = {
+                    key.decode("latin-1"): value.decode("latin-1")
+                    for key, value in message.get("headers", [])
+                }
+            await send(message)
 
-    async def _extract_request_info(self, request: Request) -> Dict[str, Any]:
-        """Extract request information for audit logging"""
         try:
-            # Get request body for POST/PUT/PATCH requests
-            body = None
-            if request.method in ["POST", "PUT", "PATCH"]:
-                try:
-                    body_bytes = await request.body()
-                    if body_bytes:
-                        body = body_bytes.decode("utf-8")
-                except Exception as e:
-                    logger.warning(f"Could not read request body: {e}")
-
-            # Get user information from headers or JWT token
-            user_id = request.headers.get("X-User-ID")
-            organization_id = request.headers.get("X-Organization-ID")
-
-            return {
-                "method": request.method,
-                "url": str(request.url),
-                "path": request.url.path,
-                "query_params": dict(request.query_params),
-                "headers": dict(request.headers),
-                "body": body,
-                "user_id": user_id,
-                "organization_id": organization_id,
-                "client_ip": request.client.host if request.client else None,
-                "user_agent": request.headers.get("user-agent"),
-            }
-
-        except Exception as e:
-            logger.error(f"Error extracting request info: {e}")
-            return {"error": str(e)}
-
-    async def _log_audit(
-        self, request_info: Dict[str, Any], response: Response, start_time: datetime
-    ):
-        """Log audit information to database"""
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            response_info["processing_time_ms"] = (time.perf_counter() - start) * 1000
+            self._enqueue_audit(
+                scope,
+                entity_type,
+                entity_id,
+                body.decode("utf-8", errors="replace") if body else None,
+                body_truncated,
+                response_info,
+                started_at,
+            )
+
+    def _enqueue_audit(
+        self,
+        scope: Scope,
+        entity_type: str,
+        entity_id: Optional[str],
+        body: Optional[str],
+        body_truncated: bool,
+        response_info: Dict[str, Any],
+        started_at: datetime,
+    ) -> None:
+        """Build the audit record and hand it to the background writer"""
         try:
-            # Only log for write operations
-            if request_info.get("method") not in ["POST", "PUT", "PATCH", "DELETE"]:
-                return
-
-            # Determine entity type and ID from path
-            entity_type, entity_id = self._extract_entity_info(request_info["path"])
-
-            if not entity_type:
-                return
-
-            # Get response information
-            response_info = {
-                "status_code": response.status_code,
-                "headers": dict(response.headers),
-                "processing_time_ms": (datetime.now() - start_time).total_seconds()
-                * 1000,
+            headers = {
+                key.decode("latin-1").lower(): value.decode("latin-1")
+                for key, value in scope.get("headers", [])
             }
-
-            # Create audit log entry
-            audit_data = {
-                "entity_type": entity_type,
-                "entity_id": entity_id,
-                "action": self._map_method_to_action(request_info["method"]),
-                "user_id": request_info.get("user_id"),
-                "organization_id": request_info.get("organization_id")
-                or "00000000-0000-0000-0000-000000000000",
-                "changes": {
-                    "request": {
-                        "method": request_info["method"],
-                        "path": request_info["path"],
-                        "query_params": request_info["query_params"],
-                        "body": request_info.get("body"),
+            client = scope.get("client")
+            query_string = scope.get("query_string", b"").decode("latin-1")
+
+            self.writer.enqueue(
+                build_audit_record(
+                    entity_type=entity_type,
+                    entity_id=entity_id,
+                    action=self._map_method_to_action(scope["method"]),
+                    # Get user information from headers or JWT token
+                    user_id=headers.get("x-user-id"),
+                    organization_id=headers.get("x-organization-id"),
+                    changes={
+                        "request": {
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "query_params": dict(
+                                parse_qsl(query_string, keep_blank_values=True)
+                            ),
+                            "body": redact_body(body),
+                            "body_truncated": body_truncated,
+                        },
+                        "response": response_info,
                     },
-                    "response": response_info,
-                },
-                "metadata": {
-                    "client_ip": request_info.get("client_ip"),
-                    "user_agent": request_info.get("user_agent"),
-                    "timestamp": start_time.isoformat(),
-                },
-            }
-
-            # Store in database
-            await self._store_audit_log(audit_data)
+                    metadata={
+                        "client_ip": client[0] if client else None,
+                        "user_agent": headers.get("user-agent"),
+                        "timestamp": started_at.isoformat(),
+                    },
+                    timestamp=started_at,
+                )
+            )
 
         except Exception as e:
             logger.error(f"Error logging audit: {e}")
 
     def _extract_entity_info(self, path: str) -> tuple[Optional[str], Optional[str]]:
         """Extract entity type and ID from URL path"""
-        try:
-            # Parse path like /api/v1/assets/{asset_id}
-            path_parts = path.strip("/").split("/")
+        # Parse path like /api/v1/assets/{asset_id}
+        path_parts = path.strip("/").split("/")
 
-            if (
-                len(path_parts) >= 3
-                and path_parts[0] == "api"
-                and path_parts[1] == "v1"
-            ):
-                entity_type = path_parts[2]
+        if len(path_parts) >= 3 and path_parts[0] == "api" and path_parts[1] == "v1":
+            entity_type = path_parts[2]
 
-                # Try to extract ID from path
-                entity_id = None
-                if len(path_parts) > 3:
-                    # Check if next part looks like an ID
-                    potential_id = path_parts[3]
-                    if self._looks_like_id(potential_id):
-                        entity_id = potential_id
+            # Try to extract ID from path
+            entity_id = None
+            if len(path_parts) > 3 and self._looks_like_id(path_parts[3]):
+                entity_id = path_parts[3]
 
-                return entity_type, entity_id
+            return entity_type, entity_id
 
-            return None, None
-
-        except Exception as e:
-            logger.error(f"Error extracting entity info from path {path}: {e}")
-            return None, None
+        return None, None
 
     def _looks_like_id(self, value: str) -> bool:
-        """Check if a string looks like an ID"""
-        # UUID pattern or numeric ID
-        import re
-
-        uuid_pattern = r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
-        numeric_pattern = r"^\d+$"
-
-        return bool(
-            re.match(uuid_pattern, value, re.IGNORECASE)
-            or re.match(numeric_pattern, value)
-        )
+        """Check if a string looks like an ID (UUID or numeric)"""
+        return bool(UUID_PATTERN.match(value) or NUMERIC_PATTERN.match(value))
 
     def _map_method_to_action(self, method: str) -> str:
         """Map HTTP method to audit action"""
@@ -189,28 +233,6 @@ class AuditMiddleware(BaseHTTPMiddleware):
         }
         return mapping.get(method, "unknown")
 
-    async def _store_audit_log(self, audit_data: Dict[str, Any]) -> None:
-        """Store audit log in database"""
-        try:
-            # Get database session
-            async for db in get_db():
-                audit_log = AuditLog(
-                    entity_type=audit_data["entity_type"],
-                    entity_id=audit_data["entity_id"],
-                    action=audit_data["action"],
-                    user_id=audit_data.get("user_id"),
-                    organization_id=audit_data["organization_id"],
-                    changes=audit_data["changes"],
-                    metadata=audit_data["metadata"],
-                )
-
-                db.add(audit_log)
-                await db.commit()
-                break
-
-        except Exception as e:
-            logger.error(f"Error storing audit log: {e}")
-
 
 class AuditLogger:
     """Utility class for manual audit logging"""
@@ -234,31 +256,17 @@ class AuditLogger:
             if after_data:
                 changes["after"] = after_data
 
-            audit_data = {
-                "entity_type": entity_type,
-                "entity_id": entity_id,
-                "action": action,
-                "user_id": user_id,
-                "organization_id": organization_id,
-                "changes": changes,
-                "metadata": metadata or {},
-            }
-
-            # Store in database
-            async for db in get_db():
-                audit_log = AuditLog(
-                    entity_type=audit_data["entity_type"],
-                    entity_id=audit_data["entity_id"],
-                    action=audit_data["action"],
-                    user_id=audit_data.get("user_id"),
-                    organization_id=audit_data["organization_id"],
-                    changes=audit_data["changes"],
-                    metadata=audit_data["metadata"],
+            audit_writer.enqueue(
+                build_audit_record(
+                    entity_type=entity_type,
+                    entity_id=entity_id,
+                    action=action,
+                    user_id=user_id,
+                    organization_id=organization_id,
+                    changes=changes,
+                    metadata=metadata,
                 )
-
-                db.add(audit_log)
-                await db.commit()
-                break
+            )
 
         except Exception as e:
             logger.error(f"Error logging entity change: {e}")
@@ -274,34 +282,22 @@ class AuditLogger:
     ):
         """Log bulk operations"""
         try:
-            audit_data = {
-                "entity_type": entity_type,
-                "entity_id": None,  # Bulk operation
-                "action": f"bulk_{action}",
-                "user_id": user_id,
-                "organization_id": organization_id,
-                "changes": {
-                    "affected_entities": affected_entities or [],
-                    "entity_count": len(affected_entities) if affected_entities else 0,
-                },
-                "metadata": metadata or {},
-            }
-
-            # Store in database
-            async for db in get_db():
-                audit_log = AuditLog(
-                    entity_type=audit_data["entity_type"],
-                    entity_id=audit_data["entity_id"],
-                    action=audit_data["action"],
-                    user_id=audit_data.get("user_id"),
-                    organization_id=audit_data["organization_id"],
-                    changes=audit_data["changes"],
-                    metadata=audit_data["metadata"],
+            audit_writer.enqueue(
+                build_audit_record(
+                    entity_type=entity_type,
+                    entity_id=None,  # Bulk operation
+                    action=f"bulk_{action}",
+                    user_id=user_id,
+                    organization_id=organization_id,
+                    changes={
+                        "affected_entities": affected_entities or [],
+                        "entity_count": (
+                            len(affected_entities) if affected_entities else 0
+                        ),
+                    },
+                    metadata=metadata,
                 )
-
-                db.add(audit_log)
-                await db.commit()
-                break
+            )
 
         except Exception as e:
             logger.error(f"Error logging bulk operation: {e}")
@@ -0,0 +1,323 @@
+"""
+Batched background writer for audit logs
+
+Audit records are queued in memory and written by a single background task
+as multi-row INSERTs, flushed when a batch fills up or the flush interval
+elapses. When the database is unreachable, batches are spilled to JSON-lines
+files and replayed once writes succeed again. A full queue drops records
+rather than slowing down requests; drops are counted in ``stats``.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+from config.database import get_db
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ORGANIZATION_ID = "00000000-0000-0000-0000-000000000000"
+
+# Longest pause between write attempts while the database is unreachable
+MAX_OUTAGE_BACKOFF_SECONDS = 30.0
+
+
+def build_audit_record(
+    entity_type: str,
+    entity_id: Optional[str],
+    action: str,
+    user_id: Optional[str] = None,
+    organization_id: Optional[str] = None,
+    changes: Optional[Dict[str, Any]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    timestamp: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Build a JSON-serializable audit record ready to enqueue"""
+    created_at = (timestamp or datetime.now(timezone.utc)).isoformat()
+    return {
+        "id": str(uuid.uuid4()),
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "action": action,
+        "user_id": user_id,
+        "organization_id": organization_id or DEFAULT_ORGANIZATION_ID,
+        "changes": changes,
+        "model_metadata": metadata or {},
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def _as_uuid(value: Optional[str]) -> Any:
+    if value is None:
+        return None
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return value
+
+
+def _to_db_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a queued record to column values for the insert"""
+    row = dict(record)
+    for column in ("id", "entity_id", "user_id", "organization_id"):
+        row[column] = _as_uuid(row.get(column))
+    for column in ("created_at", "updated_at"):
+        row[column] = datetime.fromisoformat(row[column])
+    return row
+
+
+def is_outage(error: BaseException) -> bool:
+    """Whether an error means the database is unreachable (vs. a bad row)"""
+    if isinstance(error, (OSError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, DBAPIError):
+        return error.connection_invalidated or isinstance(
+            error, (OperationalError, InterfaceError)
+        )
+    return False
+
+
+class AuditWriter:
+    """Bounded queue drained by a background task that bulk-inserts audit logs"""
+
+    def __init__(
+        self,
+        max_queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        self.max_queue_size = max_queue_size or settings.audit_queue_max_size
+        self.batch_size = batch_size or settings.audit_batch_size
+        self.flush_interval = flush_interval or settings.audit_flush_interval_seconds
+        self.spill_dir = Path(spill_dir or settings.audit_spill_dir)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.running = False
+        self.writer_task = None
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "dropped_overflow": 0,
+            "rejected": 0,
+            "spilled": 0,
+            "dropped_spill_failed": 0,
+            "replayed": 0,
+            "last_error": None,
+        }
+
+    def enqueue(self, record: Dict[str, Any]) -> bool:
+        """Queue a record without blocking; returns False if it was dropped"""
+        try:
+            self.queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.stats["dropped_overflow"] += 1
+            return False
+        self.stats["enqueued"] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Writer counters plus current queue depth and spill backlog"""
+        return {
+            **self.stats,
+            "running": self.running,
+            "queue_size": self.queue.qsize(),
+            "queue_capacity": self.max_queue_size,
+            "spill_files": len(self._spill_files()),
+        }
+
+    async def start(self) -> None:
+        """Start the background writer"""
+        if self.running:
+            return
+
+        self.running = True
+        self.writer_task = asyncio.create_task(self._writer_loop())
+        logger.info("Audit writer started")
+
+    async def stop(self) -> None:
+        """Stop the writer and flush whatever is still queued"""
+        self.running = False
+        if self.writer_task:
+            # Let an in-flight batch finish before draining the rest
+            try:
+                await asyncio.wait_for(self.writer_task, self.flush_interval + 10)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+
+        while not self.queue.empty():
+            await self._flush(self._take_batch())
+        logger.info("Audit writer stopped")
+
+    async def _writer_loop(self) -> None:
+        """Collect batches on size/time thresholds and write them"""
+        await self._replay_spilled()
+
+        while self.running:
+            try:
+                batch = await self._collect_batch()
+                if batch:
+                    await self._flush(batch)
+                elif self._retry_at and time.monotonic() >= self._retry_at:
+                    await self._replay_spilled()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in audit writer loop: {e}")
+                await asyncio.sleep(1)
+
+    async def _collect_batch(self) -> List[Dict[str, Any]]:
+        """Wait for the first record, then fill the batch until the deadline"""
+        try:
+            first = await asyncio.wait_for(self.queue.get(), self.flush_interval)
+        except asyncio.TimeoutError:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self.queue.empty():
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(self.queue.get_nowait())
+        return batch
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < self.batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        """Write a batch, spilling it to disk if the database is unreachable"""
+        # Skip the round-trip while backing off from an outage
+        if self._retry_at and time.monotonic() < self._retry_at:
+            await self._spill(batch)
+            return
+
+        try:
+            await self._write(batch)
+        except Exception as e:
+            self.stats["last_error"] = str(e)
+            if is_outage(e):
+                logger.warning(f"Audit database unavailable, spilling batch: {e}")
+                self._backoff = min(
+                    max(self._backoff * 2, self.flush_interval),
+                    MAX_OUTAGE_BACKOFF_SECONDS,
+                )
+                self._retry_at = time.monotonic() + self._backoff
+                await self._spill(batch)
+                return
+            # A bad row fails the whole statement; isolate it
+            await self._write_rows_individually(batch)
+            return
+
+        if self._retry_at:
+            self._backoff = 0.0
+            self._retry_at = 0.0
+            await self._replay_spilled()
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Insert a batch as one multi-row INSERT"""
+        from modules.shared.database.models import AuditLog
+
+        async for db in get_db():
+            await db.execute(
+                insert(AuditLog.__table__), [_to_db_row(r) for r in batch]
+            )
+            await db.commit()
+
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+
+    async def _write_rows_individually(self, batch: List[Dict[str, Any]]) -> None:
+        for record in batch:
+            try:
+                await self._write([record])
+            except Exception as e:
+                if is_outage(e):
+                    await self._spill([record])
+                else:
+                    self.stats["rejected"] += 1
+                    logger.error(f"Rejected audit record {record.get('id')}: {e}")
+
+    def _spill_files(self) -> List[Path]:
+        if not self.spill_dir.exists():
+            return []
+        return sorted(self.spill_dir.glob("audit-*.jsonl"))
+
+    async def _spill(self, batch: List[Dict[str, Any]]) -> None:
+        """Append a batch to a new spill file (written atomically)"""
+
+        def write() -> None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            path = self.spill_dir / f"audit-{time.time_ns()}-{os.getpid()}.jsonl"
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in batch:
+                    f.write(json.dumps(record, default=str) + "\n")
+            os.replace(tmp_path, path)
+
+        try:
+            await asyncio.to_thread(write)
+            self.stats["spilled"] += len(batch)
+        except Exception as e:
+            self.stats["dropped_spill_failed"] += len(batch)
+            logger.error(f"Could not spill {len(batch)} audit records: {e}")
+
+    async def _replay_spilled(self) -> None:
+        """Write spilled batches back to the database, oldest first"""
+        for path in self._spill_files():
+            try:
+                content = await asyncio.to_thread(path.read_text, encoding="utf-8")
+                records = [json.loads(line) for line in content.splitlines() if line]
+            except Exception as e:
+                logger.error(f"Skipping unreadable audit spill file {path}: {e}")
+                path.rename(path.with_suffix(".failed"))
+                continue
+
+            for start in range(0, len(records), self.batch_size):
+                chunk = records[start : start + self.batch_size]
+                try:
+                    await self._write(chunk)
+                except Exception as e:
+                    if is_outage(e):
+                        # Keep the file; rows already written are rejected
+                        # as duplicates on the next replay
+                        self._retry_at = time.monotonic() + max(
+                            self._backoff, self.flush_interval
+                        )
+                        return
+                    await self._write_rows_individually(chunk)
+
+            path.unlink()
+            self.stats["replayed"] += len(records)
+            logger.info(f"Replayed {len(records)} spilled audit records from {path}")
+
+
+# Global audit writer instance
+audit_writer = AuditWriter()
+
+
+async def get_audit_writer() -> AuditWriter:
+    """Get audit writer instance"""
+    return audit_writer
@@ -9,7 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from modules.checkin_checkout.models import CheckInOutRecord
 from modules.checkin_checkout.schemas import (CheckInCreate,
                                               CheckInOutResponse,
@@ -156,7 +156,7 @@ async def get_checkin_checkout_records(
     status: Optional[str] = None,  # "checked_in", "checked_out"
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get check-in/check-out records with optional filtering"""
     try:
@@ -201,7 +201,7 @@ async def get_checkin_checkout_records(
 
 @router.get("/checkin-checkout/records/{record_id}", response_model=CheckInOutResponse)
 async def get_checkin_checkout_record(
-    record_id: str, db: AsyncSession = Depends(get_db)
+    record_id: str, db: AsyncSession = Depends(get_read_db)
 ):
     """Get check-in/check-out record by ID"""
     try:
@@ -227,7 +227,7 @@ async def get_checkin_checkout_record(
 
 
 @router.get("/checkin-checkout/status")
-async def get_checkin_checkout_status(db: AsyncSession = Depends(get_db)):
+async def get_checkin_checkout_status(db: AsyncSession = Depends(get_read_db)):
     """Get overall check-in/check-out status"""
     try:
         # Get counts of checked in and checked out assets
@@ -246,7 +246,7 @@ async def get_checkin_checkout_status(db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/checkin-checkout/status/{asset_id}")
-async def get_current_checkin_status(asset_id: str, db: AsyncSession = Depends(get_db)):
+async def get_current_checkin_status(asset_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get current check-in status for an asset"""
     try:
         result = await db.execute(
@@ -300,7 +300,7 @@ async def get_current_checkin_status(asset_id: str, db: AsyncSession = Depends(g
 
 
 @router.get("/checkin-checkout/overdue")
-async def get_overdue_checkins(db: AsyncSession = Depends(get_db)):
+async def get_overdue_checkins(db: AsyncSession = Depends(get_read_db)):
     """Get overdue check-ins (assets checked in longer than expected)"""
     try:
         current_time = datetime.now()
@@ -349,7 +349,7 @@ async def get_overdue_checkins(db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/checkin-checkout/stats")
-async def get_checkin_checkout_stats(db: AsyncSession = Depends(get_db)):
+async def get_checkin_checkout_stats(db: AsyncSession = Depends(get_read_db)):
     """Get check-in/check-out statistics summary"""
     try:
         # Get counts
@@ -10,7 +10,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import and_, delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from modules.compliance.models import Compliance, ComplianceCheck
 from modules.compliance.schemas import (ComplianceCheckCreate,
                                         ComplianceCheckResponse,
@@ -31,7 +31,7 @@ async def get_compliance_records(
     asset_id: Optional[str] = None,
     overdue_only: Optional[bool] = None,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of compliance records with optional filtering"""
     try:
@@ -77,7 +77,7 @@ async def get_compliance_records(
 
 
 @router.get("/compliance/{compliance_id}", response_model=ComplianceWithChecks)
-async def get_compliance_record(compliance_id: str, db: AsyncSession = Depends(get_db)):
+async def get_compliance_record(compliance_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get compliance record by ID with checks"""
     try:
         result = await db.execute(
@@ -228,7 +228,7 @@ async def delete_compliance_record(
 
 
 @router.get("/compliance/stats", response_model=ComplianceStats)
-async def get_compliance_stats(db: AsyncSession = Depends(get_db)):
+async def get_compliance_stats(db: AsyncSession = Depends(get_read_db)):
     """Get compliance statistics"""
     try:
         # Get total compliance records
@@ -298,7 +298,7 @@ async def get_compliance_stats(db: AsyncSession = Depends(get_db)):
 async def get_overdue_compliance(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get overdue compliance records"""
     try:
@@ -390,7 +390,7 @@ async def get_compliance_checks(
     compliance_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get compliance checks for a compliance record"""
     try:
@@ -0,0 +1,46 @@
+"""
+Export job API endpoints
+"""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import RedirectResponse
+
+from modules.exports.schemas import ExportJobStatus
+from modules.exports.service import export_jobs
+
+router = APIRouter()
+
+
+@router.get("/exports/{export_id}", response_model=ExportJobStatus)
+async def get_export_status(export_id: str):
+    """Get status of an export uploaded to storage"""
+    job = await export_jobs.get(export_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
+
+
+@router.get("/exports/{export_id}/download")
+async def download_export(export_id: str):
+    """Redirect to a presigned storage URL for a completed export"""
+    try:
+        job = await export_jobs.get(export_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Export not found")
+        if job.status != "completed":
+            raise HTTPException(
+                status_code=409, detail=f"Export is not ready (status: {job.status})"
+            )
+
+        url = await export_jobs.get_download_url(job)
+        if not url:
+            raise HTTPException(status_code=502, detail="Could not sign download URL")
+        # Object storage serves Range requests, so interrupted downloads resume
+        return RedirectResponse(url, status_code=307)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error downloading export: {str(e)}"
+        )
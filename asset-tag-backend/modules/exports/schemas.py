@@ -0,0 +1,25 @@
+"""
+Export job schemas
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ExportJobStatus(BaseModel):
+    """Schema for an export uploaded to storage"""
+
+    export_id: str = Field(..., description="Export ID")
+    status: str = Field(..., description="pending, running, completed or failed")
+    format: str = Field(..., description="Export format")
+    filename: str = Field(..., description="Download filename")
+    rows: int = Field(0, description="Rows exported so far")
+    size: int = Field(0, description="Bytes uploaded so far")
+    download_url: Optional[str] = Field(
+        None, description="Download URL (supports HTTP Range for resuming)"
+    )
+    error_message: Optional[str] = Field(None, description="Error message")
+    created_at: datetime = Field(..., description="Creation timestamp")
+    completed_at: Optional[datetime] = Field(None, description="Completion timestamp")
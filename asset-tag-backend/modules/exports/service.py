@@ -0,0 +1,242 @@
+"""
+Export delivery: streamed responses and uploads to object storage
+
+Small exports stream straight to the client. Large ones can be written to
+object storage with a multipart upload instead, so the client polls the job
+and downloads the finished file from a presigned URL, which supports HTTP
+Range requests for resuming interrupted downloads.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import BackgroundTasks
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from config.cache import get_cache
+from config.settings import settings
+from modules.exports.schemas import ExportJobStatus
+from modules.exports.streaming import (ExportFormat, encode_export,
+                                       export_filename)
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DESTINATIONS = ("download", "storage")
+
+# S3 rejects multipart parts smaller than 5 MB (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+def storage_key(export_id: str, filename: str) -> str:
+    return f"exports/{export_id}/{filename}"
+
+
+def stream_export(
+    query: Select, export_format: ExportFormat, prefix: str, compress: bool = True
+) -> StreamingResponse:
+    """Stream an export as the response body"""
+    filename = export_filename(prefix, export_format, compress)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    return StreamingResponse(
+        encode_export(query, export_format, compress),
+        media_type=export_format.media_type,
+        headers=headers,
+    )
+
+
+async def upload_stream(
+    chunks: AsyncIterator[bytes],
+    key: str,
+    content_type: str,
+    part_size: Optional[int] = None,
+    on_part: Optional[Any] = None,
+) -> int:
+    """Upload a byte stream to storage as a multipart upload, returning its size"""
+    from config.storage import storage
+
+    part_size = max(
+        part_size or settings.export_upload_part_size_mb * 1024 * 1024, MIN_PART_SIZE
+    )
+    client = storage.client
+    upload = await asyncio.to_thread(
+        client.create_multipart_upload,
+        Bucket=storage.bucket,
+        Key=key,
+        ContentType=content_type,
+    )
+    upload_id = upload["UploadId"]
+    parts = []
+    buffer = bytearray()
+    size = 0
+
+    async def send_part(data: bytes) -> None:
+        part_number = len(parts) + 1
+        response = await asyncio.to_thread(
+            client.upload_part,
+            Bucket=storage.bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+        if on_part:
+            await on_part(size)
+
+    try:
+        async for chunk in chunks:
+            buffer.extend(chunk)
+            size += len(chunk)
+            if len(buffer) >= part_size:
+                await send_part(bytes(buffer))
+                buffer.clear()
+        if buffer or not parts:
+            await send_part(bytes(buffer))
+
+        await asyncio.to_thread(
+            client.complete_multipart_upload,
+            Bucket=storage.bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except BaseException:
+        try:
+            await asyncio.to_thread(
+                client.abort_multipart_upload,
+                Bucket=storage.bucket,
+                Key=key,
+                UploadId=upload_id,
+            )
+        except Exception as e:
+            logger.error(f"Could not abort multipart upload for {key}: {e}")
+        raise
+    return size
+
+
+class ExportJobManager:
+    """Tracks exports written to storage in the background
+
+    Job status is kept in Redis so any worker can answer status and download
+    requests; without Redis it only lives in the process running the export.
+    """
+
+    def __init__(self) -> None:
+        # Jobs whose latest state could not be written to Redis
+        self.jobs: Dict[str, ExportJobStatus] = {}
+
+    async def get(self, export_id: str) -> Optional[ExportJobStatus]:
+        if export_id in self.jobs:
+            return self.jobs[export_id]
+        cache = await get_cache()
+        stored = await cache.get_with_strategy("export_job", export_id=export_id)
+        return ExportJobStatus(**stored) if stored else None
+
+    async def save(self, job: ExportJobStatus) -> None:
+        """Publish the job's current state"""
+        cache = await get_cache()
+        if await cache.set_with_strategy(
+            "export_job", job.model_dump(mode="json"), export_id=job.export_id
+        ):
+            self.jobs.pop(job.export_id, None)
+        else:
+            self.jobs[job.export_id] = job
+
+    async def submit(
+        self,
+        background_tasks: BackgroundTasks,
+        query: Select,
+        export_format: ExportFormat,
+        prefix: str,
+        compress: bool = True,
+    ) -> ExportJobStatus:
+        """Register an export and schedule its upload after the response"""
+        export_id = str(uuid.uuid4())
+        job = ExportJobStatus(
+            export_id=export_id,
+            status="pending",
+            format=export_format.name,
+            filename=export_filename(prefix, export_format, compress),
+            created_at=datetime.now(),
+        )
+        await self.save(job)
+        background_tasks.add_task(self.run, job, query, export_format, compress)
+        return job
+
+    async def run(
+        self,
+        job: ExportJobStatus,
+        query: Select,
+        export_format: ExportFormat,
+        compress: bool,
+    ) -> None:
+        """Encode the export and upload it to storage"""
+        job.status = "running"
+        await self.save(job)
+
+        def count_rows(rows: int) -> None:
+            job.rows += rows
+
+        async def record_progress(size: int) -> None:
+            job.size = size
+            await self.save(job)
+
+        try:
+            chunks = encode_export(query, export_format, compress, on_batch=count_rows)
+            job.size = await upload_stream(
+                chunks,
+                storage_key(job.export_id, job.filename),
+                export_format.media_type,
+                on_part=record_progress,
+            )
+            job.status = "completed"
+            job.completed_at = datetime.now()
+            job.download_url = (
+                f"{settings.api_v1_prefix}/exports/{job.export_id}/download"
+            )
+            logger.info(
+                f"Export {job.export_id} uploaded: {job.rows} rows, {job.size} bytes"
+            )
+        except Exception as e:
+            job.status = "failed"
+            job.error_message = str(e)
+            logger.error(f"Export {job.export_id} failed: {e}")
+        await self.save(job)
+
+    async def get_download_url(self, job: ExportJobStatus) -> Optional[str]:
+        """Fresh presigned URL for a completed export"""
+        from config.storage import storage
+
+        return await storage.get_file_url(
+            storage_key(job.export_id, job.filename),
+            expires_in=settings.export_url_expiry_seconds,
+        )
+
+
+async def deliver_export(
+    background_tasks: BackgroundTasks,
+    query: Select,
+    export_format: ExportFormat,
+    prefix: str,
+    compress: bool = True,
+    destination: str = "download",
+) -> Any:
+    """Stream the export, or upload it to storage and return the job"""
+    if destination == "storage":
+        return await export_jobs.submit(
+            background_tasks, query, export_format, prefix, compress
+        )
+    return stream_export(query, export_format, prefix, compress)
+
+
+# Global export job manager instance
+export_jobs = ExportJobManager()
+
+
+async def get_export_jobs() -> ExportJobManager:
+    """Get export job manager instance"""
+    return export_jobs
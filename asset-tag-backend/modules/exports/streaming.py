@@ -0,0 +1,237 @@
+"""
+Streaming export encoders
+
+Rows are read through a server-side cursor in batches of
+``export_batch_size`` and encoded incrementally as CSV, NDJSON or Parquet,
+optionally gzip-compressed on the fly. Only one batch is held in memory at a
+time regardless of the number of rows exported.
+"""
+
+import csv
+import io
+import json
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric, Select
+
+from config.settings import settings
+from modules.shared.serialization import dumps
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    """Media type and file extension for an export format"""
+
+    name: str
+    media_type: str
+    extension: str
+    # Parquet pages are already compressed
+    compressible: bool = True
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    "csv": ExportFormat("csv", "text/csv", "csv"),
+    "ndjson": ExportFormat("ndjson", "application/x-ndjson", "ndjson"),
+    "parquet": ExportFormat(
+        "parquet", "application/vnd.apache.parquet", "parquet", compressible=False
+    ),
+}
+
+# "json" exports are newline-delimited so they can be streamed
+FORMAT_ALIASES = {"json": "ndjson"}
+
+
+def get_export_format(name: str) -> ExportFormat:
+    """Resolve a requested format name, raising ValueError if unsupported"""
+    key = FORMAT_ALIASES.get(name.lower(), name.lower())
+    if key not in EXPORT_FORMATS:
+        allowed = ", ".join(sorted([*EXPORT_FORMATS, *FORMAT_ALIASES]))
+        raise ValueError(f"Unsupported export format '{name}'. Use one of: {allowed}")
+    return EXPORT_FORMATS[key]
+
+
+def export_filename(prefix: str, export_format: ExportFormat, compress: bool) -> str:
+    filename = f"{prefix}.{export_format.extension}"
+    return f"{filename}.gz" if compress and export_format.compressible else filename
+
+
+def _plain_value(value: Any) -> Any:
+    """Normalize database values to JSON-compatible Python values"""
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _text_value(value: Any) -> Any:
+    """Flatten values for tabular formats (CSV, Parquet string columns)"""
+    value = _plain_value(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def stream_query_rows(
+    query: Select,
+    batch_size: Optional[int] = None,
+    on_batch: Optional[Callable[[int], None]] = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield batches of row mappings from a server-side cursor"""
+    from config.database import analytics_session
+
+    batch_size = batch_size or settings.export_batch_size
+    # The request's session is closed before a streaming body is sent, so the
+    # export opens its own (analytics pool) session for the cursor lifetime
+    async with analytics_session() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.mappings().partitions(batch_size):
+            if on_batch:
+                on_batch(len(partition))
+            yield [
+                {key: _plain_value(value) for key, value in row.items()}
+                for row in partition
+            ]
+
+
+async def encode_csv(
+    batches: AsyncIterator[List[Dict[str, Any]]], columns: List[str]
+) -> AsyncIterator[bytes]:
+    """Encode row batches as CSV, header first"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_text_value(row.get(c)) for c in columns] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def encode_ndjson(
+    batches: AsyncIterator[List[Dict[str, Any]]], columns: List[str]
+) -> AsyncIterator[bytes]:
+    """Encode row batches as newline-delimited JSON"""
+    async for batch in batches:
+        yield b"".join(
+            dumps({c: row.get(c) for c in columns}) + b"\n" for row in batch
+        )
+
+
+def arrow_schema_for(query: Select) -> Any:
+    """Derive a stable Parquet schema from the selected column types"""
+    import pyarrow as pa
+
+    fields = []
+    for column in query.selected_columns:
+        column_type = column.type
+        if isinstance(column_type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column_type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column_type, (Float, Numeric)):
+            arrow_type = pa.float64()
+        elif isinstance(column_type, DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC")
+        elif isinstance(column_type, Date):
+            arrow_type = pa.date32()
+        else:
+            # Strings, UUIDs and JSON (serialized) are stored as text
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes can be taken incrementally"""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+async def encode_parquet(
+    batches: AsyncIterator[List[Dict[str, Any]]], schema: Any
+) -> AsyncIterator[bytes]:
+    """Encode row batches as Parquet, one row group per batch"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    text_columns = {
+        field.name for field in schema if pa.types.is_string(field.type)
+    }
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for batch in batches:
+            rows = [
+                {
+                    name: _text_value(value) if name in text_columns else value
+                    for name, value in row.items()
+                }
+                for row in batch
+            ]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip-compress a byte stream on the fly"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def encode_export(
+    query: Select,
+    export_format: ExportFormat,
+    compress: bool = True,
+    on_batch: Optional[Callable[[int], None]] = None,
+) -> AsyncIterator[bytes]:
+    """Build the byte stream for exporting a query in the given format"""
+    batches = stream_query_rows(query, on_batch=on_batch)
+    columns = [column.name for column in query.selected_columns]
+
+    if export_format.name == "csv":
+        chunks = encode_csv(batches, columns)
+    elif export_format.name == "ndjson":
+        chunks = encode_ndjson(batches, columns)
+    else:
+        chunks = encode_parquet(batches, arrow_schema_for(query))
+
+    if compress and export_format.compressible:
+        return gzip_stream(chunks)
+    return chunks
@@ -10,7 +10,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from modules.gateways.models import Gateway
 from modules.gateways.schemas import (GatewayCreate, GatewayResponse,
                                       GatewayUpdate)
@@ -25,7 +25,7 @@ async def get_gateways(
     status: Optional[str] = None,
     site_id: Optional[str] = None,
     is_online: Optional[bool] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of gateways with optional filtering"""
     try:
@@ -54,7 +54,7 @@ async def get_gateways(
 
 
 @router.get("/gateways/{gateway_id}", response_model=GatewayResponse)
-async def get_gateway(gateway_id: str, db: AsyncSession = Depends(get_db)):
+async def get_gateway(gateway_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get gateway by ID"""
     try:
         result = await db.execute(select(Gateway).where(Gateway.id == gateway_id))
@@ -180,7 +180,7 @@ async def get_gateway_observations(
     start_time: Optional[str] = None,
     end_time: Optional[str] = None,
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get observations from a specific gateway"""
     try:
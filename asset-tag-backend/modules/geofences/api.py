@@ -11,7 +11,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from modules.geofences.models import Geofence, GeofenceEvent
 from modules.geofences.schemas import (GeofenceCreate,
                                        GeofenceEvaluationRequest,
@@ -126,7 +126,7 @@ async def get_geofences(
     vehicle_id: Optional[str] = None,
     asset_id: Optional[str] = None,
     attachment_type: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of geofences with optional filtering"""
     try:
@@ -161,7 +161,7 @@ async def get_geofences(
 
 
 @router.get("/geofences/{geofence_id}", response_model=GeofenceResponse)
-async def get_geofence(geofence_id: str, db: AsyncSession = Depends(get_db)):
+async def get_geofence(geofence_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get geofence by ID"""
     try:
         result = await db.execute(select(Geofence).where(Geofence.id == geofence_id))
@@ -445,7 +445,7 @@ async def get_geofence_events(
     asset_id: Optional[str] = None,
     start_time: Optional[str] = None,
     end_time: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get events for a specific geofence"""
     try:
@@ -480,7 +480,7 @@ async def get_geofence_events(
 
 
 @router.get("/geofences/stats", response_model=GeofenceStatsResponse)
-async def get_geofence_stats(db: AsyncSession = Depends(get_db)):
+async def get_geofence_stats(db: AsyncSession = Depends(get_read_db)):
     """Get geofence statistics"""
     try:
         # Get counts by status
@@ -11,7 +11,7 @@ from fastapi import (APIRouter, Depends, File, Form, HTTPException, Query,
 from sqlalchemy import and_, delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from modules.issues.models import Issue, IssueAttachment, IssueComment
 from modules.issues.schemas import (IssueAttachmentCreate,
                                     IssueAttachmentResponse,
@@ -33,7 +33,7 @@ async def get_issues(
     assigned_to_user_id: Optional[str] = None,
     asset_id: Optional[str] = None,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of issues with optional filtering"""
     try:
@@ -71,7 +71,7 @@ async def get_issues(
 
 
 @router.get("/issues/{issue_id}", response_model=IssueWithDetails)
-async def get_issue(issue_id: str, db: AsyncSession = Depends(get_db)):
+async def get_issue(issue_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get issue by ID with full details"""
     try:
         result = await db.execute(
@@ -279,7 +279,7 @@ async def get_issue_comments(
     issue_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get comments for an issue"""
     try:
@@ -359,7 +359,7 @@ async def upload_issue_attachment(
 
 
 @router.get("/issues/stats", response_model=IssueStats)
-async def get_issue_stats(db: AsyncSession = Depends(get_db)):
+async def get_issue_stats(db: AsyncSession = Depends(get_read_db)):
     """Get issue statistics"""
     try:
         # Get basic counts
@@ -9,7 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from modules.jobs.models import Job, JobAsset
 from modules.jobs.schemas import JobCreate, JobResponse, JobUpdate
 
@@ -24,7 +24,7 @@ async def get_jobs(
     priority: Optional[str] = None,
     assigned_to_user_id: Optional[str] = None,
     site_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of jobs with optional filtering"""
     try:
@@ -53,7 +53,7 @@ async def get_jobs(
 
 
 @router.get("/jobs/{job_id}", response_model=JobResponse)
-async def get_job(job_id: str, db: AsyncSession = Depends(get_db)):
+async def get_job(job_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get job by ID"""
     try:
         result = await db.execute(select(Job).where(Job.id == job_id))
@@ -254,7 +254,7 @@ async def unassign_asset_from_job(
 
 
 @router.get("/jobs/{job_id}/assets")
-async def get_job_assets(job_id: str, db: AsyncSession = Depends(get_db)):
+async def get_job_assets(job_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get assets assigned to a job"""
     try:
         result = await db.execute(
@@ -5,15 +5,17 @@ Location API endpoints
 import asyncio
 import json
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, List, Optional
 
 from fastapi import (APIRouter, Depends, HTTPException, Query, WebSocket,
                      WebSocketDisconnect)
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_read_db
+from modules.archive.cold_store import cold_archive
 from modules.locations.models import EstimatedLocation
+from modules.shared.serialization import FastJSONResponse
 
 router = APIRouter()
 
@@ -22,6 +24,15 @@ router = APIRouter()
 class ConnectionManager:
     def __init__(self) -> None:
         self.active_connections: dict[str, List[WebSocket]] = {}
+        # Bus forwarding updates to sockets held by other workers
+        self.cluster = None
+
+    def attach_cluster(self, bus) -> None:
+        self.cluster = bus
+        bus.register("asset_location", self._deliver_forwarded)
+
+    async def _deliver_forwarded(self, message: dict) -> None:
+        await self._send_local(message["asset_id"], message["location"])
 
     async def connect(self, websocket: WebSocket, asset_id: str) -> None:
         await websocket.accept()
@@ -36,6 +47,13 @@ class ConnectionManager:
                 del self.active_connections[asset_id]
 
     async def send_location_update(self, asset_id: str, location_data: dict) -> None:
+        await self._send_local(asset_id, location_data)
+        if self.cluster is not None:
+            self.cluster.forward(
+                "asset_location", {"asset_id": asset_id, "location": location_data}
+            )
+
+    async def _send_local(self, asset_id: str, location_data: dict) -> None:
         if asset_id in self.active_connections:
             for connection in self.active_connections[asset_id]:
                 try:
@@ -49,7 +67,7 @@ manager = ConnectionManager()
 
 
 @router.get("/locations/{asset_id}/current")
-async def get_current_location(asset_id: str, db: AsyncSession = Depends(get_db)):
+async def get_current_location(asset_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get current location of an asset"""
     try:
         # Get latest location
@@ -105,53 +123,45 @@ async def get_location_history(
     start_time: Optional[str] = None,
     end_time: Optional[str] = None,
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get location history for an asset"""
     try:
-        query = select(EstimatedLocation).where(EstimatedLocation.asset_id == asset_id)
+        # Select plain columns so rows skip ORM identity-map overhead
+        query = select(*EstimatedLocation.__table__.columns).where(
+            EstimatedLocation.asset_id == asset_id
+        )
+        start_dt = datetime.fromisoformat(start_time) if start_time else None
+        end_dt = datetime.fromisoformat(end_time) if end_time else None
 
         # Apply time filters
-        if start_time:
-            start_dt = datetime.fromisoformat(start_time)
+        if start_dt:
             query = query.where(EstimatedLocation.estimated_at >= start_dt)
 
-        if end_time:
-            end_dt = datetime.fromisoformat(end_time)
+        if end_dt:
             query = query.where(EstimatedLocation.estimated_at <= end_dt)
 
         # Order by time and limit
         query = query.order_by(EstimatedLocation.estimated_at.desc()).limit(limit)
 
         result = await db.execute(query)
-        locations = result.scalars().all()
+        locations = result.fetchall()
+
+        history = [location_history_entry(loc) for loc in locations]
+
+        # Ranges older than the hot window fall through to the Parquet archive
+        if len(history) < limit:
+            archived = await cold_archive.history_fallthrough(
+                "estimated_locations",
+                asset_id,
+                start_dt,
+                end_dt,
+                locations[-1].estimated_at if locations else None,
+                limit - len(history),
+            )
+            history.extend(archived_location_entry(row) for row in archived)
 
-        return [
-            {
-                "latitude": float(loc.latitude),
-                "longitude": float(loc.longitude),
-                "altitude": float(loc.altitude) if loc.altitude else None,
-                "uncertainty_radius": float(loc.uncertainty_radius),
-                "confidence": float(loc.confidence),
-                "algorithm": loc.algorithm,
-                "estimated_at": loc.estimated_at.isoformat(),
-                "speed": float(loc.speed) if loc.speed else None,
-                "bearing": float(loc.bearing) if loc.bearing else None,
-                "distance_from_previous": (
-                    float(loc.distance_from_previous)
-                    if loc.distance_from_previous
-                    else None
-                ),
-                "signal_quality_score": (
-                    float(loc.signal_quality_score)
-                    if loc.signal_quality_score
-                    else None
-                ),
-                "gateway_count": loc.gateway_count,
-                "gateway_ids": loc.gateway_ids,
-            }
-            for loc in locations
-        ]
+        return FastJSONResponse(history)
 
     except Exception as e:
         raise HTTPException(
@@ -159,11 +169,53 @@ async def get_location_history(
         )
 
 
+def location_history_entry(loc: Any) -> dict:
+    """History entry for an estimated location row"""
+    return {
+        "latitude": float(loc.latitude),
+        "longitude": float(loc.longitude),
+        "altitude": float(loc.altitude) if loc.altitude else None,
+        "uncertainty_radius": float(loc.uncertainty_radius),
+        "confidence": float(loc.confidence),
+        "algorithm": loc.algorithm,
+        "estimated_at": loc.estimated_at.isoformat(),
+        "speed": float(loc.speed) if loc.speed else None,
+        "bearing": float(loc.bearing) if loc.bearing else None,
+        "distance_from_previous": (
+            float(loc.distance_from_previous) if loc.distance_from_previous else None
+        ),
+        "signal_quality_score": (
+            float(loc.signal_quality_score) if loc.signal_quality_score else None
+        ),
+        "gateway_count": loc.gateway_count,
+        "gateway_ids": loc.gateway_ids,
+    }
+
+
+def archived_location_entry(row: dict) -> dict:
+    """Shape an archived location row like a live history entry"""
+    return {
+        "latitude": row["latitude"],
+        "longitude": row["longitude"],
+        "altitude": row["altitude"],
+        "uncertainty_radius": row["uncertainty_radius"],
+        "confidence": row["confidence"],
+        "algorithm": row["algorithm"],
+        "estimated_at": row["estimated_at"].isoformat(),
+        "speed": row["speed"],
+        "bearing": row["bearing"],
+        "distance_from_previous": row["distance_from_previous"],
+        "signal_quality_score": row["signal_quality_score"],
+        "gateway_count": row["gateway_count"],
+        "gateway_ids": json.loads(row["gateway_ids"]) if row["gateway_ids"] else [],
+    }
+
+
 @router.get("/locations/{asset_id}/track")
 async def get_location_track(
     asset_id: str,
     hours: int = Query(24, ge=1, le=168),
-    db: AsyncSession = Depends(get_db),  # Default 24 hours, max 1 week
+    db: AsyncSession = Depends(get_read_db),  # Default 24 hours, max 1 week
 ):
     """Get location track for an asset over a time period"""
     try:
@@ -223,7 +275,7 @@ async def websocket_location_updates(websocket: WebSocket, asset_id: str) -> Non
 @router.get("/locations/bulk/current")
 async def get_bulk_current_locations(
     asset_ids: str = Query(..., description="Comma-separated asset IDs"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get current locations for multiple assets"""
     try:
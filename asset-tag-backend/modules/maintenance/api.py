@@ -9,7 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from modules.maintenance.models import MaintenanceRecord
 from modules.maintenance.schemas import (MaintenanceCreate,
                                          MaintenanceResponse,
@@ -26,7 +26,7 @@ async def get_maintenance_records(
     priority: Optional[str] = None,
     asset_id: Optional[str] = None,
     maintenance_type: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of maintenance records with optional filtering"""
     try:
@@ -58,7 +58,7 @@ async def get_maintenance_records(
 
 @router.get("/maintenance/{maintenance_id}", response_model=MaintenanceResponse)
 async def get_maintenance_record(
-    maintenance_id: str, db: AsyncSession = Depends(get_db)
+    maintenance_id: str, db: AsyncSession = Depends(get_read_db)
 ):
     """Get maintenance record by ID"""
     try:
@@ -186,7 +186,7 @@ async def delete_maintenance_record(
 async def get_asset_maintenance_history(
     asset_id: str,
     limit: int = Query(50, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get maintenance history for a specific asset"""
     try:
@@ -241,7 +241,7 @@ async def get_asset_maintenance_history(
 
 
 @router.get("/maintenance/overdue")
-async def get_overdue_maintenance(db: AsyncSession = Depends(get_db)):
+async def get_overdue_maintenance(db: AsyncSession = Depends(get_read_db)):
     """Get overdue maintenance records"""
     try:
         current_date = datetime.now().date()
@@ -278,7 +278,7 @@ async def get_overdue_maintenance(db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/maintenance/stats/summary")
-async def get_maintenance_stats(db: AsyncSession = Depends(get_db)):
+async def get_maintenance_stats(db: AsyncSession = Depends(get_read_db)):
     """Get maintenance statistics summary"""
     try:
         # Get counts by status
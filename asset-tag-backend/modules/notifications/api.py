@@ -10,7 +10,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import and_, delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from modules.notifications.models import (NotificationConfig, NotificationLog,
                                           NotificationTemplate)
 from modules.notifications.schemas import (NotificationConfigCreate,
@@ -33,7 +33,7 @@ async def get_notification_configs(
     limit: int = Query(100, ge=1, le=1000),
     level: Optional[str] = None,
     entity_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of notification configurations"""
     try:
@@ -70,7 +70,7 @@ async def get_notification_configs(
     response_model=NotificationConfigResponse,
 )
 async def get_notification_config(
-    level: str, entity_id: str, db: AsyncSession = Depends(get_db)
+    level: str, entity_id: str, db: AsyncSession = Depends(get_read_db)
 ):
     """Get specific notification configuration"""
     try:
@@ -293,7 +293,7 @@ async def get_notifications(
     notification_type: Optional[str] = None,
     channel: Optional[str] = None,
     delivery_status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of notifications"""
     try:
@@ -403,7 +403,7 @@ async def test_notification(
 
 
 @router.get("/notifications/stats", response_model=NotificationStats)
-async def get_notification_stats(db: AsyncSession = Depends(get_db)):
+async def get_notification_stats(db: AsyncSession = Depends(get_read_db)):
     """Get notification statistics"""
     try:
         # Get total notifications
@@ -10,7 +10,8 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
+from modules.archive.cold_store import cold_archive
 from modules.observations.models import Observation, ObservationBatch
 from modules.observations.schemas import (ObservationBatchCreate,
                                           ObservationBatchResponse,
@@ -21,6 +22,7 @@ from modules.observations.schemas import (ObservationBatchCreate,
                                           ObservationResponse,
                                           ObservationStatsResponse,
                                           ObservationUpdate)
+from modules.shared.serialization import RowSerializer
 
 router = APIRouter()
 
@@ -45,6 +47,12 @@ def _observation_to_response(observation: Observation) -> ObservationResponse:
     )
 
 
+# Fast path for list endpoints: result rows map straight to response dicts
+observation_serializer = RowSerializer(
+    ObservationResponse, columns={"metadata": "observation_metadata"}
+)
+
+
 @router.get("/observations", response_model=List[ObservationResponse])
 async def get_observations(
     skip: int = Query(0, ge=0),
@@ -56,11 +64,12 @@ async def get_observations(
     min_rssi: Optional[int] = None,
     max_rssi: Optional[int] = None,
     signal_quality: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of observations with optional filtering"""
     try:
-        query = select(Observation)
+        # Select plain columns so rows skip ORM identity-map overhead
+        query = select(*Observation.__table__.columns)
 
         # Apply filters
         if asset_id:
@@ -84,9 +93,8 @@ async def get_observations(
         query = query.order_by(Observation.observed_at.desc()).offset(skip).limit(limit)
 
         result = await db.execute(query)
-        observations = result.scalars().all()
 
-        return [_observation_to_response(obs) for obs in observations]
+        return observation_serializer.response(result.fetchall())
 
     except Exception as e:
         raise HTTPException(
@@ -95,7 +103,7 @@ async def get_observations(
 
 
 @router.get("/observations/{observation_id}", response_model=ObservationResponse)
-async def get_observation(observation_id: str, db: AsyncSession = Depends(get_db)):
+async def get_observation(observation_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get observation by ID"""
     try:
         result = await db.execute(
@@ -282,7 +290,7 @@ async def update_observation(
 
 @router.get("/observations/asset/{asset_id}/latest")
 async def get_latest_observation_for_asset(
-    asset_id: str, db: AsyncSession = Depends(get_db)
+    asset_id: str, db: AsyncSession = Depends(get_read_db)
 ):
     """Get the latest observation for a specific asset"""
     try:
@@ -315,19 +323,19 @@ async def get_asset_observation_history(
     start_time: Optional[str] = None,
     end_time: Optional[str] = None,
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get observation history for a specific asset"""
     try:
         query = select(Observation).where(Observation.asset_id == asset_id)
+        start_dt = datetime.fromisoformat(start_time) if start_time else None
+        end_dt = datetime.fromisoformat(end_time) if end_time else None
 
         # Apply time filters
-        if start_time:
-            start_dt = datetime.fromisoformat(start_time)
+        if start_dt:
             query = query.where(Observation.observed_at >= start_dt)
 
-        if end_time:
-            end_dt = datetime.fromisoformat(end_time)
+        if end_dt:
             query = query.where(Observation.observed_at <= end_dt)
 
         # Order by time and limit
@@ -336,7 +344,7 @@ async def get_asset_observation_history(
         result = await db.execute(query)
         observations = result.scalars().all()
 
-        return [
+        history = [
             {
                 "id": str(obs.id),
                 "gateway_id": str(obs.gateway_id),
@@ -352,6 +360,34 @@ async def get_asset_observation_history(
             for obs in observations
         ]
 
+        # Ranges older than the hot window fall through to the Parquet archive
+        if len(history) < limit:
+            archived = await cold_archive.history_fallthrough(
+                "observations",
+                asset_id,
+                start_dt,
+                end_dt,
+                observations[-1].observed_at if observations else None,
+                limit - len(history),
+            )
+            history.extend(
+                {
+                    "id": row["id"],
+                    "gateway_id": row["gateway_id"],
+                    "rssi": row["rssi"],
+                    "battery_level": row["battery_level"],
+                    "temperature": row["temperature"],
+                    "observed_at": row["observed_at"].isoformat(),
+                    "received_at": row["received_at"].isoformat(),
+                    "signal_quality": row["signal_quality"],
+                    "noise_level": row["noise_level"],
+                    "metadata": None,
+                }
+                for row in archived
+            )
+
+        return history
+
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -364,7 +400,7 @@ async def get_recent_observations_for_gateway(
     gateway_id: str,
     hours: int = Query(24, ge=1, le=168),  # Default 24 hours, max 1 week
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get recent observations from a specific gateway"""
     try:
@@ -413,7 +449,7 @@ async def get_observation_stats(
     end_time: Optional[str] = None,
     asset_id: Optional[str] = None,
     gateway_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get observation statistics"""
     try:
@@ -536,7 +572,7 @@ async def get_observation_batches(
     processing_status: Optional[str] = None,
     start_time: Optional[str] = None,
     end_time: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get observation batches with optional filtering"""
     try:
@@ -569,7 +605,7 @@ async def get_observation_batches(
 
 
 @router.get("/observations/batches/{batch_id}", response_model=ObservationBatchResponse)
-async def get_observation_batch(batch_id: str, db: AsyncSession = Depends(get_db)):
+async def get_observation_batch(batch_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get observation batch by ID"""
     try:
         result = await db.execute(
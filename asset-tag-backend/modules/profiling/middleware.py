@@ -0,0 +1,55 @@
+"""
+Request profiling middleware
+
+Profiles a request when it carries a valid signed ``X-Profile-Token`` header
+or when an admin has armed profiling for the next requests. The profile ID
+is returned in the ``X-Profile-Id`` response header.
+
+Plain ASGI so the endpoint runs in the same task the profile follows; it is
+added before the other middleware, making it the innermost one.
+"""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from modules.profiling.profiler import (PROFILE_TOKEN_HEADER,
+                                        ProfilingService, profiling_service,
+                                        verify_profile_token)
+
+
+class ProfilingMiddleware:
+    """Captures a sampling profile of selected requests"""
+
+    def __init__(self, app: ASGIApp, service: ProfilingService = None) -> None:
+        self.app = app
+        self.service = service or profiling_service
+
+    def _wants_profile(self, scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_TOKEN_HEADER:
+                return verify_profile_token(value.decode("latin-1"))
+        return self.service.claim_armed_request(scope["path"])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        session = self.service.start_task_profile(
+            "request", f"{scope['method']} {scope['path']}"
+        )
+        profile_id = session.profile.id.encode()
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-profile-id", profile_id)
+                ]
+            await send(message)
+
+        status = "failed"
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+            status = "completed"
+        finally:
+            self.service.finish(session, status)
@@ -0,0 +1,388 @@
+"""
+On-demand sampling profiler
+
+A background thread reads every thread's current stack at a fixed interval
+(``sys._current_frames``) while at least one profile is being captured, and
+attributes each sample to the profiles it belongs to:
+
+- request profiles keep the event loop thread's stack while the request's
+  task is the one running (other requests interleaving on the loop are left
+  out);
+- processor profiles keep any stack that passes through the processor's
+  module, for a fixed number of seconds.
+
+Stacks are aggregated as collapsed ``frame;frame;frame count`` lines, the
+input format of flamegraph.pl and speedscope. When nothing is being profiled
+no thread runs and requests only pay for a header check in the middleware.
+"""
+
+import abc
+import asyncio
+import hashlib
+import hmac
+import importlib.util
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import settings
+
+# Profilable stream processors by name, as importable modules
+PROCESSOR_MODULES = {
+    "location": "streaming.processors.location_processor",
+    "geofence": "streaming.processors.geofence_processor",
+    "anomaly": "streaming.processors.anomaly_processor",
+}
+
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+
+# Deepest stack recorded per sample (frames nearer the root are dropped)
+MAX_STACK_DEPTH = 128
+
+PROJECT_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+Stack = Tuple[str, ...]
+
+
+def _current_task_map() -> Optional[Dict[Any, Any]]:
+    """asyncio's running-task-per-loop map, if this Python exposes it"""
+    return getattr(asyncio.tasks, "_current_tasks", None)
+
+
+def _short_path(filename: str) -> str:
+    for marker in ("site-packages/", "dist-packages/"):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    if filename.startswith(PROJECT_ROOT + os.sep):
+        return filename[len(PROJECT_ROOT) + 1 :]
+    return os.path.basename(filename)
+
+
+_labels: Dict[Any, str] = {}
+
+
+def _label(code) -> str:
+    """``function (path:line)``; ``;`` is the collapsed-format separator"""
+    label = _labels.get(code)
+    if label is None:
+        label = (
+            f"{code.co_name} "
+            f"({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        ).replace(";", ":")
+        _labels[code] = label
+    return label
+
+
+def frame_stack(frame) -> Tuple[Stack, frozenset]:
+    """Root-first stack labels and the set of source files on the stack"""
+    labels: List[str] = []
+    files = set()
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        labels.append(_label(code))
+        files.add(code.co_filename)
+        frame = frame.f_back
+    labels.reverse()
+    return tuple(labels), frozenset(files)
+
+
+@dataclass
+class Profile:
+    """Aggregated samples of one profiling session"""
+
+    kind: str
+    target: str
+    interval_ms: float
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    duration_seconds: Optional[float] = None
+    status: str = "running"
+    task_filtered: bool = True
+    stacks: Counter = field(default_factory=Counter)
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.stacks.values())
+
+    def collapsed(self) -> str:
+        """Flamegraph collapsed-stack text, heaviest stacks first"""
+        return "".join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in self.stacks.most_common()
+        )
+
+    def top_functions(self, limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+        """Functions with the most samples on top (self) and anywhere (total)"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            if not stack:
+                continue
+            own[stack[-1]] += count
+            for label in set(stack):
+                total[label] += count
+        samples = max(self.sample_count, 1)
+        return {
+            name: [
+                {
+                    "function": label,
+                    "samples": count,
+                    "percent": round(100 * count / samples, 1),
+                }
+                for label, count in counter.most_common(limit)
+            ]
+            for name, counter in (("self", own), ("total", total))
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "target": self.target,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_seconds": self.duration_seconds,
+            "interval_ms": self.interval_ms,
+            "samples": self.sample_count,
+            "unique_stacks": len(self.stacks),
+            "task_filtered": self.task_filtered,
+        }
+
+
+class _Session(abc.ABC):
+    """A profile being captured and the samples that belong to it"""
+
+    def __init__(self, profile: Profile) -> None:
+        self.profile = profile
+
+    @abc.abstractmethod
+    def sample(self, stacks, current_tasks) -> None:
+        """Count the sampled stacks that belong to this profile"""
+
+
+class _TaskSession(_Session):
+    """Samples the loop thread while a given task is running on it"""
+
+    def __init__(self, profile: Profile, loop, thread_id: int, task) -> None:
+        super().__init__(profile)
+        self.loop = loop
+        self.thread_id = thread_id
+        self.task = task
+
+    def sample(self, stacks, current_tasks) -> None:
+        if current_tasks is not None and current_tasks.get(self.loop) is not self.task:
+            return
+        found = stacks(self.thread_id)
+        if found is not None:
+            self.profile.stacks[found[0]] += 1
+
+
+class _ModuleSession(_Session):
+    """Samples any thread whose stack passes through a source file"""
+
+    def __init__(self, profile: Profile, filename: str) -> None:
+        super().__init__(profile)
+        self.filename = filename
+
+    def sample(self, stacks, current_tasks) -> None:
+        for thread_id in stacks.thread_ids:
+            stack, files = stacks(thread_id)
+            if self.filename in files:
+                self.profile.stacks[stack] += 1
+
+
+class _StackCache:
+    """Each thread's stack for one sampling tick, built on first request"""
+
+    def __init__(self, frames: Dict[int, Any]) -> None:
+        self.frames = frames
+        self.thread_ids = list(frames)
+        self.built: Dict[int, Tuple[Stack, frozenset]] = {}
+
+    def __call__(self, thread_id: int) -> Optional[Tuple[Stack, frozenset]]:
+        if thread_id not in self.built:
+            frame = self.frames.get(thread_id)
+            if frame is None:
+                return None
+            self.built[thread_id] = frame_stack(frame)
+        return self.built[thread_id]
+
+
+class SamplingProfiler:
+    """One sampling thread shared by all active profiling sessions"""
+
+    def __init__(self, interval_ms: Optional[float] = None) -> None:
+        self.interval_ms = interval_ms or settings.profiling_sample_interval_ms
+        self.sessions: List[_Session] = []
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        self.ticks = 0
+
+    def add(self, session: _Session) -> None:
+        with self.lock:
+            self.sessions.append(session)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self._run, name="sampling-profiler", daemon=True
+                )
+                self.thread.start()
+
+    def remove(self, session: _Session) -> None:
+        # The thread exits on its own once no session is left
+        with self.lock:
+            if session in self.sessions:
+                self.sessions.remove(session)
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        interval = self.interval_ms / 1000
+        while True:
+            with self.lock:
+                sessions = list(self.sessions)
+                if not sessions:
+                    self.thread = None
+                    return
+            frames = sys._current_frames()
+            frames.pop(own_id, None)
+            stacks = _StackCache(frames)
+            current_tasks = _current_task_map()
+            for session in sessions:
+                session.sample(stacks, current_tasks)
+            del frames, stacks
+            self.ticks += 1
+            time.sleep(interval)
+
+
+def sign_profile_token(expires_at: int) -> str:
+    """Token for the ``X-Profile-Token`` header, valid until ``expires_at``"""
+    signature = hmac.new(
+        settings.secret_key.encode(),
+        f"profile:{expires_at}".encode(),
+        hashlib.sha256,
+    ).hexdigest()
+    return f"{expires_at}.{signature}"
+
+
+def verify_profile_token(token: str) -> bool:
+    expires_at, _, signature = token.partition(".")
+    if not expires_at.isdigit() or int(expires_at) < time.time():
+        return False
+    expected = sign_profile_token(int(expires_at)).partition(".")[2]
+    return hmac.compare_digest(signature, expected)
+
+
+class ProfilingService:
+    """Starts profiling sessions and keeps the most recent profiles"""
+
+    def __init__(self) -> None:
+        self.profiler = SamplingProfiler()
+        self.profiles: "OrderedDict[str, Profile]" = OrderedDict()
+        # Requests still to profile after an admin arms request profiling
+        self.armed_requests = 0
+        self.armed_path_prefix = ""
+        self.processor_tasks: Dict[str, asyncio.Task] = {}
+
+    def _store(self, profile: Profile) -> None:
+        self.profiles[profile.id] = profile
+        while len(self.profiles) > settings.profiling_max_profiles:
+            self.profiles.popitem(last=False)
+
+    def get_profile(self, profile_id: str) -> Optional[Profile]:
+        return self.profiles.get(profile_id)
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        return [profile.summary() for profile in reversed(self.profiles.values())]
+
+    # Requests
+
+    def arm_requests(self, count: int, path_prefix: str = "") -> None:
+        """Profile the next ``count`` requests whose path has this prefix"""
+        self.armed_requests = count
+        self.armed_path_prefix = path_prefix
+
+    def claim_armed_request(self, path: str) -> bool:
+        if self.armed_requests <= 0 or not path.startswith(self.armed_path_prefix):
+            return False
+        self.armed_requests -= 1
+        return True
+
+    def start_task_profile(self, kind: str, target: str) -> _TaskSession:
+        """Profile the calling task until ``finish`` is called"""
+        profile = Profile(kind, target, self.profiler.interval_ms)
+        profile.task_filtered = _current_task_map() is not None
+        session = _TaskSession(
+            profile,
+            asyncio.get_running_loop(),
+            threading.get_ident(),
+            asyncio.current_task(),
+        )
+        self._store(profile)
+        self.profiler.add(session)
+        return session
+
+    def finish(self, session: _Session, status: str = "completed") -> Profile:
+        self.profiler.remove(session)
+        profile = session.profile
+        profile.status = status
+        profile.duration_seconds = round(
+            (datetime.now(timezone.utc) - profile.started_at).total_seconds(), 3
+        )
+        return profile
+
+    # Stream processors
+
+    def start_processor_profile(self, name: str, seconds: float) -> Profile:
+        """Profile a stream processor's code for ``seconds`` in the background"""
+        if name not in PROCESSOR_MODULES:
+            raise ValueError(f"Unknown processor: {name}")
+        running = self.processor_tasks.get(name)
+        if running is not None and not running.done():
+            raise RuntimeError(f"Processor {name} is already being profiled")
+
+        spec = importlib.util.find_spec(PROCESSOR_MODULES[name])
+        profile = Profile("processor", name, self.profiler.interval_ms)
+        profile.task_filtered = False
+        session = _ModuleSession(profile, spec.origin)
+        self._store(profile)
+        self.profiler.add(session)
+        self.processor_tasks[name] = asyncio.create_task(
+            self._finish_after(session, seconds)
+        )
+        return profile
+
+    async def _finish_after(self, session: _Session, seconds: float) -> None:
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            self.finish(session, "cancelled")
+            raise
+        self.finish(session)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.profiling_enabled,
+            "interval_ms": self.profiler.interval_ms,
+            "active_sessions": len(self.profiler.sessions),
+            "sampler_running": self.profiler.thread is not None,
+            "armed_requests": self.armed_requests,
+            "armed_path_prefix": self.armed_path_prefix,
+            "stored_profiles": len(self.profiles),
+            "max_profiles": settings.profiling_max_profiles,
+        }
+
+
+# Global profiling service instance
+profiling_service = ProfilingService()
+
+
+async def get_profiling_service() -> ProfilingService:
+    """Get profiling service instance"""
+    return profiling_service
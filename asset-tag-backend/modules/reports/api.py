@@ -2,21 +2,22 @@
 Reports API endpoints
 """
 
-import csv
-import io
-import json
-import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any, Dict, List
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.database import get_db
-from modules.reports.generators import ReportGenerator
-from modules.reports.schemas import (ExportRequest, ExportResponse,
-                                     ReportGenerationRequest,
+from modules.exports.service import deliver_export
+from modules.exports.streaming import get_export_format
+from modules.reports.jobs import (create_scheduled_report, get_report_job,
+                                  list_scheduled_reports, report_job_to_status,
+                                  scheduled_report_to_response,
+                                  submit_report_job)
+from modules.reports.schemas import (ExportRequest, ReportGenerationRequest,
                                      ReportGenerationResponse, ReportStatus,
                                      ReportTemplate, ScheduledReportRequest,
                                      ScheduledReportResponse)
@@ -99,9 +100,6 @@ report_templates = {
     ),
 }
 
-# In-memory report status storage (use Redis/database in production)
-report_statuses: Dict[str, ReportStatus] = {}
-
 
 @router.get("/reports/templates", response_model=List[ReportTemplate])
 async def get_report_templates() -> None:
@@ -119,44 +117,26 @@ async def get_report_template(template_id: str) -> None:
 
 @router.post("/reports/generate", response_model=ReportGenerationResponse)
 async def generate_report(
-    request: ReportGenerationRequest,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db),
+    request: ReportGenerationRequest, db: AsyncSession = Depends(get_db)
 ):
-    """Generate a report (async)"""
+    """Queue a report for the report workers"""
     try:
         # Validate template exists
         if request.template_id not in report_templates:
             raise HTTPException(status_code=404, detail="Report template not found")
 
-        # Generate report ID
-        report_id = str(uuid.uuid4())
-
-        # Create initial status
-        report_status = ReportStatus(
-            id=report_id,
-            template_id=request.template_id,
-            status="pending",
-            created_at=datetime.now(),
-            parameters=request.parameters,
-            progress=0,
-        )
-        report_statuses[report_id] = report_status
-
-        # Start background task
-        background_tasks.add_task(
-            _generate_report_background,
-            report_id,
-            request.template_id,
-            request.parameters,
-            request.format,
-            db,
+        job, reused = await submit_report_job(
+            db, request.template_id, request.format.value, request.parameters
         )
 
         return ReportGenerationResponse(
-            report_id=report_id,
-            status="pending",
-            message="Report generation started",
+            report_id=str(job.id),
+            status=job.status,
+            message=(
+                "Reusing report with identical parameters"
+                if reused
+                else "Report generation queued"
+            ),
         )
 
     except HTTPException:
@@ -168,88 +148,84 @@ async def generate_report(
         )
 
 
+@router.get("/reports/scheduled", response_model=List[ScheduledReportResponse])
+async def get_scheduled_reports(db: AsyncSession = Depends(get_db)):
+    """Get list of scheduled reports"""
+    reports = await list_scheduled_reports(db)
+    return [scheduled_report_to_response(report) for report in reports]
+
+
+@router.post("/reports/schedule", response_model=ScheduledReportResponse)
+async def schedule_report(
+    request: ScheduledReportRequest, db: AsyncSession = Depends(get_db)
+):
+    """Schedule a recurring report"""
+    try:
+        if request.template_id not in report_templates:
+            raise HTTPException(status_code=404, detail="Report template not found")
+
+        report = await create_scheduled_report(db, request)
+        return scheduled_report_to_response(report)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error scheduling report: {str(e)}"
+        )
+
+
 @router.get("/reports/{report_id}", response_model=ReportStatus)
-async def get_report_status(report_id: str) -> None:
+async def get_report_status(report_id: str, db: AsyncSession = Depends(get_db)):
     """Get report generation status"""
-    if report_id not in report_statuses:
+    job = await get_report_job(db, report_id)
+    if not job:
         raise HTTPException(status_code=404, detail="Report not found")
-    return report_statuses[report_id]
+    return report_job_to_status(job)
 
 
 @router.get("/reports/{report_id}/download", response_class=StreamingResponse)
-async def download_report(report_id: str) -> None:
-    """Download generated report"""
-    if report_id not in report_statuses:
+async def download_report(report_id: str, db: AsyncSession = Depends(get_db)):
+    """Stream a generated report from storage"""
+    job = await get_report_job(db, report_id)
+    if not job:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    report_status = report_statuses[report_id]
-
-    if report_status.status != "completed":
+    if job.status != "completed":
         raise HTTPException(status_code=400, detail="Report not ready for download")
 
-    if not report_status.download_url:
+    if not job.storage_key:
         raise HTTPException(status_code=404, detail="Report file not found")
 
-    # TODO: Implement actual file download from storage
-    # For now, return a placeholder response
-    return StreamingResponse(
-        io.StringIO("Report content would be here"),
-        media_type="application/octet-stream",
-        headers={
-            "Content-Disposition": (f"attachment; filename={report_status.filename}")
-        },
-    )
+    from config.storage import storage
 
-
-@router.get("/reports/scheduled", response_model=List[ScheduledReportResponse])
-async def get_scheduled_reports() -> None:
-    """Get list of scheduled reports"""
-    # TODO: Implement scheduled reports functionality
-    return []
-
-
-@router.post("/reports/schedule", response_model=ScheduledReportResponse)
-async def schedule_report(request: ScheduledReportRequest) -> None:
-    """Schedule a recurring report"""
-    # TODO: Implement scheduled reports functionality
-    scheduled_id = str(uuid.uuid4())
-    return ScheduledReportResponse(
-        id=scheduled_id,
-        template_id=request.template_id,
-        schedule=request.schedule,
-        parameters=request.parameters,
-        format=request.format,
-        recipients=request.recipients,
-        created_at=datetime.now(),
-        next_run=datetime.now() + timedelta(days=1),
+    headers = {"Content-Disposition": f"attachment; filename={job.filename}"}
+    if job.size_bytes is not None:
+        headers["Content-Length"] = str(job.size_bytes)
+    return StreamingResponse(
+        storage.iter_file(job.storage_key),
+        media_type=job.media_type or "application/octet-stream",
+        headers=headers,
     )
 
 
-@router.post("/reports/export", response_model=ExportResponse)
-async def export_data(request: ExportRequest, db: AsyncSession = Depends(get_db)):
-    """Export data in various formats"""
+@router.post("/reports/export")
+async def export_data(request: ExportRequest, background_tasks: BackgroundTasks):
+    """Export a dataset, streamed in batches from a server-side cursor"""
     try:
-        # Generate export ID
-        export_id = str(uuid.uuid4())
-
-        # Create export based on type
-        if request.export_type == "csv":
-            content = await _generate_csv_export(request, db)
-            media_type = "text/csv"
-            filename = f"export_{export_id}.csv"
-        elif request.export_type == "json":
-            content = await _generate_json_export(request, db)
-            media_type = "application/json"
-            filename = f"export_{export_id}.json"
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported export format")
-
-        return ExportResponse(
-            export_id=export_id,
-            filename=filename,
-            content=content,
-            media_type=media_type,
-            size=len(content),
+        try:
+            query = _build_export_query(request)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        prefix = f"{request.export_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        return await deliver_export(
+            background_tasks,
+            query,
+            get_export_format(request.format),
+            prefix,
+            request.compress,
+            request.destination,
         )
 
     except HTTPException:
@@ -258,116 +234,62 @@ async def export_data(request: ExportRequest, db: AsyncSession = Depends(get_db)
         raise HTTPException(status_code=500, detail=f"Error exporting data: {str(e)}")
 
 
-async def _generate_report_background(
-    report_id: str,
-    template_id: str,
-    parameters: Dict[str, Any],
-    format: str,
-    db: AsyncSession,
-):
-    """Background task for report generation"""
-    try:
-        # Update status to processing
-        report_statuses[report_id].status = "processing"
-        report_statuses[report_id].progress = 10
-
-        # Get report generator
-        generator = ReportGenerator()
-
-        # Generate report based on template
-        if template_id == "asset_utilization":
-            await generator.generate_asset_utilization_report(parameters, db)
-        elif template_id == "job_performance":
-            await generator.generate_job_performance_report(parameters, db)
-        elif template_id == "maintenance_history":
-            await generator.generate_maintenance_history_report(parameters, db)
-        elif template_id == "alert_summary":
-            await generator.generate_alert_summary_report(parameters, db)
-        elif template_id == "compliance_audit":
-            await generator.generate_compliance_audit_report(parameters, db)
-        else:
-            raise ValueError(f"Unknown template: {template_id}")
-
-        report_statuses[report_id].progress = 80
-
-        # Format report
-        if format == "pdf":
-            # TODO: Implement PDF generation
-            filename = f"report_{report_id}.pdf"
-        elif format == "excel":
-            # TODO: Implement Excel generation
-            filename = f"report_{report_id}.xlsx"
-        else:  # csv
-            filename = f"report_{report_id}.csv"
-
-        # Update status to completed
-        report_statuses[report_id].status = "completed"
-        report_statuses[report_id].progress = 100
-        report_statuses[report_id].completed_at = datetime.now()
-        report_statuses[report_id].download_url = (
-            f"/api/v1/reports/{report_id}/download"
-        )
-        report_statuses[report_id].filename = filename
-
-    except Exception as e:
-        # Update status to failed
-        report_statuses[report_id].status = "failed"
-        report_statuses[report_id].error_message = str(e)
-        report_statuses[report_id].failed_at = datetime.now()
-
-
-async def _generate_csv_export(request: ExportRequest, db: AsyncSession) -> str:
-    """Generate CSV export"""
-    # TODO: Implement actual data export based on request
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Sample data
-    writer.writerow(["ID", "Name", "Type", "Status", "Created"])
-    writer.writerow(["1", "Sample Asset", "Equipment", "Active", "2024-01-01"])
-    writer.writerow(["2", "Another Asset", "Vehicle", "Inactive", "2024-01-02"])
-
-    return output.getvalue()
-
-
-async def _generate_json_export(request: ExportRequest, db: AsyncSession) -> str:
-    """Generate JSON export"""
-    # TODO: Implement actual data export based on request
-    data = {
-        "export_type": request.export_type,
-        "filters": request.filters,
-        "data": [
-            {
-                "id": "1",
-                "name": "Sample Asset",
-                "type": "Equipment",
-                "status": "Active",
-            },
-            {
-                "id": "2",
-                "name": "Another Asset",
-                "type": "Vehicle",
-                "status": "Inactive",
-            },
-        ],
-        "exported_at": datetime.now().isoformat(),
+def _export_models() -> Dict[str, Any]:
+    """Exportable datasets by export_type"""
+    from modules.alerts.models import Alert
+    from modules.assets.models import Asset
+    from modules.jobs.models import Job
+    from modules.locations.models import EstimatedLocation
+    from modules.maintenance.models import MaintenanceRecord
+    from modules.observations.models import Observation
+    from modules.shared.database.models import AuditLog
+
+    return {
+        "assets": Asset,
+        "jobs": Job,
+        "maintenance": MaintenanceRecord,
+        "alerts": Alert,
+        "observations": Observation,
+        "locations": EstimatedLocation,
+        "audit": AuditLog,
     }
 
-    return json.dumps(data, indent=2)
 
+def _build_export_query(request: ExportRequest) -> Select:
+    """Build the column select for an export request"""
+    models = _export_models()
+    model = models.get(request.export_type)
+    if model is None:
+        raise ValueError(
+            f"Unknown export type '{request.export_type}'. "
+            f"Use one of: {', '.join(models)}"
+        )
 
-def _format_as_csv(data: Dict[str, Any]) -> str:
-    """Format report data as CSV"""
-    output = io.StringIO()
-    writer = csv.writer(output)
+    columns = model.__table__.columns
+    if request.fields:
+        unknown = [name for name in request.fields if name not in columns]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        query = select(*(columns[name] for name in request.fields))
+    else:
+        query = select(*columns)
+
+    for key, value in request.filters.items():
+        if key == "start_date":
+            query = query.where(columns["created_at"] >= _parse_datetime(value))
+        elif key == "end_date":
+            query = query.where(columns["created_at"] <= _parse_datetime(value))
+        elif key in columns:
+            if isinstance(value, list):
+                query = query.where(columns[key].in_(value))
+            else:
+                query = query.where(columns[key] == value)
+        else:
+            raise ValueError(f"Unknown filter: {key}")
 
-    # Write headers
-    if "headers" in data:
-        writer.writerow(data["headers"])
+    # Stable order so a restarted export produces the same file
+    return query.order_by(columns["created_at"], columns["id"])
 
-    # Write rows
-    if "rows" in data:
-        for row in data["rows"]:
-            writer.writerow(row)
 
-    return output.getvalue()
+def _parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
@@ -12,6 +12,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 class ReportGenerator:
     """Main report generator class"""
 
+    async def generate(
+        self, template_id: str, parameters: Dict[str, Any], db: AsyncSession
+    ) -> Dict[str, Any]:
+        """Generate the report for a template"""
+        generators = {
+            "asset_utilization": self.generate_asset_utilization_report,
+            "job_performance": self.generate_job_performance_report,
+            "maintenance_history": self.generate_maintenance_history_report,
+            "alert_summary": self.generate_alert_summary_report,
+            "compliance_audit": self.generate_compliance_audit_report,
+        }
+        if template_id not in generators:
+            raise ValueError(f"Unknown template: {template_id}")
+        return await generators[template_id](_parse_date_range(parameters), db)
+
     async def generate_asset_utilization_report(
         self, parameters: Dict[str, Any], db: AsyncSession
     ) -> Dict[str, Any]:
@@ -430,3 +445,16 @@ class ReportGenerator:
 
         except Exception as e:
             raise Exception(f"Error generating compliance audit report: {str(e)}")
+
+
+def _parse_date_range(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse ISO date strings in date_range (parameters arrive as JSON)"""
+    date_range = parameters.get("date_range")
+    if not isinstance(date_range, dict):
+        return parameters
+
+    parsed = dict(date_range)
+    for key in ("start_date", "end_date"):
+        if isinstance(parsed.get(key), str):
+            parsed[key] = datetime.fromisoformat(parsed[key].replace("Z", "+00:00"))
+    return {**parameters, "date_range": parsed}
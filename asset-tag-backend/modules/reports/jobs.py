@@ -0,0 +1,286 @@
+"""
+Durable report job queue
+
+Report requests are stored as rows in ``report_jobs``. Workers claim the
+oldest pending job with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several
+worker processes can share the table, and keep a heartbeat while running so
+jobs of a crashed worker are picked up again. Requests whose template,
+format and parameters match a recent completed (or still running) job reuse
+that job instead of rendering the same report twice.
+
+Scheduled reports are rows in ``scheduled_reports``; a scheduler job queues
+a report job for each one that has come due.
+"""
+
+import hashlib
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from modules.reports.models import ReportJob, ScheduledReport
+from modules.reports.schemas import (ReportStatus, ScheduledReportRequest,
+                                     ScheduledReportResponse)
+from modules.scheduler.cron import CronSchedule
+
+logger = logging.getLogger(__name__)
+
+# Cron expressions (UTC) for the schedule frequencies
+SCHEDULE_CRONS = {
+    "daily": "0 6 * * *",
+    "weekly": "0 6 * * 1",
+    "monthly": "0 6 1 * *",
+    "quarterly": "0 6 1 1,4,7,10 *",
+}
+
+
+def params_hash(template_id: str, format: str, parameters: Dict[str, Any]) -> str:
+    """Stable hash of a report request"""
+    canonical = json.dumps(
+        {"template_id": template_id, "format": format, "parameters": parameters},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def parse_job_id(report_id: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(report_id)
+    except ValueError:
+        return None
+
+
+async def submit_report_job(
+    db: AsyncSession,
+    template_id: str,
+    format: str,
+    parameters: Dict[str, Any],
+    commit: bool = True,
+) -> Tuple[ReportJob, bool]:
+    """Queue a report job, or return a matching one; the flag is True if reused"""
+    digest = params_hash(template_id, format, parameters)
+    fresh_since = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.report_cache_ttl_seconds
+    )
+    result = await db.execute(
+        select(ReportJob)
+        .where(
+            ReportJob.params_hash == digest,
+            or_(
+                ReportJob.status.in_(["pending", "processing"]),
+                and_(
+                    ReportJob.status == "completed",
+                    ReportJob.completed_at >= fresh_since,
+                ),
+            ),
+        )
+        .order_by(ReportJob.created_at.desc())
+        .limit(1)
+    )
+    existing = result.scalar_one_or_none()
+    if existing:
+        return existing, True
+
+    job = ReportJob(
+        template_id=template_id,
+        format=format,
+        parameters=parameters,
+        params_hash=digest,
+        status="pending",
+        progress=0,
+        attempts=0,
+    )
+    db.add(job)
+    if commit:
+        await db.commit()
+        await db.refresh(job)
+    else:
+        await db.flush()
+    return job, False
+
+
+async def get_report_job(db: AsyncSession, report_id: str) -> Optional[ReportJob]:
+    job_id = parse_job_id(report_id)
+    if job_id is None:
+        return None
+    result = await db.execute(select(ReportJob).where(ReportJob.id == job_id))
+    return result.scalar_one_or_none()
+
+
+def report_job_to_status(job: ReportJob) -> ReportStatus:
+    """Convert a report job to its API status"""
+    download_url = None
+    if job.status == "completed":
+        download_url = f"{settings.api_v1_prefix}/reports/{job.id}/download"
+    return ReportStatus(
+        id=str(job.id),
+        template_id=job.template_id,
+        status=job.status,
+        progress=job.progress or 0,
+        created_at=job.created_at,
+        completed_at=job.completed_at,
+        failed_at=job.failed_at,
+        error_message=job.error_message,
+        download_url=download_url,
+        filename=job.filename,
+        parameters=job.parameters or {},
+    )
+
+
+async def claim_next_job(worker_id: str) -> Optional[Dict[str, Any]]:
+    """Claim the oldest runnable job (pending, or abandoned by its worker)"""
+    from config.database import AsyncSessionLocal
+
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=settings.report_job_timeout_seconds)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ReportJob)
+            .where(
+                or_(
+                    ReportJob.status == "pending",
+                    and_(
+                        ReportJob.status == "processing",
+                        ReportJob.heartbeat_at < stale_before,
+                        ReportJob.attempts < settings.report_max_attempts,
+                    ),
+                )
+            )
+            .order_by(ReportJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = result.scalar_one_or_none()
+        if job is None:
+            return None
+
+        if job.status == "processing":
+            logger.warning(f"Reclaiming report job {job.id} from {job.worker_id}")
+        job.status = "processing"
+        job.worker_id = worker_id
+        job.heartbeat_at = now
+        job.started_at = now
+        job.attempts = (job.attempts or 0) + 1
+        job.progress = 5
+        job.error_message = None
+        await db.commit()
+
+        return {
+            "id": str(job.id),
+            "template_id": job.template_id,
+            "format": job.format,
+            "parameters": job.parameters or {},
+        }
+
+
+async def update_report_job(job_id: str, **values: Any) -> None:
+    """Update a job's columns, refreshing its heartbeat"""
+    from config.database import AsyncSessionLocal
+
+    values.setdefault("heartbeat_at", datetime.now(timezone.utc))
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(ReportJob).where(ReportJob.id == uuid.UUID(job_id)).values(**values)
+        )
+        await db.commit()
+
+
+async def fail_abandoned_jobs() -> int:
+    """Fail jobs whose workers died on every allowed attempt"""
+    from config.database import AsyncSessionLocal
+
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=settings.report_job_timeout_seconds)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(ReportJob)
+            .where(
+                ReportJob.status == "processing",
+                ReportJob.heartbeat_at < stale_before,
+                ReportJob.attempts >= settings.report_max_attempts,
+            )
+            .values(
+                status="failed",
+                failed_at=now,
+                error_message="Report worker stopped responding",
+            )
+        )
+        await db.commit()
+        return result.rowcount or 0
+
+
+def scheduled_report_to_response(report: ScheduledReport) -> ScheduledReportResponse:
+    return ScheduledReportResponse(
+        id=str(report.id),
+        template_id=report.template_id,
+        schedule=report.schedule,
+        parameters=report.parameters or {},
+        format=report.format,
+        recipients=report.recipients or [],
+        enabled=report.enabled,
+        cron=report.cron,
+        created_at=report.created_at,
+        next_run=report.next_run,
+        last_run=report.last_run,
+        last_report_id=str(report.last_report_id) if report.last_report_id else None,
+    )
+
+
+async def create_scheduled_report(
+    db: AsyncSession, request: ScheduledReportRequest
+) -> ScheduledReport:
+    """Store a recurring report and compute its first run"""
+    cron = request.cron or SCHEDULE_CRONS[request.schedule.value]
+    report = ScheduledReport(
+        template_id=request.template_id,
+        schedule=request.schedule.value,
+        cron=cron,
+        parameters=request.parameters,
+        format=request.format.value,
+        recipients=request.recipients,
+        enabled=request.enabled,
+        next_run=CronSchedule(cron).next_after(datetime.now(timezone.utc)),
+    )
+    db.add(report)
+    await db.commit()
+    await db.refresh(report)
+    return report
+
+
+async def list_scheduled_reports(db: AsyncSession) -> List[ScheduledReport]:
+    result = await db.execute(
+        select(ScheduledReport).order_by(ScheduledReport.created_at)
+    )
+    return list(result.scalars().all())
+
+
+async def run_due_scheduled_reports() -> int:
+    """Queue a report job for every scheduled report that has come due"""
+    from config.database import AsyncSessionLocal
+
+    now = datetime.now(timezone.utc)
+    queued = 0
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ScheduledReport)
+            .where(ScheduledReport.enabled.is_(True), ScheduledReport.next_run <= now)
+            .with_for_update(skip_locked=True)
+        )
+        for report in result.scalars().all():
+            job, _ = await submit_report_job(
+                db, report.template_id, report.format, report.parameters or {}, False
+            )
+            report.last_run = now
+            report.last_report_id = job.id
+            # Runs missed while nothing was scheduling are not replayed
+            report.next_run = CronSchedule(report.cron).next_after(now)
+            queued += 1
+            logger.info(f"Queued scheduled report {report.id} as job {job.id}")
+        await db.commit()
+    return queued
@@ -0,0 +1,70 @@
+"""
+Report job models
+"""
+
+from sqlalchemy import (JSON, Boolean, Column, DateTime, Index, Integer, String,
+                        Text)
+from sqlalchemy.dialects.postgresql import UUID
+
+from modules.shared.database.base import BaseModel
+
+
+class ReportJob(BaseModel):
+    """Durable report generation job, claimed and executed by report workers"""
+
+    __tablename__ = "report_jobs"
+
+    template_id = Column(String(100), nullable=False)
+    format = Column(String(20), nullable=False)
+    parameters = Column(JSON, default={})
+    # Hash of template, format and parameters, used to reuse finished results
+    params_hash = Column(String(64), nullable=False)
+
+    status = Column(
+        String(20), nullable=False, default="pending"
+    )  # pending, processing, completed, failed
+    progress = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    error_message = Column(Text, nullable=True)
+
+    # Claiming worker and liveness, for recovering jobs of crashed workers
+    worker_id = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Rendered artifact in object storage
+    storage_key = Column(String(500), nullable=True)
+    filename = Column(String(255), nullable=True)
+    media_type = Column(String(100), nullable=True)
+    size_bytes = Column(Integer, nullable=True)
+    row_count = Column(Integer, nullable=True)
+
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    failed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Indexes
+    __table_args__ = (
+        Index("idx_report_job_status", "status", "created_at"),
+        Index("idx_report_job_params", "params_hash", "status"),
+    )
+
+
+class ScheduledReport(BaseModel):
+    """Recurring report, queued as a ReportJob each time it comes due"""
+
+    __tablename__ = "scheduled_reports"
+
+    template_id = Column(String(100), nullable=False)
+    schedule = Column(String(20), nullable=False)  # daily, weekly, monthly, ...
+    cron = Column(String(100), nullable=False)  # Effective cron expression (UTC)
+    parameters = Column(JSON, default={})
+    format = Column(String(20), nullable=False)
+    recipients = Column(JSON, default=[])
+    enabled = Column(Boolean, nullable=False, default=True)
+
+    next_run = Column(DateTime(timezone=True), nullable=True)
+    last_run = Column(DateTime(timezone=True), nullable=True)
+    last_report_id = Column(UUID(as_uuid=True), nullable=True)
+
+    # Indexes
+    __table_args__ = (Index("idx_scheduled_report_due", "enabled", "next_run"),)
@@ -0,0 +1,166 @@
+"""
+Report rendering to files
+
+Runs inside report worker processes, so it only depends on the standard
+library at import time. Report data is first spooled to a JSON-lines file
+(one header record, then one line per row); renderers read the spool back in
+chunks and write the output file incrementally, so neither the worker nor
+the renderer holds a whole report in memory.
+"""
+
+import csv
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List
+
+
+@dataclass(frozen=True)
+class RenderFormat:
+    """Media type and file extension for a rendered report"""
+
+    media_type: str
+    extension: str
+
+
+RENDER_FORMATS: Dict[str, RenderFormat] = {
+    "csv": RenderFormat("text/csv", "csv"),
+    "excel": RenderFormat(
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"
+    ),
+    "pdf": RenderFormat("application/pdf", "pdf"),
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def spool_report(data: Dict[str, Any], spool_path: str) -> int:
+    """Write generator output to a JSON-lines spool file, returning the row count"""
+    rows = data.get("rows", [])
+    with open(spool_path, "w", encoding="utf-8") as f:
+        header = {"headers": data.get("headers", []), "summary": data.get("summary")}
+        f.write(json.dumps(header, default=_json_default) + "\n")
+        for row in rows:
+            f.write(json.dumps(row, default=_json_default) + "\n")
+    return len(rows)
+
+
+def _read_spool(spool_path: str, chunk_rows: int) -> Iterator[Any]:
+    """Yield the header record, then lists of up to chunk_rows rows"""
+    with open(spool_path, encoding="utf-8") as f:
+        yield json.loads(f.readline())
+        chunk: List[Any] = []
+        for line in f:
+            chunk.append(json.loads(line))
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _summary_rows(summary: Any) -> List[List[Any]]:
+    if not isinstance(summary, dict):
+        return []
+    return [[key, value] for key, value in summary.items()]
+
+
+def _render_csv(spool_path: str, output_path: str, chunk_rows: int) -> int:
+    chunks = _read_spool(spool_path, chunk_rows)
+    header = next(chunks)
+    rows = 0
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header["headers"])
+        for chunk in chunks:
+            writer.writerows(chunk)
+            rows += len(chunk)
+    return rows
+
+
+def _render_excel(spool_path: str, output_path: str, chunk_rows: int) -> int:
+    # Write-only workbooks stream rows to disk instead of building a DOM
+    from openpyxl import Workbook
+
+    chunks = _read_spool(spool_path, chunk_rows)
+    header = next(chunks)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Report")
+    sheet.append(header["headers"])
+    rows = 0
+    for chunk in chunks:
+        for row in chunk:
+            sheet.append(row)
+        rows += len(chunk)
+
+    summary = _summary_rows(header.get("summary"))
+    if summary:
+        summary_sheet = workbook.create_sheet("Summary")
+        for row in summary:
+            summary_sheet.append([row[0], json.dumps(row[1], default=str)])
+    workbook.save(output_path)
+    return rows
+
+
+def _render_pdf(spool_path: str, output_path: str, chunk_rows: int) -> int:
+    # Drawn line by line on the canvas; each finished page is flushed
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas
+
+    page_width, page_height = landscape(A4)
+    margin, line_height = 36, 12
+    chunks = _read_spool(spool_path, chunk_rows)
+    header = next(chunks)
+    headers = header["headers"]
+    column_width = (page_width - 2 * margin) / max(len(headers), 1)
+    max_chars = max(int(column_width / 5), 4)
+
+    pdf = canvas.Canvas(output_path, pagesize=(page_width, page_height))
+    y = page_height - margin
+
+    def draw_row(values: List[Any], bold: bool = False) -> None:
+        nonlocal y
+        if y < margin:
+            pdf.showPage()
+            y = page_height - margin
+        pdf.setFont("Helvetica-Bold" if bold else "Helvetica", 8)
+        for index, value in enumerate(values):
+            text = "" if value is None else str(value)
+            pdf.drawString(margin + index * column_width, y, text[:max_chars])
+        y -= line_height
+
+    for row in _summary_rows(header.get("summary")):
+        draw_row(row)
+    if header.get("summary"):
+        y -= line_height
+
+    draw_row(headers, bold=True)
+    rows = 0
+    for chunk in chunks:
+        for row in chunk:
+            draw_row(row)
+        rows += len(chunk)
+    pdf.save()
+    return rows
+
+
+RENDERERS = {
+    "csv": _render_csv,
+    "excel": _render_excel,
+    "pdf": _render_pdf,
+}
+
+
+def render_report(
+    spool_path: str, output_path: str, format: str, chunk_rows: int = 5000
+) -> Dict[str, int]:
+    """Render a spooled report to output_path (runs in a worker process)"""
+    if format not in RENDERERS:
+        raise ValueError(f"Unsupported report format: {format}")
+    rows = RENDERERS[format](spool_path, output_path, chunk_rows)
+    return {"rows": rows, "size": os.path.getsize(output_path)}
@@ -106,6 +106,17 @@ class ScheduledReportRequest(BaseModel):
     format: ReportFormat = Field(default=ReportFormat.CSV, description="Output format")
     recipients: List[str] = Field(default_factory=list, description="Email recipients")
     enabled: bool = Field(default=True, description="Whether schedule is enabled")
+    cron: Optional[str] = Field(
+        None, description="Cron expression (UTC) overriding the schedule frequency"
+    )
+
+    @validator("cron")
+    def validate_cron(cls, v) -> None:
+        if v is not None:
+            from modules.scheduler.cron import CronSchedule
+
+            CronSchedule(v)
+        return v
 
 
 class ScheduledReportResponse(BaseModel):
@@ -118,9 +129,11 @@ class ScheduledReportResponse(BaseModel):
     format: ReportFormat = Field(..., description="Output format")
     recipients: List[str] = Field(..., description="Email recipients")
     enabled: bool = Field(..., description="Whether schedule is enabled")
+    cron: Optional[str] = Field(None, description="Effective cron expression (UTC)")
     created_at: datetime = Field(..., description="Creation timestamp")
     next_run: Optional[datetime] = Field(None, description="Next scheduled run")
     last_run: Optional[datetime] = Field(None, description="Last run timestamp")
+    last_report_id: Optional[str] = Field(None, description="Most recent report ID")
 
 
 class ExportRequest(BaseModel):
@@ -129,17 +142,33 @@ class ExportRequest(BaseModel):
     export_type: str = Field(
         ..., description="Export type (assets, jobs, maintenance, etc.)"
     )
-    format: str = Field(default="csv", description="Export format")
+    format: str = Field(
+        default="csv", description="Export format (csv, json/ndjson, parquet)"
+    )
     filters: Dict[str, Any] = Field(default_factory=dict, description="Export filters")
     fields: Optional[List[str]] = Field(None, description="Specific fields to export")
+    compress: bool = Field(default=True, description="Gzip CSV/NDJSON output")
+    destination: str = Field(
+        default="download",
+        description="download (stream) or storage (upload, then poll the export)",
+    )
 
     @validator("format")
     def validate_format(cls, v) -> None:
-        allowed_formats = ["csv", "json", "excel"]
+        allowed_formats = ["csv", "json", "ndjson", "parquet"]
         if v not in allowed_formats:
             raise ValueError(f'Format must be one of: {", ".join(allowed_formats)}')
         return v
 
+    @validator("destination")
+    def validate_destination(cls, v) -> None:
+        allowed_destinations = ["download", "storage"]
+        if v not in allowed_destinations:
+            raise ValueError(
+                f'Destination must be one of: {", ".join(allowed_destinations)}'
+            )
+        return v
+
 
 class ExportResponse(BaseModel):
     """Schema for export response"""
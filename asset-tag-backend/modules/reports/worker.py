@@ -0,0 +1,250 @@
+"""
+Report worker
+
+Claims jobs from the ``report_jobs`` table, collects report data with
+``ReportGenerator`` and renders the output in a process pool so CSV, Excel
+and PDF rendering never blocks an event loop. Rendered files are uploaded
+to object storage and streamed back by the download endpoint.
+
+Runs inside the API process when ``report_worker_enabled`` is set, or as a
+dedicated worker with ``python -m modules.reports.worker``.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from config.settings import settings
+from modules.reports.jobs import (claim_next_job, fail_abandoned_jobs,
+                                  update_report_job)
+from modules.reports.rendering import (RENDER_FORMATS, render_report,
+                                       spool_report)
+
+logger = logging.getLogger(__name__)
+
+
+class ReportWorker:
+    """Executes queued report jobs with a pool of rendering processes"""
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        spool_dir: Optional[str] = None,
+    ) -> None:
+        self.processes = processes or settings.report_worker_processes
+        self.poll_interval = poll_interval or settings.report_poll_interval_seconds
+        self.spool_dir = Path(spool_dir or settings.report_spool_dir)
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.running = False
+        self.worker_task = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.active: Set[asyncio.Task] = set()
+        self.stats = {"completed": 0, "failed": 0, "reclaimed_failed": 0}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "worker_id": self.worker_id,
+            "running": self.running,
+            "processes": self.processes,
+            "active_jobs": len(self.active),
+        }
+
+    async def start(self) -> None:
+        """Start claiming and running report jobs"""
+        if self.running:
+            return
+
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        # Spawned (not forked) processes do not inherit the event loop or
+        # open database connections
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self.running = True
+        self.worker_task = asyncio.create_task(self._worker_loop())
+        logger.info(
+            f"Report worker {self.worker_id} started with {self.processes} processes"
+        )
+
+    async def stop(self) -> None:
+        """Stop claiming jobs; running jobs are re-queued via their heartbeat"""
+        self.running = False
+        if self.worker_task:
+            self.worker_task.cancel()
+            try:
+                await self.worker_task
+            except asyncio.CancelledError:
+                pass
+
+        for task in list(self.active):
+            task.cancel()
+        if self.active:
+            await asyncio.gather(*self.active, return_exceptions=True)
+
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        logger.info(f"Report worker {self.worker_id} stopped")
+
+    async def _worker_loop(self) -> None:
+        """Claim jobs while there is free rendering capacity"""
+        while self.running:
+            try:
+                self.stats["reclaimed_failed"] += await fail_abandoned_jobs()
+
+                claimed = False
+                while len(self.active) < self.processes:
+                    job = await claim_next_job(self.worker_id)
+                    if job is None:
+                        break
+                    claimed = True
+                    task = asyncio.create_task(self._run_job(job))
+                    self.active.add(task)
+                    task.add_done_callback(self.active.discard)
+
+                if not claimed:
+                    await asyncio.sleep(self.poll_interval)
+                else:
+                    await asyncio.sleep(0)
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in report worker loop: {e}")
+                await asyncio.sleep(max(self.poll_interval, 5))
+
+    async def _heartbeat(self, job_id: str) -> None:
+        interval = max(settings.report_job_timeout_seconds / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await update_report_job(job_id)
+            except Exception as e:
+                logger.warning(f"Report job {job_id} heartbeat failed: {e}")
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        """Collect, render and upload one report"""
+        job_id = job["id"]
+        render_format = RENDER_FORMATS[job["format"]]
+        filename = f"report_{job_id}.{render_format.extension}"
+        spool_path = self.spool_dir / f"{job_id}.jsonl"
+        output_path = self.spool_dir / filename
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+
+        try:
+            data = await self._collect_data(job["template_id"], job["parameters"])
+            await update_report_job(job_id, progress=30)
+
+            await asyncio.to_thread(spool_report, data, str(spool_path))
+            del data
+            await update_report_job(job_id, progress=50)
+
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self.pool,
+                render_report,
+                str(spool_path),
+                str(output_path),
+                job["format"],
+                settings.report_render_chunk_rows,
+            )
+            await update_report_job(job_id, progress=80)
+
+            key = f"reports/{job_id}/{filename}"
+            if not await self._get_storage().upload_local_file(
+                str(output_path), key, render_format.media_type
+            ):
+                raise RuntimeError(f"Failed to upload report {key}")
+
+            await update_report_job(
+                job_id,
+                status="completed",
+                progress=100,
+                storage_key=key,
+                filename=filename,
+                media_type=render_format.media_type,
+                size_bytes=result["size"],
+                row_count=result["rows"],
+                completed_at=datetime.now(timezone.utc),
+            )
+            self.stats["completed"] += 1
+            logger.info(f"Report {job_id} completed: {result['rows']} rows")
+
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back to the queue. If this fails,
+            # it is reclaimed once its heartbeat goes stale.
+            try:
+                await update_report_job(job_id, status="pending", worker_id=None)
+            except Exception:
+                pass
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"Report {job_id} failed: {e}")
+            try:
+                await update_report_job(
+                    job_id,
+                    status="failed",
+                    error_message=str(e),
+                    failed_at=datetime.now(timezone.utc),
+                )
+            except Exception as update_error:
+                logger.error(f"Could not mark report {job_id} failed: {update_error}")
+        finally:
+            heartbeat.cancel()
+            for path in (spool_path, output_path):
+                path.unlink(missing_ok=True)
+
+    async def _collect_data(
+        self, template_id: str, parameters: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        from config.database import analytics_session
+        from modules.reports.generators import ReportGenerator
+
+        async with analytics_session() as db:
+            return await ReportGenerator().generate(template_id, parameters, db)
+
+    def _get_storage(self) -> Any:
+        from config.storage import storage
+
+        return storage
+
+
+# Global report worker instance
+report_worker = ReportWorker()
+
+
+async def get_report_worker() -> ReportWorker:
+    """Get report worker instance"""
+    return report_worker
+
+
+async def run_worker() -> None:
+    """Run a dedicated report worker until interrupted"""
+    await report_worker.start()
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await report_worker.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    try:
+        asyncio.run(run_worker())
+    except KeyboardInterrupt:
+        pass
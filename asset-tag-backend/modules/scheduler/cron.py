@@ -0,0 +1,145 @@
+"""
+Schedules for the periodic job scheduler
+
+``CronSchedule`` parses standard five-field cron expressions (minute, hour,
+day of month, month, day of week) plus the ``@hourly``/``@daily``/... aliases.
+``IntervalSchedule`` fires every N seconds, aligned to the Unix epoch so
+every process computes the same occurrence times. All times are UTC.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, FrozenSet, List, Tuple
+
+CRON_ALIASES: Dict[str, str] = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@quarterly": "0 0 1 1,4,7,10 *",
+    "@yearly": "0 0 1 1 *",
+}
+
+# (name, minimum, maximum) for each cron field
+CRON_FIELDS: List[Tuple[str, int, int]] = [
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+]
+
+# Longest search for a matching minute (covers leap-day-only expressions)
+MAX_SEARCH_DAYS = 366 * 5
+
+
+def _as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _parse_field(spec: str, name: str, low: int, high: int) -> FrozenSet[int]:
+    values = set()
+    for part in spec.split(","):
+        step = 1
+        if "/" in part:
+            part, step_spec = part.split("/", 1)
+            step = int(step_spec)
+            if step < 1:
+                raise ValueError(f"Invalid step in cron {name} field: {spec}")
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_spec, end_spec = part.split("-", 1)
+            start, end = int(start_spec), int(end_spec)
+        else:
+            start = int(part)
+            # "5/15" means every 15 starting at 5
+            end = high if step > 1 else start
+
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron {name} field out of range: {spec}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """Five-field cron expression evaluated in UTC"""
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression.strip()
+        fields = CRON_ALIASES.get(self.expression, self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+
+        parsed = [
+            _parse_field(spec, name, low, high)
+            for spec, (name, low, high) in zip(fields, CRON_FIELDS)
+        ]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # Both 0 and 7 mean Sunday
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        # Standard cron: if both day fields are restricted, either may match
+        self._day_restricted = fields[2] != "*"
+        self._weekday_restricted = fields[4] != "*"
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after ``moment``"""
+        candidate = _as_utc(moment).replace(second=0, microsecond=0) + timedelta(
+            minutes=1
+        )
+        limit = candidate + timedelta(days=MAX_SEARCH_DAYS)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                # First minute of the next month
+                year = candidate.year + candidate.month // 12
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(
+                    year=year, month=month, day=1, hour=0, minute=0
+                )
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+class IntervalSchedule:
+    """Fixed interval, aligned to the epoch so all processes agree on run times"""
+
+    def __init__(self, seconds: float) -> None:
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        return f"IntervalSchedule({self.seconds})"
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First interval boundary strictly after ``moment``"""
+        # Integer microseconds, so float rounding cannot return the input again
+        timestamp_us = round(_as_utc(moment).timestamp() * 1_000_000)
+        interval_us = max(round(self.seconds * 1_000_000), 1)
+        boundary_us = (timestamp_us // interval_us + 1) * interval_us
+        return datetime.fromtimestamp(boundary_us / 1_000_000, tz=timezone.utc)
@@ -0,0 +1,46 @@
+"""
+Built-in periodic jobs
+
+Services with their own lifecycle (alert statistics reconciliation, model
+refresh, geofence cache refresh, anomaly sweeps) register their jobs when
+they start; the jobs below have no owning service.
+"""
+
+from config.settings import settings
+from modules.scheduler.cron import CronSchedule, IntervalSchedule
+from modules.scheduler.scheduler import ScheduledJob, Scheduler
+
+
+async def _queue_scheduled_reports() -> None:
+    from modules.reports.jobs import run_due_scheduled_reports
+
+    await run_due_scheduled_reports()
+
+
+async def _run_archive() -> None:
+    from modules.archive.archiver import run_archive_job
+
+    await run_archive_job()
+
+
+def register_default_jobs(scheduler: Scheduler) -> None:
+    """Register cluster-wide jobs that are not owned by another service"""
+    scheduler.add_job(
+        ScheduledJob(
+            name="scheduled_reports",
+            func=_queue_scheduled_reports,
+            schedule=IntervalSchedule(settings.scheduled_reports_poll_seconds),
+            missed_run_policy="run_once",
+        )
+    )
+
+    if settings.archive_enabled:
+        scheduler.add_job(
+            ScheduledJob(
+                name="cold_archive",
+                func=_run_archive,
+                schedule=CronSchedule(settings.archive_cron),
+                missed_run_policy="run_once",
+                timeout_seconds=6 * 3600,
+            )
+        )
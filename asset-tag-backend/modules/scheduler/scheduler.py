@@ -0,0 +1,368 @@
+"""
+Periodic job scheduler
+
+One scheduler per process keeps a min-heap of next run times and sleeps
+until the earliest one. Jobs marked ``exclusive`` run once per cluster:
+before running an occurrence, a process claims it with a Redis
+``SET NX`` on a key naming the job and its scheduled time, so whichever
+uvicorn worker gets there first runs it and the rest skip it. Jobs that
+refresh per-process state (in-memory caches, loaded models) are not
+exclusive and run in every process.
+
+Runs that are late by more than ``misfire_grace_seconds`` (the process was
+busy, or down when the run was due) follow the job's missed-run policy:
+
+- ``skip``: drop the missed runs and wait for the next one
+- ``run_once``: run once now, then continue from the current time
+- ``catch_up``: run every missed occurrence, oldest first
+"""
+
+import asyncio
+import heapq
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import (Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple,
+                    Union)
+
+from config.settings import settings
+from modules.scheduler.cron import CronSchedule, IntervalSchedule
+
+logger = logging.getLogger(__name__)
+
+MISSED_RUN_POLICIES = ("skip", "run_once", "catch_up")
+
+# Upper bound on occurrences replayed by one catch-up
+MAX_CATCH_UP_RUNS = 100
+
+Schedule = Union[CronSchedule, IntervalSchedule]
+
+
+@dataclass
+class ScheduledJob:
+    """A periodic job and its execution policy"""
+
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    schedule: Schedule
+    exclusive: bool = True  # Once per cluster (Redis lock) vs. every process
+    jitter_seconds: float = 0.0  # Random delay to spread load across processes
+    missed_run_policy: str = "run_once"
+    misfire_grace_seconds: float = 60.0
+    timeout_seconds: float = 3600.0
+    run_on_start: bool = False
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.missed_run_policy not in MISSED_RUN_POLICIES:
+            raise ValueError(
+                f"Unknown missed run policy {self.missed_run_policy!r}; "
+                f"use one of {', '.join(MISSED_RUN_POLICIES)}"
+            )
+        self.stats = {
+            "runs": 0,
+            "failures": 0,
+            "skipped_locked": 0,
+            "skipped_overlap": 0,
+            "missed": 0,
+            "lock_errors": 0,
+            "last_run_at": None,
+            "last_duration_seconds": None,
+            "total_duration_seconds": 0.0,
+            "last_error": None,
+            "next_run_at": None,
+        }
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Scheduler:
+    """Min-heap scheduler with per-occurrence Redis locks for exclusive jobs"""
+
+    def __init__(self, key_prefix: Optional[str] = None) -> None:
+        self.key_prefix = key_prefix or settings.scheduler_key_prefix
+        self.instance_id = (
+            f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        )
+        self.jobs: Dict[str, ScheduledJob] = {}
+        # (fire timestamp, sequence, job, due timestamp)
+        self.heap: List[Tuple[float, int, ScheduledJob, float]] = []
+        self._sequence = 0
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self.running = False
+        self.scheduler_task = None
+
+    @property
+    def client(self) -> Any:
+        from config.cache import cache
+
+        return cache.client if cache.enabled else None
+
+    def add_job(self, job: ScheduledJob) -> ScheduledJob:
+        """Register (or replace) a job; takes effect immediately if running"""
+        if self.jobs.get(job.name) is job:
+            return job
+        self.jobs[job.name] = job
+        if self.running:
+            asyncio.create_task(self._schedule_initial(job))
+        return job
+
+    def remove_job(self, name: str) -> None:
+        """Unregister a job; queued heap entries for it are discarded lazily"""
+        self.jobs.pop(name, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-job execution metrics"""
+        return {
+            "instance_id": self.instance_id,
+            "running": self.running,
+            "locking": "redis" if self.client is not None else "local",
+            "jobs": {
+                name: {
+                    **job.stats,
+                    "schedule": repr(job.schedule),
+                    "exclusive": job.exclusive,
+                    "missed_run_policy": job.missed_run_policy,
+                    "in_flight": name in self._in_flight,
+                }
+                for name, job in self.jobs.items()
+            },
+        }
+
+    async def start(self) -> None:
+        """Start the scheduler loop"""
+        if self.running:
+            return
+
+        if self.client is None:
+            logger.warning(
+                "Redis disabled: exclusive scheduled jobs run in every process"
+            )
+        self._wakeup = asyncio.Event()
+        self.running = True
+        for job in list(self.jobs.values()):
+            await self._schedule_initial(job)
+        self.scheduler_task = asyncio.create_task(self._scheduler_loop())
+        logger.info(f"Scheduler {self.instance_id} started with {len(self.jobs)} jobs")
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Stop scheduling and wait briefly for running jobs"""
+        self.running = False
+        if self.scheduler_task:
+            self.scheduler_task.cancel()
+            try:
+                await self.scheduler_task
+            except asyncio.CancelledError:
+                pass
+
+        if self._tasks:
+            done, pending = await asyncio.wait(list(self._tasks), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        self.heap.clear()
+        logger.info(f"Scheduler {self.instance_id} stopped")
+
+    async def run_now(self, name: str) -> bool:
+        """Trigger a job outside its schedule (still honours the cluster lock)"""
+        job = self.jobs.get(name)
+        if job is None:
+            return False
+        self._start_run(job, [time.time()])
+        return True
+
+    async def _schedule_initial(self, job: ScheduledJob) -> None:
+        """Queue a job's first run, resuming from its last recorded run if known"""
+        now = utcnow()
+        last_due = await self._get_last_run(job) if job.exclusive else None
+        if job.run_on_start and last_due is None:
+            due = now
+        elif last_due is not None:
+            # A past due time is handled by the missed-run policy
+            due = job.schedule.next_after(
+                datetime.fromtimestamp(last_due, tz=timezone.utc)
+            )
+        else:
+            due = job.schedule.next_after(now)
+        self._push(job, due.timestamp())
+
+    def _push(self, job: ScheduledJob, due: float) -> None:
+        jitter = random.uniform(0, job.jitter_seconds) if job.jitter_seconds else 0.0
+        self._sequence += 1
+        heapq.heappush(self.heap, (due + jitter, self._sequence, job, due))
+        job.stats["next_run_at"] = datetime.fromtimestamp(
+            due, tz=timezone.utc
+        ).isoformat()
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _scheduler_loop(self) -> None:
+        """Sleep until the earliest run, then dispatch it"""
+        while self.running:
+            try:
+                self._wakeup.clear()
+                if not self.heap:
+                    await self._wakeup.wait()
+                    continue
+
+                fire_at, _, job, due = self.heap[0]
+                delay = fire_at - time.time()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                heapq.heappop(self.heap)
+                # Entries of removed or replaced jobs are dropped here
+                if self.jobs.get(job.name) is job:
+                    self._dispatch(job, due)
+                # Let the started run begin before the next dispatch
+                await asyncio.sleep(0)
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in scheduler loop: {e}")
+                await asyncio.sleep(1)
+
+    def _dispatch(self, job: ScheduledJob, due: float) -> None:
+        """Run a due occurrence (subject to the missed-run policy) and requeue"""
+        now = utcnow()
+        due_at = datetime.fromtimestamp(due, tz=timezone.utc)
+        late = now.timestamp() - due > job.misfire_grace_seconds + job.jitter_seconds
+
+        if not late:
+            self._start_run(job, [due])
+            self._push(job, job.schedule.next_after(due_at).timestamp())
+            return
+
+        if job.missed_run_policy == "catch_up":
+            # Every occurrence up to now, run back to back in one task
+            dues = [due]
+            next_due = job.schedule.next_after(due_at)
+            while next_due <= now and len(dues) < MAX_CATCH_UP_RUNS:
+                dues.append(next_due.timestamp())
+                next_due = job.schedule.next_after(next_due)
+        else:
+            dues = [due] if job.missed_run_policy == "run_once" else []
+
+        job.stats["missed"] += 1
+        logger.warning(
+            f"Scheduled job {job.name} missed its {due_at.isoformat()} run; "
+            f"{job.missed_run_policy}: running {len(dues)} occurrence(s)"
+        )
+        if dues:
+            self._start_run(job, dues)
+        self._push(job, job.schedule.next_after(now).timestamp())
+
+    def _start_run(self, job: ScheduledJob, dues: List[float]) -> None:
+        if job.name in self._in_flight:
+            # Never overlap runs of the same job within a process
+            job.stats["skipped_overlap"] += 1
+            return
+        task = asyncio.create_task(self._run_occurrences(job, dues))
+        self._in_flight[job.name] = task
+        self._tasks.add(task)
+
+        def done(finished: asyncio.Task) -> None:
+            self._tasks.discard(finished)
+            if self._in_flight.get(job.name) is finished:
+                del self._in_flight[job.name]
+
+        task.add_done_callback(done)
+
+    async def _run_occurrences(self, job: ScheduledJob, dues: List[float]) -> None:
+        for due in dues:
+            await self._run(job, due)
+
+    async def _run(self, job: ScheduledJob, due: float) -> None:
+        """Execute one occurrence, claiming it first if the job is exclusive"""
+        if job.exclusive and not await self._claim(job, due):
+            job.stats["skipped_locked"] += 1
+            return
+
+        started = time.monotonic()
+        job.stats["last_run_at"] = utcnow().isoformat()
+        try:
+            await asyncio.wait_for(job.func(), job.timeout_seconds)
+            job.stats["runs"] += 1
+            job.stats["last_error"] = None
+        except asyncio.TimeoutError:
+            job.stats["failures"] += 1
+            job.stats["last_error"] = f"Timed out after {job.timeout_seconds}s"
+            logger.error(f"Scheduled job {job.name} timed out")
+        except Exception as e:
+            job.stats["failures"] += 1
+            job.stats["last_error"] = str(e)
+            logger.error(f"Scheduled job {job.name} failed: {e}")
+        finally:
+            duration = time.monotonic() - started
+            job.stats["last_duration_seconds"] = round(duration, 3)
+            job.stats["total_duration_seconds"] += duration
+
+        if job.exclusive:
+            await self._set_last_run(job, due)
+
+    async def _claim(self, job: ScheduledJob, due: float) -> bool:
+        """Claim an occurrence cluster-wide; fails open if Redis is unavailable"""
+        client = self.client
+        if client is None:
+            return True
+
+        due_at = datetime.fromtimestamp(due, tz=timezone.utc)
+        period = job.schedule.next_after(due_at).timestamp() - due
+        # Hold the claim past the run so slow processes cannot repeat it
+        ttl = int(max(period, job.timeout_seconds, 60))
+        try:
+            claimed = await client.set(
+                f"{self.key_prefix}:lock:{job.name}:{int(due)}",
+                self.instance_id,
+                nx=True,
+                ex=ttl,
+            )
+            return bool(claimed)
+        except Exception as e:
+            job.stats["lock_errors"] += 1
+            logger.error(f"Could not claim scheduled job {job.name}, running it: {e}")
+            return True
+
+    async def _get_last_run(self, job: ScheduledJob) -> Optional[float]:
+        client = self.client
+        if client is None:
+            return None
+        try:
+            value = await client.get(f"{self.key_prefix}:last_run:{job.name}")
+            return float(value) if value else None
+        except Exception as e:
+            logger.error(f"Could not read last run of {job.name}: {e}")
+            return None
+
+    async def _set_last_run(self, job: ScheduledJob, due: float) -> None:
+        client = self.client
+        if client is None:
+            return
+        try:
+            await client.set(f"{self.key_prefix}:last_run:{job.name}", str(due))
+        except Exception as e:
+            logger.error(f"Could not record last run of {job.name}: {e}")
+
+
+# Global scheduler instance
+scheduler = Scheduler()
+
+
+async def get_scheduler() -> Scheduler:
+    """Get scheduler instance"""
+    return scheduler
@@ -7,9 +7,19 @@ from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-from config.cache import get_cache
+from config.cache import CacheManager, get_cache
+from config.cache_strategies import (cache_key_manager,
+                                     generate_search_results_key)
 from config.elasticsearch import (ElasticsearchManager,
                                   get_elasticsearch_manager)
+from modules.search.queries import (ENTITY_SEARCHES, ENTITY_TYPES,
+                                    build_alert_query, build_asset_query,
+                                    build_gateway_query, build_global_search,
+                                    build_site_query, build_suggestion_query,
+                                    per_index_budget, rank_global_results,
+                                    suggestion_results)
+from modules.search.suggestions import (SUGGESTION_FIELDS, SuggestionService,
+                                        get_suggestion_service)
 
 router = APIRouter()
 
@@ -27,93 +37,14 @@ async def search_assets(
 ):
     """Search assets using Elasticsearch"""
     try:
-        # Build Elasticsearch query
-        query = {
-            "query": {
-                "bool": {
-                    "must": [
-                        {
-                            "multi_match": {
-                                "query": q,
-                                "fields": [
-                                    "name^2",
-                                    "serial_number^2",
-                                    "manufacturer",
-                                    "model",
-                                    "location_description",
-                                ],
-                                "type": "best_fields",
-                                "fuzziness": "AUTO",
-                            }
-                        }
-                    ],
-                    "filter": [],
-                }
-            },
-            "highlight": {
-                "fields": {
-                    "name": {},
-                    "serial_number": {},
-                    "manufacturer": {},
-                    "model": {},
-                }
-            },
-            "sort": [{"_score": {"order": "desc"}}, {"name.keyword": {"order": "asc"}}],
-        }
-
-        # Add filters
-        if asset_type:
-            query["query"]["bool"]["filter"].append(
-                {"term": {"asset_type": asset_type}}
-            )
-
-        if status:
-            query["query"]["bool"]["filter"].append({"term": {"status": status}})
-
-        if site_id:
-            query["query"]["bool"]["filter"].append(
-                {"term": {"current_site_id": site_id}}
-            )
-
-        if manufacturer:
-            query["query"]["bool"]["filter"].append(
-                {"term": {"manufacturer.keyword": manufacturer}}
-            )
-
-        # Execute search
+        query = build_asset_query(q, asset_type, status, site_id, manufacturer)
         response = await es_manager.search_documents("assets", query, size, from_)
 
-        # Process results
-        hits = response.get("hits", {})
-        total = hits.get("total", {}).get("value", 0)
-
-        results = []
-        for hit in hits.get("hits", []):
-            source = hit["_source"]
-            highlight = hit.get("highlight", {})
-
-            result = {
-                "id": source.get("id"),
-                "name": source.get("name"),
-                "serial_number": source.get("serial_number"),
-                "asset_type": source.get("asset_type"),
-                "status": source.get("status"),
-                "manufacturer": source.get("manufacturer"),
-                "model": source.get("model"),
-                "location_description": source.get("location_description"),
-                "battery_level": source.get("battery_level"),
-                "temperature": source.get("temperature"),
-                "score": hit["_score"],
-                "highlight": highlight,
-            }
-            results.append(result)
-
         return {
             "query": q,
-            "total": total,
+            **ENTITY_SEARCHES["assets"].process(response),
             "size": size,
             "from": from_,
-            "results": results,
             "filters": {
                 "asset_type": asset_type,
                 "status": status,
@@ -136,69 +67,14 @@ async def search_sites(
 ):
     """Search sites using Elasticsearch"""
     try:
-        # Build Elasticsearch query
-        query = {
-            "query": {
-                "bool": {
-                    "must": [
-                        {
-                            "multi_match": {
-                                "query": q,
-                                "fields": [
-                                    "name^2",
-                                    "location^2",
-                                    "address",
-                                    "description",
-                                ],
-                                "type": "best_fields",
-                                "fuzziness": "AUTO",
-                            }
-                        }
-                    ],
-                    "filter": [],
-                }
-            },
-            "highlight": {"fields": {"name": {}, "location": {}, "address": {}}},
-            "sort": [{"_score": {"order": "desc"}}, {"name.keyword": {"order": "asc"}}],
-        }
-
-        # Add filters
-        if status:
-            query["query"]["bool"]["filter"].append({"term": {"status": status}})
-
-        # Execute search
+        query = build_site_query(q, status)
         response = await es_manager.search_documents("sites", query, size, from_)
 
-        # Process results
-        hits = response.get("hits", {})
-        total = hits.get("total", {}).get("value", 0)
-
-        results = []
-        for hit in hits.get("hits", []):
-            source = hit["_source"]
-            highlight = hit.get("highlight", {})
-
-            result = {
-                "id": source.get("id"),
-                "name": source.get("name"),
-                "location": source.get("location"),
-                "area": source.get("area"),
-                "status": source.get("status"),
-                "manager": source.get("manager"),
-                "address": source.get("address"),
-                "asset_count": source.get("asset_count"),
-                "personnel_count": source.get("personnel_count"),
-                "score": hit["_score"],
-                "highlight": highlight,
-            }
-            results.append(result)
-
         return {
             "query": q,
-            "total": total,
+            **ENTITY_SEARCHES["sites"].process(response),
             "size": size,
             "from": from_,
-            "results": results,
             "filters": {"status": status},
         }
 
@@ -217,77 +93,14 @@ async def search_gateways(
 ):
     """Search gateways using Elasticsearch"""
     try:
-        # Build Elasticsearch query
-        query = {
-            "query": {
-                "bool": {
-                    "must": [
-                        {
-                            "multi_match": {
-                                "query": q,
-                                "fields": [
-                                    "name^2",
-                                    "gateway_id^2",
-                                    "location_description",
-                                ],
-                                "type": "best_fields",
-                                "fuzziness": "AUTO",
-                            }
-                        }
-                    ],
-                    "filter": [],
-                }
-            },
-            "highlight": {
-                "fields": {"name": {}, "gateway_id": {}, "location_description": {}}
-            },
-            "sort": [{"_score": {"order": "desc"}}, {"name.keyword": {"order": "asc"}}],
-        }
-
-        # Add filters
-        if status:
-            query["query"]["bool"]["filter"].append({"term": {"status": status}})
-
-        if site_id:
-            query["query"]["bool"]["filter"].append({"term": {"site_id": site_id}})
-
-        # Execute search
+        query = build_gateway_query(q, status, site_id)
         response = await es_manager.search_documents("gateways", query, size, from_)
 
-        # Process results
-        hits = response.get("hits", {})
-        total = hits.get("total", {}).get("value", 0)
-
-        results = []
-        for hit in hits.get("hits", []):
-            source = hit["_source"]
-            highlight = hit.get("highlight", {})
-
-            result = {
-                "id": source.get("id"),
-                "gateway_id": source.get("gateway_id"),
-                "name": source.get("name"),
-                "location_description": source.get("location_description"),
-                "latitude": source.get("latitude"),
-                "longitude": source.get("longitude"),
-                "status": source.get("status"),
-                "firmware_version": source.get("firmware_version"),
-                "last_seen": source.get("last_seen"),
-                "signal_strength": source.get("signal_strength"),
-                "battery_level": source.get("battery_level"),
-                "temperature": source.get("temperature"),
-                "site_id": source.get("site_id"),
-                "score": hit["_score"],
-                "highlight": highlight,
-            }
-            results.append(result)
-
         return {
             "query": q,
-            "total": total,
+            **ENTITY_SEARCHES["gateways"].process(response),
             "size": size,
             "from": from_,
-            "results": results,
             "filters": {"status": status, "site_id": site_id},
         }
 
@@ -310,96 +123,14 @@ async def search_alerts(
 ):
     """Search alerts using Elasticsearch"""
     try:
-        # Build Elasticsearch query
-        query = {
-            "query": {
-                "bool": {
-                    "must": [
-                        {
-                            "multi_match": {
-                                "query": q,
-                                "fields": [
-                                    "message^2",
-                                    "description^2",
-                                    "asset_name",
-                                    "reason",
-                                ],
-                                "type": "best_fields",
-                                "fuzziness": "AUTO",
-                            }
-                        }
-                    ],
-                    "filter": [],
-                }
-            },
-            "highlight": {
-                "fields": {"message": {}, "description": {}, "asset_name": {}}
-            },
-            "sort": [
-                {"triggered_at": {"order": "desc"}},
-                {"_score": {"order": "desc"}},
-            ],
-        }
-
-        # Add filters
-        if alert_type:
-            query["query"]["bool"]["filter"].append(
-                {"term": {"alert_type": alert_type}}
-            )
-
-        if severity:
-            query["query"]["bool"]["filter"].append({"term": {"severity": severity}})
-
-        if status:
-            query["query"]["bool"]["filter"].append({"term": {"status": status}})
-
-        if asset_id:
-            query["query"]["bool"]["filter"].append({"term": {"asset_id": asset_id}})
-
-        # Execute search
+        query = build_alert_query(q, alert_type, severity, status, asset_id)
         response = await es_manager.search_documents("alerts", query, size, from_)
 
-        # Process results
-        hits = response.get("hits", {})
-        total = hits.get("total", {}).get("value", 0)
-
-        results = []
-        for hit in hits.get("hits", []):
-            source = hit["_source"]
-            highlight = hit.get("highlight", {})
-
-            result = {
-                "id": source.get("id"),
-                "alert_type": source.get("alert_type"),
-                "severity": source.get("severity"),
-                "status": source.get("status"),
-                "asset_id": source.get("asset_id"),
-                "asset_name": source.get("asset_name"),
-                "message": source.get("message"),
-                "description": source.get("description"),
-                "reason": source.get("reason"),
-                "suggested_action": source.get("suggested_action"),
-                "location_description": source.get("location_description"),
-                "latitude": source.get("latitude"),
-                "longitude": source.get("longitude"),
-                "geofence_id": source.get("geofence_id"),
-                "geofence_name": source.get("geofence_name"),
-                "triggered_at": source.get("triggered_at"),
-                "acknowledged_at": source.get("acknowledged_at"),
-                "resolved_at": source.get("resolved_at"),
-                "resolution_notes": source.get("resolution_notes"),
-                "auto_resolvable": source.get("auto_resolvable"),
-                "score": hit["_score"],
-                "highlight": highlight,
-            }
-            results.append(result)
-
         return {
             "query": q,
-            "total": total,
+            **ENTITY_SEARCHES["alerts"].process(response),
             "size": size,
             "from": from_,
-            "results": results,
             "filters": {
                 "alert_type": alert_type,
                 "severity": severity,
@@ -420,51 +151,45 @@ async def global_search(
     ),
     size: int = Query(20, ge=1, le=100, description="Number of results to return"),
     es_manager: ElasticsearchManager = Depends(get_elasticsearch_manager),
+    cache: CacheManager = Depends(get_cache),
 ):
-    """Global search across all entity types"""
+    """Global search across all entity types, in one multi-search request"""
     try:
         # Parse entity types
         if entity_types:
-            types = [t.strip() for t in entity_types.split(",")]
+            requested = [t.strip() for t in entity_types.split(",")]
+            types = [t for t in requested if t in ENTITY_SEARCHES]
         else:
-            types = ["assets", "sites", "gateways", "alerts"]
+            types = list(ENTITY_TYPES)
 
-        results = {}
-        total_results = 0
-
-        # Search each entity type
-        for entity_type in types:
-            if entity_type == "assets":
-                search_result = await search_assets(
-                    q, size=size // len(types), es_manager=es_manager
-                )
-            elif entity_type == "sites":
-                search_result = await search_sites(
-                    q, size=size // len(types), es_manager=es_manager
-                )
-            elif entity_type == "gateways":
-                search_result = await search_gateways(
-                    q, size=size // len(types), es_manager=es_manager
-                )
-            elif entity_type == "alerts":
-                search_result = await search_alerts(
-                    q, size=size // len(types), es_manager=es_manager
-                )
-            else:
-                continue
+        # Cached results belong to a search generation, bumped on index writes
+        generation = await cache.get_search_generation()
+        cache_key = generate_search_results_key(
+            q, {"entity_types": types, "size": size, "generation": generation}
+        )
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return {**cached, "cached": True}
 
-            results[entity_type] = {
-                "total": search_result["total"],
-                "results": search_result["results"],
-            }
-            total_results += search_result["total"]
+        budget = per_index_budget(size, len(types))
+        responses = await es_manager.multi_search(
+            [(t, build_global_search(q, t, budget)) for t in types]
+        )
+        ranked = rank_global_results(dict(zip(types, responses)), size)
 
-        return {
+        result = {
             "query": q,
-            "total_results": total_results,
+            "total_results": ranked["total_results"],
             "entity_types": types,
-            "results": results,
+            "results": ranked["results"],
+            "ranked": ranked["ranked"],
         }
+        # Failed indices return no hits; do not cache a partial answer
+        if not any(response.get("error") for response in responses):
+            await cache.set(
+                cache_key, result, cache_key_manager.get_ttl("search_results")
+            )
+        return {**result, "cached": False}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in global search: {str(e)}")
@@ -473,35 +198,70 @@ async def global_search(
 @router.get("/search/suggestions")
 async def get_search_suggestions(
     q: str = Query(..., description="Search query for suggestions"),
-    entity_type: str = Query("assets", description="Entity type for suggestions"),
+    organization_id: str = Query(..., description="Organization to suggest from"),
+    entity_type: str = Query(
+        "assets", description="Entity type for suggestions (or 'all')"
+    ),
     size: int = Query(5, ge=1, le=20, description="Number of suggestions"),
     es_manager: ElasticsearchManager = Depends(get_elasticsearch_manager),
+    suggestions_service: SuggestionService = Depends(get_suggestion_service),
 ):
-    """Get search suggestions"""
+    """Get search suggestions from the in-memory prefix index"""
     try:
-        # Build completion query
-        query = {
-            "suggest": {
-                "suggestions": {
-                    "prefix": q,
-                    "completion": {"field": f"{entity_type}_suggest", "size": size},
+        if entity_type == "all":
+            entity_types = list(SUGGESTION_FIELDS)
+        elif entity_type in SUGGESTION_FIELDS:
+            entity_types = [entity_type]
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Suggestions are available for: {', '.join(SUGGESTION_FIELDS)}",
+            )
+
+        if suggestions_service.ready:
+            suggestions = suggestions_service.suggest(
+                q, size, organization_id, set(entity_types)
+            )
+            if suggestions:
+                return {
+                    "query": q,
+                    "entity_type": entity_type,
+                    "suggestions": suggestions,
+                    "source": "memory",
                 }
-            }
-        }
 
-        # Execute search
-        response = await es_manager.search_documents(entity_type, query, size)
+        # No prefix match (likely a typo) or index still building: ask ES
+        suggestions_service.stats["fallbacks"] += 1
+        responses = await es_manager.multi_search(
+            [
+                (
+                    fallback_type,
+                    build_suggestion_query(
+                        q, SUGGESTION_FIELDS[fallback_type], organization_id, size
+                    ),
+                )
+                for fallback_type in entity_types
+            ]
+        )
 
         suggestions = []
-        if "suggest" in response:
-            for suggestion in response["suggest"]["suggestions"]:
-                for option in suggestion.get("options", []):
-                    suggestions.append(
-                        {"text": option["text"], "score": option["_score"]}
-                    )
+        for fallback_type, response in zip(entity_types, responses):
+            suggestions.extend(
+                suggestion_results(
+                    response, fallback_type, SUGGESTION_FIELDS[fallback_type]
+                )
+            )
+        suggestions.sort(key=lambda suggestion: -(suggestion["score"] or 0))
 
-        return {"query": q, "entity_type": entity_type, "suggestions": suggestions}
+        return {
+            "query": q,
+            "entity_type": entity_type,
+            "suggestions": suggestions[:size],
+            "source": "elasticsearch",
+        }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error getting suggestions: {str(e)}"
@@ -511,6 +271,7 @@ async def get_search_suggestions(
 @router.get("/search/stats")
 async def get_search_stats(
     es_manager: ElasticsearchManager = Depends(get_elasticsearch_manager),
+    suggestions_service: SuggestionService = Depends(get_suggestion_service),
 ):
     """Get search index statistics"""
     try:
@@ -520,6 +281,7 @@ async def get_search_stats(
         return {
             "index_stats": stats,
             "cluster_health": health,
+            "suggestions": suggestions_service.get_stats(),
             "timestamp": datetime.now().isoformat(),
         }
 
@@ -0,0 +1,704 @@
+"""
+Change-data-capture indexing of entities into Elasticsearch
+
+SQLAlchemy session hooks record which assets, sites, gateways and alerts a
+transaction inserted, updated or deleted; when it commits, the changes are
+handed to ``search_indexer``. Changes to the same document within the
+coalescing window collapse into one action, and the current row is loaded
+when the batch is shipped, so a burst of battery/temperature updates becomes
+a single index operation. Batches go to the ``_bulk`` API bounded by action
+count and bytes, retrying throttled or failed items with exponential
+back-off.
+
+Changes are held in memory: a crash loses at most one window, and a full
+reindex (``python -m modules.search.indexer reindex``) rebuilds an index
+from the database into a new physical index, then swaps the alias so
+searches never see a partial index. ORM ``update()``/``delete()``
+statements are captured too, by the ids their criteria match; raw ``text()``
+writes carry no entity and call ``record_change`` explicitly.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+
+from config.database import get_db
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest pause between bulk retries
+MAX_BACKOFF_SECONDS = 30.0
+
+# Bulk item statuses worth retrying (throttled or unavailable)
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+SESSION_CHANGES_KEY = "search_index_changes"
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+@dataclass
+class IndexedEntity:
+    """How a model's rows become documents of one index type"""
+
+    index_type: str
+    model_path: str  # "module:Class", imported lazily
+    # Document field -> model attribute
+    fields: Dict[str, str]
+    extra: Optional[Callable[[Any], Dict[str, Any]]] = None
+
+    @property
+    def model(self) -> Any:
+        import importlib
+
+        module_name, class_name = self.model_path.split(":")
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def to_document(self, row: Any) -> Dict[str, Any]:
+        document = {
+            field: _plain(getattr(row, attribute, None))
+            for field, attribute in self.fields.items()
+        }
+        if self.extra:
+            document.update(self.extra(row))
+        return document
+
+    def is_deleted(self, row: Any) -> bool:
+        return getattr(row, "deleted_at", None) is not None
+
+
+def _same(*names: str) -> Dict[str, str]:
+    return {name: name for name in names}
+
+
+def _site_coordinates(row: Any) -> Dict[str, Any]:
+    if row.latitude is None or row.longitude is None:
+        return {}
+    return {"coordinates": {"lat": float(row.latitude), "lon": float(row.longitude)}}
+
+
+INDEXED_ENTITIES: Dict[str, IndexedEntity] = {
+    "assets": IndexedEntity(
+        "assets",
+        "modules.assets.models:Asset",
+        {
+            **_same(
+                "id",
+                "name",
+                "serial_number",
+                "asset_type",
+                "status",
+                "manufacturer",
+                "model",
+                "location_description",
+                "current_site_id",
+                "assigned_to_user_id",
+                "battery_level",
+                "temperature",
+                "purchase_date",
+                "warranty_expiry",
+                "hourly_rate",
+                "availability",
+                "created_at",
+                "updated_at",
+                "organization_id",
+            ),
+            "metadata": "asset_metadata",
+        },
+    ),
+    "sites": IndexedEntity(
+        "sites",
+        "modules.sites.models:Site",
+        {
+            **_same(
+                "id",
+                "name",
+                "location",
+                "area",
+                "status",
+                "radius",
+                "tolerance",
+                "address",
+                "phone",
+                "email",
+                "description",
+                "geofence_id",
+                "created_at",
+                "updated_at",
+                "organization_id",
+            ),
+            "manager": "manager_name",
+        },
+        extra=_site_coordinates,
+    ),
+    "gateways": IndexedEntity(
+        "gateways",
+        "modules.gateways.models:Gateway",
+        {
+            **_same(
+                "id",
+                "gateway_id",
+                "name",
+                "latitude",
+                "longitude",
+                "altitude",
+                "status",
+                "firmware_version",
+                "last_seen",
+                "signal_strength",
+                "battery_level",
+                "site_id",
+                "created_at",
+                "updated_at",
+                "organization_id",
+            ),
+            "metadata": "gateway_metadata",
+        },
+    ),
+    "alerts": IndexedEntity(
+        "alerts",
+        "modules.alerts.models:Alert",
+        _same(
+            "id",
+            "alert_type",
+            "severity",
+            "status",
+            "asset_id",
+            "asset_name",
+            "message",
+            "description",
+            "reason",
+            "suggested_action",
+            "location_description",
+            "latitude",
+            "longitude",
+            "geofence_id",
+            "geofence_name",
+            "triggered_at",
+            "acknowledged_at",
+            "resolved_at",
+            "resolution_notes",
+            "resolved_by_user_id",
+            "auto_resolvable",
+            "created_at",
+            "updated_at",
+            "organization_id",
+        ),
+    ),
+}
+
+
+def bulk_batches(
+    operations: Iterable[List[Dict[str, Any]]], max_actions: int, max_bytes: int
+) -> Iterator[List[List[Dict[str, Any]]]]:
+    """Group actions (each an action line plus optional source) into batches
+
+    A batch closes when it holds ``max_actions`` actions or adding the next
+    one would exceed ``max_bytes`` of NDJSON. An action larger than
+    ``max_bytes`` is sent on its own.
+    """
+    batch: List[List[Dict[str, Any]]] = []
+    batch_bytes = 0
+    for action in operations:
+        size = sum(len(json.dumps(line, default=str)) + 1 for line in action)
+        if batch and (len(batch) >= max_actions or batch_bytes + size > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(action)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def _backoff(attempt: int) -> float:
+    delay = min(0.5 * 2**attempt, MAX_BACKOFF_SECONDS)
+    return delay + random.uniform(0, delay / 2)
+
+
+class SearchIndexer:
+    """Coalesces captured entity changes and ships them with ``_bulk``"""
+
+    def __init__(self) -> None:
+        # (index type, document id) -> "index" | "delete"; last change wins
+        self.pending: Dict[Tuple[str, str], str] = {}
+        self.running = False
+        self.indexer_task = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.stats: Dict[str, Any] = {
+            "captured": 0,
+            "coalesced": 0,
+            "indexed": 0,
+            "deleted": 0,
+            "failed": 0,
+            "retries": 0,
+            "bulk_requests": 0,
+            "last_flush_at": None,
+            "last_error": None,
+        }
+
+    def _get_es_manager(self) -> Any:
+        from config.elasticsearch import elasticsearch_manager
+
+        return elasticsearch_manager
+
+    def enqueue(self, index_type: str, document_id: str, op: str) -> None:
+        """Record a document change; repeated changes within a window merge"""
+        key = (index_type, document_id)
+        if key in self.pending:
+            self.stats["coalesced"] += 1
+        self.pending[key] = op
+        self.stats["captured"] += 1
+        if self._wakeup is not None and (
+            len(self.pending) >= settings.search_bulk_max_actions
+        ):
+            self._wakeup.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "running": self.running, "pending": len(self.pending)}
+
+    async def start(self) -> None:
+        """Capture ORM changes and start the background flush loop"""
+        if self.running:
+            return
+        register_change_capture()
+        self._wakeup = asyncio.Event()
+        self.running = True
+        self.indexer_task = asyncio.create_task(self._indexer_loop())
+        logger.info("Search indexer started")
+
+    async def stop(self) -> None:
+        """Stop the loop, shipping changes that are still pending"""
+        self.running = False
+        if self.indexer_task:
+            self.indexer_task.cancel()
+            try:
+                await self.indexer_task
+            except asyncio.CancelledError:
+                pass
+        if self.pending:
+            await self.flush()
+        logger.info("Search indexer stopped")
+
+    async def _indexer_loop(self) -> None:
+        while self.running:
+            try:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), settings.search_index_coalesce_seconds
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                if self.pending:
+                    await self.flush()
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                logger.error(f"Error in search indexer loop: {e}")
+                await asyncio.sleep(1)
+
+    async def flush(self) -> None:
+        """Ship every pending change, loading current rows for upserts
+
+        If loading or shipping fails, the changes go back into ``pending``
+        unless a newer change to the same document arrived meanwhile.
+        """
+        pending, self.pending = self.pending, {}
+        try:
+            failed, shipped = await self._ship_pending(pending)
+        except BaseException:
+            for key, op in pending.items():
+                self.pending.setdefault(key, op)
+            raise
+
+        # Requeue what could not be shipped unless a newer change arrived
+        for index_type, document_id in failed:
+            self.pending.setdefault((index_type, document_id), "index")
+        self.stats["last_flush_at"] = datetime.now(timezone.utc).isoformat()
+
+        if shipped:
+            from config.cache import cache
+
+            await cache.invalidate_search_cache()
+
+    async def _ship_pending(
+        self, pending: Dict[Tuple[str, str], str]
+    ) -> Tuple[List[Tuple[str, str]], bool]:
+        """Build and ship actions; returns the unshipped keys and whether any went"""
+        by_type: Dict[str, Dict[str, str]] = {}
+        for (index_type, document_id), op in pending.items():
+            by_type.setdefault(index_type, {})[document_id] = op
+
+        es_manager = self._get_es_manager()
+        actions: List[List[Dict[str, Any]]] = []
+        # The primary, so rows reflect the commits that queued them
+        async for db in get_db():
+            for index_type, changes in by_type.items():
+                entity = INDEXED_ENTITIES[index_type]
+                alias = es_manager.indices[index_type]
+                rows = {}
+                upsert_ids = [
+                    uuid.UUID(document_id)
+                    for document_id, op in changes.items()
+                    if op == "index"
+                ]
+                if upsert_ids:
+                    model = entity.model
+                    result = await db.execute(
+                        select(model).where(model.id.in_(upsert_ids))
+                    )
+                    rows = {str(row.id): row for row in result.scalars().all()}
+
+                for document_id in changes:
+                    row = rows.get(document_id)
+                    if row is not None and not entity.is_deleted(row):
+                        actions.append(
+                            [
+                                {"index": {"_index": alias, "_id": document_id}},
+                                entity.to_document(row),
+                            ]
+                        )
+                    else:
+                        actions.append(
+                            [{"delete": {"_index": alias, "_id": document_id}}]
+                        )
+
+        failed = await self.ship(actions)
+        return failed, len(failed) < len(actions)
+
+    async def ship(
+        self, actions: List[List[Dict[str, Any]]], index_type: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
+        """Send actions in bounded batches; returns (index type, id) not shipped"""
+        es_manager = self._get_es_manager()
+        index_types = {name: key for key, name in es_manager.indices.items()}
+        failed: List[Tuple[str, str]] = []
+        for batch in bulk_batches(
+            actions, settings.search_bulk_max_actions, settings.search_bulk_max_bytes
+        ):
+            for action in await self._send_batch(batch):
+                meta = next(iter(action[0].values()))
+                failed_type = index_type or index_types.get(meta["_index"])
+                failed.append((failed_type, meta["_id"]))
+        return failed
+
+    async def _send_batch(
+        self, batch: List[List[Dict[str, Any]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """Bulk-send one batch, retrying throttled items; returns retryable failures"""
+        es_manager = self._get_es_manager()
+        remaining = batch
+        for attempt in range(settings.search_bulk_max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                await asyncio.sleep(_backoff(attempt - 1))
+            try:
+                self.stats["bulk_requests"] += 1
+                response = await es_manager.bulk(
+                    [line for action in remaining for line in action]
+                )
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                logger.warning(f"Bulk request failed (attempt {attempt + 1}): {e}")
+                continue
+
+            retry = []
+            for action, item in zip(remaining, response.get("items", [])):
+                op_type, result = next(iter(item.items()))
+                status = result.get("status", 500)
+                if status < 300 or (op_type == "delete" and status == 404):
+                    self.stats["deleted" if op_type == "delete" else "indexed"] += 1
+                elif status in RETRYABLE_STATUSES:
+                    retry.append(action)
+                else:
+                    # Mapping errors and the like will not succeed on retry
+                    self.stats["failed"] += 1
+                    self.stats["last_error"] = str(result.get("error"))
+                    logger.error(
+                        f"Could not {op_type} document {result.get('_id')}: "
+                        f"{result.get('error')}"
+                    )
+            if not retry:
+                return []
+            remaining = retry
+
+        logger.error(f"Giving up on {len(remaining)} bulk actions after retries")
+        return remaining
+
+    async def reindex(
+        self,
+        index_types: Optional[List[str]] = None,
+        parallelism: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Rebuild indices from the database and swap their aliases"""
+        summary = {}
+        for index_type in index_types or list(INDEXED_ENTITIES):
+            summary[index_type] = await self._reindex_one(
+                index_type,
+                parallelism or settings.search_reindex_parallelism,
+                batch_size or settings.search_reindex_batch_size,
+            )
+        from config.cache import cache
+
+        await cache.invalidate_search_cache()
+        return summary
+
+    async def _reindex_one(
+        self, index_type: str, parallelism: int, batch_size: int
+    ) -> Dict[str, Any]:
+        from config.database import analytics_session
+
+        entity = INDEXED_ENTITIES[index_type]
+        es_manager = self._get_es_manager()
+        alias = es_manager.indices[index_type]
+        started = datetime.now(timezone.utc)
+        new_index = f"{alias}_{started.strftime('%Y%m%d%H%M%S')}"
+        if not await es_manager.create_index(index_type, new_index):
+            # Writing anyway would auto-create the index without its mapping
+            raise RuntimeError(f"Could not create index {new_index}")
+        logger.info(f"Reindexing {index_type} into {new_index}")
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=parallelism * 2)
+        counts = {"documents": 0, "failed": 0}
+
+        async def sender() -> None:
+            while True:
+                actions = await queue.get()
+                try:
+                    if actions is None:
+                        return
+                    failed = await self.ship(actions, index_type)
+                    counts["documents"] += len(actions) - len(failed)
+                    counts["failed"] += len(failed)
+                finally:
+                    queue.task_done()
+
+        senders = [asyncio.create_task(sender()) for _ in range(parallelism)]
+        model = entity.model
+        timer = time.monotonic()
+        try:
+            async with analytics_session() as db:
+                query = select(model).execution_options(yield_per=batch_size)
+                if hasattr(model, "deleted_at"):
+                    query = query.where(model.deleted_at.is_(None))
+                result = await db.stream(query)
+                async for rows in result.scalars().partitions(batch_size):
+                    await queue.put(
+                        [
+                            [
+                                {"index": {"_index": new_index, "_id": str(row.id)}},
+                                entity.to_document(row),
+                            ]
+                            for row in rows
+                        ]
+                    )
+            for _ in senders:
+                await queue.put(None)
+            await asyncio.gather(*senders)
+        except BaseException:
+            for task in senders:
+                task.cancel()
+            await es_manager.delete_index(new_index)
+            raise
+
+        old_indices = await es_manager.swap_alias(index_type, new_index)
+        for old_index in old_indices:
+            await es_manager.delete_index(old_index)
+
+        # Rows changed while the snapshot streamed were written to the old index
+        async with analytics_session() as db:
+            result = await db.execute(
+                select(model.id).where(model.updated_at >= started)
+            )
+            for (document_id,) in result.all():
+                self.enqueue(index_type, str(document_id), "index")
+
+        duration = round(time.monotonic() - timer, 1)
+        logger.info(
+            f"Reindexed {counts['documents']} {index_type} documents into "
+            f"{new_index} in {duration}s ({counts['failed']} failed)"
+        )
+        return {**counts, "index": new_index, "duration_seconds": duration}
+
+
+# Global search indexer instance
+search_indexer = SearchIndexer()
+
+
+async def get_search_indexer() -> SearchIndexer:
+    """Get search indexer instance"""
+    return search_indexer
+
+
+def _entity_for(instance: Any) -> Optional[IndexedEntity]:
+    # Index types are named after their tables
+    return INDEXED_ENTITIES.get(getattr(type(instance), "__tablename__", None))
+
+
+# Called with (index type, document id, op, instance) for committed changes;
+# instance is None for changes written without loading the object
+ChangeListener = Callable[[str, str, str, Any], None]
+change_listeners: List[ChangeListener] = []
+
+
+def add_change_listener(listener: ChangeListener) -> None:
+    """Receive committed entity changes in-process (must not do I/O)"""
+    if listener not in change_listeners:
+        change_listeners.append(listener)
+    register_change_capture()
+
+
+def _capture_flush(session: Session, flush_context: Any) -> None:
+    """Record indexed entities written by this flush until the commit"""
+    changes = session.info.setdefault(SESSION_CHANGES_KEY, {})
+    for instance in list(session.new) + list(session.dirty):
+        entity = _entity_for(instance)
+        if entity and instance.id is not None:
+            changes[(entity.index_type, str(instance.id))] = ("index", instance)
+    for instance in session.deleted:
+        entity = _entity_for(instance)
+        if entity and instance.id is not None:
+            changes[(entity.index_type, str(instance.id))] = ("delete", instance)
+
+
+def record_change(
+    session: Any, index_type: str, document_id: str, op: str = "index"
+) -> None:
+    """Record a change made with raw SQL, published when ``session`` commits"""
+    changes = session.info.setdefault(SESSION_CHANGES_KEY, {})
+    changes[(index_type, document_id)] = (op, None)
+
+
+def _matched_ids(statement: Any, id_column: Any) -> Optional[List[Any]]:
+    """Ids named by ``id == x`` or ``id IN (...)`` criteria, else None"""
+    criteria = statement.whereclause
+    if not (
+        isinstance(criteria, BinaryExpression)
+        and criteria.left is id_column
+        and isinstance(criteria.right, BindParameter)
+        and criteria.right.value is not None
+    ):
+        return None
+    if criteria.operator is operators.eq:
+        return [criteria.right.value]
+    if criteria.operator is operators.in_op:
+        return list(criteria.right.value)
+    return None
+
+
+def _capture_bulk_write(orm_execute_state: Any) -> None:
+    """Record indexed entities written by ORM update()/delete() statements
+
+    The ids come from the statement's criteria when it names them, and from
+    a SELECT with the same criteria otherwise.
+    """
+    state = orm_execute_state
+    if not (state.is_update or state.is_delete):
+        return
+    table = getattr(state.statement, "table", None)
+    entity = INDEXED_ENTITIES.get(getattr(table, "name", None))
+    if entity is None:
+        return
+
+    if isinstance(state.parameters, list):
+        # Bulk UPDATE by primary key: one parameter set per row
+        ids = [params["id"] for params in state.parameters if "id" in params]
+    else:
+        ids = _matched_ids(state.statement, table.c.id)
+        if ids is None:
+            query = select(table.c.id)
+            if state.statement.whereclause is not None:
+                query = query.where(state.statement.whereclause)
+            ids = list(state.session.execute(query, state.parameters).scalars())
+
+    op = "delete" if state.is_delete else "index"
+    changes = state.session.info.setdefault(SESSION_CHANGES_KEY, {})
+    for document_id in ids:
+        changes[(entity.index_type, str(document_id))] = (op, None)
+
+
+def _publish_commit(session: Session) -> None:
+    changes = session.info.pop(SESSION_CHANGES_KEY, {})
+    for (index_type, document_id), (op, instance) in changes.items():
+        if search_indexer.running:
+            search_indexer.enqueue(index_type, document_id, op)
+        for listener in change_listeners:
+            try:
+                listener(index_type, document_id, op, instance)
+            except Exception as e:
+                logger.error(f"Error in search change listener: {e}")
+
+
+def _discard_rollback(session: Session, *args: Any) -> None:
+    session.info.pop(SESSION_CHANGES_KEY, None)
+
+
+def register_change_capture() -> None:
+    """Install the session hooks (idempotent)"""
+    if event.contains(Session, "after_flush", _capture_flush):
+        return
+    event.listen(Session, "do_orm_execute", _capture_bulk_write)
+    event.listen(Session, "after_flush", _capture_flush)
+    event.listen(Session, "after_commit", _publish_commit)
+    event.listen(Session, "after_soft_rollback", _discard_rollback)
+
+
+async def run_reindex(index_types: List[str], parallelism: Optional[int]) -> None:
+    """Rebuild indices from the command line"""
+    from config.elasticsearch import close_elasticsearch
+
+    try:
+        summary = await search_indexer.reindex(index_types or None, parallelism)
+        # Changes seen during the rebuild
+        if search_indexer.pending:
+            await search_indexer.flush()
+        print(json.dumps(summary, indent=2))
+    finally:
+        await close_elasticsearch()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search index maintenance")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    reindex_parser = subcommands.add_parser(
+        "reindex", help="Rebuild indices and swap aliases"
+    )
+    reindex_parser.add_argument(
+        "index_types", nargs="*", help=f"Any of {', '.join(INDEXED_ENTITIES)}"
+    )
+    reindex_parser.add_argument("--parallelism", type=int, default=None)
+    args = parser.parse_args()
+    unknown = set(args.index_types) - set(INDEXED_ENTITIES)
+    if unknown:
+        parser.error(f"Unknown index types: {', '.join(sorted(unknown))}")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(run_reindex(args.index_types, args.parallelism))
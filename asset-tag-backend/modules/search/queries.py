@@ -0,0 +1,304 @@
+"""
+Elasticsearch query builders and result formatting for search endpoints
+
+Each entity type has a query builder and a hit formatter, shared by the
+per-entity endpoints and global search. Global search sends every entity's
+query in one ``_msearch`` request, then merges the hits by normalized score.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+ENTITY_TYPES = ["assets", "sites", "gateways", "alerts"]
+
+
+def _text_query(
+    q: str, fields: List[str], highlight: List[str], filters: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Fuzzy multi-field match with term filters for the non-empty filters"""
+    return {
+        "query": {
+            "bool": {
+                "must": [
+                    {
+                        "multi_match": {
+                            "query": q,
+                            "fields": fields,
+                            "type": "best_fields",
+                            "fuzziness": "AUTO",
+                        }
+                    }
+                ],
+                "filter": [
+                    {"term": {field: value}}
+                    for field, value in filters.items()
+                    if value
+                ],
+            }
+        },
+        "highlight": {"fields": {field: {} for field in highlight}},
+    }
+
+
+def build_asset_query(
+    q: str,
+    asset_type: Optional[str] = None,
+    status: Optional[str] = None,
+    site_id: Optional[str] = None,
+    manufacturer: Optional[str] = None,
+) -> Dict[str, Any]:
+    query = _text_query(
+        q,
+        [
+            "name^2",
+            "serial_number^2",
+            "manufacturer",
+            "model",
+            "location_description",
+        ],
+        ["name", "serial_number", "manufacturer", "model"],
+        {
+            "asset_type": asset_type,
+            "status": status,
+            "current_site_id": site_id,
+            "manufacturer.keyword": manufacturer,
+        },
+    )
+    query["sort"] = [{"_score": {"order": "desc"}}, {"name.keyword": {"order": "asc"}}]
+    return query
+
+
+def build_site_query(q: str, status: Optional[str] = None) -> Dict[str, Any]:
+    query = _text_query(
+        q,
+        ["name^2", "location^2", "address", "description"],
+        ["name", "location", "address"],
+        {"status": status},
+    )
+    query["sort"] = [{"_score": {"order": "desc"}}, {"name.keyword": {"order": "asc"}}]
+    return query
+
+
+def build_gateway_query(
+    q: str, status: Optional[str] = None, site_id: Optional[str] = None
+) -> Dict[str, Any]:
+    query = _text_query(
+        q,
+        ["name^2", "gateway_id^2", "location_description"],
+        ["name", "gateway_id", "location_description"],
+        {"status": status, "site_id": site_id},
+    )
+    query["sort"] = [{"_score": {"order": "desc"}}, {"name.keyword": {"order": "asc"}}]
+    return query
+
+
+def build_alert_query(
+    q: str,
+    alert_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    status: Optional[str] = None,
+    asset_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    query = _text_query(
+        q,
+        ["message^2", "description^2", "asset_name", "reason"],
+        ["message", "description", "asset_name"],
+        {
+            "alert_type": alert_type,
+            "severity": severity,
+            "status": status,
+            "asset_id": asset_id,
+        },
+    )
+    query["sort"] = [
+        {"triggered_at": {"order": "desc"}},
+        {"_score": {"order": "desc"}},
+    ]
+    return query
+
+
+def _result(hit: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    source = hit["_source"]
+    result = {field: source.get(field) for field in fields}
+    result["score"] = hit["_score"]
+    result["highlight"] = hit.get("highlight", {})
+    return result
+
+
+ASSET_FIELDS = [
+    "id",
+    "name",
+    "serial_number",
+    "asset_type",
+    "status",
+    "manufacturer",
+    "model",
+    "location_description",
+    "battery_level",
+    "temperature",
+]
+
+SITE_FIELDS = [
+    "id",
+    "name",
+    "location",
+    "area",
+    "status",
+    "manager",
+    "address",
+    "asset_count",
+    "personnel_count",
+]
+
+GATEWAY_FIELDS = [
+    "id",
+    "gateway_id",
+    "name",
+    "location_description",
+    "latitude",
+    "longitude",
+    "status",
+    "firmware_version",
+    "last_seen",
+    "signal_strength",
+    "battery_level",
+    "temperature",
+    "site_id",
+]
+
+ALERT_FIELDS = [
+    "id",
+    "alert_type",
+    "severity",
+    "status",
+    "asset_id",
+    "asset_name",
+    "message",
+    "description",
+    "reason",
+    "suggested_action",
+    "location_description",
+    "latitude",
+    "longitude",
+    "geofence_id",
+    "geofence_name",
+    "triggered_at",
+    "acknowledged_at",
+    "resolved_at",
+    "resolution_notes",
+    "auto_resolvable",
+]
+
+
+@dataclass
+class EntitySearch:
+    """How one entity type is queried and its hits formatted"""
+
+    build_query: Callable[..., Dict[str, Any]]
+    fields: List[str]
+
+    def to_result(self, hit: Dict[str, Any]) -> Dict[str, Any]:
+        return _result(hit, self.fields)
+
+    def process(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Total and formatted results of a search response"""
+        hits = response.get("hits", {})
+        return {
+            "total": hits.get("total", {}).get("value", 0),
+            "results": [self.to_result(hit) for hit in hits.get("hits", [])],
+        }
+
+
+ENTITY_SEARCHES: Dict[str, EntitySearch] = {
+    "assets": EntitySearch(build_asset_query, ASSET_FIELDS),
+    "sites": EntitySearch(build_site_query, SITE_FIELDS),
+    "gateways": EntitySearch(build_gateway_query, GATEWAY_FIELDS),
+    "alerts": EntitySearch(build_alert_query, ALERT_FIELDS),
+}
+
+
+def per_index_budget(size: int, entity_count: int) -> int:
+    """Hits fetched from each index so any one index can fill its share"""
+    return max(1, math.ceil(size / max(entity_count, 1)))
+
+
+def build_global_search(q: str, entity_type: str, budget: int) -> Dict[str, Any]:
+    """Relevance-ordered query body for one entity type in global search"""
+    query = ENTITY_SEARCHES[entity_type].build_query(q)
+    # Ranked by relevance across indices, so sort by score alone
+    query["sort"] = [{"_score": {"order": "desc"}}]
+    query["size"] = budget
+    query["track_total_hits"] = True
+    return query
+
+
+def build_suggestion_query(
+    q: str, fields: List[str], organization_id: str, size: int
+) -> Dict[str, Any]:
+    """Fuzzy match on suggestion fields within one organization (typo fallback)"""
+    query = _text_query(q, fields, [], {"organization_id": organization_id})
+    del query["highlight"]
+    query["_source"] = fields
+    query["size"] = size
+    return query
+
+
+def suggestion_results(
+    response: Dict[str, Any], entity_type: str, fields: List[str]
+) -> List[Dict[str, Any]]:
+    """Suggestions from fallback hits, shaped like the in-memory ones"""
+    suggestions = []
+    for hit in response.get("hits", {}).get("hits", []):
+        source = hit.get("_source", {})
+        text = next((source[field] for field in fields if source.get(field)), None)
+        if text is not None:
+            suggestions.append(
+                {
+                    "text": text,
+                    "entity_type": entity_type,
+                    "id": hit["_id"],
+                    "score": hit.get("_score"),
+                }
+            )
+    return suggestions
+
+
+def rank_global_results(
+    responses: Dict[str, Dict[str, Any]], size: int
+) -> Dict[str, Any]:
+    """Group hits per entity type and merge them by normalized score
+
+    Raw BM25 scores are not comparable between indices, so each hit's score is
+    divided by its index's best score before merging.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    ranked: List[Dict[str, Any]] = []
+    total_results = 0
+
+    for entity_type, response in responses.items():
+        processed = ENTITY_SEARCHES[entity_type].process(response)
+        results[entity_type] = processed
+        total_results += processed["total"]
+
+        max_score = max(
+            (result["score"] or 0 for result in processed["results"]), default=0
+        )
+        for result in processed["results"]:
+            normalized = (result["score"] or 0) / max_score if max_score else 0.0
+            ranked.append(
+                {
+                    "entity_type": entity_type,
+                    "id": result.get("id"),
+                    "name": result.get("name") or result.get("message"),
+                    "score": result["score"],
+                    "normalized_score": round(normalized, 4),
+                }
+            )
+
+    ranked.sort(key=lambda item: item["normalized_score"], reverse=True)
+    return {
+        "total_results": total_results,
+        "results": results,
+        "ranked": ranked[:size],
+    }
@@ -0,0 +1,369 @@
+"""
+In-process prefix index for search autocomplete
+
+Asset names and serial numbers, site names and gateway names/IDs are kept
+per organization in a sorted array of ``(key, text, entity type, id)``
+entries; a prefix lookup is a binary search plus a short forward scan, so
+suggestions are answered without a network round trip. Names are also
+indexed from each word so "pump" finds "Hydraulic Pump", until the memory
+budget is reached.
+
+The index is built from Postgres at startup and rebuilt periodically, and
+committed ORM changes update it in place through the search change hooks.
+Elasticsearch is only asked when a prefix has no match here (typos).
+"""
+
+import asyncio
+import heapq
+import logging
+import re
+import sys
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Indexed fields per entity type
+SUGGESTION_FIELDS: Dict[str, List[str]] = {
+    "assets": ["name", "serial_number"],
+    "sites": ["name"],
+    "gateways": ["name", "gateway_id"],
+}
+
+# Fields also indexed from each word, not only from their start
+WORD_FIELDS = {"name"}
+
+# Most prefix matches examined per organization for one lookup
+MAX_SCAN = 128
+
+# Rough per-entry cost of the tuple and its list slot
+ENTRY_OVERHEAD_BYTES = 120
+
+WORD_BOUNDARY = re.compile(r"[\s\-_/.,]+")
+
+# (key, text, entity type, entity id, 0 for whole-text keys / 1 for word keys)
+Entry = Tuple[str, str, str, str, int]
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _keys(text: str, words: bool) -> List[str]:
+    """The full normalized text, then (optionally) its suffixes at each word"""
+    full = normalize(text)
+    keys = [full] if full else []
+    if words:
+        for match in WORD_BOUNDARY.finditer(full):
+            rest = full[match.end() :]
+            if rest:
+                keys.append(rest)
+    return keys
+
+
+class PrefixIndex:
+    """Sorted-array prefix index, one array per organization"""
+
+    def __init__(self, memory_budget_bytes: Optional[int] = None) -> None:
+        self.memory_budget_bytes = (
+            memory_budget_bytes
+            if memory_budget_bytes is not None
+            else settings.search_suggestions_memory_mb * 1024 * 1024
+        )
+        self.entries: Dict[str, List[Entry]] = {}
+        # (entity type, id) -> (organization, entries) for in-place updates
+        self.by_entity: Dict[Tuple[str, str], Tuple[str, List[Entry]]] = {}
+        self.memory_bytes = 0
+        self.truncated = False
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.entries.values())
+
+    def _entries_for(
+        self, entity_type: str, entity_id: str, values: Dict[str, Optional[str]]
+    ) -> List[Entry]:
+        entries = []
+        for field, text in values.items():
+            if not text:
+                continue
+            text = str(text)
+            for position, key in enumerate(_keys(text, field in WORD_FIELDS)):
+                size = sys.getsizeof(key) + ENTRY_OVERHEAD_BYTES
+                # Whole-text keys are always kept; word keys only within budget
+                if position and self.memory_bytes + size > self.memory_budget_bytes:
+                    self.truncated = True
+                    break
+                self.memory_bytes += size
+                entries.append((key, text, entity_type, entity_id, min(position, 1)))
+        return entries
+
+    def load(
+        self, rows: Iterable[Tuple[str, str, str, Dict[str, Optional[str]]]]
+    ) -> None:
+        """Bulk-load ``(entity type, id, organization, values)`` rows"""
+        for entity_type, entity_id, organization_id, values in rows:
+            entries = self._entries_for(entity_type, entity_id, values)
+            self.entries.setdefault(organization_id, []).extend(entries)
+            self.by_entity[(entity_type, entity_id)] = (organization_id, entries)
+        for entries in self.entries.values():
+            entries.sort()
+
+    def add(
+        self,
+        entity_type: str,
+        entity_id: str,
+        organization_id: str,
+        values: Dict[str, Optional[str]],
+    ) -> None:
+        """Insert or replace one entity's entries"""
+        self.remove(entity_type, entity_id)
+        entries = self._entries_for(entity_type, entity_id, values)
+        shard = self.entries.setdefault(organization_id, [])
+        for entry in entries:
+            insort(shard, entry)
+        self.by_entity[(entity_type, entity_id)] = (organization_id, entries)
+
+    def remove(self, entity_type: str, entity_id: str) -> None:
+        found = self.by_entity.pop((entity_type, entity_id), None)
+        if found is None:
+            return
+        organization_id, entries = found
+        shard = self.entries.get(organization_id, [])
+        for entry in entries:
+            position = bisect_left(shard, entry)
+            if position < len(shard) and shard[position] == entry:
+                del shard[position]
+                self.memory_bytes -= sys.getsizeof(entry[0]) + ENTRY_OVERHEAD_BYTES
+
+    def suggest(
+        self,
+        prefix: str,
+        size: int,
+        organization_id: str,
+        entity_types: Optional[Set[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Top ``size`` matches in one organization, whole-text matches first"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        shard = self.entries.get(organization_id, [])
+
+        best: Dict[Tuple[str, str, str], Tuple[int, int, str]] = {}
+        position = bisect_left(shard, (prefix,))
+        end = min(position + MAX_SCAN, len(shard))
+        while position < end and shard[position][0].startswith(prefix):
+            _, text, entity_type, entity_id, word = shard[position]
+            position += 1
+            if entity_types and entity_type not in entity_types:
+                continue
+            rank = (word, len(text), text)
+            identity = (entity_type, entity_id, text)
+            if identity not in best or rank < best[identity]:
+                best[identity] = rank
+
+        top = heapq.nsmallest(size, best.items(), key=lambda item: item[1])
+        return [
+            {
+                "text": text,
+                "entity_type": entity_type,
+                "id": entity_id,
+                "score": round(len(prefix) / max(len(text), 1), 3),
+            }
+            for (entity_type, entity_id, text), _ in top
+        ]
+
+
+class SuggestionService:
+    """Keeps the prefix index built and current"""
+
+    def __init__(self) -> None:
+        self.index = PrefixIndex()
+        self.ready = False
+        self.running = False
+        self.build_task = None
+        # The startup build and the periodic job must not overlap
+        self._build_lock = asyncio.Lock()
+        # Changes seen while a rebuild snapshot loads, replayed after the swap
+        self._changes_during_build: Optional[List[Tuple[str, str, str, Any]]] = None
+        self.stats: Dict[str, Any] = {
+            "lookups": 0,
+            "fallbacks": 0,
+            "updates": 0,
+            "last_build_seconds": None,
+            "last_build_at": None,
+        }
+
+    async def start(self) -> None:
+        """Build the index in the background and follow entity changes"""
+        from modules.scheduler.cron import IntervalSchedule
+        from modules.scheduler.scheduler import ScheduledJob, scheduler
+        from modules.search.indexer import add_change_listener
+
+        if self.running:
+            return
+        self.running = True
+        add_change_listener(self.on_change)
+        self.build_task = asyncio.create_task(self.rebuild())
+        # Catches writes that bypassed the ORM hooks
+        scheduler.add_job(
+            ScheduledJob(
+                name="search_suggestions_rebuild",
+                func=self.rebuild,
+                schedule=IntervalSchedule(settings.search_suggestions_rebuild_seconds),
+                exclusive=False,
+                jitter_seconds=60,
+                missed_run_policy="skip",
+            )
+        )
+        logger.info("Search suggestion index started")
+
+    async def stop(self) -> None:
+        from modules.scheduler.scheduler import scheduler
+
+        self.running = False
+        scheduler.remove_job("search_suggestions_rebuild")
+        if self.build_task and not self.build_task.done():
+            self.build_task.cancel()
+            try:
+                await self.build_task
+            except asyncio.CancelledError:
+                pass
+
+    async def rebuild(self) -> None:
+        """Load every suggestible entity and swap in a fresh index
+
+        Skipped when a rebuild is already running; that one sees the same
+        changes.
+        """
+        if self._build_lock.locked():
+            logger.info("Suggestion index rebuild already running; skipping")
+            return
+
+        async with self._build_lock:
+            await self._rebuild()
+
+    async def _rebuild(self) -> None:
+        started = time.monotonic()
+        self._changes_during_build = []
+        try:
+            rows = await self._load_rows()
+            index = PrefixIndex()
+            index.load(rows)
+            self.index = index
+            for change in self._changes_during_build:
+                self._apply(*change)
+        finally:
+            self._changes_during_build = None
+
+        self.ready = True
+        self.stats["last_build_seconds"] = round(time.monotonic() - started, 3)
+        self.stats["last_build_at"] = datetime.now(timezone.utc).isoformat()
+        if self.index.truncated:
+            logger.warning(
+                "Suggestion index reached its memory budget; "
+                "some word-prefix matches are not indexed"
+            )
+        logger.info(
+            f"Built suggestion index with {len(self.index)} entries "
+            f"in {self.stats['last_build_seconds']}s"
+        )
+
+    async def _load_rows(self) -> List[Tuple[str, str, str, Dict[str, Any]]]:
+        from sqlalchemy import select
+
+        from config.database import ReadSessionLocal
+        from modules.assets.models import Asset
+        from modules.gateways.models import Gateway
+        from modules.sites.models import Site
+
+        models = {"assets": Asset, "sites": Site, "gateways": Gateway}
+        rows = []
+        async with ReadSessionLocal() as db:
+            for entity_type, model in models.items():
+                fields = SUGGESTION_FIELDS[entity_type]
+                result = await db.execute(
+                    select(
+                        model.id,
+                        model.organization_id,
+                        *[getattr(model, field) for field in fields],
+                    ).where(model.deleted_at.is_(None))
+                )
+                for row in result.all():
+                    rows.append(
+                        (
+                            entity_type,
+                            str(row[0]),
+                            str(row[1]),
+                            dict(zip(fields, row[2:])),
+                        )
+                    )
+        return rows
+
+    def on_change(
+        self, index_type: str, entity_id: str, op: str, instance: Any
+    ) -> None:
+        """Apply a committed entity change (from the search change hooks)"""
+        if index_type not in SUGGESTION_FIELDS:
+            return
+        if instance is None:
+            # Written with SQL: only a delete can be applied without the row
+            if op != "delete":
+                return
+            change = (index_type, entity_id, op, None)
+        else:
+            # Only already-loaded attributes: loading would need the database
+            state = vars(instance)
+            values = {
+                field: state.get(field) for field in SUGGESTION_FIELDS[index_type]
+            }
+            if op == "delete" or state.get("deleted_at") is not None:
+                op = "delete"
+            elif "organization_id" not in state or not any(values.values()):
+                return
+            organization_id = str(state.get("organization_id"))
+            change = (index_type, entity_id, op, (organization_id, values))
+        if self._changes_during_build is not None:
+            self._changes_during_build.append(change)
+        self._apply(*change)
+
+    def _apply(self, entity_type: str, entity_id: str, op: str, payload: Any) -> None:
+        self.stats["updates"] += 1
+        if op == "delete":
+            self.index.remove(entity_type, entity_id)
+            return
+        organization_id, values = payload
+        self.index.add(entity_type, entity_id, organization_id, values)
+
+    def suggest(
+        self,
+        prefix: str,
+        size: int,
+        organization_id: str,
+        entity_types: Optional[Set[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        self.stats["lookups"] += 1
+        return self.index.suggest(prefix, size, organization_id, entity_types)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "ready": self.ready,
+            "entries": len(self.index),
+            "organizations": len(self.index.entries),
+            "memory_bytes": self.index.memory_bytes,
+            "memory_budget_bytes": self.index.memory_budget_bytes,
+            "truncated": self.index.truncated,
+        }
+
+
+# Global suggestion service instance
+suggestion_service = SuggestionService()
+
+
+async def get_suggestion_service() -> SuggestionService:
+    """Get suggestion service instance"""
+    return suggestion_service
@@ -17,6 +17,7 @@ from modules.jobs.models import Job
 from modules.locations.models import EstimatedLocation
 from modules.maintenance.models import MaintenanceRecord
 from modules.observations.models import Observation
+from modules.reports.models import ReportJob, ScheduledReport  # noqa: F401
 from modules.shared.database.base import (BaseModel, OrganizationMixin,
                                           SoftDeleteMixin)
 from modules.sites.models import Site
@@ -0,0 +1,359 @@
+"""
+HTTP response caching with ETags for read-heavy dashboard endpoints
+
+Every committed session write, ORM or raw SQL, bumps a version counter for
+the written table (Redis hash ``http:versions``). A cached route's ETag is
+derived from its path, query parameters, organization, the versions of the
+tables it reads and the current TTL period, so:
+
+- ``If-None-Match`` with the current ETag is answered with 304 after one
+  Redis round trip, without running the endpoint;
+- otherwise the rendered body is served from Redis when another client has
+  already rendered it, and stored there (``dashboard_metrics`` TTL) when not;
+- a write to any table a route reads changes its ETag at once, and the TTL
+  period in the ETag bounds staleness from data no counter covers (location
+  history, time windows such as "last 30 days").
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.cache import CacheManager, get_cache
+from config.cache_strategies import cache_key_manager, generate_http_response_key
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Cached GET routes (below the API prefix) and the tables their bodies read
+CACHED_ROUTES: Dict[str, Tuple[str, ...]] = {
+    "/analytics/summary": ("assets",),
+    "/sites/stats": ("sites", "assets", "personnel"),
+    "/alerts/statistics": ("alerts",),
+    "/geofences/stats": ("geofences",),
+    "/assets": ("assets", "sites"),
+    "/alerts": ("alerts",),
+    "/geofences": ("geofences",),
+    "/sites": ("sites",),
+}
+
+VERSIONED_TABLES: Set[str] = {
+    table for tables in CACHED_ROUTES.values() for table in tables
+}
+
+SESSION_TABLES_KEY = "http_cache_tables"
+
+# Target tables of raw text() writes, which carry no table metadata
+TEXT_WRITE_PATTERN = re.compile(
+    r'\b(?:UPDATE|INSERT\s+INTO|DELETE\s+FROM)\s+"?(\w+)', re.IGNORECASE
+)
+
+# Shared by middleware instances, reported by the admin API
+http_cache_stats: Dict[str, int] = {
+    "not_modified": 0,
+    "hits": 0,
+    "misses": 0,
+    "stored": 0,
+}
+
+
+class EntityVersions:
+    """Per-table write counters in Redis, in-process when Redis is disabled"""
+
+    def __init__(self) -> None:
+        self.local: Dict[str, Tuple[int, float]] = {}
+        self.pending: Set[asyncio.Task] = set()
+
+    async def _cache(self) -> CacheManager:
+        return await get_cache()
+
+    def bump_soon(self, tables: Set[str]) -> None:
+        """Schedule a bump from synchronous code (the commit hook)"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Scripts without a running loop: nothing is cached in-process
+            return
+        task = loop.create_task(self.bump(sorted(tables)))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def bump(self, tables: List[str]) -> None:
+        now = time.time()
+        for table in tables:
+            version, _ = self.local.get(table, (0, 0.0))
+            self.local[table] = (version + 1, now)
+        cache = await self._cache()
+        await cache.bump_entity_versions(tables)
+
+    async def get(self, tables: Tuple[str, ...]) -> Dict[str, Tuple[int, float]]:
+        """Versions of ``tables``, after this process's own bumps have landed"""
+        if self.pending:
+            await asyncio.gather(*list(self.pending), return_exceptions=True)
+        cache = await self._cache()
+        versions = await cache.get_entity_versions(list(tables))
+        if versions is None:
+            return {table: self.local.get(table, (0, 0.0)) for table in tables}
+        return versions
+
+
+entity_versions = EntityVersions()
+
+
+def _statement_table(orm_execute_state: Any) -> Optional[str]:
+    table = getattr(orm_execute_state.statement, "table", None)
+    return getattr(table, "name", None)
+
+
+def _capture_bulk_write(orm_execute_state: Any) -> None:
+    """Record tables written by ORM update()/delete()/insert() or raw SQL"""
+    state = orm_execute_state
+    if isinstance(state.statement, TextClause):
+        written = {
+            table.lower() for table in TEXT_WRITE_PATTERN.findall(state.statement.text)
+        }
+    elif state.is_update or state.is_delete or state.is_insert:
+        written = {_statement_table(state)}
+    else:
+        return
+    tables = written & VERSIONED_TABLES
+    if tables:
+        state.session.info.setdefault(SESSION_TABLES_KEY, set()).update(tables)
+
+
+def _capture_flush(session: Session, flush_context: Any) -> None:
+    tables = session.info.setdefault(SESSION_TABLES_KEY, set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(type(instance), "__tablename__", None)
+        if table in VERSIONED_TABLES:
+            tables.add(table)
+
+
+def _publish_commit(session: Session) -> None:
+    tables = session.info.pop(SESSION_TABLES_KEY, None)
+    if tables:
+        entity_versions.bump_soon(tables)
+
+
+def _discard_rollback(session: Session, *args: Any) -> None:
+    session.info.pop(SESSION_TABLES_KEY, None)
+
+
+def register_version_tracking() -> None:
+    """Install the session hooks that bump table versions (idempotent)"""
+    if event.contains(Session, "after_flush", _capture_flush):
+        return
+    event.listen(Session, "do_orm_execute", _capture_bulk_write)
+    event.listen(Session, "after_flush", _capture_flush)
+    event.listen(Session, "after_commit", _publish_commit)
+    event.listen(Session, "after_soft_rollback", _discard_rollback)
+
+
+def compute_etag(
+    path: str,
+    query_string: str,
+    organization_id: Optional[str],
+    versions: Dict[str, Tuple[int, float]],
+    period: int,
+) -> str:
+    material = json.dumps(
+        {
+            "path": path,
+            "query": sorted(parse_qsl(query_string, keep_blank_values=True)),
+            "organization_id": organization_id,
+            "versions": {table: version for table, (version, _) in versions.items()},
+            "period": period,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()[:32]
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """RFC 9110 weak comparison against an If-None-Match header value"""
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+
+def _not_modified_since(if_modified_since: str, last_modified: float) -> bool:
+    try:
+        return int(last_modified) <= parsedate_to_datetime(
+            if_modified_since
+        ).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class HTTPCacheMiddleware:
+    """Conditional GET and shared response cache for dashboard routes"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Optional[Dict[str, Tuple[str, ...]]] = None,
+        versions: Optional[EntityVersions] = None,
+    ) -> None:
+        self.app = app
+        self.routes = {
+            f"{settings.api_v1_prefix}{path}": tables
+            for path, tables in (routes or CACHED_ROUTES).items()
+        }
+        self.versions = versions or entity_versions
+        self.ttl = cache_key_manager.get_ttl("dashboard_metrics")
+        self.max_body_bytes = settings.http_cache_max_body_bytes
+        self.stats = http_cache_stats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        tables = self.routes.get(scope["path"]) if scope["type"] == "http" else None
+        if tables is None or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        now = time.time()
+        period = int(now // self.ttl)
+        versions = await self.versions.get(tables)
+        etag = compute_etag(
+            scope["path"],
+            scope.get("query_string", b"").decode("latin-1"),
+            headers.get("x-organization-id"),
+            versions,
+            period,
+        )
+        # Content may also change when the TTL period rolls over
+        last_modified = max(
+            [period * self.ttl] + [at for _, at in versions.values()]
+        )
+        validators = [
+            (b"etag", f'"{etag}"'.encode()),
+            (b"last-modified", formatdate(last_modified, usegmt=True).encode()),
+            (b"cache-control", b"private, no-cache"),
+        ]
+
+        if_none_match = headers.get("if-none-match")
+        if (if_none_match is not None and etag_matches(if_none_match, etag)) or (
+            if_none_match is None
+            and "if-modified-since" in headers
+            and _not_modified_since(headers["if-modified-since"], last_modified)
+        ):
+            self.stats["not_modified"] += 1
+            await send(
+                {"type": "http.response.start", "status": 304, "headers": validators}
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        cache = await get_cache()
+        key = generate_http_response_key(etag)
+        cached = await cache.get(key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            body = cached["body"].encode()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", cached["content_type"].encode()),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"x-cache", b"HIT"),
+                        *validators,
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        self.stats["misses"] += 1
+        await self._render_and_store(scope, receive, send, cache, key, validators)
+
+    async def _render_and_store(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        cache: CacheManager,
+        key: str,
+        validators: List[Tuple[bytes, bytes]],
+    ) -> None:
+        response: Dict[str, Any] = {"status": None, "content_type": None}
+        chunks: List[bytes] = []
+        size = 0
+
+        async def capture(message: Message) -> None:
+            nonlocal size
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        response["content_type"] = value.decode("latin-1")
+                if response["status"] == 200:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-cache", b"MISS"),
+                        *validators,
+                    ]
+            elif message["type"] == "http.response.body" and size is not None:
+                size += len(message.get("body", b""))
+                if size > self.max_body_bytes:
+                    size = None
+                    chunks.clear()
+                else:
+                    chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+        if response["status"] != 200 or size is None:
+            return
+        try:
+            body = b"".join(chunks).decode("utf-8")
+        except UnicodeDecodeError:
+            return
+        stored = await cache.set(
+            key,
+            {"body": body, "content_type": response["content_type"] or ""},
+            self.ttl,
+        )
+        if stored:
+            self.stats["stored"] += 1
+
+
+def get_http_cache_stats() -> Dict[str, Any]:
+    requests = sum(http_cache_stats.values()) - http_cache_stats["stored"]
+    return {
+        **http_cache_stats,
+        "served_without_rendering": (
+            round(
+                (http_cache_stats["not_modified"] + http_cache_stats["hits"])
+                / requests,
+                3,
+            )
+            if requests
+            else 0.0
+        ),
+        "routes": sorted(CACHED_ROUTES),
+        "ttl_seconds": cache_key_manager.get_ttl("dashboard_metrics"),
+        "pending_version_bumps": len(entity_versions.pending),
+    }
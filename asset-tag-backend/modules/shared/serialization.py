@@ -0,0 +1,184 @@
+"""
+Fast row-to-response serialization for list endpoints
+
+List endpoints used to turn each SQL row into an ORM object, then into a
+Pydantic model, and let FastAPI validate and JSON-encode it again. The
+``RowSerializer`` here maps result rows straight into response dicts using
+per-field converters derived once from the response schema, and
+``FastJSONResponse`` encodes them with orjson when it is installed.
+"""
+
+import json
+import re
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Type,
+                    Union, get_args, get_origin)
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from config.settings import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_HEX_UUID = re.compile(r"^[0-9a-fA-F]{32}$")
+
+Converter = Callable[[Any], Any]
+
+
+def _default(value: Any) -> Any:
+    """Encode types the JSON encoders do not handle natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson (falls back to the stdlib encoder)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def normalize_uuid(value: Any) -> Optional[str]:
+    """Render UUIDs (including SQLite's 32-char hex form) with hyphens"""
+    if value is None:
+        return None
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    value = str(value)
+    if _HEX_UUID.match(value):
+        return str(uuid.UUID(value))
+    return value
+
+
+def _none() -> None:
+    return None
+
+
+def _to_str(value: Any) -> Any:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _to_datetime(value: Any) -> Any:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value
+
+
+def _to_float(value: Any) -> Any:
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _to_json_object(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def converter_for(name: str, annotation: Any) -> Optional[Converter]:
+    """Pick the converter for a response field from its type annotation"""
+    annotation = _unwrap_optional(annotation)
+    origin = get_origin(annotation) or annotation
+
+    if annotation is str:
+        if name == "id" or name.endswith("_id"):
+            return normalize_uuid
+        return _to_str
+    if annotation is datetime:
+        return _to_datetime
+    if annotation is float:
+        return _to_float
+    if origin in (dict, list):
+        return _to_json_object
+    return None
+
+
+class RowSerializer:
+    """Maps SQL result rows directly to response dicts for a response schema"""
+
+    def __init__(
+        self,
+        model: Type[BaseModel],
+        columns: Optional[Dict[str, str]] = None,
+        converters: Optional[Dict[str, Converter]] = None,
+    ) -> None:
+        self.model = model
+        # Response field -> result column, where they differ
+        self.columns = columns or {}
+        self.fields: List[tuple] = []
+        for name, field in model.model_fields.items():
+            converter = (converters or {}).get(name) or converter_for(
+                name, field.annotation
+            )
+            if field.default_factory is not None:
+                default = field.default_factory
+            elif field.is_required():
+                default = _none
+            else:
+                default = lambda value=field.get_default(): value  # noqa: E731
+            self.fields.append(
+                (name, self.columns.get(name, name), converter, default)
+            )
+        self._adapter: Optional[TypeAdapter] = None
+
+    def row_to_dict(self, row: Any) -> Dict[str, Any]:
+        """Map one result row (or mapping) to a response dict"""
+        mapping = getattr(row, "_mapping", row)
+        item = {}
+        for name, column, converter, default in self.fields:
+            value = mapping.get(column)
+            if value is None:
+                item[name] = default()
+            else:
+                item[name] = converter(value) if converter else value
+        return item
+
+    def serialize(self, rows: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Map result rows to response dicts"""
+        items = [self.row_to_dict(row) for row in rows]
+        if settings.validate_fast_responses:
+            self.validate(items)
+        return items
+
+    def validate(self, items: List[Dict[str, Any]]) -> List[BaseModel]:
+        """Validate response dicts against the schema (debugging and tests)"""
+        if self._adapter is None:
+            self._adapter = TypeAdapter(List[self.model])
+        return self._adapter.validate_python(items)
+
+    def response(self, rows: Iterable[Any], **kwargs: Any) -> FastJSONResponse:
+        """Serialize rows and wrap them in a fast JSON response"""
+        return FastJSONResponse(self.serialize(rows), **kwargs)
@@ -10,7 +10,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from modules.sites.models import Personnel, PersonnelActivity, Site
 from modules.sites.schemas import (PersonnelActivityResponse, PersonnelCreate,
                                    PersonnelResponse, PersonnelUpdate,
@@ -92,7 +92,7 @@ async def get_sites(
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = None,
     manager_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of sites with optional filtering"""
     try:
@@ -117,7 +117,7 @@ async def get_sites(
 
 
 @router.get("/sites/{site_id}", response_model=SiteWithAssetsResponse)
-async def get_site(site_id: str, db: AsyncSession = Depends(get_db)):
+async def get_site(site_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get site by ID with related data"""
     try:
         # Get site
@@ -328,7 +328,7 @@ async def get_site_assets(
     limit: int = Query(100, ge=1, le=1000),
     asset_type: Optional[str] = None,
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get assets at a specific site"""
     try:
@@ -385,7 +385,7 @@ async def get_site_personnel(
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = None,
     role: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get personnel at a specific site"""
     try:
@@ -432,7 +432,7 @@ async def get_site_activity(
     start_time: Optional[str] = None,
     end_time: Optional[str] = None,
     limit: int = Query(100, ge=1, le=1000),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get activity data for a site"""
     try:
@@ -474,7 +474,7 @@ async def get_site_activity(
 
 
 @router.get("/sites/stats")
-async def get_sites_stats(db: AsyncSession = Depends(get_db)):
+async def get_sites_stats(db: AsyncSession = Depends(get_read_db)):
     """Get sites statistics summary"""
     try:
         # Get counts by status
@@ -515,7 +515,7 @@ async def get_personnel(
     status: Optional[str] = None,
     role: Optional[str] = None,
     site_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of personnel with optional filtering"""
     try:
@@ -544,7 +544,7 @@ async def get_personnel(
 
 
 @router.get("/personnel/{personnel_id}", response_model=PersonnelResponse)
-async def get_personnel_by_id(personnel_id: str, db: AsyncSession = Depends(get_db)):
+async def get_personnel_by_id(personnel_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get personnel by ID"""
     try:
         result = await db.execute(select(Personnel).where(Personnel.id == personnel_id))
@@ -667,7 +667,7 @@ async def get_site_personnel_list(
     status: Optional[str] = None,
     role: Optional[str] = None,
     site_id: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Alias for getting personnel under sites namespace"""
     return await get_personnel(skip, limit, status, role, site_id, db)
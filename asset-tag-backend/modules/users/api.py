@@ -13,7 +13,7 @@ from passlib.context import CryptContext
 from sqlalchemy import and_, delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from config.settings import settings
 from modules.shared.database.models import User
 from modules.users.schemas import (LoginRequest, LoginResponse,
@@ -83,6 +83,13 @@ async def get_current_user(
     return user
 
 
+async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Current user, who must be an admin"""
+    if not (current_user.is_superuser or current_user.role in ("admin", "superuser")):
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return current_user
+
+
 @router.get("/users", response_model=List[UserResponse])
 async def get_users(
     skip: int = Query(0, ge=0),
@@ -90,7 +97,7 @@ async def get_users(
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of users with optional filtering"""
     try:
@@ -122,7 +129,7 @@ async def get_users(
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
-async def get_user(user_id: str, db: AsyncSession = Depends(get_db)):
+async def get_user(user_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get user by ID"""
     try:
         result = await db.execute(
@@ -384,7 +391,7 @@ async def refresh_token(
 
 
 @router.get("/users/stats", response_model=UserStats)
-async def get_user_stats(db: AsyncSession = Depends(get_db)):
+async def get_user_stats(db: AsyncSession = Depends(get_read_db)):
     """Get user statistics"""
     try:
         # Get total users
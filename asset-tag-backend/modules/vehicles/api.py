@@ -10,7 +10,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import and_, delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.database import get_db
+from config.database import get_db, get_read_db
 from modules.vehicles.models import Vehicle, VehicleAssetPairing
 from modules.vehicles.schemas import (VehicleAssetPairingCreate,
                                       VehicleAssetPairingResponse,
@@ -95,7 +95,7 @@ async def get_vehicles(
     vehicle_type: Optional[str] = None,
     assigned_driver_id: Optional[str] = None,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of vehicles with optional filtering"""
     try:
@@ -131,7 +131,7 @@ async def get_vehicles(
 
 
 @router.get("/vehicles/{vehicle_id}", response_model=VehicleWithAssets)
-async def get_vehicle(vehicle_id: str, db: AsyncSession = Depends(get_db)):
+async def get_vehicle(vehicle_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get vehicle by ID with paired assets"""
     try:
         result = await db.execute(
@@ -288,7 +288,7 @@ async def get_vehicle_assets(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get assets paired with a vehicle"""
     try:
@@ -428,7 +428,7 @@ async def unpair_asset_from_vehicle(
 
 
 @router.get("/vehicles/stats", response_model=VehicleStats)
-async def get_vehicle_stats(db: AsyncSession = Depends(get_db)):
+async def get_vehicle_stats(db: AsyncSession = Depends(get_read_db)):
     """Get vehicle statistics"""
     try:
         # Get total vehicles
@@ -13,6 +13,7 @@ from modules.websocket.connection_manager import manager
 from modules.websocket.handlers import (AlertHandler, DashboardHandler,
                                         GeofenceHandler, LocationHandler,
                                         SystemHandler)
+from modules.websocket.subscriptions import parse_viewport
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -27,6 +28,12 @@ async def websocket_locations(
     site_ids: Optional[str] = Query(
         None, description="Comma-separated site IDs to filter"
     ),
+    bbox: Optional[str] = Query(
+        None, description="Map viewport as min_lon,min_lat,max_lon,max_lat"
+    ),
+    zoom: Optional[int] = Query(
+        None, description="Map zoom level; zoomed-out viewports get clusters"
+    ),
 ):
     """WebSocket endpoint for real-time location updates"""
     # Parse filters
@@ -35,6 +42,21 @@ async def websocket_locations(
         filters["asset_ids"] = asset_ids.split(",")
     if site_ids:
         filters["site_ids"] = site_ids.split(",")
+    if bbox:
+        try:
+            viewport = parse_viewport({"bbox": bbox, "zoom": zoom})
+        except ValueError as e:
+            await websocket.close(code=1008, reason=f"Invalid viewport: {e}")
+            return
+        filters["viewport"] = {
+            "bbox": [
+                viewport.min_lon,
+                viewport.min_lat,
+                viewport.max_lon,
+                viewport.max_lat,
+            ],
+            "zoom": viewport.zoom,
+        }
 
     await manager.connect(websocket, "locations", filters)
 
@@ -139,15 +161,27 @@ async def websocket_dashboard(
     refresh_interval: Optional[int] = Query(
         30, description="Refresh interval in seconds"
     ),
+    organization_id: Optional[str] = Query(
+        None, description="Organization whose dashboard to follow"
+    ),
 ):
-    """WebSocket endpoint for real-time dashboard metrics"""
+    """WebSocket endpoint for real-time dashboard metrics
+
+    Starts with ``dashboard_snapshot`` messages, then sends
+    ``dashboard_delta`` patches (see ``modules.websocket.dashboard_state``).
+    """
     # Parse filters
     filters = {}
     if metrics:
         filters["metrics"] = metrics.split(",")
     filters["refresh_interval"] = refresh_interval
+    if organization_id:
+        filters["organization_ids"] = [organization_id]
 
     await manager.connect(websocket, "dashboard", filters)
+    await manager.send_dashboard_snapshots(
+        websocket, [organization_id] if organization_id else None
+    )
 
     try:
         while True:
@@ -165,7 +199,7 @@ async def websocket_dashboard(
 
 @router.get("/ws/stats")
 async def get_websocket_stats() -> None:
-    """Get WebSocket connection statistics"""
+    """Get WebSocket connections, send queue depths and drop counts"""
     return manager.get_connection_stats()
 
 
@@ -0,0 +1,231 @@
+"""
+Cross-worker WebSocket broadcasts over Redis pub/sub
+
+Each worker process holds its own sockets, so a broadcast made in one worker
+is delivered locally and forwarded to the others. Forwarded messages are
+queued per channel and published in batches: one PUBLISH per
+``websocket_cluster_batch_ms`` window, or sooner once
+``websocket_cluster_batch_size`` messages are waiting. Channels are sharded by
+broadcast target and organization (``ws:{target}:{shard}``). Every worker
+keeps one subscription to all of them, decodes each batch once and fans it
+out to its local connections. A worker skips the batches it published itself,
+since it already delivered them.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+import zlib
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from config.cache import get_cache
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "ws"
+
+# Local delivery of a forwarded message
+Deliver = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def channel_for(target: str, organization_id: Optional[str] = None) -> str:
+    """Pub/sub channel carrying ``target`` broadcasts for an organization"""
+    shard = zlib.crc32(str(organization_id or "").encode())
+    return f"{CHANNEL_PREFIX}:{target}:{shard % settings.websocket_cluster_shards}"
+
+
+class ClusterBroadcastBus:
+    """Forwards local broadcasts to, and delivers broadcasts from, other workers"""
+
+    def __init__(self, worker_id: Optional[str] = None) -> None:
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        )
+        self.targets: Dict[str, Deliver] = {}
+        # Channel -> messages waiting for the next publish
+        self.pending: Dict[str, List[Dict[str, Any]]] = {}
+        self.has_pending = asyncio.Event()
+        self.batch_full = asyncio.Event()
+        self.running = False
+        self.publisher_task: Optional[asyncio.Task] = None
+        self.listener_task: Optional[asyncio.Task] = None
+        self.subscribed = asyncio.Event()
+        # Publish-to-local-delivery time of received batches
+        self.latencies_ms: Deque[float] = deque(maxlen=1000)
+        self.stats = {
+            "forwarded": 0,
+            "published_batches": 0,
+            "publish_failures": 0,
+            "received_batches": 0,
+            "received_messages": 0,
+            "own_batches_skipped": 0,
+            "delivery_errors": 0,
+        }
+
+    def register(self, target: str, deliver: Deliver) -> None:
+        """Deliver ``target`` broadcasts from other workers with ``deliver``"""
+        self.targets[target] = deliver
+
+    def channels(self) -> List[str]:
+        return [
+            f"{CHANNEL_PREFIX}:{target}:{shard}"
+            for target in sorted(self.targets)
+            for shard in range(settings.websocket_cluster_shards)
+        ]
+
+    def forward(self, target: str, message: Dict[str, Any]) -> None:
+        """Queue a broadcast already delivered locally for the other workers"""
+        if not self.running:
+            return
+        channel = channel_for(target, message.get("organization_id"))
+        batch = self.pending.setdefault(channel, [])
+        batch.append(message)
+        self.stats["forwarded"] += 1
+        self.has_pending.set()
+        if len(batch) >= settings.websocket_cluster_batch_size:
+            self.batch_full.set()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        self.publisher_task = asyncio.create_task(self._publisher())
+        self.listener_task = asyncio.create_task(self._listener())
+        logger.info(
+            f"WebSocket cluster broadcasts started as {self.worker_id} "
+            f"({len(self.channels())} channels)"
+        )
+
+    async def stop(self) -> None:
+        self.running = False
+        for task in (self.publisher_task, self.listener_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        # Whatever was queued still reaches the other workers
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Publish every queued batch"""
+        pending, self.pending = self.pending, {}
+        if pending:
+            await asyncio.gather(
+                *(self._publish(channel, batch) for channel, batch in pending.items())
+            )
+
+    async def _publish(self, channel: str, messages: List[Dict[str, Any]]) -> None:
+        cache = await get_cache()
+        envelope = {
+            "origin": self.worker_id,
+            "target": channel.split(":")[1],
+            "sent_at": time.time(),
+            "messages": messages,
+        }
+        # CacheManager.publish logs failures and reports 0 receivers; our own
+        # subscription is always a receiver
+        if await cache.publish(channel, envelope):
+            self.stats["published_batches"] += 1
+        else:
+            self.stats["publish_failures"] += 1
+
+    async def _publisher(self) -> None:
+        window = settings.websocket_cluster_batch_ms / 1000.0
+        while True:
+            await self.has_pending.wait()
+            if not self.batch_full.is_set():
+                try:
+                    async with asyncio.timeout(window):
+                        await self.batch_full.wait()
+                except TimeoutError:
+                    pass
+            self.has_pending.clear()
+            self.batch_full.clear()
+            await self.flush()
+
+    async def _listener(self) -> None:
+        while self.running:
+            cache = await get_cache()
+            pubsub = await cache.subscribe(self.channels())
+            if pubsub is None:
+                await asyncio.sleep(1.0)
+                continue
+            self.subscribed.set()
+            try:
+                async for raw in pubsub.listen():
+                    if raw.get("type") == "message":
+                        await self.receive(raw["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"WebSocket cluster subscription lost, retrying: {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                self.subscribed.clear()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def receive(self, data: Any) -> None:
+        """Deliver one published batch to this worker's connections"""
+        envelope = json.loads(data)
+        if envelope.get("origin") == self.worker_id:
+            self.stats["own_batches_skipped"] += 1
+            return
+        deliver = self.targets.get(envelope.get("target"))
+        if deliver is None:
+            return
+        self.stats["received_batches"] += 1
+        for message in envelope.get("messages", []):
+            try:
+                await deliver(message)
+            except Exception as e:
+                self.stats["delivery_errors"] += 1
+                logger.error(f"Error delivering cluster broadcast: {e}")
+            self.stats["received_messages"] += 1
+        self.latencies_ms.append((time.time() - envelope["sent_at"]) * 1000)
+
+    def get_stats(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        return {
+            **self.stats,
+            "worker_id": self.worker_id,
+            "running": self.running,
+            "subscribed": self.subscribed.is_set(),
+            "queued": sum(len(batch) for batch in self.pending.values()),
+            "latency_ms": {
+                "p50": round(latencies[len(latencies) // 2], 2) if latencies else None,
+                "p99": (
+                    round(latencies[int(len(latencies) * 0.99)], 2)
+                    if latencies
+                    else None
+                ),
+                "max": round(latencies[-1], 2) if latencies else None,
+            },
+        }
+
+
+cluster_bus = ClusterBroadcastBus()
+
+
+async def start_cluster_broadcasts(bus: ClusterBroadcastBus = cluster_bus) -> None:
+    """Forward this worker's WebSocket broadcasts and receive the others'"""
+    from modules.locations.api import manager as asset_location_manager
+    from modules.websocket.connection_manager import manager
+
+    manager.attach_cluster(bus)
+    asset_location_manager.attach_cluster(bus)
+    await bus.start()
+
+
+async def stop_cluster_broadcasts(bus: ClusterBroadcastBus = cluster_bus) -> None:
+    await bus.stop()
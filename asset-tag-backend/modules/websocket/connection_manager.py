@@ -1,18 +1,303 @@
 """
 WebSocket connection manager for handling real-time connections
+
+Broadcasts are encoded once and handed to each matching connection's bounded
+outbound queue; a writer task per connection drains its queue, so a slow
+client only delays itself. Messages superseding an earlier one for the same
+subject (an asset's location, a metric) replace it while still queued, and
+when a queue is full the oldest message is dropped and the client is sent a
+``lagged`` notice before its next message.
+
+A client may also negotiate paced location delivery with a ``subscribe``
+message carrying ``"delivery": {"max_rate_hz": 2, "batch": true}``: location
+updates are then held per asset (latest wins) and released once per tick,
+either individually or as a single ``location_batch`` frame. Connections
+whose ``viewport`` filter is zoomed out below
+``websocket_viewport_cluster_below_zoom`` receive ``location_clusters``
+frames instead, aggregating each tick's positions per map cell.
+
+With several workers, broadcasts are also forwarded to the other workers
+through ``modules.websocket.cluster``; ``deliver_local`` is their entry point.
 """
 
 import asyncio
+import functools
+import itertools
 import json
 import logging
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Set
+from typing import (TYPE_CHECKING, Any, Dict, Hashable, Iterable, List, Optional,
+                    Set, Tuple)
 
 from fastapi import WebSocket, WebSocketDisconnect
 
+from config.settings import settings
+from modules.shared.serialization import dumps
+from modules.websocket.dashboard_state import DashboardStateStore
+from modules.websocket.subscriptions import (SubscriptionIndex, cluster_locations,
+                                             message_position)
+
+if TYPE_CHECKING:
+    from modules.websocket.cluster import ClusterBroadcastBus
+
 logger = logging.getLogger(__name__)
 
 
+def coalesce_key(message: Dict[str, Any]) -> Optional[Hashable]:
+    """Subject a message supersedes earlier messages for (None: never)"""
+    message_type = message.get("type")
+    if message_type == "location_update":
+        return ("location_update", message.get("asset_id"))
+    if message_type == "metric_update":
+        return ("metric_update", message.get("metric_name"))
+    if message_type in ("dashboard_summary", "system_status"):
+        return (message_type,)
+    return None
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """JSON text frame payload, encoded once and shared by every recipient"""
+    return dumps(message).decode("utf-8")
+
+
+def encode_location_batch(updates: Iterable[str]) -> str:
+    """``location_batch`` frame around already-encoded location updates"""
+    return '{"type":"location_batch","updates":[%s],"timestamp":%s}' % (
+        ",".join(updates),
+        json.dumps(datetime.now().isoformat()),
+    )
+
+
+def parse_delivery_policy(delivery: Any) -> Tuple[Optional[float], bool]:
+    """``(max_rate_hz, batch)`` from a subscribe message's delivery policy"""
+    if not isinstance(delivery, dict):
+        raise ValueError("delivery must be an object")
+    max_rate_hz = delivery.get("max_rate_hz")
+    if max_rate_hz is not None:
+        max_rate_hz = float(max_rate_hz)
+        if not max_rate_hz > 0:
+            raise ValueError("max_rate_hz must be positive")
+    return max_rate_hz, bool(delivery.get("batch", False))
+
+
+class ClientConnection:
+    """A connection's bounded outbound queue and the task that drains it"""
+
+    # Queue keys for messages that never coalesce
+    _sequence = itertools.count()
+
+    # Queue keys of a paced client's pending location_batch and clusters frames
+    BATCH_KEY = ("location_batch",)
+    CLUSTERS_KEY = ("location_clusters",)
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        connection_type: str,
+        max_queue: Optional[int] = None,
+        send_timeout: Optional[float] = None,
+    ) -> None:
+        self.websocket = websocket
+        self.connection_type = connection_type
+        self.max_queue = max_queue or settings.websocket_send_queue_size
+        self.send_timeout = send_timeout or settings.websocket_send_timeout_seconds
+        # Coalesce key (or a unique sequence number) -> encoded message
+        self.queue: "OrderedDict[Hashable, str]" = OrderedDict()
+        self.wakeup = asyncio.Event()
+        self.writer_task: Optional[asyncio.Task] = None
+        self.lagged = 0
+        self.stats = {
+            "sent": 0,
+            "dropped": 0,
+            "coalesced": 0,
+            "lag_notices": 0,
+            "batches": 0,
+            "cluster_frames": 0,
+        }
+        self.max_depth = 0
+        self.closed = False
+        # Paced location delivery negotiated by the client (None: immediate)
+        self.delivery: Optional[Dict[str, Any]] = None
+        # Coalesce key -> encoded location update held until the next tick
+        self.deferred: Dict[Hashable, str] = {}
+        self.pacer_task: Optional[asyncio.Task] = None
+        # Zoom level of a zoomed-out viewport (None: positions are not clustered)
+        self.cluster_zoom: Optional[int] = None
+        # Paced only because positions are clustered, not at the client's request
+        self.cluster_paced = False
+        # Coalesce key -> (latitude, longitude, asset_id) for the next clusters
+        self.points: Dict[Hashable, Tuple[float, float, Any]] = {}
+
+    def enqueue(self, text: str, key: Optional[Hashable] = None) -> bool:
+        """Queue an encoded message; False if it displaced an older one"""
+        if self.closed:
+            return False
+        if key is not None and key in self.queue:
+            self.queue[key] = text
+            self.stats["coalesced"] += 1
+            return True
+        displaced = False
+        if len(self.queue) >= self.max_queue:
+            self.queue.popitem(last=False)
+            self.stats["dropped"] += 1
+            self.lagged += 1
+            displaced = True
+        self.queue[key if key is not None else next(self._sequence)] = text
+        self.max_depth = max(self.max_depth, len(self.queue))
+        self.wakeup.set()
+        return not displaced
+
+    def offer(
+        self,
+        text: str,
+        key: Optional[Hashable] = None,
+        message: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Queue a message, or hold a location update until the next tick"""
+        if key is None or key[0] != "location_update":
+            return self.enqueue(text, key)
+        if self.closed:
+            return False
+        position = message_position(message) if message is not None else None
+        if self.cluster_zoom is not None and position is not None:
+            if key in self.points:
+                self.stats["coalesced"] += 1
+            self.points[key] = (*position, message.get("asset_id"))
+            return True
+        if self.delivery is None:
+            return self.enqueue(text, key)
+        if key in self.deferred:
+            self.stats["coalesced"] += 1
+        self.deferred[key] = text
+        return True
+
+    def set_delivery(
+        self, max_rate_hz: Optional[float], batch: bool
+    ) -> Optional[Dict[str, Any]]:
+        """Pace location updates to ``max_rate_hz`` ticks per second
+
+        ``batch`` sends each tick's updates as one ``location_batch`` frame.
+        Rates above ``websocket_location_max_rate_hz`` are capped; passing
+        neither option restores immediate delivery, or the clustering rate
+        while positions are clustered.
+        """
+        if self.pacer_task is not None:
+            self.pacer_task.cancel()
+            self.pacer_task = None
+        self._release_deferred()
+        self.cluster_paced = False
+        if max_rate_hz is None and not batch:
+            if self.cluster_zoom is None:
+                self.delivery = None
+                return None
+            max_rate_hz = settings.websocket_viewport_cluster_rate_hz
+            self.cluster_paced = True
+        limit = settings.websocket_location_max_rate_hz
+        rate = min(max_rate_hz or limit, limit)
+        self.delivery = {"max_rate_hz": rate, "batch": batch}
+        self.pacer_task = asyncio.create_task(self._pacer(1.0 / rate))
+        return self.delivery
+
+    def set_clustering(self, zoom: Optional[int]) -> None:
+        """Cluster positions for a viewport zoomed out below the clustering level"""
+        if zoom is not None and zoom >= settings.websocket_viewport_cluster_below_zoom:
+            zoom = None
+        self.cluster_zoom = zoom
+        if zoom is None:
+            self.points.clear()
+            if self.cluster_paced:
+                self.set_delivery(None, False)
+        elif self.delivery is None:
+            self.set_delivery(None, False)
+
+    def flush_deferred(self) -> None:
+        """Release held location updates (one tick)"""
+        if self.points and self.CLUSTERS_KEY not in self.queue:
+            points, self.points = self.points, {}
+            frame = {
+                "type": "location_clusters",
+                "zoom": self.cluster_zoom,
+                "clusters": cluster_locations(points.values(), self.cluster_zoom),
+                "timestamp": datetime.now().isoformat(),
+            }
+            self.enqueue(encode_message(frame), self.CLUSTERS_KEY)
+            self.stats["cluster_frames"] += 1
+        if not self.deferred:
+            return
+        if not self.delivery or not self.delivery["batch"]:
+            self._release_deferred()
+            return
+        if self.BATCH_KEY in self.queue:
+            # Previous frame not sent yet: keep coalescing into the next one
+            return
+        updates = list(self.deferred.values())
+        self.deferred.clear()
+        self.enqueue(encode_location_batch(updates), self.BATCH_KEY)
+        self.stats["batches"] += 1
+
+    def _release_deferred(self) -> None:
+        deferred, self.deferred = self.deferred, {}
+        for key, text in deferred.items():
+            self.enqueue(text, key)
+
+    async def _pacer(self, interval: float) -> None:
+        while not self.closed:
+            await asyncio.sleep(interval)
+            self.flush_deferred()
+
+    def start(self, on_failure) -> None:
+        self.writer_task = asyncio.create_task(self._writer(on_failure))
+
+    async def _send(self, text: str) -> None:
+        # asyncio.timeout rather than wait_for, which can swallow a cancellation
+        # arriving just as the send completes
+        async with asyncio.timeout(self.send_timeout):
+            await self.websocket.send_text(text)
+        self.stats["sent"] += 1
+
+    async def _writer(self, on_failure) -> None:
+        try:
+            while not self.closed:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                while self.queue and not self.closed:
+                    if self.lagged:
+                        dropped, self.lagged = self.lagged, 0
+                        self.stats["lag_notices"] += 1
+                        await self._send(
+                            encode_message(
+                                {
+                                    "type": "lagged",
+                                    "dropped": dropped,
+                                    "total_dropped": self.stats["dropped"],
+                                    "timestamp": datetime.now().isoformat(),
+                                }
+                            )
+                        )
+                    _, text = self.queue.popitem(last=False)
+                    await self._send(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Includes send timeouts: a client that stops reading is dropped
+            logger.info(
+                f"Closing {self.connection_type} WebSocket after send error: {e!r}"
+            )
+            await on_failure(self)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queue_depth": len(self.queue),
+            "max_queue_depth": self.max_depth,
+            "queue_capacity": self.max_queue,
+            "delivery": self.delivery,
+            "deferred_updates": len(self.deferred),
+            "cluster_zoom": self.cluster_zoom,
+        }
+
+
 class ConnectionManager:
     """Manages WebSocket connections and message broadcasting"""
 
@@ -31,6 +316,29 @@ class ConnectionManager:
         # Subscription filters for each connection
         self.connection_filters: Dict[WebSocket, Dict[str, Any]] = {}
 
+        # Connections of each type indexed by the values their filters accept
+        self.subscriptions: Dict[str, SubscriptionIndex] = {
+            connection_type: SubscriptionIndex()
+            for connection_type in self.active_connections
+        }
+
+        # Outbound queue and writer task for each connection
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+
+        # Versioned dashboard snapshots; dashboard clients receive deltas
+        self.dashboard = DashboardStateStore()
+
+        # Bus forwarding broadcasts to other workers (None: this worker only)
+        self.cluster: Optional["ClusterBroadcastBus"] = None
+
+        self.stats = {
+            "messages_broadcast": 0,
+            "messages_encoded": 0,
+            "deliveries": 0,
+            "dropped": 0,
+            "slow_disconnects": 0,
+        }
+
     async def connect(
         self,
         websocket: WebSocket,
@@ -50,6 +358,11 @@ class ConnectionManager:
             "last_activity": datetime.now(),
         }
         self.connection_filters[websocket] = filters or {}
+        self.subscriptions[connection_type].add(websocket, filters)
+        client = ClientConnection(websocket, connection_type)
+        self.clients[websocket] = client
+        client.start(self._on_send_failure)
+        self._apply_viewport(websocket)
 
         logger.info(
             f"WebSocket connected: {connection_type} (total: {len(self.active_connections[connection_type])})"
@@ -74,6 +387,7 @@ class ConnectionManager:
         for conn_type, connections in self.active_connections.items():
             if websocket in connections:
                 connections.remove(websocket)
+                self.subscriptions[conn_type].remove(websocket)
                 connection_type = conn_type
                 break
 
@@ -82,57 +396,245 @@ class ConnectionManager:
             del self.connection_metadata[websocket]
         if websocket in self.connection_filters:
             del self.connection_filters[websocket]
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            client.closed = True
+            client.wakeup.set()
+            for task in (client.writer_task, client.pacer_task):
+                if task and not task.done() and task is not asyncio.current_task():
+                    task.cancel()
 
         if connection_type:
             logger.info(
                 f"WebSocket disconnected: {connection_type} (total: {len(self.active_connections[connection_type])})"
             )
 
+    async def close_all(self) -> None:
+        """Disconnect every connection and wait for its tasks to stop"""
+        tasks = [
+            task
+            for client in self.clients.values()
+            for task in (client.writer_task, client.pacer_task)
+            if task is not None
+        ]
+        for websocket in list(self.clients):
+            self.disconnect(websocket)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _on_send_failure(self, client: ClientConnection) -> None:
+        self.stats["slow_disconnects"] += 1
+        self.disconnect(client.websocket)
+        try:
+            await client.websocket.close(code=1011)
+        except Exception:
+            pass
+
     async def send_personal_message(
         self, message: Dict[str, Any], websocket: WebSocket
     ):
         """Send a message to a specific WebSocket connection"""
-        try:
-            await websocket.send_text(json.dumps(message))
-            if websocket in self.connection_metadata:
-                self.connection_metadata[websocket]["last_activity"] = datetime.now()
-        except Exception as e:
-            logger.error(f"Error sending personal message: {e}")
-            self.disconnect(websocket)
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        if not client.enqueue(encode_message(message)):
+            self.stats["dropped"] += 1
+        if websocket in self.connection_metadata:
+            self.connection_metadata[websocket]["last_activity"] = datetime.now()
+
+    def _update_filters(self, websocket: WebSocket, filters: Dict[str, Any]) -> None:
+        """Merge ``filters`` into a connection's filters and re-index it
+
+        Raises ValueError, keeping the current filters, for an invalid viewport.
+        """
+        merged = {**self.connection_filters[websocket], **filters}
+        metadata = self.connection_metadata.get(websocket)
+        if metadata is not None:
+            self.subscriptions[metadata["type"]].add(websocket, merged)
+        self.connection_filters[websocket] = merged
+        self._apply_viewport(websocket)
+
+    def _apply_viewport(self, websocket: WebSocket) -> None:
+        """Cluster positions for the connection if its viewport is zoomed out"""
+        client = self.clients.get(websocket)
+        metadata = self.connection_metadata.get(websocket)
+        if client is None or metadata is None:
+            return
+        grid = self.subscriptions[metadata["type"]].viewports
+        viewport = grid.viewports.get(websocket)
+        client.set_clustering(viewport.zoom if viewport else None)
+
+    def _fan_out(
+        self, message: Dict[str, Any], websockets: Iterable[WebSocket]
+    ) -> int:
+        """Queue one encoding of ``message`` for every connection given
+
+        ``websockets`` is already filtered, by the subscription index.
+        """
+        text = None
+        key = coalesce_key(message)
+        now = datetime.now()
+        delivered = 0
+        for websocket in websockets:
+            client = self.clients.get(websocket)
+            if client is None:
+                continue
+            if text is None:
+                text = encode_message(message)
+                self.stats["messages_encoded"] += 1
+            if not client.offer(text, key, message):
+                self.stats["dropped"] += 1
+            self.connection_metadata[websocket]["last_activity"] = now
+            delivered += 1
+        self.stats["deliveries"] += delivered
+        return delivered
+
+    def attach_cluster(self, bus: "ClusterBroadcastBus") -> None:
+        """Forward broadcasts to other workers and deliver theirs locally"""
+        self.cluster = bus
+        for target in (
+            *self.active_connections,
+            "all",
+            "location_batch",
+            "dashboard_state",
+        ):
+            bus.register(target, functools.partial(self.deliver_local, target))
+
+    async def deliver_local(self, target: str, message: Dict[str, Any]) -> None:
+        """Deliver a broadcast to this worker's connections only"""
+        if target == "all":
+            self._deliver_to_all(message)
+        elif target == "location_batch":
+            self._deliver_location_batch(message["updates"])
+        elif target == "dashboard_state":
+            self._deliver_dashboard_update(
+                message["path"], message["value"], message["organization_id"]
+            )
+        elif target in self.active_connections:
+            self._deliver_to_type(message, target)
+
+    def _forward(self, target: str, message: Dict[str, Any]) -> None:
+        if self.cluster is not None:
+            self.cluster.forward(target, message)
 
     async def broadcast_to_type(self, message: Dict[str, Any], connection_type: str) -> None:
-        """Broadcast a message to all connections of a specific type"""
+        """Broadcast a message to all connections of a specific type
+
+        Only queues the message; writer tasks send it, so this never waits on
+        a client. The subscription index yields the connections whose filters
+        accept the message without evaluating the others.
+        """
         if connection_type not in self.active_connections:
             return
 
-        disconnected = set()
-
-        for websocket in self.active_connections[connection_type]:
-            try:
-                # Check if message matches connection filters
-                if self._message_matches_filters(message, websocket):
-                    await websocket.send_text(json.dumps(message))
-                    if websocket in self.connection_metadata:
-                        self.connection_metadata[websocket][
-                            "last_activity"
-                        ] = datetime.now()
-            except Exception as e:
-                logger.error(f"Error broadcasting to {connection_type}: {e}")
-                disconnected.add(websocket)
-
-        # Remove disconnected connections
-        for websocket in disconnected:
-            self.disconnect(websocket)
+        self._deliver_to_type(message, connection_type)
+        self._forward(connection_type, message)
+
+    def _deliver_to_type(self, message: Dict[str, Any], connection_type: str) -> None:
+        self.stats["messages_broadcast"] += 1
+        index = self.subscriptions[connection_type]
+        self._fan_out(message, index.match(message))
+
+    async def broadcast_location_batch(self, updates: List[Dict[str, Any]]) -> None:
+        """Broadcast several location updates to location subscribers
+
+        Clients on immediate delivery get a single ``location_batch`` frame;
+        paced and viewport clients get the updates their filters accept, one
+        by one (folded into their held updates when paced).
+        """
+        self._deliver_location_batch(updates)
+        self._forward("location_batch", {"updates": updates})
+
+    def _deliver_location_batch(self, updates: List[Dict[str, Any]]) -> None:
+        self.stats["messages_broadcast"] += 1
+        index = self.subscriptions["locations"]
+        batch = {
+            "type": "location_batch",
+            "updates": updates,
+            "timestamp": datetime.now().isoformat(),
+        }
+        # Paced clients and viewports take the updates one by one
+        individual = {
+            websocket
+            for websocket in index.members
+            if websocket in self.clients
+            and (
+                self.clients[websocket].delivery is not None
+                or websocket in index.viewports.viewports
+            )
+        }
+        self._fan_out(
+            batch,
+            [
+                websocket
+                for websocket in index.match(batch)
+                if websocket in self.clients and websocket not in individual
+            ],
+        )
+        if not individual:
+            return
+        for update in updates:
+            self._fan_out(
+                {"type": "location_update", **update},
+                [
+                    websocket
+                    for websocket in index.match(update)
+                    if websocket in individual
+                ],
+            )
+
+    async def broadcast_dashboard_update(
+        self, path: List[str], value: Any, organization_id: Optional[str] = None
+    ) -> None:
+        """Set a field of the dashboard state and push what changed
+
+        Dashboard clients get a ``dashboard_delta`` with the changed fields
+        only, or nothing when the value is unchanged. Other workers apply the
+        same update to their own snapshots.
+        """
+        self._deliver_dashboard_update(path, value, organization_id)
+        self._forward(
+            "dashboard_state",
+            {"path": list(path), "value": value, "organization_id": organization_id},
+        )
+
+    def _deliver_dashboard_update(
+        self, path: List[str], value: Any, organization_id: Optional[str]
+    ) -> None:
+        delta = self.dashboard.update(organization_id, path, value)
+        if delta is not None:
+            self._deliver_to_type(delta, "dashboard")
+
+    async def send_dashboard_snapshots(
+        self, websocket: WebSocket, organization_ids: Optional[List[str]] = None
+    ) -> None:
+        """Send a new dashboard client the snapshots its deltas apply to"""
+        for message in self.dashboard.snapshot_messages(organization_ids):
+            await self.send_personal_message(message, websocket)
 
     async def broadcast_to_all(self, message: Dict[str, Any]) -> None:
         """Broadcast a message to all active connections"""
-        for connection_type in self.active_connections:
-            await self.broadcast_to_type(message, connection_type)
+        self._deliver_to_all(message)
+        self._forward("all", message)
+
+    def _deliver_to_all(self, message: Dict[str, Any]) -> None:
+        self.stats["messages_broadcast"] += 1
+        self._fan_out(
+            message,
+            [
+                websocket
+                for index in self.subscriptions.values()
+                for websocket in index.match(message)
+            ],
+        )
 
     def _message_matches_filters(
         self, message: Dict[str, Any], websocket: WebSocket
     ) -> bool:
-        """Check if a message matches the filters for a specific connection"""
+        """Check if a message matches the filters for a specific connection
+
+        Reference check for one connection; broadcasts use the subscription
+        index, which gives the same answer for every connection at once.
+        """
         if websocket not in self.connection_filters:
             return True
 
@@ -167,6 +669,7 @@ class ConnectionManager:
 
     def get_connection_stats(self) -> Dict[str, Any]:
         """Get statistics about active connections"""
+        clients = list(self.clients.values())
         stats = {
             "total_connections": sum(
                 len(connections) for connections in self.active_connections.values()
@@ -175,16 +678,34 @@ class ConnectionManager:
                 conn_type: len(connections)
                 for conn_type, connections in self.active_connections.items()
             },
+            "fan_out": {
+                **self.stats,
+                "queued_messages": sum(len(client.queue) for client in clients),
+                "max_queue_depth": max(
+                    (len(client.queue) for client in clients), default=0
+                ),
+                "lagging_connections": sum(
+                    1 for client in clients if client.stats["dropped"]
+                ),
+            },
+            "subscriptions": {
+                conn_type: index.get_stats()
+                for conn_type, index in self.subscriptions.items()
+            },
+            "cluster": self.cluster.get_stats() if self.cluster else None,
+            "dashboard": self.dashboard.get_stats(),
             "connection_details": [],
         }
 
         for websocket, metadata in self.connection_metadata.items():
+            client = self.clients.get(websocket)
             stats["connection_details"].append(
                 {
                     "type": metadata["type"],
                     "connected_at": metadata["connected_at"].isoformat(),
                     "last_activity": metadata["last_activity"].isoformat(),
                     "filters": self.connection_filters.get(websocket, {}),
+                    **(client.get_stats() if client else {}),
                 }
             )
 
@@ -205,7 +726,18 @@ class ConnectionManager:
             elif message_type == "update_filters":
                 # Update connection filters
                 if websocket in self.connection_filters:
-                    self.connection_filters[websocket].update(data.get("filters", {}))
+                    try:
+                        self._update_filters(websocket, data.get("filters", {}))
+                    except (TypeError, ValueError) as e:
+                        await self.send_personal_message(
+                            {
+                                "type": "error",
+                                "message": f"Invalid filters: {e}",
+                                "timestamp": datetime.now().isoformat(),
+                            },
+                            websocket,
+                        )
+                        return
                     await self.send_personal_message(
                         {
                             "type": "filters_updated",
@@ -219,20 +751,62 @@ class ConnectionManager:
                 # Handle subscription requests
                 subscription_type = data.get("subscription_type")
                 filters = data.get("filters", {})
+                client = self.clients.get(websocket)
+
+                policy = None
+                if "delivery" in data:
+                    try:
+                        policy = parse_delivery_policy(data["delivery"])
+                    except (TypeError, ValueError) as e:
+                        await self.send_personal_message(
+                            {
+                                "type": "error",
+                                "message": f"Invalid delivery policy: {e}",
+                                "timestamp": datetime.now().isoformat(),
+                            },
+                            websocket,
+                        )
+                        return
 
                 if websocket in self.connection_filters:
-                    self.connection_filters[websocket].update(filters)
+                    try:
+                        self._update_filters(websocket, filters)
+                    except (TypeError, ValueError) as e:
+                        await self.send_personal_message(
+                            {
+                                "type": "error",
+                                "message": f"Invalid filters: {e}",
+                                "timestamp": datetime.now().isoformat(),
+                            },
+                            websocket,
+                        )
+                        return
+                if policy is not None and client is not None:
+                    client.set_delivery(*policy)
 
                 await self.send_personal_message(
                     {
                         "type": "subscribed",
                         "subscription_type": subscription_type,
                         "filters": filters,
+                        "delivery": client.delivery if client else None,
                         "timestamp": datetime.now().isoformat(),
                     },
                     websocket,
                 )
 
+            elif message_type == "resync":
+                # Dashboard client detected a gap in delta sequence numbers
+                try:
+                    since_seq = data.get("since_seq")
+                    since_seq = int(since_seq) if since_seq is not None else None
+                except (TypeError, ValueError):
+                    since_seq = None
+                for reply in self.dashboard.resync_messages(
+                    data.get("organization_id"), since_seq
+                ):
+                    await self.send_personal_message(reply, websocket)
+
             else:
                 # Unknown message type
                 await self.send_personal_message(
@@ -0,0 +1,200 @@
+"""
+Versioned dashboard state with JSON-patch deltas
+
+Each organization's dashboard (summary and metrics) is kept as a snapshot
+with a sequence number. An update is diffed against the snapshot and only
+the changed fields are pushed, as RFC 6902 operations in a
+``dashboard_delta`` message carrying ``seq`` and ``base_seq``. Updates that
+change nothing push nothing.
+
+Clients start from a ``dashboard_snapshot``. A client that sees a delta
+whose ``base_seq`` is not its current ``seq`` (for example after a
+``lagged`` notice) sends ``{"type": "resync", "organization_id": ...,
+"since_seq": n}``. It gets the missed deltas when they are still in the
+history, and a fresh snapshot otherwise.
+
+Sequence numbers are per worker process. Other workers apply the same
+updates (see ``modules.websocket.cluster``), and a client only ever talks to
+one worker.
+"""
+
+import json
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+from modules.shared.serialization import dumps
+
+
+def _escape(key: str) -> str:
+    """JSON pointer reference token (RFC 6901)"""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _scope(organization_id: Any) -> Optional[str]:
+    return str(organization_id) if organization_id else None
+
+
+def json_diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """RFC 6902 operations turning ``old`` into ``new``
+
+    Objects are compared key by key; any other changed value, including a
+    list, is replaced whole.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[Dict[str, Any]] = [
+            {"op": "remove", "path": f"{path}/{_escape(key)}"}
+            for key in sorted(old.keys() - new.keys())
+        ]
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(json_diff(old[key], value, child))
+        return ops
+    if type(old) is type(new) and old == new:
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+class DashboardSnapshot:
+    """One organization's dashboard state and recent deltas"""
+
+    def __init__(self, history: int) -> None:
+        self.state: Dict[str, Any] = {}
+        self.seq = 0
+        # (seq, encoded operations); encoded because later updates modify the
+        # state the operations' values are part of
+        self.history: Deque[Tuple[int, bytes]] = deque(maxlen=history)
+
+
+class DashboardStateStore:
+    """Dashboard snapshots by organization (``None``: not organization-scoped)"""
+
+    def __init__(self, history: Optional[int] = None) -> None:
+        self.history = history or settings.websocket_dashboard_history
+        self.snapshots: Dict[Optional[str], DashboardSnapshot] = {}
+        self.stats = {
+            "updates": 0,
+            "unchanged": 0,
+            "deltas": 0,
+            "operations": 0,
+            "snapshots_sent": 0,
+            "resyncs": 0,
+        }
+
+    def update(
+        self, organization_id: Optional[str], path: Sequence[str], value: Any
+    ) -> Optional[Dict[str, Any]]:
+        """Set ``path`` to ``value``; the delta message, or None if unchanged"""
+        self.stats["updates"] += 1
+        organization_id = _scope(organization_id)
+        # Compare in JSON form, as clients see it
+        value = json.loads(dumps(value))
+        snapshot = self.snapshots.get(organization_id)
+        if snapshot is None:
+            snapshot = self.snapshots[organization_id] = DashboardSnapshot(self.history)
+
+        parent = snapshot.state
+        pointer = ""
+        ops: List[Dict[str, Any]] = []
+        for depth, key in enumerate(path[:-1]):
+            pointer = f"{pointer}/{_escape(key)}"
+            child = parent.get(key)
+            if not isinstance(child, dict):
+                # Create the missing branch with one operation
+                for missing in reversed(path[depth + 1 :]):
+                    value = {missing: value}
+                ops.append(
+                    {
+                        "op": "add" if child is None else "replace",
+                        "path": pointer,
+                        "value": value,
+                    }
+                )
+                parent[key] = value
+                break
+            parent = child
+        else:
+            key = path[-1]
+            pointer = f"{pointer}/{_escape(key)}"
+            if key not in parent:
+                ops.append({"op": "add", "path": pointer, "value": value})
+            else:
+                ops.extend(json_diff(parent[key], value, pointer))
+            parent[key] = value
+
+        if not ops:
+            self.stats["unchanged"] += 1
+            return None
+        snapshot.seq += 1
+        snapshot.history.append((snapshot.seq, dumps(ops)))
+        self.stats["deltas"] += 1
+        self.stats["operations"] += len(ops)
+        return self._delta_message(organization_id, snapshot.seq, ops)
+
+    @staticmethod
+    def _delta_message(
+        organization_id: Optional[str], seq: int, ops: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        return {
+            "type": "dashboard_delta",
+            "organization_id": organization_id,
+            "seq": seq,
+            "base_seq": seq - 1,
+            "ops": ops,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    def snapshot_message(self, organization_id: Optional[str]) -> Dict[str, Any]:
+        organization_id = _scope(organization_id)
+        snapshot = self.snapshots.get(organization_id)
+        self.stats["snapshots_sent"] += 1
+        return {
+            "type": "dashboard_snapshot",
+            "organization_id": organization_id,
+            "seq": snapshot.seq if snapshot else 0,
+            "state": snapshot.state if snapshot else {},
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    def snapshot_messages(
+        self, organization_ids: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Snapshots for a newly connected client
+
+        The unscoped dashboard plus the given organizations, or every known
+        organization.
+        """
+        if organization_ids is None:
+            scopes = list(self.snapshots) or [None]
+        else:
+            scopes = [None, *organization_ids]
+        return [self.snapshot_message(scope) for scope in scopes]
+
+    def resync_messages(
+        self, organization_id: Optional[str], since_seq: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Deltas after ``since_seq`` if all are retained, else a snapshot"""
+        self.stats["resyncs"] += 1
+        organization_id = _scope(organization_id)
+        snapshot = self.snapshots.get(organization_id)
+        if snapshot is not None and since_seq is not None:
+            missed = [entry for entry in snapshot.history if entry[0] > since_seq]
+            if since_seq == snapshot.seq or (missed and missed[0][0] == since_seq + 1):
+                return [
+                    self._delta_message(organization_id, seq, json.loads(ops))
+                    for seq, ops in missed
+                ]
+        return [self.snapshot_message(organization_id)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "organizations": len(self.snapshots),
+            "sequences": {
+                str(scope): snapshot.seq for scope, snapshot in self.snapshots.items()
+            },
+        }
@@ -37,14 +37,12 @@ class LocationHandler:
 
     @staticmethod
     async def broadcast_location_batch(updates: list) -> None:
-        """Broadcast multiple location updates in a batch"""
-        message = {
-            "type": "location_batch",
-            "updates": updates,
-            "timestamp": datetime.now().isoformat(),
-        }
+        """Broadcast multiple location updates in a batch
 
-        await manager.broadcast_to_type(message, "locations")
+        Each update is a ``location_update`` message; paced clients fold them
+        into their own batches.
+        """
+        await manager.broadcast_location_batch(updates)
         logger.debug(f"Broadcasted {len(updates)} location updates")
 
 
@@ -155,30 +153,24 @@ class DashboardHandler:
         value: Any,
         unit: Optional[str] = None,
         additional_data: Optional[Dict[str, Any]] = None,
+        organization_id: Optional[str] = None,
     ):
-        """Broadcast metric update to dashboard subscribers"""
-        message = {
-            "type": "metric_update",
-            "metric_name": metric_name,
-            "value": value,
-            "unit": unit,
-            "timestamp": datetime.now().isoformat(),
-            "data": additional_data or {},
-        }
-
-        await manager.broadcast_to_type(message, "dashboard")
+        """Update a dashboard metric; subscribers receive only what changed"""
+        await manager.broadcast_dashboard_update(
+            ["metrics", metric_name],
+            {"value": value, "unit": unit, "data": additional_data or {}},
+            organization_id,
+        )
         logger.debug(f"Broadcasted metric update: {metric_name} = {value}")
 
     @staticmethod
-    async def broadcast_dashboard_summary(summary_data: Dict[str, Any]) -> None:
-        """Broadcast dashboard summary data"""
-        message = {
-            "type": "dashboard_summary",
-            "summary": summary_data,
-            "timestamp": datetime.now().isoformat(),
-        }
-
-        await manager.broadcast_to_type(message, "dashboard")
+    async def broadcast_dashboard_summary(
+        summary_data: Dict[str, Any], organization_id: Optional[str] = None
+    ) -> None:
+        """Update the dashboard summary; subscribers receive only what changed"""
+        await manager.broadcast_dashboard_update(
+            ["summary"], summary_data, organization_id
+        )
         logger.debug("Broadcasted dashboard summary")
 
     @staticmethod
@@ -0,0 +1,343 @@
+"""
+Inverted subscription index for WebSocket filter matching
+
+A connection's filters restrict message fields (``asset_ids`` restricts
+``asset_id``, ...). Rather than evaluating every connection's filters for
+every message, each field keeps the connections subscribed to each value and
+the connections that do not filter on that field. A message then goes to the
+intersection, over the fields it carries, of "unfiltered or subscribed to
+this value", computed starting from the smallest of those sets.
+
+Same semantics as the per-connection check: a filter only applies when the
+message carries a value for its field, and an empty filter list matches
+nothing. Values are compared as strings.
+
+A ``viewport`` filter (bounding box plus optional zoom) restricts messages
+carrying ``latitude``/``longitude`` to those inside the box. Viewports are
+indexed by the cells of a uniform grid they overlap, so a location only
+looks at the viewports registered in its cell; viewports covering more than
+``websocket_viewport_max_cells`` cells are checked directly.
+"""
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from config.settings import settings
+
+# Connection filter key -> message field it restricts
+FILTER_FIELDS: Dict[str, str] = {
+    "asset_ids": "asset_id",
+    "site_ids": "site_id",
+    "geofence_ids": "geofence_id",
+    "alert_types": "alert_type",
+    "severity_levels": "severity",
+    "organization_ids": "organization_id",
+}
+
+_EMPTY: frozenset = frozenset()
+
+MAX_ZOOM = 22
+
+# Asset ids listed per cluster; larger clusters only report their count
+CLUSTER_SAMPLE_IDS = 5
+
+
+@dataclass(frozen=True)
+class Viewport:
+    """Map viewport: bounding box in degrees, optional web map zoom level"""
+
+    min_lon: float
+    min_lat: float
+    max_lon: float
+    max_lat: float
+    zoom: Optional[int] = None
+
+    def boxes(self) -> List[Tuple[float, float, float, float]]:
+        """Boxes to index; a viewport crossing the antimeridian is split"""
+        if self.min_lon <= self.max_lon:
+            return [(self.min_lon, self.min_lat, self.max_lon, self.max_lat)]
+        return [
+            (self.min_lon, self.min_lat, 180.0, self.max_lat),
+            (-180.0, self.min_lat, self.max_lon, self.max_lat),
+        ]
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        if not self.min_lat <= latitude <= self.max_lat:
+            return False
+        if self.min_lon <= self.max_lon:
+            return self.min_lon <= longitude <= self.max_lon
+        return longitude >= self.min_lon or longitude <= self.max_lon
+
+
+def parse_viewport(value: Any) -> Viewport:
+    """Viewport from ``{"bbox": [min_lon, min_lat, max_lon, max_lat], "zoom": z}``
+
+    The bounding box may also be given on its own, as a list or a
+    comma-separated string.
+    """
+    zoom = None
+    bbox = value
+    if isinstance(value, dict):
+        bbox = value.get("bbox")
+        zoom = value.get("zoom")
+    if isinstance(bbox, str):
+        bbox = bbox.split(",")
+    if not isinstance(bbox, (list, tuple)) or len(bbox) != 4:
+        raise ValueError("bbox must be [min_lon, min_lat, max_lon, max_lat]")
+    min_lon, min_lat, max_lon, max_lat = (float(edge) for edge in bbox)
+    if not all(math.isfinite(edge) for edge in (min_lon, min_lat, max_lon, max_lat)):
+        raise ValueError("bbox edges must be finite")
+    if not (-180.0 <= min_lon <= 180.0 and -180.0 <= max_lon <= 180.0):
+        raise ValueError("bbox longitudes must be within [-180, 180]")
+    if not -90.0 <= min_lat <= max_lat <= 90.0:
+        raise ValueError("bbox latitudes must be within [-90, 90], min first")
+    if zoom is not None:
+        zoom = int(zoom)
+        if not 0 <= zoom <= MAX_ZOOM:
+            raise ValueError(f"zoom must be within [0, {MAX_ZOOM}]")
+    return Viewport(min_lon, min_lat, max_lon, max_lat, zoom)
+
+
+def message_position(message: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """``(latitude, longitude)`` of a location message, if it has one"""
+    latitude = message.get("latitude")
+    longitude = message.get("longitude")
+    if latitude is None or longitude is None:
+        return None
+    try:
+        return float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None
+
+
+class ViewportGrid:
+    """Viewports indexed by the grid cells they overlap"""
+
+    def __init__(
+        self, cell_degrees: Optional[float] = None, max_cells: Optional[int] = None
+    ) -> None:
+        self.cell_degrees = cell_degrees or settings.websocket_viewport_cell_degrees
+        self.max_cells = max_cells or settings.websocket_viewport_max_cells
+        self.cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        # Viewports too large to index cell by cell
+        self.wide: Set[Hashable] = set()
+        self.viewports: Dict[Hashable, Viewport] = {}
+        self.cell_keys: Dict[Hashable, List[Tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.viewports)
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (
+            math.floor(longitude / self.cell_degrees),
+            math.floor(latitude / self.cell_degrees),
+        )
+
+    def _cover(self, viewport: Viewport) -> Optional[List[Tuple[int, int]]]:
+        """Cells overlapped by ``viewport``; None when there are too many"""
+        ranges = []
+        count = 0
+        for min_lon, min_lat, max_lon, max_lat in viewport.boxes():
+            low_x, low_y = self._cell(min_lat, min_lon)
+            high_x, high_y = self._cell(max_lat, max_lon)
+            count += (high_x - low_x + 1) * (high_y - low_y + 1)
+            if count > self.max_cells:
+                return None
+            ranges.append((low_x, high_x, low_y, high_y))
+        return [
+            (x, y)
+            for low_x, high_x, low_y, high_y in ranges
+            for x in range(low_x, high_x + 1)
+            for y in range(low_y, high_y + 1)
+        ]
+
+    def add(self, connection: Hashable, viewport: Viewport) -> None:
+        self.remove(connection)
+        self.viewports[connection] = viewport
+        cells = self._cover(viewport)
+        if cells is None:
+            self.wide.add(connection)
+            return
+        self.cell_keys[connection] = cells
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(connection)
+
+    def remove(self, connection: Hashable) -> None:
+        if self.viewports.pop(connection, None) is None:
+            return
+        self.wide.discard(connection)
+        for cell in self.cell_keys.pop(connection, ()):
+            members = self.cells.get(cell)
+            if members is not None:
+                members.discard(connection)
+                if not members:
+                    del self.cells[cell]
+
+    def match(self, latitude: float, longitude: float) -> Set[Hashable]:
+        """Connections whose viewport contains the position"""
+        candidates = self.cells.get(self._cell(latitude, longitude), _EMPTY)
+        return {
+            connection
+            for group in (candidates, self.wide)
+            for connection in group
+            if self.viewports[connection].contains(latitude, longitude)
+        }
+
+
+def cluster_cell_degrees(zoom: int) -> float:
+    """Cluster cell size: a quarter of a 256px web map tile at ``zoom``"""
+    return 360.0 / 2 ** (zoom + 2)
+
+
+def cluster_locations(
+    points: Iterable[Tuple[float, float, Any]], zoom: int
+) -> List[Dict[str, Any]]:
+    """Aggregate ``(latitude, longitude, asset_id)`` points per cluster cell"""
+    size = cluster_cell_degrees(zoom)
+    cells: Dict[Tuple[int, int], List[Tuple[float, float, Any]]] = defaultdict(list)
+    for latitude, longitude, asset_id in points:
+        cell = (math.floor(longitude / size), math.floor(latitude / size))
+        cells[cell].append((latitude, longitude, asset_id))
+    clusters = []
+    for members in cells.values():
+        count = len(members)
+        clusters.append(
+            {
+                "latitude": sum(member[0] for member in members) / count,
+                "longitude": sum(member[1] for member in members) / count,
+                "count": count,
+                "asset_ids": [member[2] for member in members[:CLUSTER_SAMPLE_IDS]],
+            }
+        )
+    return clusters
+
+
+def _filter_values(values: Any) -> Optional[Set[str]]:
+    """Normalized filter values; None when the filter is not set"""
+    if values is None:
+        return None
+    if isinstance(values, str):
+        values = [value for value in values.split(",") if value]
+    elif not isinstance(values, (list, tuple, set, frozenset)):
+        values = [values]
+    return {str(value) for value in values}
+
+
+class SubscriptionIndex:
+    """Connections of one type, indexed by the values their filters accept"""
+
+    def __init__(self) -> None:
+        self.members: Set[Hashable] = set()
+        self.unfiltered: Dict[str, Set[Hashable]] = {
+            field: set() for field in FILTER_FIELDS.values()
+        }
+        self.by_value: Dict[str, Dict[str, Set[Hashable]]] = {
+            field: {} for field in FILTER_FIELDS.values()
+        }
+        # Connection -> field -> accepted values, for removal
+        self.subscriptions: Dict[Hashable, Dict[str, Set[str]]] = {}
+        self.viewports = ViewportGrid()
+        self.no_viewport: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def add(self, connection: Hashable, filters: Optional[Dict[str, Any]]) -> None:
+        """Index a connection's filters, replacing any previous ones
+
+        Raises ValueError, leaving the previous filters indexed, when the
+        viewport is invalid.
+        """
+        filters = filters or {}
+        viewport = None
+        if filters.get("viewport") is not None:
+            viewport = parse_viewport(filters["viewport"])
+        self.remove(connection)
+        if viewport is None:
+            self.no_viewport.add(connection)
+        else:
+            self.viewports.add(connection, viewport)
+        accepted: Dict[str, Set[str]] = {}
+        for key, field in FILTER_FIELDS.items():
+            values = _filter_values(filters.get(key))
+            if values is None:
+                self.unfiltered[field].add(connection)
+                continue
+            accepted[field] = values
+            index = self.by_value[field]
+            for value in values:
+                index.setdefault(value, set()).add(connection)
+        self.subscriptions[connection] = accepted
+        self.members.add(connection)
+
+    def remove(self, connection: Hashable) -> None:
+        accepted = self.subscriptions.pop(connection, None)
+        if accepted is None:
+            return
+        self.members.discard(connection)
+        self.no_viewport.discard(connection)
+        self.viewports.remove(connection)
+        for field in FILTER_FIELDS.values():
+            if field not in accepted:
+                self.unfiltered[field].discard(connection)
+                continue
+            index = self.by_value[field]
+            for value in accepted[field]:
+                subscribers = index.get(value)
+                if subscribers is not None:
+                    subscribers.discard(connection)
+                    if not subscribers:
+                        del index[value]
+
+    def match(self, message: Dict[str, Any]) -> Iterable[Hashable]:
+        """Connections whose filters accept ``message``"""
+        constraints: List[Tuple[int, Set[Hashable], Set[Hashable]]] = []
+        for field in FILTER_FIELDS.values():
+            value = message.get(field)
+            if not value:
+                continue
+            unfiltered = self.unfiltered[field]
+            subscribed = self.by_value[field].get(str(value), _EMPTY)
+            size = len(unfiltered) + len(subscribed)
+            constraints.append((size, unfiltered, subscribed))
+        position = message_position(message)
+        if position is not None and self.viewports.viewports:
+            inside = self.viewports.match(*position)
+            size = len(self.no_viewport) + len(inside)
+            constraints.append((size, self.no_viewport, inside))
+        if not constraints:
+            return self.members
+
+        constraints.sort(key=lambda constraint: constraint[0])
+        _, unfiltered, subscribed = constraints[0]
+        others = constraints[1:]
+        if not others:
+            return [*unfiltered, *subscribed]
+        return [
+            connection
+            for candidates in (unfiltered, subscribed)
+            for connection in candidates
+            if all(
+                connection in other_unfiltered or connection in other_subscribed
+                for _, other_unfiltered, other_subscribed in others
+            )
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self.members),
+            "fields": {
+                field: {
+                    "unfiltered": len(self.unfiltered[field]),
+                    "distinct_values": len(self.by_value[field]),
+                }
+                for field in FILTER_FIELDS.values()
+            },
+            "viewports": {
+                "connections": len(self.viewports),
+                "indexed_cells": len(self.viewports.cells),
+                "wide": len(self.viewports.wide),
+            },
+        }
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+List Endpoint Serialization Benchmark
+
+Compares the per-1000-row cost of turning asset rows into a JSON response
+body the old way (ORM object per row -> asset_to_response -> FastAPI
+response_model validation -> json) against the RowSerializer fast path.
+
+Usage:
+    python scripts/benchmark_serialization.py [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# Registers the models Asset's relationships refer to
+import modules.shared.database.models  # noqa: E402,F401
+from modules.assets.api import asset_serializer, asset_to_response  # noqa: E402
+from modules.assets.models import Asset  # noqa: E402
+from modules.assets.schemas import AssetResponse  # noqa: E402
+from modules.shared import serialization  # noqa: E402
+
+COLUMNS = [
+    "id", "organization_id", "name", "serial_number", "asset_type", "status",
+    "current_site_id", "location_description", "last_seen", "battery_level",
+    "temperature", "movement_status", "assigned_to_user_id", "assigned_job_id",
+    "assignment_start_date", "assignment_end_date", "manufacturer", "model",
+    "purchase_date", "warranty_expiry", "last_maintenance", "next_maintenance",
+    "hourly_rate", "availability", "asset_metadata", "created_at", "updated_at",
+]
+
+
+class FakeRow(tuple):
+    """Tuple row with a ``_mapping`` view, like SQLAlchemy's Row"""
+
+    @property
+    def _mapping(self) -> Dict[str, Any]:
+        return dict(zip(COLUMNS, self))
+
+
+def make_rows(count: int) -> List[FakeRow]:
+    """Rows shaped like the raw SQL result of GET /assets"""
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    rows = []
+    for i in range(count):
+        rows.append(
+            FakeRow(
+                (
+                    uuid.uuid4().hex,
+                    uuid.uuid4().hex,
+                    f"Asset {i}",
+                    f"SN-{i:06d}",
+                    "equipment",
+                    "active",
+                    uuid.uuid4().hex,
+                    "Warehouse A",
+                    now,
+                    80,
+                    Decimal("21.50"),
+                    "stationary",
+                    None,
+                    None,
+                    None,
+                    None,
+                    "Acme",
+                    "X1",
+                    now - timedelta(days=365),
+                    now + timedelta(days=365),
+                    now - timedelta(days=30),
+                    now + timedelta(days=30),
+                    Decimal("45.00"),
+                    "available",
+                    '{"color": "yellow"}',
+                    now,
+                    now,
+                )
+            )
+        )
+    return rows
+
+
+def before(rows: List[FakeRow]) -> bytes:
+    """ORM object per row, Pydantic model per row, response_model re-validation"""
+    assets = []
+    for row in rows:
+        asset = Asset()
+        for index, column in enumerate(COLUMNS):
+            setattr(asset, column, row[index])
+        assets.append(asset)
+    models = [asset_to_response(asset) for asset in assets]
+    validated = TypeAdapter(List[AssetResponse]).validate_python(models)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def after(rows: List[FakeRow]) -> bytes:
+    """Rows mapped straight to dicts and encoded once"""
+    return asset_serializer.response(rows).body
+
+
+def measure(
+    func: Callable[[List[FakeRow]], bytes], rows: List[FakeRow], repeat: int
+) -> float:
+    """Best-of-N milliseconds per 1000 rows"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000 * 1000 / len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    # Warm up converters and the TypeAdapter
+    before(rows[:10])
+    after(rows[:10])
+
+    before_ms = measure(before, rows, args.repeat)
+    after_ms = measure(after, rows, args.repeat)
+    encoder = "orjson" if serialization.orjson is not None else "json (no orjson)"
+
+    print(f"Rows: {args.rows}, repeat: {args.repeat}, encoder: {encoder}")
+    print(f"before: {before_ms:8.2f} ms / 1000 rows")
+    print(f"after:  {after_ms:8.2f} ms / 1000 rows")
+    print(f"speedup: {before_ms / after_ms:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
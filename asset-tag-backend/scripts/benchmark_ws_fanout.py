@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Cross-Worker WebSocket Fan-out Benchmark
+
+Starts N worker processes, each with its own ConnectionManager, a number of
+in-memory dashboard connections and a ClusterBroadcastBus on the configured
+Redis. Worker 0 broadcasts timestamped messages; every connection in every
+worker records how long each message took to reach its send queue's writer.
+Reports per-worker and overall latency percentiles.
+
+Requires Redis (ASSET_TAG_USE_REDIS=true, ASSET_TAG_REDIS_URL).
+
+Usage:
+    python scripts/benchmark_ws_fanout.py [--workers 4] [--connections 250]
+        [--messages 500] [--rate 200]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+class RecordingWebSocket:
+    """Stands in for a client socket; records delivery latency"""
+
+    def __init__(self, latencies: List[float]) -> None:
+        self.latencies = latencies
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        message = json.loads(text)
+        if message.get("type") == "benchmark":
+            self.latencies.append((time.time() - message["sent_at"]) * 1000)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_worker(
+    number: int, args: argparse.Namespace, barrier: Any, results: Any
+) -> None:
+    from config.cache import get_cache
+    from modules.websocket.cluster import ClusterBroadcastBus
+    from modules.websocket.connection_manager import ConnectionManager
+
+    if not (await get_cache()).enabled:
+        raise SystemExit("Redis is disabled; set ASSET_TAG_USE_REDIS=true")
+
+    manager = ConnectionManager()
+    bus = ClusterBroadcastBus(worker_id=f"bench-{number}")
+    manager.attach_cluster(bus)
+    await bus.start()
+    await bus.subscribed.wait()
+
+    latencies: List[float] = []
+    for _ in range(args.connections):
+        await manager.connect(RecordingWebSocket(latencies), "dashboard")
+
+    await asyncio.get_running_loop().run_in_executor(None, barrier.wait)
+
+    if number == 0:
+        interval = 1.0 / args.rate
+        for sequence in range(args.messages):
+            await manager.broadcast_to_type(
+                {"type": "benchmark", "sequence": sequence, "sent_at": time.time()},
+                "dashboard",
+            )
+            await asyncio.sleep(interval)
+
+    expected = args.messages * args.connections
+    deadline = time.monotonic() + args.messages / args.rate + args.timeout
+    while len(latencies) < expected and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+    results.put(
+        {
+            "worker": number,
+            "delivered": len(latencies),
+            "expected": expected,
+            "latencies": latencies,
+            "bus": bus.get_stats(),
+        }
+    )
+    for websocket in list(manager.clients):
+        manager.disconnect(websocket)
+    await bus.stop()
+
+
+def worker_main(
+    number: int, args: argparse.Namespace, barrier: Any, results: Any
+) -> None:
+    asyncio.run(run_worker(number, args, barrier, results))
+
+
+def print_report(reports: List[Dict[str, Any]]) -> None:
+    print(f"{'worker':>6} {'delivered':>12} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    everything: List[float] = []
+    for report in sorted(reports, key=lambda r: r["worker"]):
+        latencies = report["latencies"]
+        everything.extend(latencies)
+        print(
+            f"{report['worker']:>6} "
+            f"{report['delivered']:>6}/{report['expected']:<5} "
+            f"{percentile(latencies, 0.5):>9.2f} "
+            f"{percentile(latencies, 0.99):>9.2f} "
+            f"{max(latencies, default=float('nan')):>9.2f}"
+        )
+    remote = [r["latencies"] for r in reports if r["worker"] != 0]
+    remote_latencies = [value for latencies in remote for value in latencies]
+    print(
+        f"\nall workers: p50 {percentile(everything, 0.5):.2f} ms, "
+        f"p99 {percentile(everything, 0.99):.2f} ms"
+    )
+    if remote_latencies:
+        print(
+            f"other workers only: p50 {percentile(remote_latencies, 0.5):.2f} ms, "
+            f"p99 {percentile(remote_latencies, 0.99):.2f} ms"
+        )
+    publisher = next(r for r in reports if r["worker"] == 0)["bus"]
+    print(
+        f"publisher: {publisher['forwarded']} messages in "
+        f"{publisher['published_batches']} PUBLISH calls"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--connections", type=int, default=250)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=200.0, help="messages/second")
+    parser.add_argument(
+        "--timeout", type=float, default=10.0, help="seconds to wait after sending"
+    )
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker_main, args=(number, args, barrier, results))
+        for number in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    print_report(reports)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Import Time Profile
+
+Imports a module (the application entry point by default) in a fresh
+interpreter with ``-X importtime`` and lists the slowest modules by
+cumulative and self time, so a heavy dependency pulled in at startup is easy
+to spot. Exits non-zero when the total import time exceeds ``--budget-ms``.
+
+Usage:
+    python scripts/import_profile.py [--module main] [--top 25] [--json]
+                                     [--budget-ms 3000]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Project root, where the application modules are importable from
+project_root = Path(__file__).parent.parent
+
+IMPORTTIME_LINE = re.compile(
+    r"^import time:\s+(?P<self>\d+)\s+\|\s+(?P<cumulative>\d+)\s+\|"
+    r"(?P<indent>\s+)(?P<name>\S+)\s*$"
+)
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` output into per-module timings (microseconds)"""
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        modules.append(
+            {
+                "module": match.group("name"),
+                "self_us": int(match.group("self")),
+                "cumulative_us": int(match.group("cumulative")),
+                # Nesting depth: one level per two spaces after the first
+                "depth": (len(match.group("indent")) - 1) // 2,
+            }
+        )
+    return modules
+
+
+def profile_imports(module: str = "main") -> Dict[str, Any]:
+    """Import ``module`` in a subprocess and return its import timings"""
+    env = dict(os.environ)
+    env.setdefault("ASSET_TAG_ENVIRONMENT", "test")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(project_root),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(
+            f"import {module} failed:\n{completed.stderr.strip()[-2000:]}"
+        )
+
+    modules = parse_importtime(completed.stderr)
+    # The target's own top-level line; interpreter startup is excluded
+    total_us = next(
+        (
+            m["cumulative_us"]
+            for m in reversed(modules)
+            if m["module"] == module and m["depth"] == 0
+        ),
+        0,
+    )
+    return {
+        "module": module,
+        "total_ms": round(total_us / 1000, 1),
+        "modules": modules,
+        "loaded": sorted({m["module"] for m in modules}),
+    }
+
+
+def print_report(profile: Dict[str, Any], top: int) -> None:
+    modules = profile["modules"]
+    print(f"import {profile['module']}: {profile['total_ms']} ms total")
+    print(f"{len(modules)} modules imported\n")
+
+    for title, key in (("cumulative", "cumulative_us"), ("self", "self_us")):
+        print(f"Top {top} by {title} time:")
+        print(f"{'ms':>10}  module")
+        for entry in sorted(modules, key=lambda m: m[key], reverse=True)[:top]:
+            print(f"{entry[key] / 1000:>10.1f}  {entry['module']}")
+        print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile module import time")
+    parser.add_argument("--module", default="main", help="Module to import")
+    parser.add_argument("--top", type=int, default=25, help="Rows per table")
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    parser.add_argument(
+        "--budget-ms", type=float, help="Fail when total import time exceeds this"
+    )
+    args = parser.parse_args()
+
+    profile = profile_imports(args.module)
+    if args.json:
+        print(json.dumps(profile, indent=2))
+    else:
+        print_report(profile, args.top)
+
+    if args.budget_ms is not None and profile["total_ms"] > args.budget_ms:
+        print(
+            f"Import time {profile['total_ms']} ms exceeds budget "
+            f"{args.budget_ms} ms",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
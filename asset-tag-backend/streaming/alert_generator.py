@@ -4,10 +4,13 @@ Alert generation service
 
 import logging
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
 
 from config.database import get_db
 from modules.alerts.models import Alert
+from modules.alerts.statistics import alert_statistics
 
 logger = logging.getLogger(__name__)
 
@@ -42,11 +45,14 @@ class AlertGenerator:
                     geofence_name=alert_data.get("geofence_name"),
                     triggered_at=datetime.fromisoformat(alert_data["triggered_at"]),
                     auto_resolvable=alert_data.get("auto_resolvable", False),
-                    metadata=alert_data.get("metadata", {}),
+                    alert_metadata=alert_data.get("metadata", {}),
                 )
 
                 db.add(alert)
                 await db.commit()
+                await alert_statistics.record_created(
+                    alert.alert_type, alert.severity, alert.status
+                )
 
                 logger.info(
                     f"Created alert {alert.id} for asset {alert_data['asset_id']}"
@@ -60,13 +66,17 @@ class AlertGenerator:
         """Acknowledge an alert"""
         try:
             async for db in get_db():
-                result = await db.execute(db.query(Alert).where(Alert.id == alert_id))
+                result = await db.execute(select(Alert).where(Alert.id == alert_id))
                 alert = result.scalar_one_or_none()
 
                 if alert:
+                    previous_status = alert.status
                     alert.status = "acknowledged"
                     alert.acknowledged_at = datetime.now()
                     await db.commit()
+                    await alert_statistics.record_transition(
+                        previous_status, "acknowledged"
+                    )
                     logger.info(f"Alert {alert_id} acknowledged")
                 break
 
@@ -79,16 +89,20 @@ class AlertGenerator:
         """Resolve an alert"""
         try:
             async for db in get_db():
-                result = await db.execute(db.query(Alert).where(Alert.id == alert_id))
+                result = await db.execute(select(Alert).where(Alert.id == alert_id))
                 alert = result.scalar_one_or_none()
 
                 if alert:
+                    previous_status = alert.status
                     alert.status = "resolved"
                     alert.resolved_at = datetime.now()
                     alert.resolution_notes = notes
                     if user_id:
                         alert.resolved_by_user_id = user_id
                     await db.commit()
+                    await alert_statistics.record_transition(
+                        previous_status, "resolved"
+                    )
                     logger.info(f"Alert {alert_id} resolved")
                 break
 
@@ -6,13 +6,14 @@ import asyncio
 import logging
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.cache import get_cache
 from config.database import get_db
+from ml.features.feature_store import feature_store
 from modules.assets.models import Asset
 from modules.gateways.models import Gateway
 from modules.locations.estimator import GatewayObservation, LocationEstimator
@@ -35,7 +36,14 @@ class ObservationProcessor:
             # Get database session
             async for db in get_db():
                 # Store the observation
-                await self._store_observation(db, observation_data)
+                stored = await self._store_observation(db, observation_data)
+
+                # Keep the asset's online features current
+                if stored:
+                    asset_id, gateway_id = stored
+                    await feature_store.observe(
+                        asset_id, {**observation_data, "gateway_id": gateway_id}
+                    )
 
                 # Add to buffer for location estimation
                 await self._add_to_buffer(observation_data)
@@ -50,8 +58,8 @@ class ObservationProcessor:
 
     async def _store_observation(
         self, db: AsyncSession, observation_data: Dict[str, Any]
-    ):
-        """Store observation in database"""
+    ) -> Optional[Tuple[str, str]]:
+        """Store observation in database; returns (asset_id, gateway_id)"""
         try:
             # Get asset and gateway IDs
             asset_id = await self._get_asset_id(db, observation_data["asset_tag_id"])
@@ -59,7 +67,7 @@ class ObservationProcessor:
 
             if not asset_id or not gateway_id:
                 logger.warning(f"Asset or gateway not found: {observation_data}")
-                return
+                return None
 
             # Create observation record
             observation = Observation(
@@ -80,10 +88,12 @@ class ObservationProcessor:
             logger.debug(
                 f"Stored observation for asset {asset_id} from gateway {gateway_id}"
             )
+            return str(asset_id), str(gateway_id)
 
         except Exception as e:
             logger.error(f"Error storing observation: {e}")
             await db.rollback()
+            return None
 
     async def _get_asset_id(self, db: AsyncSession, asset_tag_id: str) -> str:
         """Get asset ID from asset tag ID"""
@@ -157,7 +167,10 @@ class ObservationProcessor:
 
             # Convert to GatewayObservation objects
             gateway_observations = []
+            resolved_asset_id = None
             async for db in get_db():
+                # Observations are buffered by tag; features are kept by asset
+                resolved_asset_id = await self._get_asset_id(db, asset_id)
                 for obs_data in observations:
                     gateway_id = await self._get_gateway_id(db, obs_data["gateway_id"])
                     if gateway_id:
@@ -185,6 +198,11 @@ class ObservationProcessor:
                 # Store estimated location
                 await self._store_estimated_location(estimated_location)
 
+                if estimated_location and resolved_asset_id:
+                    await feature_store.observe_location(
+                        resolved_asset_id, estimated_location
+                    )
+
                 # Trigger geofence evaluation
                 await self._trigger_geofence_evaluation(estimated_location)
 
@@ -2,14 +2,17 @@
 Enhanced anomaly detection processor
 """
 
-import asyncio
 import logging
+import time
 from collections import defaultdict, deque
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
+from sqlalchemy import text
+
 from config.cache import get_cache
-from config.database import get_db
+from config.database import analytics_session, get_db
+from config.settings import settings
 from ml.features.feature_store import FeatureStore, get_feature_store
 from ml.serving.inference import InferenceEngine, get_inference_engine
 from modules.alerts.models import Alert
@@ -31,9 +34,9 @@ class AnomalyProcessor:
         self.cache = None
         self.db = None
         self.running = False
-        self.processing_task = None
         self.asset_cooldowns = defaultdict(lambda: datetime.min)  # Prevent spam alerts
         self.cooldown_duration = timedelta(minutes=15)  # 15 minute cooldown
+        self.last_sweep: Dict[str, Any] = {}
 
     async def _get_inference_engine(self) -> InferenceEngine:
         """Get inference engine"""
@@ -61,22 +64,31 @@ class AnomalyProcessor:
 
     async def start(self) -> None:
         """Start the anomaly processor"""
+        from modules.scheduler.cron import IntervalSchedule
+        from modules.scheduler.scheduler import ScheduledJob, scheduler
+
         if self.running:
             return
 
         self.running = True
-        self.processing_task = asyncio.create_task(self._processing_loop())
+        # The sweep covers all assets, so it runs once per cluster
+        scheduler.add_job(
+            ScheduledJob(
+                name="anomaly_sweep",
+                func=self._periodic_anomaly_detection,
+                schedule=IntervalSchedule(self.processing_interval),
+                missed_run_policy="skip",
+                timeout_seconds=max(self.processing_interval * 10, 300),
+            )
+        )
         logger.info("Anomaly processor started")
 
     async def stop(self) -> None:
         """Stop the anomaly processor"""
+        from modules.scheduler.scheduler import scheduler
+
         self.running = False
-        if self.processing_task:
-            self.processing_task.cancel()
-            try:
-                await self.processing_task
-            except asyncio.CancelledError:
-                pass
+        scheduler.remove_job("anomaly_sweep")
         logger.info("Anomaly processor stopped")
 
     async def process_location_update(self, location_data: Dict[str, Any]) -> None:
@@ -99,56 +111,57 @@ class AnomalyProcessor:
         except Exception as e:
             logger.error(f"Error processing location update for anomaly detection: {e}")
 
-    async def _processing_loop(self) -> None:
-        """Main processing loop for periodic anomaly detection"""
-        while self.running:
-            try:
-                await asyncio.sleep(self.processing_interval)
-
-                if self.running:
-                    await self._periodic_anomaly_detection()
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in anomaly processing loop: {e}")
-                await asyncio.sleep(60)  # Wait before retrying
-
     async def _periodic_anomaly_detection(self) -> None:
-        """Periodic anomaly detection for all active assets"""
-        try:
-            # Get all active assets
-            db = await self._get_db()
-            assets = await db.execute(
-                "SELECT id FROM assets WHERE status = 'active' AND deleted_at IS NULL"
-            )
-            asset_ids = [str(row.id) for row in assets.fetchall()]
+        """Periodic anomaly detection for all active assets
 
-            # Process assets in parallel (with concurrency limit)
-            semaphore = asyncio.Semaphore(10)  # Limit concurrent processing
+        Assets outside their cooldown are scored in batches of
+        ``ml_anomaly_batch_size`` through the batch inference path.
+        """
+        try:
+            started = time.monotonic()
 
-            tasks = []
-            for asset_id in asset_ids:
-                if not self._is_in_cooldown(asset_id):
-                    task = asyncio.create_task(
-                        self._detect_anomaly_with_semaphore(semaphore, asset_id)
+            # Get all active assets
+            async with analytics_session() as db:
+                assets = await db.execute(
+                    text(
+                        "SELECT id FROM assets "
+                        "WHERE status = 'active' AND deleted_at IS NULL"
                     )
-                    tasks.append(task)
+                )
+                asset_ids = [str(row.id) for row in assets.fetchall()]
 
-            # Wait for all tasks to complete
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
+            due = [
+                asset_id for asset_id in asset_ids if not self._is_in_cooldown(asset_id)
+            ]
+            inference_engine = await self._get_inference_engine()
+            batch_size = settings.ml_anomaly_batch_size
+            batches = 0
+            anomalies = 0
+            for start in range(0, len(due), batch_size):
+                predictions = await inference_engine.predict_anomaly_batch(
+                    due[start : start + batch_size]
+                )
+                batches += 1
+                for asset_id, prediction in predictions.items():
+                    if await self._handle_prediction(asset_id, prediction):
+                        anomalies += 1
+
+            self.last_sweep = {
+                "finished_at": datetime.now().isoformat(),
+                "duration_seconds": round(time.monotonic() - started, 3),
+                "active_assets": len(asset_ids),
+                "assets_scored": len(due),
+                "batches": batches,
+                "anomalies": anomalies,
+            }
+            logger.info(
+                f"Anomaly sweep scored {len(due)} assets in {batches} batches "
+                f"({self.last_sweep['duration_seconds']}s, {anomalies} anomalies)"
+            )
 
         except Exception as e:
             logger.error(f"Error in periodic anomaly detection: {e}")
 
-    async def _detect_anomaly_with_semaphore(
-        self, semaphore: asyncio.Semaphore, asset_id: str
-    ):
-        """Detect anomaly with semaphore for concurrency control"""
-        async with semaphore:
-            await self._detect_anomaly(asset_id)
-
     async def _detect_anomaly(
         self, asset_id: str, location_data: Optional[Dict[str, Any]] = None
     ):
@@ -159,28 +172,35 @@ class AnomalyProcessor:
 
             # Get anomaly prediction
             prediction = await inference_engine.predict_anomaly(asset_id)
+            await self._handle_prediction(asset_id, prediction)
 
-            if not prediction or "error" in prediction:
-                logger.warning(f"Could not get anomaly prediction for asset {asset_id}")
-                return
+        except Exception as e:
+            logger.error(f"Error detecting anomaly for asset {asset_id}: {e}")
 
-            anomaly_score = prediction.get("anomaly_score", 0.0)
-            is_anomalous = prediction.get("is_anomalous", False)
-            confidence = prediction.get("confidence", 0.0)
+    async def _handle_prediction(
+        self, asset_id: str, prediction: Optional[Dict[str, Any]]
+    ) -> bool:
+        """Raise an alert for an anomalous prediction; True if one was raised"""
+        if not prediction or "error" in prediction:
+            logger.warning(f"Could not get anomaly prediction for asset {asset_id}")
+            return False
 
-            # Check if anomaly threshold is exceeded
-            if is_anomalous and confidence > 0.5:
-                await self._create_anomaly_alert(
-                    asset_id, anomaly_score, confidence, prediction
-                )
-                self._set_cooldown(asset_id)
+        anomaly_score = prediction.get("anomaly_score", 0.0)
+        is_anomalous = prediction.get("is_anomalous", False)
+        confidence = prediction.get("confidence", 0.0)
 
-            logger.debug(
-                f"Anomaly detection for asset {asset_id}: score={anomaly_score:.3f}, anomalous={is_anomalous}"
-            )
+        logger.debug(
+            f"Anomaly detection for asset {asset_id}: score={anomaly_score:.3f}, anomalous={is_anomalous}"
+        )
 
-        except Exception as e:
-            logger.error(f"Error detecting anomaly for asset {asset_id}: {e}")
+        # Check if anomaly threshold is exceeded
+        if is_anomalous and confidence > 0.5:
+            await self._create_anomaly_alert(
+                asset_id, anomaly_score, confidence, prediction
+            )
+            self._set_cooldown(asset_id)
+            return True
+        return False
 
     async def _create_anomaly_alert(
         self,
@@ -283,6 +303,8 @@ class AnomalyProcessor:
                 / 60,
                 "assets_in_cooldown": assets_in_cooldown,
                 "total_cooldown_entries": len(self.asset_cooldowns),
+                "batch_size": settings.ml_anomaly_batch_size,
+                "last_sweep": self.last_sweep,
             }
 
         except Exception as e:
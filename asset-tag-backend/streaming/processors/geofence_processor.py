@@ -2,7 +2,6 @@
 Enhanced geofence evaluation processor
 """
 
-import asyncio
 import logging
 import math
 from collections import defaultdict
@@ -26,7 +25,6 @@ class GeofenceProcessor:
         self.cache = None
         self.db = None
         self.running = False
-        self.processing_task = None
         self.asset_geofence_states = defaultdict(
             set
         )  # Track which geofences each asset is in
@@ -48,22 +46,33 @@ class GeofenceProcessor:
 
     async def start(self) -> None:
         """Start the geofence processor"""
+        from modules.scheduler.cron import IntervalSchedule
+        from modules.scheduler.scheduler import ScheduledJob, scheduler
+
         if self.running:
             return
 
         self.running = True
-        self.processing_task = asyncio.create_task(self._processing_loop())
+        # The geofence cache is per process, so every process refreshes its own
+        scheduler.add_job(
+            ScheduledJob(
+                name="geofence_cache_refresh",
+                func=self._update_geofence_cache,
+                schedule=IntervalSchedule(self.cache_ttl.total_seconds()),
+                exclusive=False,
+                jitter_seconds=30,
+                missed_run_policy="skip",
+                run_on_start=True,
+            )
+        )
         logger.info("Geofence processor started")
 
     async def stop(self) -> None:
         """Stop the geofence processor"""
+        from modules.scheduler.scheduler import scheduler
+
         self.running = False
-        if self.processing_task:
-            self.processing_task.cancel()
-            try:
-                await self.processing_task
-            except asyncio.CancelledError:
-                pass
+        scheduler.remove_job("geofence_cache_refresh")
         logger.info("Geofence processor stopped")
 
     async def process_location_update(self, location_data: Dict[str, Any]) -> None:
@@ -85,23 +94,6 @@ class GeofenceProcessor:
                 f"Error processing location update for geofence evaluation: {e}"
             )
 
-    async def _processing_loop(self) -> None:
-        """Main processing loop for periodic geofence cache updates"""
-        while self.running:
-            try:
-                await asyncio.sleep(self.processing_interval)
-
-                if self.running:
-                    # Update geofence cache if needed
-                    if self._should_update_cache():
-                        await self._update_geofence_cache()
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in geofence processing loop: {e}")
-                await asyncio.sleep(30)  # Wait before retrying
-
     def _should_update_cache(self) -> bool:
         """Check if geofence cache should be updated"""
         return datetime.now() - self.last_cache_update > self.cache_ttl
@@ -7,6 +7,7 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from ml.features.feature_store import feature_store
 from streaming.processors.anomaly_processor import (get_anomaly_processor,
                                                     start_anomaly_processor,
                                                     stop_anomaly_processor)
@@ -54,6 +55,9 @@ class StreamProcessorCoordinator:
             # Wait for all processors to start
             await asyncio.gather(*self.startup_tasks, return_exceptions=True)
 
+            # Checkpoint the online features the processors maintain
+            await feature_store.start_online_updates()
+
             self.running = True
             logger.info("All stream processors started successfully")
 
@@ -79,6 +83,7 @@ class StreamProcessorCoordinator:
 
             # Wait for all processors to stop
             await asyncio.gather(*stop_tasks, return_exceptions=True)
+            await feature_store.stop_online_updates()
 
             # Cancel any pending startup tasks
             for task in self.startup_tasks:
@@ -122,7 +127,8 @@ class StreamProcessorCoordinator:
                 "coordinator": {
                     "running": self.running,
                     "processors": list(self.processors.keys()),
-                }
+                },
+                "online_features": feature_store.online.get_stats(),
             }
 
             # Get stats from each processor
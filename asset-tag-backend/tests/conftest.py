@@ -5,7 +5,7 @@ Pytest configuration and fixtures
 import asyncio
 import os
 import uuid
-from typing import AsyncGenerator, Generator
+from typing import Any, AsyncGenerator, Callable, Generator
 
 # Set test environment BEFORE any imports
 os.environ["ASSET_TAG_ENVIRONMENT"] = "test"
@@ -25,7 +25,7 @@ from config.uuid_compat import setup_uuid_compatibility
 
 setup_uuid_compatibility()
 
-from config.database import Base, get_db
+from config.database import Base, get_analytics_db, get_db, get_read_db
 from config.settings import settings
 # Import test database configuration from separate module
 from config.test_database import TestSessionLocal, test_engine
@@ -48,6 +48,13 @@ async def create_test_data():
         logger.info(f"Test data seeded: {summary}")
 
 
+def pytest_configure(config) -> None:
+    """Register markers (pytest.ini's [tool:pytest] section is not read)"""
+    config.addinivalue_line(
+        "markers", "perf: Timing checks that depend on machine speed"
+    )
+
+
 @pytest.fixture(scope="session")
 def event_loop() -> Generator:
     """Create an instance of the default event loop for the test session."""
@@ -144,6 +151,8 @@ async def async_client() -> AsyncGenerator[AsyncClient, None]:
     # Override database dependency
     from config.test_database import get_test_db
     app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_read_db] = get_test_db
+    app.dependency_overrides[get_analytics_db] = get_test_db
 
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
@@ -151,12 +160,35 @@ async def async_client() -> AsyncGenerator[AsyncClient, None]:
     # Clean up override
     app.dependency_overrides.clear()
 
+@pytest_asyncio.fixture
+async def websocket_managers() -> AsyncGenerator[Callable[[], Any], None]:
+    """Factory of WebSocket connection managers, closed after the test
+
+    Closing awaits each connection's writer and pacer tasks, which would
+    otherwise still be pending when the test ends.
+    """
+    from modules.websocket.connection_manager import ConnectionManager
+
+    managers = []
+
+    def make_manager() -> ConnectionManager:
+        manager = ConnectionManager()
+        managers.append(manager)
+        return manager
+
+    yield make_manager
+    for manager in managers:
+        await manager.close_all()
+
+
 @pytest.fixture(scope="function")
 def client() -> TestClient:
     """Create a synchronous test client for backward compatibility."""
     # Override database dependency
     from config.test_database import get_test_db
     app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_read_db] = get_test_db
+    app.dependency_overrides[get_analytics_db] = get_test_db
 
     with TestClient(app) as tc:
         yield tc
@@ -30,6 +30,13 @@ class TestMainApplication:
         assert "timestamp" in data
         assert data["status"] == "healthy"
 
+    def test_database_pool_health(self, client: TestClient) -> None:
+        """Test the connection pool utilization endpoint"""
+        response = client.get("/health/db-pools")
+        assert response.status_code == 200
+        pools = response.json()["pools"]
+        assert set(pools) == {"primary", "read", "analytics"}
+
     def test_docs_endpoint(self, client: TestClient) -> None:
         """Test that docs endpoint is accessible in local environment"""
         response = client.get("/docs")
@@ -0,0 +1,83 @@
+"""
+Unit tests for alert statistics
+"""
+
+from datetime import datetime
+
+import pytest
+
+from modules.alerts.models import Alert
+from modules.alerts.statistics import (AlertStatisticsService,
+                                       build_stats_response)
+
+
+class TestStatsResponse:
+    """Test shaping counters into the statistics response"""
+
+    def test_defaults_are_zero_filled(self) -> None:
+        """Test that known categories appear even without alerts"""
+        stats = build_stats_response({})
+
+        assert stats["total_alerts"] == 0
+        assert stats["alerts_by_severity"] == {"critical": 0, "warning": 0, "info": 0}
+        assert stats["alerts_by_type"]["geofence_breach"] == 0
+
+    def test_redis_string_counters(self) -> None:
+        """Test counters read back from Redis as strings"""
+        stats = build_stats_response(
+            {
+                "total": "3",
+                "status:active": "2",
+                "status:resolved": "1",
+                "severity:critical": "3",
+                "type:temperature_high": "3",
+            }
+        )
+
+        assert stats["total_alerts"] == 3
+        assert stats["active_alerts"] == 2
+        assert stats["resolved_alerts"] == 1
+        assert stats["alerts_by_type"]["temperature_high"] == 3
+
+    def test_negative_drift_is_clamped(self) -> None:
+        """Test counters that drifted below zero are reported as zero"""
+        stats = build_stats_response({"status:acknowledged": "-1"})
+        assert stats["acknowledged_alerts"] == 0
+
+
+class TestComputeCounts:
+    """Test computing counters from the database"""
+
+    @pytest.mark.asyncio
+    async def test_single_pass_counts(
+        self, db_session, test_organization_sync, test_asset_sync
+    ) -> None:
+        """Test all breakdowns come from one grouped query"""
+        for alert_type, severity, status in [
+            ("battery_low", "warning", "active"),
+            ("battery_low", "critical", "resolved"),
+            ("geofence_breach", "critical", "active"),
+        ]:
+            db_session.add(
+                Alert(
+                    organization_id=test_organization_sync.id,
+                    alert_type=alert_type,
+                    severity=severity,
+                    status=status,
+                    asset_id=test_asset_sync.id,
+                    asset_name="Test Asset",
+                    message="Test alert",
+                    triggered_at=datetime.now(),
+                )
+            )
+        await db_session.commit()
+
+        counts = await AlertStatisticsService().compute_counts(db_session)
+        stats = build_stats_response(counts)
+
+        assert stats["total_alerts"] == 3
+        assert stats["active_alerts"] == 2
+        assert stats["resolved_alerts"] == 1
+        assert stats["alerts_by_severity"]["critical"] == 2
+        assert stats["alerts_by_type"]["battery_low"] == 2
+        assert stats["alerts_by_type"]["geofence_breach"] == 1
@@ -0,0 +1,208 @@
+"""
+Unit tests for fleet-wide batched anomaly inference
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ml.features.feature_store import FeatureVector
+from ml.serving.inference import InferenceEngine
+from streaming.processors import anomaly_processor as anomaly_module
+
+
+class FakeCache:
+    def __init__(self, predictions=None) -> None:
+        self.predictions = dict(predictions or {})
+        self.writes = []
+
+    async def get_many_with_strategy(self, strategy_name, ids, field="asset_id"):
+        assert strategy_name == "ml_predictions"
+        return {id_: self.predictions[id_] for id_ in ids if id_ in self.predictions}
+
+    async def set_many_with_strategy(self, strategy_name, values, field="asset_id"):
+        self.writes.append(dict(values))
+        self.predictions.update(values)
+        return True
+
+
+class FakeFeatureStore:
+    def __init__(self, features) -> None:
+        self.features = features
+        self.bulk_calls = 0
+
+    async def get_features_bulk(self, asset_ids):
+        self.bulk_calls += 1
+        return {
+            asset_id: self.features[asset_id]
+            for asset_id in asset_ids
+            if asset_id in self.features
+        }
+
+    async def get_baselines_bulk(self, asset_ids):
+        return {}
+
+
+class FakeModel:
+    """Anomaly probability is the avg_battery column, scaled to [0, 1]"""
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    def predict_proba(self, matrix):
+        matrix = np.asarray(matrix)
+        self.calls.append(matrix.shape)
+        score = matrix[:, 4] / 100.0
+        return np.column_stack([1 - score, score])
+
+
+class FakeModelLoader:
+    def __init__(self, model) -> None:
+        self.model = model
+
+    async def get_model(self, name, model_type):
+        return self.model
+
+
+def features_for(asset_id: str, battery: float) -> FeatureVector:
+    return FeatureVector(
+        asset_id=asset_id,
+        timestamp=datetime.now(),
+        features={"avg_battery": battery, "avg_rssi": -60.0},
+    )
+
+
+def make_engine(features, model, predictions=None) -> InferenceEngine:
+    engine = InferenceEngine()
+    engine.cache = FakeCache(predictions)
+    engine.feature_store = FakeFeatureStore(features)
+    engine.model_loader = FakeModelLoader(model)
+    return engine
+
+
+class TestPredictAnomalyBatch:
+    """Test the batch inference path"""
+
+    @pytest.mark.asyncio
+    async def test_one_model_call_and_one_cache_write(self) -> None:
+        """Test the whole matrix is scored at once and cached in one write"""
+        model = FakeModel()
+        features = {f"a{i}": features_for(f"a{i}", 10.0 * i) for i in range(10)}
+        cached = {"cached": {"asset_id": "cached", "anomaly_score": 0.1}}
+        engine = make_engine(features, model, cached)
+
+        results = await engine.predict_anomaly_batch(
+            ["cached", "missing", *features]
+        )
+
+        assert model.calls == [(10, 15)]
+        assert len(engine.cache.writes) == 1
+        assert set(engine.cache.writes[0]) == set(features)
+        assert results["cached"]["anomaly_score"] == 0.1
+        assert results["missing"]["error"] == "No features available"
+        assert results["a9"]["anomaly_score"] == pytest.approx(0.9)
+        assert results["a9"]["is_anomalous"] is True
+        assert results["a5"]["is_anomalous"] is False
+        assert results["a3"]["model_type"] == "ml_model"
+
+    @pytest.mark.asyncio
+    async def test_matches_single_asset_path(self) -> None:
+        """Test batch results agree with predict_anomaly per asset"""
+        features = {"a": features_for("a", 80.0), "b": features_for("b", 40.0)}
+        batch = await make_engine(features, FakeModel()).predict_anomaly_batch(
+            ["a", "b"]
+        )
+
+        for asset_id in features:
+            engine = make_engine(features, FakeModel())
+            engine.cache.get_with_strategy = _no_cached_prediction
+            engine.cache.set_with_strategy = _ignore_write
+            engine.feature_store.get_features = _single(features)
+            engine.feature_store.get_baseline = _no_baseline
+            single = await engine.predict_anomaly(asset_id)
+            for key in ("anomaly_score", "is_anomalous", "confidence"):
+                assert batch[asset_id][key] == pytest.approx(single[key])
+
+    @pytest.mark.asyncio
+    async def test_rule_based_without_model(self) -> None:
+        """Test assets fall back to the rules when no model is loaded"""
+        engine = make_engine({"a": features_for("a", 5.0)}, model=None)
+
+        results = await engine.predict_anomaly_batch(["a"])
+
+        assert results["a"]["model_type"] == "rule_based"
+        assert engine.cache.writes == []
+
+
+class TestAnomalySweep:
+    """Test the periodic sweep uses the batch path"""
+
+    @pytest.mark.asyncio
+    async def test_sweep_batches_due_assets(self, monkeypatch) -> None:
+        """Test cooled-down assets are skipped and the rest scored in batches"""
+        rows = [SimpleNamespace(id=f"a{i}") for i in range(5)]
+
+        class Session:
+            async def execute(self, statement):
+                return SimpleNamespace(fetchall=lambda: rows)
+
+        @asynccontextmanager
+        async def fake_session():
+            yield Session()
+
+        monkeypatch.setattr(anomaly_module, "analytics_session", fake_session)
+        monkeypatch.setattr(anomaly_module.settings, "ml_anomaly_batch_size", 2)
+
+        batches = []
+
+        class Engine:
+            async def predict_anomaly_batch(self, asset_ids):
+                batches.append(list(asset_ids))
+                return {
+                    asset_id: {
+                        "anomaly_score": 0.95,
+                        "is_anomalous": asset_id == "a4",
+                        "confidence": 0.9,
+                    }
+                    for asset_id in asset_ids
+                }
+
+        alerts = []
+
+        async def record_alert(asset_id, score, confidence, prediction):
+            alerts.append(asset_id)
+
+        processor = anomaly_module.AnomalyProcessor()
+        processor.inference_engine = Engine()
+        processor._create_anomaly_alert = record_alert
+        processor._set_cooldown("a0")
+
+        await processor._periodic_anomaly_detection()
+
+        assert batches == [["a1", "a2"], ["a3", "a4"]]
+        assert alerts == ["a4"]
+        assert processor._is_in_cooldown("a4")
+        assert processor.last_sweep["assets_scored"] == 4
+        assert processor.last_sweep["batches"] == 2
+
+
+async def _no_cached_prediction(strategy_name, **kwargs):
+    return None
+
+
+async def _ignore_write(strategy_name, value, **kwargs):
+    return True
+
+
+async def _no_baseline(asset_id):
+    return None
+
+
+def _single(features):
+    async def get_features(asset_id):
+        return features.get(asset_id)
+
+    return get_features
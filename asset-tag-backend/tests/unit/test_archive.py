@@ -0,0 +1,118 @@
+"""
+Unit tests for the Parquet cold archive
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import settings
+from modules.archive.cold_store import (ARCHIVE_TABLES, ColdArchive,
+                                        parse_interval, partition_key)
+from modules.locations.api import archived_location_entry, location_history_entry
+
+
+class TestArchiveLayout:
+    """Test archive layout helpers"""
+
+    def test_parse_interval(self) -> None:
+        """Test parsing PostgreSQL-style retention intervals"""
+        assert parse_interval("7 days") == timedelta(days=7)
+        assert parse_interval("1 hour") == timedelta(hours=1)
+        assert parse_interval("2 weeks") == timedelta(weeks=2)
+
+    def test_parse_interval_rejects_unknown_units(self) -> None:
+        """Test that unsupported intervals raise"""
+        with pytest.raises(ValueError):
+            parse_interval("1 fortnight")
+
+    def test_partition_key_is_hive_style(self) -> None:
+        """Test partition keys use organization and date directories"""
+        key = partition_key("observations", "org-1", "2024-01-02", "20240102")
+        assert key == (
+            "archive/observations/organization_id=org-1/"
+            "date=2024-01-02/part-20240102.parquet"
+        )
+
+    def test_hot_window_follows_retention(self) -> None:
+        """Test the hot window matches the configured retention"""
+        spec = ARCHIVE_TABLES["observations"]
+        assert spec.hot_window == parse_interval(settings.observations_retention)
+        assert spec.time_column in spec.column_names
+
+
+class TestColdRange:
+    """Test splitting requested ranges into the archived portion"""
+
+    @pytest.fixture
+    def archive(self, monkeypatch) -> ColdArchive:
+        monkeypatch.setattr(ColdArchive, "is_available", staticmethod(lambda: True))
+        return ColdArchive()
+
+    def test_disabled_archive_has_no_cold_range(self, monkeypatch) -> None:
+        """Test nothing falls through when the archive is disabled"""
+        monkeypatch.setattr(settings, "archive_enabled", False)
+        start = datetime.now(timezone.utc) - timedelta(days=365)
+        assert ColdArchive().cold_range("observations", start, None) is None
+
+    def test_recent_range_is_hot(self, archive: ColdArchive) -> None:
+        """Test ranges inside the hot window are served by the database only"""
+        start = datetime.now(timezone.utc) - timedelta(hours=1)
+        assert archive.cold_range("observations", start, None) is None
+
+    def test_old_range_is_clipped_to_hot_window(self, archive: ColdArchive) -> None:
+        """Test the cold range ends at the hot window boundary"""
+        now = datetime.now(timezone.utc)
+        start = now - timedelta(days=30)
+        cold_start, cold_end = archive.cold_range("observations", start, now)
+
+        hot_window = ARCHIVE_TABLES["observations"].hot_window
+        assert cold_start == start
+        assert abs((now - hot_window) - cold_end) < timedelta(seconds=5)
+
+    def test_naive_datetimes_are_utc(self, archive: ColdArchive) -> None:
+        """Test naive datetimes from query strings are treated as UTC"""
+        start = datetime.utcnow() - timedelta(days=200)
+        end = datetime.utcnow() - timedelta(days=150)
+        cold_start, cold_end = archive.cold_range("estimated_locations", start, end)
+        assert cold_start.tzinfo is not None
+        assert cold_end == end.replace(tzinfo=timezone.utc)
+
+    def test_unknown_table(self, archive: ColdArchive) -> None:
+        """Test tables without an archive never fall through"""
+        start = datetime.now(timezone.utc) - timedelta(days=30)
+        assert archive.cold_range("alerts", start, None) is None
+
+
+class TestHistoryEntries:
+    """Test archived rows read like live history entries"""
+
+    def test_archived_entry_matches_live_entry(self) -> None:
+        """Test both shapes carry the same fields and values"""
+        at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        values = {
+            "latitude": 52.5,
+            "longitude": 13.4,
+            "altitude": None,
+            "uncertainty_radius": 12.0,
+            "confidence": 0.9,
+            "algorithm": "trilateration",
+            "estimated_at": at,
+            "speed": 1.5,
+            "bearing": None,
+            "distance_from_previous": 30.0,
+            "signal_quality_score": 80.0,
+            "gateway_count": 2,
+        }
+        live = SimpleNamespace(
+            **{
+                key: Decimal(str(value)) if isinstance(value, float) else value
+                for key, value in values.items()
+            },
+            gateway_ids=["gw-1", "gw-2"],
+        )
+        archived = {**values, "gateway_ids": '["gw-1", "gw-2"]'}
+
+        assert archived_location_entry(archived) == location_history_entry(live)
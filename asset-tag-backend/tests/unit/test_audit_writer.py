@@ -0,0 +1,204 @@
+"""
+Unit tests for the batched audit writer and ASGI audit middleware
+"""
+
+import json
+from typing import Optional
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from modules.audit.audit_middleware import AuditMiddleware
+from modules.audit.writer import AuditWriter, build_audit_record, is_outage
+
+
+def _record(entity_id: Optional[str] = None) -> dict:
+    return build_audit_record("assets", entity_id, "update")
+
+
+class TestAuditWriter:
+    """Test queueing, batching and spill-to-disk"""
+
+    def test_overflow_is_counted(self, tmp_path) -> None:
+        """Test a full queue drops records instead of blocking"""
+        writer = AuditWriter(max_queue_size=2, spill_dir=str(tmp_path))
+
+        assert writer.enqueue(_record())
+        assert writer.enqueue(_record())
+        assert not writer.enqueue(_record())
+
+        stats = writer.get_stats()
+        assert stats["enqueued"] == 2
+        assert stats["dropped_overflow"] == 1
+        assert stats["queue_size"] == 2
+
+    def test_outage_classification(self) -> None:
+        """Test connectivity errors spill while bad rows do not"""
+        assert is_outage(ConnectionRefusedError())
+        assert is_outage(OperationalError("INSERT", {}, Exception("down")))
+        assert not is_outage(IntegrityError("INSERT", {}, Exception("dup")))
+        assert not is_outage(ValueError("bad"))
+
+    @pytest.mark.asyncio
+    async def test_batch_collects_queued_records(self, tmp_path) -> None:
+        """Test queued records are written as one batch"""
+        writer = AuditWriter(
+            batch_size=10, flush_interval=0.05, spill_dir=str(tmp_path)
+        )
+        written = []
+
+        async def fake_write(batch):
+            written.append(list(batch))
+
+        writer._write = fake_write
+        for _ in range(3):
+            writer.enqueue(_record())
+
+        await writer._flush(await writer._collect_batch())
+
+        assert len(written) == 1
+        assert len(written[0]) == 3
+
+    @pytest.mark.asyncio
+    async def test_outage_spills_and_replays(self, tmp_path) -> None:
+        """Test batches spill to disk during an outage and replay afterwards"""
+        writer = AuditWriter(flush_interval=0.01, spill_dir=str(tmp_path))
+        batch = [_record(), _record()]
+
+        async def failing_write(batch):
+            raise OperationalError("INSERT", {}, Exception("connection refused"))
+
+        writer._write = failing_write
+        await writer._flush(batch)
+
+        files = list(tmp_path.glob("audit-*.jsonl"))
+        assert len(files) == 1
+        assert writer.stats["spilled"] == 2
+        assert json.loads(files[0].read_text().splitlines()[0])["id"] == batch[0]["id"]
+
+        replayed = []
+
+        async def working_write(batch):
+            replayed.extend(batch)
+
+        writer._write = working_write
+        await writer._replay_spilled()
+
+        assert [r["id"] for r in replayed] == [r["id"] for r in batch]
+        assert not list(tmp_path.glob("audit-*.jsonl"))
+        assert writer.stats["replayed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_bad_row_is_isolated(self, tmp_path) -> None:
+        """Test one invalid row does not discard the rest of its batch"""
+        writer = AuditWriter(spill_dir=str(tmp_path))
+        bad = _record()
+        written = []
+
+        async def write(batch):
+            if any(r["id"] == bad["id"] for r in batch):
+                raise IntegrityError("INSERT", {}, Exception("violates constraint"))
+            written.extend(batch)
+
+        writer._write = write
+        await writer._flush([_record(), bad, _record()])
+
+        assert len(written) == 2
+        assert writer.stats["rejected"] == 1
+        assert not list(tmp_path.glob("audit-*.jsonl"))
+
+
+class TestAuditMiddleware:
+    """Test the pure ASGI audit middleware"""
+
+    async def _call(self, middleware, method: str, path: str, body: bytes = b""):
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "query_string": b"force=true",
+            "headers": [(b"x-user-id", b"user-1"), (b"user-agent", b"pytest")],
+            "client": ("127.0.0.1", 1234),
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        await middleware(scope, receive, send)
+        return sent
+
+    @staticmethod
+    async def _app(scope, receive, send) -> None:
+        await receive()
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    @pytest.mark.asyncio
+    async def test_write_request_is_enqueued(self, tmp_path) -> None:
+        """Test write requests produce one queued audit record"""
+        writer = AuditWriter(spill_dir=str(tmp_path))
+        middleware = AuditMiddleware(self._app, writer=writer)
+        entity_id = "123e4567-e89b-12d3-a456-426614174000"
+
+        sent = await self._call(
+            middleware, "PUT", f"/api/v1/assets/{entity_id}", b'{"name": "x"}'
+        )
+
+        assert sent[0]["status"] == 201
+        record = writer.queue.get_nowait()
+        assert record["entity_type"] == "assets"
+        assert record["entity_id"] == entity_id
+        assert record["action"] == "update"
+        assert record["user_id"] == "user-1"
+        assert record["changes"]["request"]["body"] == '{"name": "x"}'
+        assert record["changes"]["request"]["query_params"] == {"force": "true"}
+        assert record["changes"]["response"]["status_code"] == 201
+
+    @pytest.mark.asyncio
+    async def test_reads_and_excluded_paths_are_skipped(self, tmp_path) -> None:
+        """Test GET requests and non-API paths are not audited"""
+        writer = AuditWriter(spill_dir=str(tmp_path))
+        middleware = AuditMiddleware(self._app, writer=writer)
+
+        await self._call(middleware, "GET", "/api/v1/assets")
+        await self._call(middleware, "POST", "/health")
+
+        assert writer.queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_passwords_are_redacted(self, tmp_path) -> None:
+        """Test credentials in request bodies never reach the audit record"""
+        writer = AuditWriter(spill_dir=str(tmp_path))
+        middleware = AuditMiddleware(self._app, writer=writer)
+
+        await self._call(
+            middleware,
+            "POST",
+            "/api/v1/auth/login",
+            b'{"username": "admin", "password": "hunter2"}',
+        )
+        await self._call(
+            middleware,
+            "PUT",
+            "/api/v1/users/me/password",
+            b'{"current_password": "hunter2", "new_password": "hunter3"}',
+        )
+        await self._call(
+            middleware, "POST", "/api/v1/users", b'{"password": "hunter2", "na'
+        )
+
+        bodies = [
+            writer.queue.get_nowait()["changes"]["request"]["body"] for _ in range(3)
+        ]
+        assert json.loads(bodies[0]) == {"username": "admin", "password": "[REDACTED]"}
+        assert json.loads(bodies[1]) == {
+            "current_password": "[REDACTED]",
+            "new_password": "[REDACTED]",
+        }
+        assert bodies[2] == "[REDACTED]"
+        assert not any("hunter" in body for body in bodies)
@@ -0,0 +1,128 @@
+"""
+Unit tests for delta-encoded dashboard pushes
+"""
+
+import asyncio
+import json
+from typing import List
+
+import pytest
+
+from modules.websocket.dashboard_state import DashboardStateStore, json_diff
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.sent: List[dict] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+
+async def _drain() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestJsonDiff:
+    """Test RFC 6902 operations between dashboard states"""
+
+    def test_changed_added_and_removed_fields(self) -> None:
+        """Test only differing fields produce operations"""
+        old = {"assets": {"total": 10, "active": 7}, "sites": 3, "old": 1}
+        new = {"assets": {"total": 10, "active": 8}, "sites": 3, "a/b": [1]}
+
+        assert json_diff(old, new) == [
+            {"op": "remove", "path": "/old"},
+            {"op": "replace", "path": "/assets/active", "value": 8},
+            {"op": "add", "path": "/a~1b", "value": [1]},
+        ]
+
+    def test_type_change_is_replaced(self) -> None:
+        """Test 1 and 1.0 or True are not treated as equal"""
+        assert json_diff({"x": 1}, {"x": True}) == [
+            {"op": "replace", "path": "/x", "value": True}
+        ]
+
+
+class TestDashboardStateStore:
+    """Test versioned snapshots, deltas and resyncs"""
+
+    def test_sequence_advances_only_on_change(self) -> None:
+        """Test unchanged updates push nothing"""
+        store = DashboardStateStore(history=4)
+        first = store.update("org", ["summary"], {"total": 1})
+        second = store.update("org", ["summary"], {"total": 1})
+        third = store.update("org", ["metrics", "cpu"], {"value": 3})
+
+        assert (first["seq"], first["base_seq"]) == (1, 0)
+        assert second is None
+        assert third["seq"] == 2
+        assert third["ops"] == [
+            {"op": "add", "path": "/metrics", "value": {"cpu": {"value": 3}}}
+        ]
+        assert store.snapshot_message("org")["state"] == {
+            "summary": {"total": 1},
+            "metrics": {"cpu": {"value": 3}},
+        }
+
+    def test_resync_replays_or_falls_back_to_snapshot(self) -> None:
+        """Test retained gaps are replayed and older ones get a snapshot"""
+        store = DashboardStateStore(history=2)
+        for total in range(4):
+            store.update("org", ["summary", "total"], total)
+
+        replay = store.resync_messages("org", since_seq=2)
+        assert [m["seq"] for m in replay] == [3, 4]
+        assert replay[-1]["ops"] == [
+            {"op": "replace", "path": "/summary/total", "value": 3}
+        ]
+
+        fallback = store.resync_messages("org", since_seq=0)
+        assert [m["type"] for m in fallback] == ["dashboard_snapshot"]
+        assert fallback[0]["seq"] == 4
+
+
+class TestDashboardChannel:
+    """Test dashboard clients receive snapshots then deltas"""
+
+    @pytest.mark.asyncio
+    async def test_client_gets_snapshot_then_deltas(self, websocket_managers) -> None:
+        """Test organizations only see their own deltas"""
+        manager = websocket_managers()
+        await manager.broadcast_dashboard_update(["summary"], {"total": 5}, "org-1")
+        websocket = FakeWebSocket()
+        await manager.connect(
+            websocket, "dashboard", {"organization_ids": ["org-1"]}
+        )
+        await manager.send_dashboard_snapshots(websocket, ["org-1"])
+
+        await manager.broadcast_dashboard_update(["summary"], {"total": 6}, "org-1")
+        await manager.broadcast_dashboard_update(["summary"], {"total": 9}, "org-2")
+        await manager.broadcast_dashboard_update(["summary"], {"total": 6}, "org-1")
+        await _drain()
+
+        types = [m["type"] for m in websocket.sent]
+        assert types == [
+            "connection_established",
+            "dashboard_snapshot",
+            "dashboard_snapshot",
+            "dashboard_delta",
+        ]
+        snapshot = websocket.sent[2]
+        assert (snapshot["organization_id"], snapshot["seq"]) == ("org-1", 1)
+        delta = websocket.sent[3]
+        assert delta["base_seq"] == snapshot["seq"]
+        assert delta["ops"] == [
+            {"op": "replace", "path": "/summary/total", "value": 6}
+        ]
+
+        await manager.handle_client_message(
+            websocket,
+            json.dumps({"type": "resync", "organization_id": "org-1", "since_seq": 0}),
+        )
+        await _drain()
+        assert [m["seq"] for m in websocket.sent[4:]] == [1, 2]
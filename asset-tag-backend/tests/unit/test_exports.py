@@ -0,0 +1,210 @@
+"""
+Unit tests for streaming export encoders
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import (JSON, Column, DateTime, Integer, MetaData, String, Table,
+                        select)
+
+import modules.exports.service as export_service
+from modules.exports.service import ExportJobManager
+from modules.exports.streaming import (arrow_schema_for, encode_csv,
+                                       encode_ndjson, encode_parquet,
+                                       export_filename, get_export_format,
+                                       gzip_stream)
+
+items = Table(
+    "items",
+    MetaData(),
+    Column("id", String),
+    Column("count", Integer),
+    Column("details", JSON),
+    Column("created_at", DateTime(timezone=True)),
+)
+
+ROWS = [
+    {
+        "id": "a",
+        "count": 1,
+        "details": {"k": "v"},
+        "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+    },
+    {"id": "b", "count": 2, "details": None, "created_at": None},
+]
+COLUMNS = ["id", "count", "details", "created_at"]
+
+
+async def _batches(rows=ROWS, size=1):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+async def _collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+class TestExportFormats:
+    """Test format resolution and filenames"""
+
+    def test_json_is_ndjson(self) -> None:
+        """Test json exports are streamed as NDJSON"""
+        assert get_export_format("json").name == "ndjson"
+        assert get_export_format("CSV").name == "csv"
+
+    def test_unknown_format_rejected(self) -> None:
+        """Test unsupported formats raise ValueError"""
+        with pytest.raises(ValueError):
+            get_export_format("excel")
+
+    def test_parquet_is_not_gzipped(self) -> None:
+        """Test only text formats get a .gz suffix"""
+        assert export_filename("x", get_export_format("csv"), True) == "x.csv.gz"
+        assert (
+            export_filename("x", get_export_format("parquet"), True) == "x.parquet"
+        )
+
+
+class TestEncoders:
+    """Test incremental encoding of row batches"""
+
+    @pytest.mark.asyncio
+    async def test_csv(self) -> None:
+        """Test CSV has one header and flattens JSON values"""
+        body = await _collect(encode_csv(_batches(), COLUMNS))
+        rows = list(csv.reader(io.StringIO(body.decode("utf-8"))))
+
+        assert rows[0] == COLUMNS
+        assert len(rows) == 3
+        assert json.loads(rows[1][2]) == {"k": "v"}
+        assert rows[1][3] == "2024-01-01T00:00:00+00:00"
+
+    @pytest.mark.asyncio
+    async def test_ndjson(self) -> None:
+        """Test NDJSON emits one object per line"""
+        body = await _collect(encode_ndjson(_batches(), COLUMNS))
+        lines = body.decode("utf-8").splitlines()
+
+        assert [json.loads(line)["id"] for line in lines] == ["a", "b"]
+        assert json.loads(lines[0])["details"] == {"k": "v"}
+
+    @pytest.mark.asyncio
+    async def test_gzip_round_trip(self) -> None:
+        """Test on-the-fly gzip output decompresses to the plain stream"""
+        rows = [
+            {"id": str(i), "count": i, "details": None, "created_at": None}
+            for i in range(1000)
+        ]
+        plain = await _collect(encode_ndjson(_batches(rows, 100), COLUMNS))
+        compressed = await _collect(
+            gzip_stream(encode_ndjson(_batches(rows, 100), COLUMNS))
+        )
+
+        assert gzip.decompress(compressed) == plain
+        assert len(compressed) < len(plain)
+
+    @pytest.mark.asyncio
+    async def test_parquet(self) -> None:
+        """Test Parquet output uses the column-derived schema"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        schema = arrow_schema_for(select(items))
+
+        body = await _collect(encode_parquet(_batches(), schema))
+        table = pq.read_table(io.BytesIO(body))
+
+        assert table.column_names == COLUMNS
+        assert table.num_rows == 2
+        assert str(table.schema.field("count").type) == "int64"
+        assert json.loads(table.column("details")[0].as_py()) == {"k": "v"}
+
+
+async def _chunks():
+    yield b"id,count\n"
+
+
+class FakeCache:
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.store = {}
+
+    async def get_with_strategy(self, strategy_name, **kwargs):
+        return self.store.get(kwargs["export_id"])
+
+    async def set_with_strategy(self, strategy_name, value, **kwargs) -> bool:
+        if not self.enabled:
+            return False
+        self.store[kwargs["export_id"]] = json.loads(json.dumps(value))
+        return True
+
+
+class FakeBackgroundTasks:
+    def __init__(self) -> None:
+        self.tasks = []
+
+    def add_task(self, func, *args) -> None:
+        self.tasks.append((func, args))
+
+
+@pytest.fixture
+def export_cache(monkeypatch) -> FakeCache:
+    cache = FakeCache()
+
+    async def get_cache() -> FakeCache:
+        return cache
+
+    monkeypatch.setattr(export_service, "get_cache", get_cache)
+    return cache
+
+
+class TestExportJobManager:
+    """Test export job state is visible to every worker"""
+
+    @pytest.mark.asyncio
+    async def test_status_shared_between_workers(
+        self, export_cache, monkeypatch
+    ) -> None:
+        """Test a job run by one worker is reported by another"""
+
+        async def upload(chunks, key, content_type, on_part=None):
+            async for _ in chunks:
+                pass
+            await on_part(7)
+            return 7
+
+        monkeypatch.setattr(export_service, "upload_stream", upload)
+        monkeypatch.setattr(
+            export_service, "encode_export", lambda *args, **kwargs: _chunks()
+        )
+        running, polling = ExportJobManager(), ExportJobManager()
+        background_tasks = FakeBackgroundTasks()
+
+        job = await running.submit(
+            background_tasks, select(items), get_export_format("csv"), "items"
+        )
+        assert (await polling.get(job.export_id)).status == "pending"
+
+        func, args = background_tasks.tasks[0]
+        await func(*args)
+
+        status = await polling.get(job.export_id)
+        assert status.status == "completed"
+        assert status.size == 7
+        assert status.download_url.endswith(f"/exports/{job.export_id}/download")
+        assert await polling.get("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_kept_in_process_without_redis(self, export_cache) -> None:
+        """Test job state stays readable locally when Redis is disabled"""
+        export_cache.enabled = False
+        manager = ExportJobManager()
+
+        job = await manager.submit(
+            FakeBackgroundTasks(), select(items), get_export_format("csv"), "items"
+        )
+
+        assert (await manager.get(job.export_id)) is job
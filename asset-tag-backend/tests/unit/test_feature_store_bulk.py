@@ -0,0 +1,224 @@
+"""
+Unit tests for set-based bulk feature computation
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from ml.features import feature_store as feature_store_module
+from ml.features.api import get_batch_features
+from ml.features.feature_store import FEATURE_COLUMNS, FeatureStore
+
+
+def observation_row(asset_id, count=3, battery=80.0, trend=-0.5):
+    return SimpleNamespace(
+        asset_id=asset_id,
+        observation_count=count,
+        avg_rssi=Decimal("-60.5"),
+        min_rssi=-70,
+        max_rssi=-50,
+        rssi_std=None if count < 2 else 4.0,
+        avg_battery=battery,
+        battery_trend=trend,
+        avg_temperature=None,
+        gateway_ids=["gw-1", "gw-2"],
+        time_span=Decimal("120"),
+    )
+
+
+class FakeDatabase:
+    """Answers the bulk queries from canned rows, recording each call"""
+
+    def __init__(self, observations, locations=(), gateways=(), movement=()):
+        self.rows = {
+            "ROW_NUMBER": observations,
+            "CROSS JOIN LATERAL": locations,
+            "GROUP BY asset_id, gateway_id": gateways,
+            "avg_confidence": movement,
+        }
+        self.calls = []
+
+    async def execute(self, statement, params):
+        sql = str(statement)
+        marker = next(marker for marker in self.rows if marker in sql)
+        self.calls.append((marker, list(params["asset_ids"]), params["as_of"]))
+        rows = [
+            row for row in self.rows[marker] if row.asset_id in params["asset_ids"]
+        ]
+        return SimpleNamespace(fetchall=lambda: rows)
+
+
+class FakeCache:
+    def __init__(self) -> None:
+        self.writes = []
+
+    async def set_many_with_strategy(self, strategy_name, values, field="asset_id"):
+        self.writes.append((strategy_name, dict(values)))
+        return True
+
+
+@pytest.fixture
+def database(monkeypatch):
+    holder = {}
+
+    @asynccontextmanager
+    async def fake_session():
+        yield holder["db"]
+
+    monkeypatch.setattr(feature_store_module, "analytics_session", fake_session)
+    return holder
+
+
+class TestComputeFeaturesBulk:
+    """Test grouped feature queries and the columnar result"""
+
+    @pytest.mark.asyncio
+    async def test_matrix_columns_and_backfill(self, database) -> None:
+        """Test rows follow request order, gaps are NaN and the cache is filled"""
+        database["db"] = FakeDatabase(
+            observations=[
+                observation_row("a"),
+                observation_row("b", count=1, battery=None),
+            ],
+            locations=[
+                SimpleNamespace(
+                    asset_id="a", confidence=Decimal("0.9"), speed=None, bearing=90
+                )
+            ],
+        )
+        store = FeatureStore()
+        store.cache = FakeCache()
+
+        matrix = await store.compute_features_bulk(["b", "missing", "a"])
+
+        assert matrix.asset_ids == ["b", "a"]
+        assert matrix.columns == FEATURE_COLUMNS
+        assert matrix.values.shape == (2, len(FEATURE_COLUMNS))
+        assert np.isnan(matrix.column("avg_battery")[0])
+        assert matrix.column("avg_battery")[1] == 80.0
+        assert matrix.column("current_confidence")[1] == pytest.approx(0.9)
+        assert np.isnan(matrix.column("current_confidence")[0])
+
+        vectors = matrix.vectors()
+        assert "avg_battery" not in vectors["b"].features
+        assert "observation_rate" not in vectors["b"].features
+        assert vectors["b"].features["rssi_std"] == 0.0
+        assert vectors["a"].features["observation_rate"] == pytest.approx(1.5)
+        assert vectors["a"].features["gateway_count"] == 2
+
+        assert len(store.cache.writes) == 1
+        strategy, written = store.cache.writes[0]
+        assert strategy == "asset_features"
+        assert set(written) == {"a", "b"}
+
+    @pytest.mark.asyncio
+    async def test_chunks_and_historical_as_of(self, database, monkeypatch) -> None:
+        """Test two queries per chunk and no cache writes for past features"""
+        monkeypatch.setattr(
+            feature_store_module.settings, "ml_feature_bulk_chunk_size", 2
+        )
+        database["db"] = FakeDatabase(
+            observations=[observation_row(asset_id) for asset_id in "abcde"]
+        )
+        store = FeatureStore()
+        store.cache = FakeCache()
+        as_of = datetime(2024, 3, 2, 12, 30, tzinfo=timezone.utc)
+
+        matrix = await store.compute_features_bulk(list("abcde"), as_of)
+
+        assert len(matrix) == 5
+        assert [asset_ids for _, asset_ids, _ in database["db"].calls] == [
+            ["a", "b"],
+            ["a", "b"],
+            ["c", "d"],
+            ["c", "d"],
+            ["e"],
+            ["e"],
+        ]
+        assert all(call[2] == as_of for call in database["db"].calls)
+        expected_day = as_of.astimezone().weekday()
+        assert set(matrix.column("day_of_week")) == {expected_day}
+        assert store.cache.writes == []
+
+    @pytest.mark.asyncio
+    async def test_baselines_from_grouped_rows(self, database) -> None:
+        """Test per-gateway rows are folded into one baseline per asset"""
+        database["db"] = FakeDatabase(
+            observations=[],
+            gateways=[
+                SimpleNamespace(
+                    asset_id="a",
+                    gateway_id="gw-1",
+                    avg_rssi=-60,
+                    avg_battery=80,
+                    avg_temperature=Decimal("20"),
+                ),
+                SimpleNamespace(
+                    asset_id="a",
+                    gateway_id="gw-2",
+                    avg_rssi=-70,
+                    avg_battery=None,
+                    avg_temperature=None,
+                ),
+            ],
+            movement=[
+                SimpleNamespace(
+                    asset_id="a",
+                    avg_confidence=Decimal("0.7"),
+                    avg_distance=None,
+                    avg_speed=Decimal("1.5"),
+                    location_count=4,
+                )
+            ],
+        )
+        store = FeatureStore()
+
+        baselines = await store._compute_baselines(["a", "b"])
+
+        assert list(baselines) == ["a"]
+        baseline = baselines["a"]
+        assert baseline.avg_rssi_per_gateway == {"gw-1": -60.0, "gw-2": -70.0}
+        assert baseline.avg_temperature == pytest.approx(10.0)
+        assert baseline.typical_confidence == pytest.approx(0.7)
+        assert baseline.typical_movement_pattern == {
+            "avg_distance": 0.0,
+            "avg_speed": 1.5,
+            "location_count": 4,
+        }
+
+
+class TestBatchFeaturesApi:
+    """Test asset ids are checked before the bulk queries run"""
+
+    @pytest.mark.asyncio
+    async def test_malformed_asset_id_is_rejected(self) -> None:
+        """Test a bad id is a 400 naming it, not a silently empty chunk"""
+        requested = []
+
+        class RecordingStore:
+            async def get_features_bulk(self, asset_ids):
+                requested.append(asset_ids)
+                return {}
+
+        valid = "6F9619FF-8B86-D011-B42D-00C04FC964FF"
+        with pytest.raises(HTTPException) as error:
+            await get_batch_features(
+                asset_ids=f"{valid},not-a-uuid",
+                as_of=None,
+                feature_store=RecordingStore(),
+            )
+        assert error.value.status_code == 400
+        assert "not-a-uuid" in error.value.detail
+        assert requested == []
+
+        response = await get_batch_features(
+            asset_ids=valid, as_of=None, feature_store=RecordingStore()
+        )
+        assert requested == [[valid.lower()]]
+        assert response["returned_count"] == 0
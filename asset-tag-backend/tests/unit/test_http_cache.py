@@ -0,0 +1,287 @@
+"""
+Unit tests for ETag / conditional GET response caching
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+import modules.shared.http_cache as http_cache
+from modules.shared.http_cache import (EntityVersions, HTTPCacheMiddleware,
+                                       etag_matches)
+
+SUMMARY_PATH = "/api/v1/alerts/statistics"
+ORIGIN = "http://localhost:5173"
+
+
+class FakeCache:
+    def __init__(self) -> None:
+        self.store: Dict[str, Any] = {}
+
+    async def get(self, key: str):
+        return self.store.get(key)
+
+    async def set(self, key: str, value: Any, ttl=None) -> bool:
+        self.store[key] = value
+        return True
+
+    async def bump_entity_versions(self, tables: List[str]) -> bool:
+        return False
+
+    async def get_entity_versions(self, tables: List[str]):
+        # Redis disabled: versions come from the in-process counters
+        return None
+
+
+class CountingApp:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self, scope, receive, send) -> None:
+        self.calls += 1
+        body = b'{"total": %d}' % self.calls
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+@pytest.fixture
+def cache(monkeypatch) -> FakeCache:
+    fake = FakeCache()
+
+    async def get_cache() -> FakeCache:
+        return fake
+
+    monkeypatch.setattr(http_cache, "get_cache", get_cache)
+    return fake
+
+
+async def _get(
+    middleware: HTTPCacheMiddleware,
+    path: str = SUMMARY_PATH,
+    headers: Optional[List[Tuple[bytes, bytes]]] = None,
+    method: str = "GET",
+) -> Tuple[int, Dict[bytes, bytes], bytes]:
+    messages: List[Dict[str, Any]] = []
+
+    async def send(message: Dict[str, Any]) -> None:
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"period_days=30",
+        "headers": headers or [],
+    }
+    await middleware(scope, None, send)
+    start, body = messages[0], b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], dict(start["headers"]), body
+
+
+class TestETagMatching:
+    """Test If-None-Match comparison"""
+
+    def test_weak_lists_and_wildcard(self) -> None:
+        """Test weak validators, lists and * match"""
+        assert etag_matches('"abc"', "abc")
+        assert etag_matches('W/"abc"', "abc")
+        assert etag_matches('"x", "abc"', "abc")
+        assert etag_matches("*", "abc")
+        assert not etag_matches('"abd"', "abc")
+
+
+class TestHTTPCacheMiddleware:
+    """Test conditional GETs and the shared response cache"""
+
+    @pytest.mark.asyncio
+    async def test_if_none_match_returns_304_without_rendering(self, cache) -> None:
+        """Test a matching ETag is answered without calling the endpoint"""
+        app = CountingApp()
+        middleware = HTTPCacheMiddleware(app, versions=EntityVersions())
+
+        status, headers, _ = await _get(middleware)
+        etag = headers[b"etag"]
+        status_304, headers_304, body_304 = await _get(
+            middleware, headers=[(b"if-none-match", etag)]
+        )
+
+        assert status == 200
+        assert status_304 == 304
+        assert body_304 == b""
+        assert headers_304[b"etag"] == etag
+        assert app.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_rendered_body_is_shared(self, cache) -> None:
+        """Test a client without validators gets the stored body"""
+        app = CountingApp()
+        middleware = HTTPCacheMiddleware(app, versions=EntityVersions())
+
+        _, first_headers, first = await _get(middleware)
+        _, headers, body = await _get(middleware)
+
+        assert app.calls == 1
+        assert body == first
+        assert headers[b"x-cache"] == b"HIT"
+        assert headers[b"etag"] == first_headers[b"etag"]
+
+    @pytest.mark.asyncio
+    async def test_write_changes_etag(self, cache) -> None:
+        """Test bumping a table the route reads invalidates its responses"""
+        app = CountingApp()
+        versions = EntityVersions()
+        middleware = HTTPCacheMiddleware(app, versions=versions)
+
+        _, headers, first = await _get(middleware)
+        await versions.bump(["alerts"])
+        status, new_headers, body = await _get(
+            middleware, headers=[(b"if-none-match", headers[b"etag"])]
+        )
+
+        assert status == 200
+        assert new_headers[b"etag"] != headers[b"etag"]
+        assert body != first
+        assert app.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_unrelated_write_keeps_etag(self, cache) -> None:
+        """Test writes to other tables do not invalidate the route"""
+        versions = EntityVersions()
+        middleware = HTTPCacheMiddleware(CountingApp(), versions=versions)
+
+        _, headers, _ = await _get(middleware)
+        await versions.bump(["geofences"])
+        status, _, _ = await _get(
+            middleware, headers=[(b"if-none-match", headers[b"etag"])]
+        )
+
+        assert status == 304
+
+    @pytest.mark.asyncio
+    async def test_other_routes_pass_through(self, cache) -> None:
+        """Test uncached paths and non-GET methods reach the app untouched"""
+        app = CountingApp()
+        middleware = HTTPCacheMiddleware(app, versions=EntityVersions())
+
+        _, headers, _ = await _get(middleware, path="/api/v1/alerts/abc")
+        await _get(middleware, method="POST")
+        await _get(middleware, method="POST")
+
+        assert b"etag" not in headers
+        assert app.calls == 3
+
+
+class TestVersionTracking:
+    """Test committed writes bump the versions of the tables they touch"""
+
+    @pytest.mark.asyncio
+    async def test_raw_sql_asset_update_changes_etag(self, cache, monkeypatch) -> None:
+        """Test the raw-SQL update_asset handler invalidates /assets"""
+        from sqlalchemy import text
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+        from modules.assets.api import update_asset
+        from modules.assets.schemas import AssetUpdate
+
+        versions = EntityVersions()
+        monkeypatch.setattr(http_cache, "entity_versions", versions)
+        http_cache.register_version_tracking()
+        middleware = HTTPCacheMiddleware(CountingApp(), versions=versions)
+        asset_id = "123e4567-e89b-12d3-a456-426614174000"
+
+        engine = create_async_engine("sqlite+aiosqlite://")
+        columns = (
+            "id, organization_id, name, serial_number, asset_type, status, "
+            "current_site_id, location_description, last_seen, battery_level, "
+            "temperature, movement_status, assigned_to_user_id, assigned_job_id, "
+            "assignment_start_date, assignment_end_date, manufacturer, model, "
+            "purchase_date, warranty_expiry, last_maintenance, next_maintenance, "
+            "hourly_rate, availability, asset_metadata, created_at, updated_at, "
+            "deleted_at"
+        )
+        async with engine.begin() as connection:
+            await connection.execute(text(f"CREATE TABLE assets ({columns})"))
+            await connection.execute(
+                text(
+                    "INSERT INTO assets (id, organization_id, name, serial_number, "
+                    "asset_type, created_at, updated_at) VALUES (:id, :id, 'Tag', "
+                    "'SN-1', 'tool', '2026-01-01T00:00:00', '2026-01-01T00:00:00')"
+                ),
+                {"id": asset_id},
+            )
+
+        _, headers, _ = await _get(middleware, path="/api/v1/assets")
+        async with AsyncSession(engine) as db:
+            response = await update_asset(asset_id, AssetUpdate(name="Renamed"), db)
+        await engine.dispose()
+        status, new_headers, _ = await _get(
+            middleware,
+            path="/api/v1/assets",
+            headers=[(b"if-none-match", headers[b"etag"])],
+        )
+
+        assert response.name == "Renamed"
+        assert status == 200
+        assert new_headers[b"etag"] != headers[b"etag"]
+
+    def test_text_writes_name_their_tables(self) -> None:
+        """Test raw UPDATE/INSERT/DELETE statements are attributed to tables"""
+        statements = {
+            "UPDATE assets SET name = :name": ["assets"],
+            'insert into "alerts" (id) values (:id)': ["alerts"],
+            "DELETE FROM geofences WHERE id = :id": ["geofences"],
+            "SELECT * FROM alerts FOR UPDATE": [],
+        }
+        for statement, tables in statements.items():
+            found = http_cache.TEXT_WRITE_PATTERN.findall(statement)
+            assert [t for t in found if t in http_cache.VERSIONED_TABLES] == tables
+
+
+class TestMiddlewareOrder:
+    """Test responses answered by the cache still get the outer headers"""
+
+    def test_cache_sits_inside_cors_and_audit(self) -> None:
+        """Test main registers the cache middleware inside CORS and audit"""
+        from main import app
+        from modules.audit.audit_middleware import AuditMiddleware
+
+        # user_middleware lists the outermost middleware first
+        order = [middleware.cls for middleware in app.user_middleware]
+
+        assert order.index(HTTPCacheMiddleware) > order.index(CORSMiddleware)
+        assert order.index(HTTPCacheMiddleware) > order.index(AuditMiddleware)
+
+    def test_not_modified_has_cors_headers(self, cache) -> None:
+        """Test a cross-origin revalidation 304 carries CORS headers"""
+        app = FastAPI()
+
+        @app.get(SUMMARY_PATH)
+        async def summary() -> Dict[str, int]:
+            return {"total": 1}
+
+        app.add_middleware(HTTPCacheMiddleware, versions=EntityVersions())
+        app.add_middleware(
+            CORSMiddleware, allow_origins=[ORIGIN], allow_credentials=True
+        )
+        client = TestClient(app)
+
+        first = client.get(SUMMARY_PATH, headers={"Origin": ORIGIN})
+        hit = client.get(SUMMARY_PATH, headers={"Origin": ORIGIN})
+        revalidated = client.get(
+            SUMMARY_PATH,
+            headers={"Origin": ORIGIN, "If-None-Match": first.headers["etag"]},
+        )
+
+        assert hit.headers["x-cache"] == "HIT"
+        assert revalidated.status_code == 304
+        for response in (first, hit, revalidated):
+            assert response.headers["access-control-allow-origin"] == ORIGIN
@@ -0,0 +1,203 @@
+"""
+Unit tests for the on-disk model cache and hot-swapping model loader
+"""
+
+import asyncio
+import shutil
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ml.serving.model_cache import ModelArtifactCache, model_version
+from ml.serving.model_loader import ModelLoader
+
+
+class WeightsModel:
+    """Picklable stand-in for a fitted estimator"""
+
+    def __init__(self, weights, broken=False) -> None:
+        self.weights = np.asarray(weights, dtype=float)
+        self.n_features_in_ = len(self.weights)
+        self.broken = broken
+
+    def predict(self, rows):
+        scores = np.asarray(rows, dtype=float) @ self.weights
+        return scores * np.nan if self.broken else scores
+
+
+class FakeMLflow:
+    def __init__(self, models) -> None:
+        self.models = dict(models)
+        self.latest = None
+        self.downloads = []
+
+    def get_latest_model(self, experiment_name, model_name):
+        return self.latest
+
+    def load_model(self, model_uri, model_type="sklearn"):
+        self.downloads.append(model_uri)
+        return self.models[model_uri]
+
+
+def make_loader(tmp_path, mlflow) -> ModelLoader:
+    loader = ModelLoader(ModelArtifactCache(str(tmp_path), "r", keep_versions=2))
+    loader._mlflow_client = mlflow
+    return loader
+
+
+class TestModelArtifactCache:
+    """Test versioned storage on disk"""
+
+    def test_store_load_memory_maps_and_prunes(self, tmp_path) -> None:
+        """Test arrays come back memory-mapped and old versions are pruned"""
+        cache = ModelArtifactCache(str(tmp_path), "r", keep_versions=2)
+        for version in ("v1", "v2", "v3"):
+            meta = cache.store("detector", version, WeightsModel(np.ones(50_000)))
+
+        model, stored = cache.load("detector", "v3")
+
+        assert isinstance(model.weights, np.memmap)
+        assert stored["size_bytes"] == meta["size_bytes"] > 400_000
+        assert cache.versions("detector") == ["v3", "v2"]
+        assert not cache.has("detector", "v1")
+        assert model_version("runs:/abc123/detector") == "abc123"
+
+    def test_versions_skip_concurrently_pruned(self, tmp_path, monkeypatch) -> None:
+        """Test a version removed mid-scan is left out instead of raising"""
+        cache = ModelArtifactCache(str(tmp_path), "r", keep_versions=2)
+        for version in ("v1", "v2"):
+            cache.store("detector", version, WeightsModel([1.0]))
+        glob = Path.glob
+
+        def racing_glob(path, pattern):
+            found = list(glob(path, pattern))
+            # Another process prunes v1 after it was listed
+            shutil.rmtree(path / "v1")
+            return iter(found)
+
+        monkeypatch.setattr(Path, "glob", racing_glob)
+
+        assert cache.versions("detector") == ["v2"]
+
+
+class TestModelLoader:
+    """Test shared downloads, hot swaps and fallbacks"""
+
+    @pytest.mark.asyncio
+    async def test_downloads_once_per_host(self, tmp_path) -> None:
+        """Test a second worker loads the version from disk, not MLflow"""
+        mlflow = FakeMLflow({"runs:/r1/detector": WeightsModel([1.0, 2.0])})
+        mlflow.latest = "runs:/r1/detector"
+        first = make_loader(tmp_path, mlflow)
+        second = make_loader(tmp_path, mlflow)
+
+        await first.get_model("detector")
+        model = await second.get_model("detector")
+
+        assert mlflow.downloads == ["runs:/r1/detector"]
+        assert first.stats["downloads"] == 1
+        assert second.stats["disk_hits"] == 1
+        assert model.predict([[1.0, 1.0]])[0] == 3.0
+        info = second.get_model_info("detector")
+        assert info["version"] == "r1"
+        assert info["source"] == "disk"
+        assert info["load_seconds"] >= 0
+        assert second.get_stats()["models"]["detector"]["size_bytes"] > 0
+
+    @pytest.mark.asyncio
+    async def test_loads_while_holding_lock(self, tmp_path) -> None:
+        """Test artifacts are read under the lock that store/prune take"""
+        mlflow = FakeMLflow({"runs:/r1/detector": WeightsModel([1.0])})
+        mlflow.latest = "runs:/r1/detector"
+        loaders = [make_loader(tmp_path, mlflow) for _ in range(2)]
+        held = []
+        loads = []
+
+        for loader in loaders:
+            artifacts = loader.artifacts
+
+            @contextmanager
+            def tracking_lock(model_name, shared=False, lock=artifacts.lock):
+                with lock(model_name, shared):
+                    held.append(shared)
+                    try:
+                        yield
+                    finally:
+                        held.pop()
+
+            def tracking_load(model_name, version, load=artifacts.load):
+                loads.append(list(held))
+                return load(model_name, version)
+
+            artifacts.lock = tracking_lock
+            artifacts.load = tracking_load
+
+        for loader in loaders:
+            await loader.get_model("detector")
+
+        # Downloaded and loaded exclusively, then read from disk shared
+        assert loads == [[False], [True]]
+
+    @pytest.mark.asyncio
+    async def test_refresh_swaps_new_version_only(self, tmp_path) -> None:
+        """Test held references survive a swap and bad versions are rejected"""
+        mlflow = FakeMLflow(
+            {
+                "runs:/r1/detector": WeightsModel([1.0]),
+                "runs:/r2/detector": WeightsModel([2.0]),
+                "runs:/r3/detector": WeightsModel([3.0], broken=True),
+            }
+        )
+        mlflow.latest = "runs:/r1/detector"
+        loader = make_loader(tmp_path, mlflow)
+        in_flight = await loader.get_model("detector")
+
+        assert await loader.refresh_model("detector")
+        assert loader.stats["unchanged"] == 1
+
+        mlflow.latest = "runs:/r2/detector"
+        assert await loader.refresh_model("detector")
+        current = await loader.get_model("detector")
+        assert current.predict([[1.0]])[0] == 2.0
+        assert in_flight.predict([[1.0]])[0] == 1.0
+        assert loader.stats["swaps"] == 1
+
+        mlflow.latest = "runs:/r3/detector"
+        assert not await loader.refresh_model("detector")
+        assert loader.get_model_info("detector")["version"] == "r2"
+        assert not loader.artifacts.has("detector", "r3")
+
+    @pytest.mark.asyncio
+    async def test_stale_model_served_while_refreshing(self, tmp_path) -> None:
+        """Test a stale model is returned at once and replaced in the background"""
+        mlflow = FakeMLflow(
+            {
+                "runs:/r1/detector": WeightsModel([1.0]),
+                "runs:/r2/detector": WeightsModel([2.0]),
+            }
+        )
+        mlflow.latest = "runs:/r1/detector"
+        loader = make_loader(tmp_path, mlflow)
+        stale = await loader.get_model("detector")
+        loader.last_refresh["detector"] = datetime.now() - timedelta(hours=2)
+        mlflow.latest = "runs:/r2/detector"
+
+        assert await loader.get_model("detector") is stale
+        await asyncio.gather(*loader._refreshing.values())
+
+        assert loader.get_model_info("detector")["version"] == "r2"
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_disk_without_mlflow(self, tmp_path) -> None:
+        """Test the newest cached version is served when MLflow has none"""
+        cache = ModelArtifactCache(str(tmp_path), "r", keep_versions=2)
+        cache.store("detector", "r7", WeightsModel([7.0]))
+        loader = make_loader(tmp_path, FakeMLflow({}))
+
+        model = await loader.get_model("detector")
+
+        assert model.predict([[1.0]])[0] == 7.0
+        assert await loader.get_model("missing") is None
@@ -0,0 +1,341 @@
+"""
+Unit tests for online feature and baseline aggregates
+"""
+
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from ml.features import online as online_module
+from ml.features.feature_store import AssetBaseline
+from ml.features.online import (AssetFeatureState, DecayedCounter,
+                                DecayedMoments, OnlineFeatureTracker,
+                                WindowExtremes)
+
+NOW = float(int(time.time()))
+
+
+class FakeCache:
+    enabled = True
+
+    def __init__(self, checkpoints=None) -> None:
+        self.checkpoints = dict(checkpoints or {})
+        self.writes = {}
+
+    async def get_with_strategy(self, strategy_name, **kwargs):
+        assert strategy_name == "asset_online_state"
+        await asyncio.sleep(0)
+        return self.checkpoints.get(kwargs["asset_id"])
+
+    async def get_many_with_strategy(self, strategy_name, ids, field="asset_id"):
+        assert strategy_name == "asset_online_state"
+        return {id_: self.checkpoints[id_] for id_ in ids if id_ in self.checkpoints}
+
+    async def compare_and_set_many_with_strategy(
+        self, strategy_name, values, field="asset_id"
+    ):
+        conflicts = set()
+        written = {}
+        for asset_id, (version, value) in values.items():
+            if self.checkpoints.get(asset_id, {}).get("version", 0) != version:
+                conflicts.add(asset_id)
+                continue
+            self.checkpoints[asset_id] = written[asset_id] = json.loads(
+                json.dumps(value)
+            )
+        self.writes.setdefault(strategy_name, []).append(written)
+        return conflicts
+
+    async def set_many_with_strategy(self, strategy_name, values, field="asset_id"):
+        self.writes.setdefault(strategy_name, []).append(dict(values))
+        return True
+
+
+class TestAccumulators:
+    """Test the online building blocks"""
+
+    def test_welford_matches_batch_statistics(self) -> None:
+        """Test undecayed moments equal the sample mean and variance"""
+        values = [-61.0, -70.0, -55.5, -80.0, -64.0]
+        moments = DecayedMoments()
+        for at, value in enumerate(values):
+            moments.update(value, float(at))
+
+        assert moments.mean == pytest.approx(statistics.mean(values))
+        assert moments.variance == pytest.approx(statistics.variance(values))
+
+        merged = DecayedMoments()
+        merged.update(values[0], 0.0)
+        merged.merge(statistics.mean(values[1:]), 4.0)
+        assert merged.mean == pytest.approx(statistics.mean(values))
+
+        first, second = DecayedMoments(), DecayedMoments()
+        for at, value in enumerate(values):
+            (first if at < 2 else second).update(value, float(at))
+        first.combine(second)
+        assert first.mean == pytest.approx(statistics.mean(values))
+        assert first.variance == pytest.approx(statistics.variance(values))
+
+    def test_decay_halves_weight_per_half_life(self) -> None:
+        """Test older values lose half their weight every half-life"""
+        moments = DecayedMoments(half_life=60.0)
+        moments.update(0.0, NOW)
+        moments.update(30.0, NOW + 60.0)
+
+        assert moments.weight == pytest.approx(1.5)
+        assert moments.mean == pytest.approx(20.0)
+
+    def test_counter_tracks_steady_rate(self) -> None:
+        """Test a decayed counter reports the rate of steady events"""
+        counter = DecayedCounter(half_life=300.0)
+        for second in range(0, 3600, 6):
+            counter.add(NOW + second)
+
+        assert counter.rate_per_minute(NOW + 3594) == pytest.approx(10.0, rel=0.02)
+
+    def test_window_extremes_expire(self) -> None:
+        """Test min/max only cover readings inside the window"""
+        extremes = WindowExtremes(window=60.0)
+        extremes.add(-90.0, NOW)
+        extremes.add(-50.0, NOW + 10)
+        assert extremes.extremes(NOW + 20) == (-90.0, -50.0)
+
+        extremes.add(-70.0, NOW + 65)
+        assert extremes.extremes(NOW + 65) == (-70.0, -50.0)
+        assert extremes.extremes(NOW + 200) is None
+
+
+class TestAssetFeatureState:
+    """Test features and baselines derived from the stream"""
+
+    def make_state(self) -> AssetFeatureState:
+        state = AssetFeatureState("asset-1")
+        for step in range(10):
+            state.observe(
+                "gw-1" if step % 2 else "gw-2",
+                -60.0 - step,
+                NOW + step * 30,
+                battery_level=90.0 - step,
+                temperature=21.0,
+            )
+        state.observe_location(
+            0.9, NOW + 270, speed=1.2, bearing=45.0, distance_from_previous=30.0
+        )
+        return state
+
+    def test_features_follow_stream(self) -> None:
+        """Test real-time features reflect the observed readings"""
+        state = self.make_state()
+
+        vector = state.features(NOW + 300)
+
+        features = vector.features
+        assert features["min_rssi"] == -69.0
+        assert features["max_rssi"] == -60.0
+        assert -69.0 < features["avg_rssi"] < -60.0
+        # Draining battery gives a positive trend, as in the batch features
+        assert features["battery_trend"] > 0
+        assert features["avg_temperature"] == pytest.approx(21.0)
+        assert features["gateway_count"] == 2
+        assert features["current_speed"] == 1.2
+        assert vector.metadata["source"] == "online"
+        assert state.features(NOW + 3600) is None
+
+    def test_baseline_and_round_trip(self) -> None:
+        """Test the baseline and a JSON checkpoint round trip"""
+        state = self.make_state()
+        baseline = state.baseline()
+
+        assert set(baseline.avg_rssi_per_gateway) == {"gw-1", "gw-2"}
+        assert baseline.typical_confidence == pytest.approx(0.9)
+        # One point every 30 s is 2880 points (28.8 of full charge) per day
+        assert baseline.normal_battery_drain_rate == pytest.approx(28.8)
+        assert baseline.typical_movement_pattern["location_count"] == 1
+
+        restored = AssetFeatureState.from_dict(json.loads(json.dumps(state.to_dict())))
+        assert restored.features(NOW + 300).features == pytest.approx(
+            state.features(NOW + 300).features
+        )
+        assert restored.baseline().to_dict()["avg_rssi_per_gateway"] == (
+            baseline.avg_rssi_per_gateway
+        )
+
+
+class TestOnlineFeatureTracker:
+    """Test restore, cold-start seeding and checkpoints"""
+
+    @pytest.mark.asyncio
+    async def test_cold_start_seeds_in_bulk_and_checkpoints(
+        self, monkeypatch
+    ) -> None:
+        """Test unknown assets are seeded in one call and written back"""
+        checkpoint = AssetFeatureState("warm")
+        checkpoint.seeded = True
+        checkpoint.observe("gw-9", -50.0, NOW)
+        cache = FakeCache({"warm": checkpoint.to_dict()})
+
+        async def fake_get_cache():
+            return cache
+
+        monkeypatch.setattr(online_module, "get_cache", fake_get_cache)
+
+        seed_calls = []
+
+        async def seed_baselines(asset_ids):
+            seed_calls.append(sorted(asset_ids))
+            return {
+                "cold": AssetBaseline(
+                    asset_id="cold",
+                    avg_rssi_per_gateway={"gw-1": -65.0},
+                    typical_movement_pattern={},
+                    normal_battery_drain_rate=0.2,
+                    avg_temperature=18.0,
+                    typical_confidence=0.7,
+                    last_updated=datetime.now(),
+                )
+            }
+
+        tracker = OnlineFeatureTracker(seed_baselines)
+        for asset_id in ("cold", "new", "warm"):
+            await tracker.observe(
+                asset_id,
+                {"gateway_id": "gw-1", "rssi": -60, "timestamp": NOW + 10},
+            )
+        await tracker.observe_location(
+            "cold",
+            SimpleNamespace(
+                confidence=0.95,
+                timestamp=datetime.fromtimestamp(NOW + 20),
+                speed=None,
+                bearing=None,
+                distance_from_previous=None,
+            ),
+        )
+
+        await tracker.checkpoint()
+
+        assert seed_calls == [["cold", "new"]]
+        assert tracker.stats["restored"] == 1
+        assert set(tracker.states["warm"].gateways) == {"gw-9", "gw-1"}
+        cold = tracker.baseline("cold")
+        assert cold.avg_rssi_per_gateway["gw-1"] == pytest.approx(
+            (-65.0 * 10 - 60.0) / 11
+        )
+        assert cold.normal_battery_drain_rate == pytest.approx(0.2)
+        assert set(cache.writes["asset_online_state"][0]) == {"cold", "new", "warm"}
+        assert set(cache.writes["asset_baseline"][0]) == {"cold", "new", "warm"}
+        assert tracker.dirty == set()
+
+        await tracker.checkpoint()
+        assert seed_calls == [["cold", "new"]]
+        assert len(cache.writes["asset_online_state"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_observed(self, monkeypatch) -> None:
+        """Test the in-memory states are capped after a checkpoint"""
+        cache = FakeCache()
+
+        async def fake_get_cache():
+            return cache
+
+        async def no_baselines(asset_ids):
+            return {}
+
+        monkeypatch.setattr(online_module, "get_cache", fake_get_cache)
+        monkeypatch.setattr(online_module.settings, "ml_online_max_assets", 2)
+        tracker = OnlineFeatureTracker(no_baselines)
+        for asset_id in ("a", "b", "c", "a"):
+            await tracker.observe(
+                asset_id, {"gateway_id": "gw", "rssi": -60, "timestamp": NOW}
+            )
+
+        await tracker.checkpoint()
+
+        assert list(tracker.states) == ["c", "a"]
+        assert tracker.stats["evicted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_observations_share_state(
+        self, monkeypatch
+    ) -> None:
+        """Test observations arriving while the checkpoint loads are all kept"""
+        checkpoint = AssetFeatureState("a")
+        checkpoint.seeded = True
+        checkpoint.observe("gw-9", -50.0, NOW)
+        cache = FakeCache({"a": checkpoint.to_dict()})
+
+        async def fake_get_cache():
+            return cache
+
+        async def no_baselines(asset_ids):
+            return {}
+
+        monkeypatch.setattr(online_module, "get_cache", fake_get_cache)
+        tracker = OnlineFeatureTracker(no_baselines)
+
+        await asyncio.gather(
+            *(
+                tracker.observe(
+                    "a", {"gateway_id": gateway_id, "rssi": -60, "timestamp": NOW}
+                )
+                for gateway_id in ("gw-1", "gw-2")
+            )
+        )
+
+        state = tracker.states["a"]
+        assert set(state.gateways) == {"gw-9", "gw-1", "gw-2"}
+        assert state.rssi.weight == pytest.approx(3.0)
+        assert tracker.stats["restored"] == 1
+
+    @pytest.mark.asyncio
+    async def test_workers_merge_checkpoints(self, monkeypatch) -> None:
+        """Test two workers observing one asset both land in its checkpoint"""
+        cache = FakeCache()
+
+        async def fake_get_cache():
+            return cache
+
+        async def no_baselines(asset_ids):
+            return {}
+
+        monkeypatch.setattr(online_module, "get_cache", fake_get_cache)
+        first = OnlineFeatureTracker(no_baselines)
+        second = OnlineFeatureTracker(no_baselines)
+        await first.observe("x", {"gateway_id": "gw-1", "rssi": -60, "timestamp": NOW})
+        await second.observe("x", {"gateway_id": "gw-2", "rssi": -80, "timestamp": NOW})
+
+        # The second worker checkpoints between the first one's read and write
+        compare_and_set = cache.compare_and_set_many_with_strategy
+        interleaved = []
+
+        async def racing_compare_and_set(strategy_name, values, field="asset_id"):
+            if not interleaved:
+                interleaved.append(True)
+                await second.checkpoint()
+            return await compare_and_set(strategy_name, values, field)
+
+        monkeypatch.setattr(
+            cache, "compare_and_set_many_with_strategy", racing_compare_and_set
+        )
+        await first.checkpoint()
+
+        stored = AssetFeatureState.from_dict(cache.checkpoints["x"])
+        assert first.stats["checkpoint_conflicts"] == 1
+        assert set(stored.gateways) == {"gw-1", "gw-2"}
+        assert stored.rssi.weight == pytest.approx(2.0)
+        assert stored.rssi.mean == pytest.approx(-70.0)
+        assert set(first.states["x"].gateways) == {"gw-1", "gw-2"}
+
+        # Later checkpoints only add what is new
+        await first.observe("x", {"gateway_id": "gw-1", "rssi": -70, "timestamp": NOW})
+        await first.checkpoint()
+        await second.checkpoint()
+
+        stored = AssetFeatureState.from_dict(cache.checkpoints["x"])
+        assert stored.rssi.weight == pytest.approx(3.0)
+        assert cache.checkpoints["x"]["version"] == 3
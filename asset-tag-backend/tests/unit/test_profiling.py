@@ -0,0 +1,165 @@
+"""
+Unit tests for the on-demand sampling profiler
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from modules.admin import api as admin_api
+from modules.profiling.profiler import (Profile, ProfilingService, _ModuleSession,
+                                        _Session, sign_profile_token,
+                                        verify_profile_token)
+from modules.users.api import get_current_user
+
+
+def _spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _other_spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestProfileToken:
+    """Test signed X-Profile-Token values"""
+
+    def test_valid_token(self) -> None:
+        """Test a freshly signed token verifies"""
+        assert verify_profile_token(sign_profile_token(int(time.time()) + 60))
+
+    def test_tampered_and_expired_tokens(self) -> None:
+        """Test a changed expiry or a past expiry is rejected"""
+        expires_at = int(time.time()) + 60
+        signature = sign_profile_token(expires_at).partition(".")[2]
+
+        assert not verify_profile_token(f"{expires_at + 3600}.{signature}")
+        assert not verify_profile_token(sign_profile_token(int(time.time()) - 1))
+        assert not verify_profile_token("garbage")
+
+    def test_minting_requires_admin(self, monkeypatch) -> None:
+        """Test only admins can mint tokens"""
+        monkeypatch.setattr(admin_api.settings, "profiling_enabled", True)
+        app = FastAPI()
+        app.include_router(admin_api.router)
+        user = SimpleNamespace(role="user", is_superuser=False)
+        app.dependency_overrides[get_current_user] = lambda: user
+        client = TestClient(app)
+
+        assert client.post("/admin/profiling/token").status_code == 403
+
+        user.role = "admin"
+        response = client.post("/admin/profiling/token")
+        assert response.status_code == 200
+        assert verify_profile_token(response.json()["token"])
+
+    def test_profiling_surface_requires_admin(self, monkeypatch) -> None:
+        """Test non-admins cannot arm, start, list or download profiles"""
+        monkeypatch.setattr(admin_api.settings, "profiling_enabled", True)
+        app = FastAPI()
+        app.include_router(admin_api.router)
+        user = SimpleNamespace(role="user", is_superuser=False)
+        app.dependency_overrides[get_current_user] = lambda: user
+        client = TestClient(app)
+
+        for method, path in (
+            ("get", "/admin/profiling/stats"),
+            ("post", "/admin/profiling/requests"),
+            ("post", "/admin/profiling/processors/observation"),
+            ("get", "/admin/profiling/profiles"),
+            ("get", "/admin/profiling/profiles/x"),
+            ("get", "/admin/profiling/profiles/x/collapsed"),
+        ):
+            assert getattr(client, method)(path).status_code == 403, path
+
+        user.role = "admin"
+        assert client.get("/admin/profiling/profiles").status_code == 200
+
+
+class TestProfile:
+    """Test stack aggregation output"""
+
+    def test_collapsed_and_top_functions(self) -> None:
+        """Test collapsed lines are heaviest first with self/total counts"""
+        profile = Profile("request", "GET /x", 5.0)
+        profile.stacks[("main", "handler", "query")] += 3
+        profile.stacks[("main", "handler")] += 1
+
+        assert profile.collapsed() == "main;handler;query 3\nmain;handler 1\n"
+        top = profile.top_functions()
+        assert top["self"][0] == {"function": "query", "samples": 3, "percent": 75.0}
+        assert top["total"][0]["samples"] == 4
+
+    def test_store_keeps_most_recent(self, monkeypatch) -> None:
+        """Test only the configured number of profiles is kept"""
+        from modules.profiling import profiler
+
+        monkeypatch.setattr(profiler.settings, "profiling_max_profiles", 2)
+        service = ProfilingService()
+        profiles = [Profile("request", str(i), 5.0) for i in range(3)]
+        for profile in profiles:
+            service._store(profile)
+
+        assert [p["target"] for p in service.list_profiles()] == ["2", "1"]
+
+
+class TestSampling:
+    """Test samples are attributed to the right session"""
+
+    @pytest.mark.asyncio
+    async def test_task_profile_excludes_other_tasks(self) -> None:
+        """Test a request profile only keeps samples of its own task"""
+        service = ProfilingService()
+        service.profiler.interval_ms = 1
+
+        async def profiled() -> None:
+            session = service.start_task_profile("request", "profiled")
+            for _ in range(10):
+                _spin(0.01)
+                await asyncio.sleep(0)
+            return service.finish(session)
+
+        async def other() -> None:
+            for _ in range(10):
+                _other_spin(0.01)
+                await asyncio.sleep(0)
+
+        profile, _ = await asyncio.gather(profiled(), other())
+
+        collapsed = profile.collapsed()
+        assert profile.sample_count > 0
+        assert "_spin" in collapsed
+        assert "_other_spin" not in collapsed
+        assert service.profiler.sessions == []
+
+    def test_module_session_samples_matching_threads(self) -> None:
+        """Test a module profile keeps stacks passing through its source file"""
+        service = ProfilingService()
+        service.profiler.interval_ms = 1
+        session = _ModuleSession(Profile("processor", "test", 1.0), __file__)
+        service.profiler.add(session)
+
+        worker = threading.Thread(target=_spin, args=(0.1,))
+        worker.start()
+        worker.join()
+        service.finish(session)
+
+        assert session.profile.sample_count > 0
+        assert all(
+            any("test_profiling.py" in frame for frame in stack)
+            for stack in session.profile.stacks
+        )
+
+    def test_session_requires_sample(self) -> None:
+        """Test a session kind must implement sample()"""
+        with pytest.raises(TypeError):
+            _Session(Profile("request", "test", 1.0))
@@ -0,0 +1,157 @@
+"""
+Unit tests for the periodic job scheduler
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from modules.scheduler.cron import CronSchedule, IntervalSchedule
+from modules.scheduler.scheduler import ScheduledJob, Scheduler
+
+START = datetime(2024, 1, 31, 23, 59, 30, tzinfo=timezone.utc)
+
+
+class TestSchedules:
+    """Test cron and interval next-run computation"""
+
+    def test_cron_step_and_rollover(self) -> None:
+        """Test steps roll over hour, day and month boundaries"""
+        assert CronSchedule("*/15 * * * *").next_after(START) == datetime(
+            2024, 2, 1, 0, 0, tzinfo=timezone.utc
+        )
+        assert CronSchedule("@quarterly").next_after(START) == datetime(
+            2024, 4, 1, 0, 0, tzinfo=timezone.utc
+        )
+
+    def test_cron_weekday(self) -> None:
+        """Test day-of-week uses 0 (or 7) for Sunday"""
+        monday = CronSchedule("0 6 * * 1").next_after(START)
+        sunday = CronSchedule("0 6 * * 7").next_after(START)
+
+        assert monday == datetime(2024, 2, 5, 6, 0, tzinfo=timezone.utc)
+        assert sunday.weekday() == 6
+
+    def test_cron_day_fields_are_ored(self) -> None:
+        """Test a restricted day-of-month and day-of-week match either"""
+        # 2024-02-01 is a Thursday, so the day-of-month matches first
+        assert CronSchedule("30 9 1 * 5").next_after(START) == datetime(
+            2024, 2, 1, 9, 30, tzinfo=timezone.utc
+        )
+
+    def test_invalid_cron(self) -> None:
+        """Test malformed expressions are rejected"""
+        for expression in ["* * * *", "60 * * * *", "*/0 * * * *"]:
+            with pytest.raises(ValueError):
+                CronSchedule(expression)
+
+    def test_interval_is_epoch_aligned(self) -> None:
+        """Test every process computes the same interval boundaries"""
+        schedule = IntervalSchedule(300)
+        first = schedule.next_after(START)
+
+        assert first.timestamp() % 300 == 0
+        assert schedule.next_after(first).timestamp() - first.timestamp() == 300
+
+
+class TestScheduler:
+    """Test dispatch, missed-run policies and overlap protection"""
+
+    def _job(self, calls: list, policy: str = "run_once", **kwargs) -> ScheduledJob:
+        async def func() -> None:
+            calls.append(time.time())
+
+        return ScheduledJob(
+            name="test_job",
+            func=func,
+            schedule=IntervalSchedule(60),
+            exclusive=False,
+            missed_run_policy=policy,
+            **kwargs,
+        )
+
+    async def _drain(self, scheduler: Scheduler) -> None:
+        if scheduler._tasks:
+            await asyncio.gather(*scheduler._tasks)
+
+    def test_unknown_policy(self) -> None:
+        """Test missed-run policies are validated"""
+        with pytest.raises(ValueError):
+            self._job([], policy="sometimes")
+
+    @pytest.mark.asyncio
+    async def test_on_time_run_requeues(self) -> None:
+        """Test a due job runs and its next occurrence is queued"""
+        scheduler, calls = Scheduler(), []
+        job = scheduler.add_job(self._job(calls))
+        due = time.time()
+
+        scheduler._dispatch(job, due)
+        await self._drain(scheduler)
+
+        assert len(calls) == 1
+        assert job.stats["runs"] == 1
+        assert len(scheduler.heap) == 1
+        assert scheduler.heap[0][3] > due
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "policy,expected_runs", [("skip", 0), ("run_once", 1), ("catch_up", 10)]
+    )
+    async def test_missed_run_policies(self, policy: str, expected_runs: int) -> None:
+        """Test late runs are skipped, run once, or replayed"""
+        scheduler, calls = Scheduler(), []
+        job = scheduler.add_job(self._job(calls, policy=policy))
+        due = IntervalSchedule(60).next_after(datetime.now(timezone.utc)).timestamp()
+
+        scheduler._dispatch(job, due - 600)
+        await self._drain(scheduler)
+
+        assert len(calls) == expected_runs
+        assert job.stats["missed"] == 1
+        # Scheduling resumes from the present
+        assert scheduler.heap[-1][3] > time.time()
+
+    @pytest.mark.asyncio
+    async def test_runs_do_not_overlap(self) -> None:
+        """Test a job still running is not started again"""
+        scheduler, release = Scheduler(), asyncio.Event()
+
+        async def slow() -> None:
+            await release.wait()
+
+        job = scheduler.add_job(
+            ScheduledJob(
+                name="slow", func=slow, schedule=IntervalSchedule(60), exclusive=False
+            )
+        )
+        scheduler._start_run(job, [time.time()])
+        scheduler._start_run(job, [time.time()])
+        release.set()
+        await self._drain(scheduler)
+
+        assert job.stats["runs"] == 1
+        assert job.stats["skipped_overlap"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_are_recorded(self) -> None:
+        """Test errors and timeouts are counted, not raised"""
+        scheduler = Scheduler()
+
+        async def broken() -> None:
+            raise RuntimeError("boom")
+
+        job = scheduler.add_job(
+            ScheduledJob(
+                name="broken",
+                func=broken,
+                schedule=IntervalSchedule(60),
+                exclusive=False,
+            )
+        )
+        await scheduler._run(job, time.time())
+
+        assert job.stats["failures"] == 1
+        assert job.stats["last_error"] == "boom"
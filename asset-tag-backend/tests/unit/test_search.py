@@ -0,0 +1,186 @@
+"""
+Unit tests for global search ranking and caching
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from fastapi import HTTPException
+
+from modules.search.api import get_search_suggestions, global_search
+from modules.search.queries import (build_global_search, per_index_budget,
+                                    rank_global_results)
+from modules.search.suggestions import SuggestionService
+
+
+def _response(*scores: float) -> Dict[str, Any]:
+    return {
+        "hits": {
+            "total": {"value": len(scores)},
+            "hits": [
+                {
+                    "_id": f"id-{score}",
+                    "_score": score,
+                    "_source": {"id": f"id-{score}", "name": "x"},
+                }
+                for score in scores
+            ],
+        }
+    }
+
+
+class FakeESManager:
+    def __init__(self) -> None:
+        self.calls: List[List[Tuple[str, Dict[str, Any]]]] = []
+
+    async def multi_search(self, searches):
+        self.calls.append(searches)
+        return [_response(2.0, 1.0) for _ in searches]
+
+
+class FakeCache:
+    def __init__(self) -> None:
+        self.store: Dict[str, Any] = {}
+        self.generation = 0
+
+    async def get_search_generation(self) -> int:
+        return self.generation
+
+    async def get(self, key: str):
+        return self.store.get(key)
+
+    async def set(self, key: str, value: Any, ttl=None) -> bool:
+        self.store[key] = value
+        return True
+
+
+class TestRanking:
+    """Test per-index budgets and score normalization"""
+
+    def test_budget_covers_requested_size(self) -> None:
+        """Test every index can contribute its share, and at least one hit"""
+        assert per_index_budget(20, 4) == 5
+        assert per_index_budget(10, 4) == 3
+        assert per_index_budget(2, 4) == 1
+
+    def test_global_query_sorts_by_score(self) -> None:
+        """Test global search ranks alerts by relevance, not recency"""
+        query = build_global_search("pump", "alerts", 5)
+
+        assert query["sort"] == [{"_score": {"order": "desc"}}]
+        assert query["size"] == 5
+
+    def test_scores_are_normalized_per_index(self) -> None:
+        """Test the best hit of each index ranks equally regardless of raw score"""
+        ranked = rank_global_results(
+            {"assets": _response(12.0, 3.0), "sites": _response(1.5)}, size=10
+        )
+
+        assert ranked["total_results"] == 3
+        top = [item["normalized_score"] for item in ranked["ranked"]]
+        assert top == [1.0, 1.0, 0.25]
+        assert {item["entity_type"] for item in ranked["ranked"][:2]} == {
+            "assets",
+            "sites",
+        }
+
+    def test_ranked_results_truncated_to_size(self) -> None:
+        """Test the merged list honours the requested size"""
+        ranked = rank_global_results(
+            {"assets": _response(3.0, 2.0, 1.0), "sites": _response(5.0, 4.0)},
+            size=3,
+        )
+
+        assert len(ranked["ranked"]) == 3
+        assert len(ranked["results"]["assets"]["results"]) == 3
+
+
+class TestGlobalSearch:
+    """Test the global search endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_single_multi_search_and_cache(self) -> None:
+        """Test one round trip for all indices, then a cache hit"""
+        es_manager, cache = FakeESManager(), FakeCache()
+
+        first = await global_search(
+            "pump", entity_types=None, size=8, es_manager=es_manager, cache=cache
+        )
+        second = await global_search(
+            "pump", entity_types=None, size=8, es_manager=es_manager, cache=cache
+        )
+
+        assert len(es_manager.calls) == 1
+        assert [t for t, _ in es_manager.calls[0]] == [
+            "assets",
+            "sites",
+            "gateways",
+            "alerts",
+        ]
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["ranked"] == first["ranked"]
+
+    @pytest.mark.asyncio
+    async def test_index_write_invalidates_cache(self) -> None:
+        """Test a new search generation misses the cached results"""
+        es_manager, cache = FakeESManager(), FakeCache()
+
+        await global_search(
+            "pump", entity_types="assets", size=5, es_manager=es_manager, cache=cache
+        )
+        cache.generation += 1
+        result = await global_search(
+            "pump", entity_types="assets", size=5, es_manager=es_manager, cache=cache
+        )
+
+        assert len(es_manager.calls) == 2
+        assert result["cached"] is False
+
+
+class TestSuggestionFallback:
+    """Test the Elasticsearch fallback for suggestions"""
+
+    @pytest.mark.asyncio
+    async def test_fuzzy_match_scoped_to_organization(self) -> None:
+        """Test the fallback fuzzy-matches suggestion fields in one organization"""
+        es_manager = FakeESManager()
+
+        result = await get_search_suggestions(
+            "pmup",
+            organization_id="org-1",
+            entity_type="all",
+            size=3,
+            es_manager=es_manager,
+            suggestions_service=SuggestionService(),
+        )
+
+        searches = es_manager.calls[0]
+        assert [t for t, _ in searches] == ["assets", "sites", "gateways"]
+        query = dict(searches)["assets"]["query"]["bool"]
+        assert query["must"][0]["multi_match"]["fuzziness"] == "AUTO"
+        assert query["must"][0]["multi_match"]["fields"] == ["name", "serial_number"]
+        assert query["filter"] == [{"term": {"organization_id": "org-1"}}]
+        assert result["source"] == "elasticsearch"
+        assert len(result["suggestions"]) == 3
+        assert result["suggestions"][0] == {
+            "text": "x",
+            "entity_type": "assets",
+            "id": "id-2.0",
+            "score": 2.0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_unknown_entity_type_rejected(self) -> None:
+        """Test entity types without suggestion fields are a client error"""
+        with pytest.raises(HTTPException) as error:
+            await get_search_suggestions(
+                "pump",
+                organization_id="org-1",
+                entity_type="alerts",
+                size=3,
+                es_manager=FakeESManager(),
+                suggestions_service=SuggestionService(),
+            )
+
+        assert error.value.status_code == 400
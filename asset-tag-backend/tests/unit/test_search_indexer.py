@@ -0,0 +1,264 @@
+"""
+Unit tests for the change-data-capture search indexer
+"""
+
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import modules.search.indexer as indexer_module
+from modules.assets.models import Asset
+from modules.search.indexer import (INDEXED_ENTITIES, SearchIndexer,
+                                    bulk_batches, record_change,
+                                    register_change_capture)
+from modules.shared.database import models  # noqa: F401
+from streaming.observation_processor import ObservationProcessor
+
+
+def _action(document_id: str, padding: int = 0) -> List[Dict[str, Any]]:
+    return [
+        {"index": {"_index": "assets_index", "_id": document_id}},
+        {"name": "x" * padding},
+    ]
+
+
+class FakeESManager:
+    indices = {"assets": "assets_index"}
+
+    def __init__(self, responses: List[Any]) -> None:
+        self.responses = responses
+        self.requests: List[List[Dict[str, Any]]] = []
+
+    async def bulk(self, operations):
+        self.requests.append(operations)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _items(*statuses: int) -> Dict[str, Any]:
+    return {
+        "items": [
+            {"index": {"_id": str(i), "status": status}}
+            for i, status in enumerate(statuses)
+        ]
+    }
+
+
+class TestBulkBatches:
+    """Test size-bounded bulk batching"""
+
+    def test_action_count_bound(self) -> None:
+        """Test batches hold at most max_actions actions"""
+        batches = list(bulk_batches([_action(str(i)) for i in range(5)], 2, 10**6))
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    def test_byte_bound(self) -> None:
+        """Test batches stay under max_bytes, oversized actions go alone"""
+        actions = [_action("a", 100), _action("b", 100), _action("c", 1000)]
+        batches = list(bulk_batches(actions, 100, 400))
+
+        assert [len(batch) for batch in batches] == [2, 1]
+        batches = list(bulk_batches(actions, 100, 200))
+        assert [len(batch) for batch in batches] == [1, 1, 1]
+
+
+class TestSearchIndexer:
+    """Test coalescing and bulk retries"""
+
+    def test_changes_coalesce(self) -> None:
+        """Test repeated changes to a document keep only the latest"""
+        indexer = SearchIndexer()
+        indexer.enqueue("assets", "a", "index")
+        indexer.enqueue("assets", "a", "index")
+        indexer.enqueue("assets", "a", "delete")
+        indexer.enqueue("sites", "a", "index")
+
+        assert indexer.pending == {("assets", "a"): "delete", ("sites", "a"): "index"}
+        assert indexer.stats["coalesced"] == 2
+
+    def test_document_conversion(self) -> None:
+        """Test model attributes map to JSON-safe document fields"""
+        asset_id = uuid.uuid4()
+        row = SimpleNamespace(
+            id=asset_id,
+            name="Pump",
+            temperature=Decimal("21.50"),
+            asset_metadata={"k": "v"},
+        )
+        document = INDEXED_ENTITIES["assets"].to_document(row)
+
+        assert document["id"] == str(asset_id)
+        assert document["temperature"] == 21.5
+        assert document["metadata"] == {"k": "v"}
+        assert document["battery_level"] is None
+
+    @pytest.mark.asyncio
+    async def test_throttled_items_are_retried(self, monkeypatch) -> None:
+        """Test only 429 items are resent; mapping errors are dropped"""
+        es_manager = FakeESManager(
+            [ConnectionError("down"), _items(201, 429, 400), _items(200)]
+        )
+        indexer = SearchIndexer()
+        monkeypatch.setattr(indexer, "_get_es_manager", lambda: es_manager)
+        monkeypatch.setattr(indexer_module, "_backoff", lambda attempt: 0)
+
+        batch = [_action("0"), _action("1"), _action("2")]
+        remaining = await indexer._send_batch(batch)
+
+        assert remaining == []
+        assert len(es_manager.requests) == 3
+        # The retry carries just the throttled action and its source line
+        assert es_manager.requests[-1] == _action("1")
+        assert indexer.stats["indexed"] == 2
+        assert indexer.stats["failed"] == 1
+        assert indexer.stats["retries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_unshipped_actions_are_reported(self, monkeypatch) -> None:
+        """Test actions still failing after all retries are returned"""
+        monkeypatch.setattr(indexer_module.settings, "search_bulk_max_retries", 1)
+        es_manager = FakeESManager([_items(503), _items(503)])
+        indexer = SearchIndexer()
+        monkeypatch.setattr(indexer, "_get_es_manager", lambda: es_manager)
+        monkeypatch.setattr(indexer_module, "_backoff", lambda attempt: 0)
+
+        failed = await indexer.ship([_action("a")])
+
+        assert failed == [("assets", "a")]
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_requeues_changes(self, monkeypatch) -> None:
+        """Test a failing row load keeps pending changes, newest op winning"""
+        indexer = SearchIndexer()
+        monkeypatch.setattr(indexer, "_get_es_manager", lambda: FakeESManager([]))
+        first, second = str(uuid.uuid4()), str(uuid.uuid4())
+        indexer.enqueue("assets", first, "index")
+        indexer.enqueue("assets", second, "index")
+
+        class FailingSession:
+            async def execute(self, statement):
+                # A delete committed while the flush was loading rows
+                indexer.enqueue("assets", second, "delete")
+                raise ConnectionError("database unavailable")
+
+        async def failing_db():
+            yield FailingSession()
+
+        monkeypatch.setattr(indexer_module, "get_db", failing_db)
+
+        with pytest.raises(ConnectionError):
+            await indexer.flush()
+
+        assert indexer.pending == {
+            ("assets", first): "index",
+            ("assets", second): "delete",
+        }
+
+    @pytest.mark.asyncio
+    async def test_reindex_fails_when_index_is_not_created(self, monkeypatch) -> None:
+        """Test a reindex stops instead of writing into an auto-mapped index"""
+        indexer = SearchIndexer()
+
+        class NoCreateESManager(FakeESManager):
+            async def create_index(self, index_type, index_name):
+                return False
+
+        es_manager = NoCreateESManager([])
+        monkeypatch.setattr(indexer, "_get_es_manager", lambda: es_manager)
+
+        with pytest.raises(RuntimeError):
+            await indexer._reindex_one("assets", parallelism=1, batch_size=10)
+        assert es_manager.requests == []
+
+
+@pytest_asyncio.fixture
+async def asset_db(monkeypatch) -> AsyncIterator[Tuple[AsyncSession, uuid.UUID]]:
+    """A SQLite session holding one asset, with change capture installed"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Asset.__table__.create)
+    indexer = SearchIndexer()
+    indexer.running = True
+    monkeypatch.setattr(indexer_module, "search_indexer", indexer)
+    register_change_capture()
+
+    asset_id = uuid.uuid4()
+    async with AsyncSession(engine) as db:
+        db.add(
+            Asset(
+                id=asset_id,
+                organization_id=uuid.uuid4(),
+                name="Pump",
+                serial_number="SN-1",
+                asset_type="tool",
+            )
+        )
+        await db.commit()
+        indexer.pending.clear()
+        yield db, asset_id
+    await engine.dispose()
+
+
+class TestBulkWriteCapture:
+    """Test writes that bypass the unit of work still reach the indexer"""
+
+    @pytest.mark.asyncio
+    async def test_battery_update_is_captured(self, asset_db) -> None:
+        """Test the observation processor's battery update queues the asset"""
+        db, asset_id = asset_db
+        processor = ObservationProcessor()
+
+        async def get_asset_id(db, asset_tag_id):
+            return asset_id
+
+        processor._get_asset_id = get_asset_id
+        await processor._update_asset_battery(
+            db, {"asset_tag_id": "SN-1", "battery_level": 40}
+        )
+
+        assert indexer_module.search_indexer.pending == {
+            ("assets", str(asset_id)): "index"
+        }
+
+    @pytest.mark.asyncio
+    async def test_criteria_without_ids_are_resolved(self, asset_db) -> None:
+        """Test update()/delete() by other columns find the rows they match"""
+        db, asset_id = asset_db
+
+        await db.execute(
+            update(Asset).where(Asset.serial_number == "SN-1").values(status="lost")
+        )
+        await db.commit()
+        assert indexer_module.search_indexer.pending == {
+            ("assets", str(asset_id)): "index"
+        }
+
+        await db.execute(delete(Asset).where(Asset.serial_number == "SN-1"))
+        await db.commit()
+        assert indexer_module.search_indexer.pending == {
+            ("assets", str(asset_id)): "delete"
+        }
+
+    @pytest.mark.asyncio
+    async def test_raw_sql_changes_publish_on_commit(self, asset_db) -> None:
+        """Test record_change is published by the commit, not a rollback"""
+        db, asset_id = asset_db
+
+        record_change(db, "assets", str(asset_id), "delete")
+        await db.rollback()
+        assert indexer_module.search_indexer.pending == {}
+
+        record_change(db, "assets", str(asset_id), "delete")
+        await db.commit()
+        assert indexer_module.search_indexer.pending == {
+            ("assets", str(asset_id)): "delete"
+        }
@@ -0,0 +1,123 @@
+"""
+Unit tests for the in-memory autocomplete index
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from modules.search.suggestions import PrefixIndex, SuggestionService
+
+ROWS = [
+    ("assets", "a1", "org-1", {"name": "Hydraulic Pump", "serial_number": "SN-001"}),
+    ("assets", "a2", "org-1", {"name": "Pump Station 2", "serial_number": "SN-002"}),
+    ("assets", "a3", "org-2", {"name": "Pump", "serial_number": "SN-003"}),
+    ("sites", "s1", "org-1", {"name": "Pumphouse Yard"}),
+]
+
+
+class TestPrefixIndex:
+    """Test prefix lookups, ranking and updates"""
+
+    def _index(self, budget: int = 10**6) -> PrefixIndex:
+        index = PrefixIndex(memory_budget_bytes=budget)
+        index.load(ROWS)
+        return index
+
+    def test_whole_text_matches_rank_first(self) -> None:
+        """Test matches from the start of a name beat word matches"""
+        texts = [s["text"] for s in self._index().suggest("pump", 10, "org-1")]
+
+        assert texts[-1] == "Hydraulic Pump"
+        assert set(texts[:2]) == {"Pump Station 2", "Pumphouse Yard"}
+
+    def test_filters(self) -> None:
+        """Test organization and entity type filters"""
+        index = self._index()
+
+        org_texts = {s["text"] for s in index.suggest("pump", 10, "org-2")}
+        site_suggestions = index.suggest("pump", 10, "org-1", {"sites"})
+
+        assert org_texts == {"Pump"}
+        assert {s["text"] for s in site_suggestions} == {"Pumphouse Yard"}
+        assert index.suggest("pump", 10, "org-3") == []
+
+    def test_case_and_serial_numbers(self) -> None:
+        """Test lookups are case-insensitive and cover serial numbers"""
+        suggestions = self._index().suggest("sn-00", 2, "org-1")
+
+        assert [s["text"] for s in suggestions] == ["SN-001", "SN-002"]
+        assert suggestions[0]["id"] == "a1"
+
+    def test_add_and_remove(self) -> None:
+        """Test in-place updates replace an entity's entries"""
+        index = self._index()
+        index.add("assets", "a1", "org-1", {"name": "Generator"})
+
+        pump_texts = {s["text"] for s in index.suggest("pump", 10, "org-1")}
+        assert "Hydraulic Pump" not in pump_texts
+        assert index.suggest("gen", 1, "org-1")[0]["id"] == "a1"
+
+        index.remove("assets", "a1")
+        assert index.suggest("gen", 1, "org-1") == []
+
+    def test_memory_budget_drops_word_keys(self) -> None:
+        """Test the budget keeps whole-text keys but stops word prefixes"""
+        index = self._index(budget=0)
+
+        assert index.truncated
+        assert index.suggest("hydraulic", 1, "org-1")[0]["text"] == "Hydraulic Pump"
+        pump_suggestions = index.suggest("pump", 10, "org-1")
+        assert all(s["text"] != "Hydraulic Pump" for s in pump_suggestions)
+
+
+class TestSuggestionService:
+    """Test entity change events update the index"""
+
+    def test_change_events(self) -> None:
+        """Test commits add entries and soft deletes remove them"""
+        service = SuggestionService()
+        asset = SimpleNamespace(
+            name="Forklift",
+            serial_number="FL-1",
+            organization_id="org-1",
+            deleted_at=None,
+        )
+
+        service.on_change("assets", "f1", "index", asset)
+        assert service.suggest("fork", 5, "org-1")[0]["id"] == "f1"
+
+        asset.deleted_at = "2024-01-01"
+        service.on_change("assets", "f1", "index", asset)
+        assert service.suggest("fork", 5, "org-1") == []
+
+    def test_unrelated_entities_ignored(self) -> None:
+        """Test alerts are not suggestible"""
+        service = SuggestionService()
+        service.on_change("alerts", "x", "index", SimpleNamespace(name="Pump"))
+
+        assert len(service.index) == 0
+
+    @pytest.mark.asyncio
+    async def test_overlapping_rebuilds_run_once(self, monkeypatch) -> None:
+        """Test a rebuild started while one is loading is skipped"""
+        service = SuggestionService()
+        loads = []
+        release = asyncio.Event()
+
+        async def load_rows():
+            loads.append(1)
+            await release.wait()
+            return ROWS
+
+        monkeypatch.setattr(service, "_load_rows", load_rows)
+
+        startup = asyncio.create_task(service.rebuild())
+        await asyncio.sleep(0)
+        await service.rebuild()
+        release.set()
+        await startup
+
+        assert loads == [1]
+        assert service.suggest("pump", 10, "org-2")[0]["id"] == "a3"
@@ -0,0 +1,106 @@
+"""
+Unit tests for fast row-to-response serialization
+"""
+
+import json
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from modules.alerts.schemas import AlertResponse
+from modules.assets.schemas import AssetResponse
+from modules.shared.serialization import (FastJSONResponse, RowSerializer,
+                                          dumps, normalize_uuid)
+
+
+class TestConverters:
+    """Test value converters"""
+
+    def test_normalize_uuid(self) -> None:
+        """Test SQLite hex ids and UUID objects render with hyphens"""
+        value = uuid.uuid4()
+        assert normalize_uuid(value) == str(value)
+        assert normalize_uuid(value.hex) == str(value)
+        assert normalize_uuid(None) is None
+        assert normalize_uuid("not-a-uuid") == "not-a-uuid"
+
+    def test_dumps_handles_decimal_and_datetime(self) -> None:
+        """Test types the encoders do not handle natively"""
+        body = json.loads(
+            dumps(
+                {
+                    "rate": Decimal("1.50"),
+                    "at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+                }
+            )
+        )
+        assert body["rate"] == 1.5
+        assert body["at"].startswith("2024-01-01T00:00:00")
+
+
+class TestRowSerializer:
+    """Test mapping rows straight to response dicts"""
+
+    def _asset_row(self) -> dict:
+        now = datetime(2024, 1, 1, 12, 0, 0)
+        return {
+            "id": uuid.uuid4().hex,
+            "organization_id": uuid.uuid4().hex,
+            "name": "Asset 1",
+            "serial_number": "SN-1",
+            "asset_type": "equipment",
+            "status": "active",
+            "current_site_id": None,
+            "battery_level": 80,
+            "temperature": Decimal("21.50"),
+            "purchase_date": now,
+            "hourly_rate": Decimal("45.00"),
+            "asset_metadata": '{"color": "yellow"}',
+            "created_at": "2024-01-01 12:00:00",
+            "updated_at": now,
+        }
+
+    def test_asset_row_matches_schema(self) -> None:
+        """Test serialized rows validate against the response schema"""
+        serializer = RowSerializer(AssetResponse)
+        items = serializer.serialize([self._asset_row()])
+
+        assert "-" in items[0]["id"]
+        assert items[0]["temperature"] == 21.5
+        assert items[0]["asset_metadata"] == {"color": "yellow"}
+        assert items[0]["purchase_date"] == "2024-01-01T12:00:00"
+        assert items[0]["availability"] == "available"
+        assert items[0]["deleted_at"] is None
+        serializer.validate(items)
+
+    def test_column_aliases(self) -> None:
+        """Test response fields read from differently named columns"""
+        serializer = RowSerializer(
+            AlertResponse, columns={"metadata": "alert_metadata"}
+        )
+        item = serializer.row_to_dict(
+            {
+                "id": uuid.uuid4(),
+                "alert_metadata": '{"threshold": 20}',
+                "triggered_at": datetime(2024, 1, 1),
+            }
+        )
+
+        assert item["metadata"] == {"threshold": 20}
+        assert item["triggered_at"] == "2024-01-01T00:00:00"
+
+    def test_missing_metadata_uses_default(self) -> None:
+        """Test NULL JSON columns fall back to the schema default"""
+        serializer = RowSerializer(AssetResponse)
+        row = self._asset_row()
+        row["asset_metadata"] = None
+        assert serializer.row_to_dict(row)["asset_metadata"] == {}
+
+    def test_response_renders_json(self) -> None:
+        """Test the response class emits the serialized list"""
+        serializer = RowSerializer(AssetResponse)
+        response = serializer.response([self._asset_row()])
+
+        assert isinstance(response, FastJSONResponse)
+        assert response.media_type == "application/json"
+        assert json.loads(response.body)[0]["name"] == "Asset 1"
@@ -0,0 +1,83 @@
+"""
+Unit tests for application import cost
+
+Importing ``main`` must stay cheap: optional subsystems (MLflow, Kafka, S3,
+Elasticsearch) are imported when they are first used, not at startup.
+Profile regressions with ``python scripts/import_profile.py``. The timing
+check is marked ``perf``; deselect it with ``-m "not perf"``.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Catches gross regressions only, so loaded CI machines do not flake; the
+# sys.modules check is what guards lazy imports. Override to tighten locally
+STARTUP_BUDGET_SECONDS = float(os.getenv("ASSET_TAG_STARTUP_BUDGET_SECONDS", "10.0"))
+
+HEAVY_MODULES = [
+    "mlflow",
+    "sklearn",
+    "torch",
+    "xgboost",
+    "pandas",
+    "aiokafka",
+    "boto3",
+    "elasticsearch",
+]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+heavy = json.loads(sys.argv[1])
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [m for m in heavy if m in sys.modules],
+}))
+"""
+
+
+def _import_main() -> Dict[str, Any]:
+    """Import main in a fresh interpreter, as a worker process does"""
+    env = dict(os.environ, ASSET_TAG_ENVIRONMENT="test")
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE, json.dumps(HEAVY_MODULES)],
+        cwd=str(PROJECT_ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if completed.returncode != 0:
+        pytest.fail(f"import main failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+class TestStartupImports:
+    """Test the cost of importing the application"""
+
+    def test_heavy_dependencies_are_not_imported(self) -> None:
+        """Test optional subsystems stay out of sys.modules at import"""
+        result = _import_main()
+
+        assert result["loaded"] == []
+
+    @pytest.mark.perf
+    def test_import_within_budget(self) -> None:
+        """Test importing main stays within the startup budget"""
+        result = _import_main()
+
+        assert result["seconds"] < STARTUP_BUDGET_SECONDS, (
+            f"import main took {result['seconds']:.2f}s "
+            f"(budget {STARTUP_BUDGET_SECONDS}s); "
+            "run scripts/import_profile.py to find the slow imports"
+        )
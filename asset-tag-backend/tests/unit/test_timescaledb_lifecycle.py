@@ -0,0 +1,56 @@
+"""
+Unit tests for TimescaleDB lifecycle management
+"""
+
+from config.timescaledb_lifecycle import (get_hypertable_policies,
+                                          recommend_chunk_interval)
+
+
+class TestHypertablePolicies:
+    """Test hypertable policies built from settings"""
+
+    def test_policies_cover_time_series_tables(self) -> None:
+        """Test that all time-series tables have a policy"""
+        policies = get_hypertable_policies()
+
+        assert set(policies) == {
+            "observations",
+            "estimated_locations",
+            "alerts",
+            "audit_logs",
+        }
+        assert policies["observations"].time_column == "observed_at"
+        assert policies["observations"].compress_segmentby == "asset_id, gateway_id"
+        assert policies["alerts"].compress_after is None
+
+    def test_compress_orderby_uses_time_column(self) -> None:
+        """Test compression ordering is newest first on the time column"""
+        policy = get_hypertable_policies()["estimated_locations"]
+        assert policy.compress_orderby == "estimated_at DESC"
+
+
+class TestChunkIntervalRecommendation:
+    """Test chunk interval recommendations"""
+
+    def test_no_chunks(self) -> None:
+        """Test that no recommendation is made without chunk data"""
+        assert recommend_chunk_interval([], 3600, 512) is None
+
+    def test_small_chunks_grow_interval(self) -> None:
+        """Test that undersized chunks lead to a longer interval"""
+        # 1 hour chunks of 64 MB with a 512 MB target -> 8 hours
+        chunk_size = 64 * 1024 * 1024
+        assert recommend_chunk_interval([chunk_size] * 3, 3600, 512) == (
+            "8 hours 0 minutes"
+        )
+
+    def test_large_chunks_clamped_to_minimum(self) -> None:
+        """Test that very large chunks are clamped to the minimum interval"""
+        chunk_size = 100 * 1024 * 1024 * 1024
+        assert recommend_chunk_interval([chunk_size], 3600, 512) == (
+            "0 hours 5 minutes"
+        )
+
+    def test_interval_clamped_to_maximum(self) -> None:
+        """Test that tiny chunks are clamped to the maximum interval"""
+        assert recommend_chunk_interval([1024], 86400, 512) == "7 days 0 hours"
@@ -0,0 +1,113 @@
+"""
+Unit tests for cross-worker WebSocket broadcasts
+"""
+
+import asyncio
+import json
+from typing import Any, Callable, List, Tuple
+
+import pytest
+
+import modules.websocket.cluster as cluster
+from modules.websocket.cluster import ClusterBroadcastBus, channel_for
+from modules.websocket.connection_manager import ConnectionManager
+
+
+class FakeCache:
+    def __init__(self) -> None:
+        self.published: List[Tuple[str, Any]] = []
+
+    async def publish(self, channel: str, message: Any) -> int:
+        # Round-trip through JSON like CacheManager.publish
+        self.published.append((channel, json.loads(json.dumps(message))))
+        return 1
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.sent: List[dict] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+
+@pytest.fixture
+def cache(monkeypatch) -> FakeCache:
+    fake = FakeCache()
+
+    async def get_cache() -> FakeCache:
+        return fake
+
+    monkeypatch.setattr(cluster, "get_cache", get_cache)
+    return fake
+
+
+async def _worker(
+    make_manager: Callable[[], ConnectionManager], name: str
+) -> Tuple[ConnectionManager, ClusterBroadcastBus]:
+    manager = make_manager()
+    bus = ClusterBroadcastBus(worker_id=name)
+    manager.attach_cluster(bus)
+    # Forwarding only; tests hand published batches to receive() directly
+    bus.running = True
+    return manager, bus
+
+
+class TestClusterBroadcastBus:
+    """Test forwarding and delivery between workers"""
+
+    def test_channels_shard_by_target_and_organization(self) -> None:
+        """Test an organization always maps to the same shard of its target"""
+        channel = channel_for("alerts", "org-1")
+
+        assert channel == channel_for("alerts", "org-1")
+        assert channel.startswith("ws:alerts:")
+        shard = int(channel.rsplit(":", 1)[1])
+        assert 0 <= shard < cluster.settings.websocket_cluster_shards
+
+    @pytest.mark.asyncio
+    async def test_broadcasts_are_batched_per_channel(
+        self, cache, websocket_managers
+    ) -> None:
+        """Test queued broadcasts go out in one publish per channel"""
+        manager, bus = await _worker(websocket_managers, "a")
+
+        for number in range(3):
+            await manager.broadcast_to_type(
+                {"type": "alert", "alert_id": str(number)}, "alerts"
+            )
+        await manager.broadcast_to_all({"type": "system_notification"})
+        await bus.flush()
+
+        targets = sorted(envelope["target"] for _, envelope in cache.published)
+        assert targets == ["alerts", "all"]
+        alerts = next(e for _, e in cache.published if e["target"] == "alerts")
+        assert [m["alert_id"] for m in alerts["messages"]] == ["0", "1", "2"]
+        assert bus.stats["published_batches"] == 2
+
+    @pytest.mark.asyncio
+    async def test_other_workers_deliver_locally(
+        self, cache, websocket_managers
+    ) -> None:
+        """Test a received batch reaches local sockets and is not re-forwarded"""
+        sender, sender_bus = await _worker(websocket_managers, "a")
+        receiver, receiver_bus = await _worker(websocket_managers, "b")
+        websocket = FakeWebSocket()
+        await receiver.connect(websocket, "alerts", {"severity_levels": ["high"]})
+
+        await sender.broadcast_to_type({"type": "alert", "severity": "high"}, "alerts")
+        await sender.broadcast_to_type({"type": "alert", "severity": "low"}, "alerts")
+        await sender_bus.flush()
+        _, envelope = cache.published[0]
+        await receiver_bus.receive(json.dumps(envelope))
+        await sender_bus.receive(json.dumps(envelope))
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert [m.get("severity") for m in websocket.sent[1:]] == ["high"]
+        assert receiver_bus.stats["received_messages"] == 2
+        assert receiver_bus.pending == {}
+        assert sender_bus.stats["own_batches_skipped"] == 1
@@ -0,0 +1,233 @@
+"""
+Unit tests for WebSocket fan-out through per-connection send queues
+"""
+
+import asyncio
+import json
+from typing import List, Optional
+
+import pytest
+
+import modules.websocket.connection_manager as connection_manager
+from modules.websocket.connection_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, gate: Optional[asyncio.Event] = None) -> None:
+        self.sent: List[dict] = []
+        self.closed_with: Optional[int] = None
+        # Sends block until the gate opens, like a client that stopped reading
+        self.gate = gate
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        if self.gate is not None:
+            await self.gate.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+def _alert(number: int) -> dict:
+    return {"type": "alert", "alert_id": str(number), "severity": "high"}
+
+
+async def _drain() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def small_queues(monkeypatch) -> None:
+    monkeypatch.setattr(connection_manager.settings, "websocket_send_queue_size", 3)
+    monkeypatch.setattr(
+        connection_manager.settings, "websocket_send_timeout_seconds", 10.0
+    )
+
+
+class TestFanOut:
+    """Test serialize-once, non-blocking broadcasts"""
+
+    @pytest.mark.asyncio
+    async def test_message_encoded_once(self, websocket_managers, small_queues) -> None:
+        """Test one encoding is shared by every subscriber"""
+        manager = websocket_managers()
+        sockets = [FakeWebSocket() for _ in range(10)]
+        for websocket in sockets:
+            await manager.connect(websocket, "alerts")
+
+        await manager.broadcast_to_type(_alert(1), "alerts")
+        await _drain()
+
+        assert manager.stats["messages_encoded"] == 1
+        assert all(websocket.sent[-1]["alert_id"] == "1" for websocket in sockets)
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_block_others(
+        self, websocket_managers, small_queues
+    ) -> None:
+        """Test a stalled connection only delays itself"""
+        manager = websocket_managers()
+        slow, fast = FakeWebSocket(asyncio.Event()), FakeWebSocket()
+        await manager.connect(slow, "alerts")
+        await manager.connect(fast, "alerts")
+
+        await asyncio.wait_for(manager.broadcast_to_type(_alert(1), "alerts"), 0.1)
+        await _drain()
+
+        assert [m["type"] for m in fast.sent] == ["connection_established", "alert"]
+        assert slow.sent == []
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_oldest_and_notifies(
+        self, websocket_managers, small_queues
+    ) -> None:
+        """Test a lagging client gets a lagged notice, then the newest messages"""
+        manager = websocket_managers()
+        gate = asyncio.Event()
+        slow = FakeWebSocket(gate)
+        await manager.connect(slow, "alerts")
+        await _drain()  # the welcome message is now in flight
+
+        for number in range(6):
+            await manager.broadcast_to_type(_alert(number), "alerts")
+        stats = manager.get_connection_stats()
+        gate.set()
+        await _drain()
+
+        assert stats["fan_out"]["dropped"] == 3
+        assert stats["connection_details"][0]["queue_depth"] == 3
+        assert [m["type"] for m in slow.sent] == [
+            "connection_established",
+            "lagged",
+            "alert",
+            "alert",
+            "alert",
+        ]
+        assert slow.sent[1]["dropped"] == 3
+        assert [m["alert_id"] for m in slow.sent[2:]] == ["3", "4", "5"]
+
+    @pytest.mark.asyncio
+    async def test_location_updates_coalesce(
+        self, websocket_managers, small_queues
+    ) -> None:
+        """Test queued updates for the same asset collapse to the latest"""
+        manager = websocket_managers()
+        gate = asyncio.Event()
+        slow = FakeWebSocket(gate)
+        await manager.connect(slow, "locations")
+        await _drain()
+
+        for latitude in (1.0, 2.0, 3.0):
+            await manager.broadcast_to_type(
+                {"type": "location_update", "asset_id": "a", "latitude": latitude},
+                "locations",
+            )
+        gate.set()
+        await _drain()
+
+        updates = [m for m in slow.sent if m["type"] == "location_update"]
+        assert [m["latitude"] for m in updates] == [3.0]
+        assert manager.clients[slow].stats["coalesced"] == 2
+        assert manager.stats["dropped"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stuck_client_is_disconnected(
+        self, websocket_managers, monkeypatch
+    ) -> None:
+        """Test a send exceeding the timeout closes the connection"""
+        monkeypatch.setattr(
+            connection_manager.settings, "websocket_send_timeout_seconds", 0.01
+        )
+        manager = websocket_managers()
+        stuck = FakeWebSocket(asyncio.Event())
+        await manager.connect(stuck, "alerts")
+
+        await asyncio.sleep(0.05)
+
+        assert stuck not in manager.clients
+        assert stuck.closed_with == 1011
+        assert manager.stats["slow_disconnects"] == 1
+
+
+def _location(asset_id: str, latitude: float) -> dict:
+    return {"type": "location_update", "asset_id": asset_id, "latitude": latitude}
+
+
+async def _subscribe(manager: ConnectionManager, websocket, delivery: dict) -> None:
+    await manager.handle_client_message(
+        websocket, json.dumps({"type": "subscribe", "delivery": delivery})
+    )
+
+
+class TestPacedDelivery:
+    """Test per-client rate-limited location streams"""
+
+    @pytest.mark.asyncio
+    async def test_batch_holds_latest_per_asset(
+        self, websocket_managers, small_queues
+    ) -> None:
+        """Test a tick sends one location_batch with each asset's latest update"""
+        manager = websocket_managers()
+        client = FakeWebSocket()
+        await manager.connect(client, "locations")
+        await _subscribe(manager, client, {"max_rate_hz": 1000, "batch": True})
+        await _drain()
+
+        for latitude in (1.0, 2.0, 3.0):
+            await manager.broadcast_to_type(_location("a", latitude), "locations")
+        await manager.broadcast_to_type(_location("b", 9.0), "locations")
+        assert [m["type"] for m in client.sent] == [
+            "connection_established",
+            "subscribed",
+        ]
+
+        manager.clients[client].flush_deferred()
+        await _drain()
+
+        batch = client.sent[-1]
+        assert batch["type"] == "location_batch"
+        assert [(u["asset_id"], u["latitude"]) for u in batch["updates"]] == [
+            ("a", 3.0),
+            ("b", 9.0),
+        ]
+        assert client.sent[1]["delivery"] == {"max_rate_hz": 10.0, "batch": True}
+
+    @pytest.mark.asyncio
+    async def test_batch_broadcast_splits_for_paced_clients(
+        self, websocket_managers, small_queues
+    ) -> None:
+        """Test batches reach immediate clients whole and paced ones filtered"""
+        manager = websocket_managers()
+        immediate, paced = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(immediate, "locations")
+        await manager.connect(paced, "locations", {"asset_ids": ["b"]})
+        await _subscribe(manager, paced, {"max_rate_hz": 5})
+        await _drain()
+
+        await manager.broadcast_location_batch(
+            [_location("a", 1.0), _location("b", 2.0)]
+        )
+        manager.clients[paced].flush_deferred()
+        await _drain()
+
+        assert immediate.sent[-1]["type"] == "location_batch"
+        assert len(immediate.sent[-1]["updates"]) == 2
+        assert paced.sent[-1] == _location("b", 2.0)
+
+    @pytest.mark.asyncio
+    async def test_invalid_policy_is_rejected(
+        self, websocket_managers, small_queues
+    ) -> None:
+        """Test a non-positive rate is answered with an error"""
+        manager = websocket_managers()
+        client = FakeWebSocket()
+        await manager.connect(client, "locations")
+        await _subscribe(manager, client, {"max_rate_hz": 0})
+        await _drain()
+
+        assert client.sent[-1]["type"] == "error"
+        assert manager.clients[client].delivery is None
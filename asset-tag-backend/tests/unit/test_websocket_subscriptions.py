@@ -0,0 +1,226 @@
+"""
+Unit tests for the WebSocket subscription index
+"""
+
+import asyncio
+import json
+import random
+
+import pytest
+
+from modules.websocket.connection_manager import ConnectionManager
+from modules.websocket.subscriptions import (SubscriptionIndex, ViewportGrid,
+                                             cluster_locations, parse_viewport)
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.sent = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+
+class TestSubscriptionIndex:
+    """Test candidate selection against connection filters"""
+
+    def test_match_intersects_fields(self) -> None:
+        """Test a message reaches connections accepting all of its fields"""
+        index = SubscriptionIndex()
+        index.add("everything", {})
+        index.add("asset-a", {"asset_ids": ["a"]})
+        index.add("site-1", {"site_ids": ["1"]})
+        index.add("asset-a-site-2", {"asset_ids": ["a"], "site_ids": ["2"]})
+
+        matched = set(index.match({"asset_id": "a", "site_id": "1"}))
+
+        assert matched == {"everything", "asset-a", "site-1"}
+        assert set(index.match({"type": "system_status"})) == {
+            "everything",
+            "asset-a",
+            "site-1",
+            "asset-a-site-2",
+        }
+
+    def test_re_add_and_remove(self) -> None:
+        """Test re-indexing replaces old values and removal cleans up"""
+        index = SubscriptionIndex()
+        index.add("client", {"asset_ids": ["a"]})
+        index.add("client", {"asset_ids": ["b"]})
+
+        assert list(index.match({"asset_id": "a"})) == []
+        assert list(index.match({"asset_id": "b"})) == ["client"]
+
+        index.remove("client")
+        assert len(index) == 0
+        assert index.by_value["asset_id"] == {}
+        assert list(index.match({"asset_id": "b"})) == []
+
+    def test_agrees_with_per_connection_check(self) -> None:
+        """Test the index gives the same recipients as evaluating each filter"""
+        manager = ConnectionManager()
+        rng = random.Random(7)
+        values = {
+            "asset_ids": ["a", "b", "c"],
+            "site_ids": ["1", "2"],
+            "severity_levels": ["low", "high"],
+        }
+        fields = {
+            "asset_ids": "asset_id",
+            "site_ids": "site_id",
+            "severity_levels": "severity",
+        }
+        index = SubscriptionIndex()
+        for connection in range(50):
+            filters = {
+                key: rng.sample(options, rng.randint(0, len(options)))
+                for key, options in values.items()
+                if rng.random() < 0.5
+            }
+            manager.connection_filters[connection] = filters
+            index.add(connection, filters)
+
+        for _ in range(50):
+            message = {
+                fields[key]: rng.choice(options)
+                for key, options in values.items()
+                if rng.random() < 0.7
+            }
+            expected = {
+                connection
+                for connection in manager.connection_filters
+                if manager._message_matches_filters(message, connection)
+            }
+            assert set(index.match(message)) == expected
+
+
+class TestBroadcastUsesIndex:
+    """Test the connection manager keeps the index in step with filters"""
+
+    @pytest.mark.asyncio
+    async def test_update_filters_and_disconnect(self, websocket_managers) -> None:
+        """Test filter updates re-route broadcasts and disconnects unsubscribe"""
+        manager = websocket_managers()
+        watcher, other = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(watcher, "locations", {"asset_ids": ["a"]})
+        await manager.connect(other, "locations", {"asset_ids": ["b"]})
+
+        update = {"type": "location_update", "asset_id": "b"}
+        assert set(manager.subscriptions["locations"].match(update)) == {other}
+
+        await manager.handle_client_message(
+            watcher,
+            json.dumps({"type": "update_filters", "filters": {"asset_ids": ["b"]}}),
+        )
+        assert set(manager.subscriptions["locations"].match(update)) == {
+            watcher,
+            other,
+        }
+
+        manager.disconnect(other)
+        assert list(manager.subscriptions["locations"].match(update)) == [watcher]
+        stats = manager.get_connection_stats()["subscriptions"]["locations"]
+        assert stats["connections"] == 1
+
+
+class TestViewports:
+    """Test bounding-box subscriptions and the spatial grid"""
+
+    def test_grid_routes_by_position(self) -> None:
+        """Test a position only matches viewports containing it"""
+        grid = ViewportGrid(cell_degrees=1.0, max_cells=1000)
+        grid.add("london", parse_viewport([-0.5, 51.3, 0.3, 51.7]))
+        grid.add("pacific", parse_viewport({"bbox": "170,-20,-170,0", "zoom": 4}))
+        grid.add("world", parse_viewport([-180, -90, 180, 90]))
+
+        assert grid.match(51.5, -0.1) == {"london", "world"}
+        assert grid.match(-10.0, 179.5) == {"pacific", "world"}
+        assert grid.match(-10.0, -175.0) == {"pacific", "world"}
+        assert grid.match(-10.0, 0.0) == {"world"}
+        assert grid.wide == {"world"}
+
+        grid.remove("london")
+        assert grid.match(51.5, -0.1) == {"world"}
+        assert all("london" not in members for members in grid.cells.values())
+
+    def test_invalid_viewports(self) -> None:
+        """Test malformed boxes and zoom levels are rejected"""
+        for value in ([0, 0, 1], [0, 10, 1, 5], [0, 0, 200, 1], {"bbox": "a,b,c,d"}):
+            with pytest.raises(ValueError):
+                parse_viewport(value)
+        with pytest.raises(ValueError):
+            parse_viewport({"bbox": [0, 0, 1, 1], "zoom": 30})
+
+    def test_index_combines_viewport_with_filters(self) -> None:
+        """Test location messages reach viewports containing them"""
+        index = SubscriptionIndex()
+        index.add("map", {"viewport": {"bbox": [10, 10, 11, 11]}})
+        index.add("asset-a", {"asset_ids": ["a"]})
+
+        inside = {"type": "location_update", "asset_id": "a"}
+        inside.update(latitude=10.5, longitude=10.5)
+        outside = {**inside, "latitude": 20.0}
+
+        assert set(index.match(inside)) == {"map", "asset-a"}
+        assert set(index.match(outside)) == {"asset-a"}
+        assert set(index.match({"type": "alert"})) == {"map", "asset-a"}
+
+    def test_clusters_aggregate_nearby_points(self) -> None:
+        """Test points in one cluster cell collapse to a counted centroid"""
+        clusters = cluster_locations(
+            [(10.01, 20.01, "a"), (10.02, 20.02, "b"), (-30.0, 40.0, "c")], zoom=3
+        )
+
+        by_count = sorted(clusters, key=lambda cluster: cluster["count"])
+        assert [cluster["count"] for cluster in by_count] == [1, 2]
+        assert by_count[1]["asset_ids"] == ["a", "b"]
+        assert by_count[1]["latitude"] == pytest.approx(10.015)
+
+    @pytest.mark.asyncio
+    async def test_zoomed_out_viewport_receives_clusters(
+        self, websocket_managers
+    ) -> None:
+        """Test a low-zoom viewport gets location_clusters frames per tick"""
+        manager = websocket_managers()
+        websocket = FakeWebSocket()
+        await manager.connect(
+            websocket,
+            "locations",
+            {"viewport": {"bbox": [-10, -10, 10, 10], "zoom": 3}},
+        )
+        client = manager.clients[websocket]
+        assert client.delivery is not None
+
+        for asset_id, latitude in (("a", 1.0), ("b", 1.01), ("a", 1.02), ("c", 50)):
+            await manager.broadcast_to_type(
+                {
+                    "type": "location_update",
+                    "asset_id": asset_id,
+                    "latitude": latitude,
+                    "longitude": 1.0,
+                },
+                "locations",
+            )
+        client.flush_deferred()
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        frame = websocket.sent[-1]
+        assert frame["type"] == "location_clusters"
+        assert [cluster["count"] for cluster in frame["clusters"]] == [2]
+
+        await manager.handle_client_message(
+            websocket,
+            json.dumps(
+                {
+                    "type": "update_filters",
+                    "filters": {"viewport": {"bbox": [-10, -10, 10, 10], "zoom": 15}},
+                }
+            ),
+        )
+        assert client.cluster_zoom is None
+        assert client.delivery is None
+        manager.disconnect(websocket)